@@ -0,0 +1,4 @@
+import time
+
+# Reference time for startup timing, when the app package is first imported
+IMPORT_START = time.perf_counter()
@@ -3,15 +3,23 @@ FastAPI Application
 """
 
 import logging
+import time
 import tomllib
 from contextlib import asynccontextmanager
 from functools import lru_cache
 
-from fastapi import BackgroundTasks, Depends, FastAPI, Request, status
+from fastapi import Depends, FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
-
-from app.dependencies import create_sql_db_and_tables
+from starlette.responses import JSONResponse, Response
+
+from app import IMPORT_START
+from app.dependencies import (
+    create_sql_db_and_tables,
+    get_settings,
+    get_sql_db_engine,
+    profile_request,
+    user_cache,
+)
 from app.routers import (
     courses,
     flights,
@@ -21,6 +29,7 @@ from app.routers import (
     matches,
     officers,
     payments,
+    profiles,
     rounds,
     seasons,
     substitutes,
@@ -29,8 +38,17 @@ from app.routers import (
     tournaments,
     users,
 )
-from app.utilities.custom_logger import CustomizeLogger
-from app.utilities.notifications import EmailSchema, send_email
+from app.utilities import metrics
+from app.utilities.coalescing import coalescer
+from app.utilities.custom_logger import (
+    AccessLogMiddleware,
+    CustomizeLogger,
+    access_log_options,
+)
+from app.utilities.live_events import live_events
+from app.utilities.notifications import EmailSchema, email_outbox, enqueue_email
+from app.utilities.query_counter import QueryCounterMiddleware, query_counter_options
+from app.utilities.startup import StartupTimer, is_schema_current
 
 
 @lru_cache
@@ -47,8 +65,36 @@ def _get_project_info():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_sql_db_and_tables()
+    timer = StartupTimer()
+    timer.durations["imports"] = time.perf_counter() - IMPORT_START
+    with timer.phase("configuration"):
+        settings = get_settings()
+        if settings.apl_golf_league_api_coalesced_routes is not None:
+            coalescer.configure(settings.apl_golf_league_api_coalesced_routes)
+        query_counter_options.configure(
+            debug_headers=settings.apl_golf_league_api_query_debug_headers,
+            repeat_threshold=settings.apl_golf_league_api_query_repeat_threshold,
+        )
+        user_cache.configure(ttl=settings.apl_golf_league_api_user_cache_ttl_seconds)
+        access_log_options.configure(
+            headers=settings.apl_golf_league_api_access_log_headers,
+            debug_sample_rate=settings.apl_golf_league_api_access_log_debug_sample_rate,
+        )
+        live_events.configure(
+            heartbeat_interval=settings.apl_golf_league_api_live_events_heartbeat_seconds,
+            queue_size=settings.apl_golf_league_api_live_events_queue_size,
+        )
+    with timer.phase("database_schema"):
+        # Alembic owns the schema, only create tables if migrations are not current
+        if not (
+            settings.apl_golf_league_api_skip_create_all_when_migrated
+            and is_schema_current(get_sql_db_engine())
+        ):
+            create_sql_db_and_tables()
+    metrics.register_pool_metrics(get_sql_db_engine().pool)
+    timer.report()
     yield
+    email_outbox.close(timeout=10)
 
 
 app = FastAPI(
@@ -68,36 +114,6 @@ logger = CustomizeLogger.make_logger(CONFIG_PATH)
 app.logger = logger
 
 
-async def log_request_data(request: Request):
-    """
-    Logs request with parameters and headers.
-
-    Included as router-level dependency.
-
-    Parameters
-    ----------
-    request : Request
-        request to log
-
-    References
-    ----------
-    https://stackoverflow.com/questions/63400683/python-logging-with-loguru-log-request-params-on-fastapi-app
-
-    """
-    logger.debug(f"{request.method} {request.url}")
-    logger.debug("Params:")
-    for name, value in request.path_params.items():
-        logger.debug(f"\t{name}: {value}")
-    logger.debug("Headers:")
-    for name, value in request.headers.items():
-        logger.debug(f"\t{name}: {value}")
-    # TODO: Log request body, handle errors when request has no body
-    # req_body = await request.json()
-    # if req_body:
-    #     logger.debug(f"Body:")
-    #     logger.debug(f"\t{req_body}")
-
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -105,6 +121,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(AccessLogMiddleware)
+app.add_middleware(QueryCounterMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 @app.get("/")
@@ -123,30 +142,38 @@ async def get_heartbeat():
     return {"status": "alive"}
 
 
-app.include_router(tasks.router, dependencies=[Depends(log_request_data)])
-app.include_router(users.router, dependencies=[Depends(log_request_data)])
-app.include_router(seasons.router, dependencies=[Depends(log_request_data)])
-app.include_router(courses.router, dependencies=[Depends(log_request_data)])
-app.include_router(golfers.router, dependencies=[Depends(log_request_data)])
-app.include_router(teams.router, dependencies=[Depends(log_request_data)])
-app.include_router(substitutes.router, dependencies=[Depends(log_request_data)])
-app.include_router(free_agents.router, dependencies=[Depends(log_request_data)])
-app.include_router(flights.router, dependencies=[Depends(log_request_data)])
-app.include_router(tournaments.router, dependencies=[Depends(log_request_data)])
-app.include_router(rounds.router, dependencies=[Depends(log_request_data)])
-app.include_router(matches.router, dependencies=[Depends(log_request_data)])
-app.include_router(officers.router, dependencies=[Depends(log_request_data)])
-app.include_router(handicaps.router, dependencies=[Depends(log_request_data)])
-app.include_router(payments.router, dependencies=[Depends(log_request_data)])
+@app.get("/metrics", tags=["Metrics"], include_in_schema=False)
+async def get_metrics():
+    """
+    Runtime metrics in Prometheus text exposition format.
+    """
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+app.include_router(tasks.router, dependencies=[Depends(profile_request)])
+app.include_router(users.router, dependencies=[Depends(profile_request)])
+app.include_router(seasons.router, dependencies=[Depends(profile_request)])
+app.include_router(courses.router, dependencies=[Depends(profile_request)])
+app.include_router(golfers.router, dependencies=[Depends(profile_request)])
+app.include_router(teams.router, dependencies=[Depends(profile_request)])
+app.include_router(substitutes.router, dependencies=[Depends(profile_request)])
+app.include_router(free_agents.router, dependencies=[Depends(profile_request)])
+app.include_router(flights.router, dependencies=[Depends(profile_request)])
+app.include_router(tournaments.router, dependencies=[Depends(profile_request)])
+app.include_router(rounds.router, dependencies=[Depends(profile_request)])
+app.include_router(matches.router, dependencies=[Depends(profile_request)])
+app.include_router(officers.router, dependencies=[Depends(profile_request)])
+app.include_router(handicaps.router, dependencies=[Depends(profile_request)])
+app.include_router(payments.router, dependencies=[Depends(profile_request)])
+app.include_router(profiles.router)
 
 
 @app.post("/email_test/")
-async def test_email(
-    *, email: EmailSchema, background_tasks: BackgroundTasks
-) -> JSONResponse:
-    send_email(email, "handicap_update_report.html", background_tasks)
+async def test_email(*, email: EmailSchema) -> JSONResponse:
+    message_id = enqueue_email(email, "handicap_update_report.html")
     return JSONResponse(
-        status_code=status.HTTP_200_OK, content={"message": "Email has been sent"}
+        status_code=status.HTTP_200_OK,
+        content={"message": "Email has been queued", "id": message_id},
     )
 
 
@@ -11,9 +11,18 @@ class Settings(BaseSettings):
     apl_golf_league_api_database_name: str
     apl_golf_league_api_database_schema: str
     apl_golf_league_api_database_echo: bool = True
+    apl_golf_league_api_skip_create_all_when_migrated: bool = True
     apl_golf_league_api_access_token_secret_key: str
     apl_golf_league_api_access_token_algorithm: str
     apl_golf_league_api_access_token_expire_minutes: int = 120
+    apl_golf_league_api_user_cache_ttl_seconds: float | None = None
+    apl_golf_league_api_coalesced_routes: list[str] | None = None
+    apl_golf_league_api_query_debug_headers: bool = False
+    apl_golf_league_api_query_repeat_threshold: int | None = None
+    apl_golf_league_api_access_log_headers: list[str] | None = None
+    apl_golf_league_api_access_log_debug_sample_rate: float | None = None
+    apl_golf_league_api_live_events_heartbeat_seconds: float | None = None
+    apl_golf_league_api_live_events_queue_size: int | None = None
     mail_username: str
     mail_password: str
     mail_from_address: str
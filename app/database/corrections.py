@@ -0,0 +1,458 @@
+from datetime import date, datetime
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.database import handicaps as db_handicaps
+from app.database import rounds as db_rounds
+from app.database import snapshots as db_snapshots
+from app.models.golfer import Golfer
+from app.models.handicap import HandicapIndex
+from app.models.hole_result import HoleResult, HoleResultValidationRequest
+from app.models.match import Match, MatchValidationRequest
+from app.models.match_round_link import MatchRoundLink
+from app.models.round import (
+    GolferHandicapIndexCorrection,
+    HandicapIndexCorrection,
+    HoleResultCorrection,
+    MatchScoreCorrection,
+    Round,
+    RoundCorrection,
+    RoundValidationRequest,
+)
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.tournament_round_link import TournamentRoundLink
+from app.tasks.handicaps import (
+    get_handicap_index_data,
+    get_handicap_min_date,
+    get_handicap_update_dates,
+)
+from app.utilities import scoring
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.apl_legacy_handicap_system import APLLegacyHandicapSystem
+
+
+def correct_round(
+    session: Session,
+    round_db: Round,
+    round_golfer_link_db: RoundGolferLink,
+    golfer_id: int | None = None,
+    playing_handicap: int | None = None,
+    dry_run: bool = False,
+    today: date | None = None,
+) -> RoundCorrection:
+    """Corrects the golfer and/or playing handicap for a round.
+
+    Records that depend on the round are recomputed in the same transaction:
+    - hole results (handicap strokes, adjusted gross and net scores), in bulk
+    - handicap indexes posted for the affected golfers' league rounds from the
+      round date onwards (the tail of their scoring records)
+    - the affected golfers' current handicap index, if changed by the correction
+    - the affected golfers' stored handicap index states, if the round was posted
+    - the match score, if it was computed from the prior round data
+    - response snapshots for the round's flight and tournaments
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    round_db (`Round`): Round to correct.
+    round_golfer_link_db (`RoundGolferLink`): Current golfer link for the round.
+    golfer_id (int | None, optional): Golfer to assign the round to.
+        Defaults to None, keeps current golfer.
+    playing_handicap (int | None, optional): Corrected playing handicap.
+        Defaults to None, keeps current playing handicap.
+    dry_run (bool, optional): Compute changes without applying them (rolls back
+        the transaction). Defaults to False.
+    today (date | None, optional): Date for determining current handicap
+        indexes. Defaults to None, uses today's date.
+
+    Returns
+    -------
+    `RoundCorrection`: Changes made (or, for a dry run, that would be made).
+    """
+    if today is None:
+        today = date.today()
+
+    correction = RoundCorrection(
+        round_id=round_db.id,
+        golfer_id_prior=round_golfer_link_db.golfer_id,
+        golfer_id=round_golfer_link_db.golfer_id if golfer_id is None else golfer_id,
+        playing_handicap_prior=round_golfer_link_db.playing_handicap,
+        playing_handicap=(
+            round_golfer_link_db.playing_handicap
+            if playing_handicap is None
+            else playing_handicap
+        ),
+    )
+    is_golfer_changed = correction.golfer_id != correction.golfer_id_prior
+    is_playing_handicap_changed = (
+        correction.playing_handicap != correction.playing_handicap_prior
+    )
+    golfer_ids = list(dict.fromkeys([correction.golfer_id_prior, correction.golfer_id]))
+
+    match_db = session.exec(
+        select(Match)
+        .join(MatchRoundLink, onclause=MatchRoundLink.match_id == Match.id)
+        .where(MatchRoundLink.round_id == round_db.id)
+    ).first()
+    is_match_rescored = (
+        match_db is not None
+        and is_playing_handicap_changed
+        and round_db.date_played.year >= 2022
+    )
+
+    # Values computed from the prior round data, so only changes caused by
+    # this correction are applied
+    match_score_prior = (
+        compute_match_score(session=session, match_id=match_db.id)
+        if is_match_rescored
+        else None
+    )
+    handicap_index_prior = {
+        golfer_id: compute_current_handicap_index(
+            session=session,
+            golfer_id=golfer_id,
+            date_played=round_db.date_played,
+            today=today,
+        )
+        for golfer_id in golfer_ids
+    }
+
+    try:
+        if is_golfer_changed:
+            session.delete(round_golfer_link_db)
+            session.add(
+                RoundGolferLink(
+                    round_id=round_db.id,
+                    golfer_id=correction.golfer_id,
+                    playing_handicap=correction.playing_handicap,
+                )
+            )
+            session.execute(
+                update(HandicapIndex)
+                .where(HandicapIndex.golfer_id == correction.golfer_id_prior)
+                .where(HandicapIndex.round_id == round_db.id)
+                .values(golfer_id=correction.golfer_id)
+            )
+        else:
+            round_golfer_link_db.playing_handicap = correction.playing_handicap
+            session.add(round_golfer_link_db)
+        round_db.date_updated = datetime.now()
+        session.add(round_db)
+        session.flush()
+
+        if is_playing_handicap_changed:
+            correction.hole_results = update_hole_results_for_round(
+                session=session,
+                round_db=round_db,
+                playing_handicap=correction.playing_handicap,
+            )
+
+        for golfer_id in golfer_ids:
+            correction.handicap_indexes += update_handicap_indexes_for_golfer(
+                session=session, golfer_id=golfer_id, min_date=round_db.date_played
+            )
+
+            handicap_index = compute_current_handicap_index(
+                session=session,
+                golfer_id=golfer_id,
+                date_played=round_db.date_played,
+                today=today,
+            )
+            if handicap_index != handicap_index_prior[golfer_id]:
+                golfer_db = session.get(Golfer, golfer_id)
+                correction.golfers.append(
+                    GolferHandicapIndexCorrection(
+                        golfer_id=golfer_id,
+                        handicap_index_prior=golfer_db.handicap_index,
+                        handicap_index=handicap_index,
+                    )
+                )
+                golfer_db.handicap_index = handicap_index
+                golfer_db.handicap_index_updated = datetime.now()
+                session.add(golfer_db)
+
+        db_handicaps.rebuild_handicap_states(
+            session=session,
+            golfer_ids=golfer_ids,
+            min_date=round_db.date_played,
+            commit=False,
+        )
+
+        if is_match_rescored:
+            match_score = compute_match_score(session=session, match_id=match_db.id)
+            if (
+                match_score is not None
+                and match_score != match_score_prior
+                and (match_db.home_score, match_db.away_score) == match_score_prior
+            ):
+                correction.matches.append(
+                    MatchScoreCorrection(
+                        match_id=match_db.id,
+                        home_score_prior=match_db.home_score,
+                        home_score=match_score[0],
+                        away_score_prior=match_db.away_score,
+                        away_score=match_score[1],
+                    )
+                )
+                match_db.home_score, match_db.away_score = match_score
+                session.add(match_db)
+
+        if match_db is not None:
+            correction.snapshot_scopes.append(
+                db_snapshots.get_flight_scope(match_db.flight_id)
+            )
+        for tournament_id in session.exec(
+            select(TournamentRoundLink.tournament_id).where(
+                TournamentRoundLink.round_id == round_db.id
+            )
+        ).all():
+            correction.snapshot_scopes.append(
+                db_snapshots.get_tournament_scope(tournament_id)
+            )
+        # Handicap changes of corrected golfers also affect other competitions
+        for scope in sorted(
+            db_snapshots.get_golfer_scopes(session=session, golfer_ids=golfer_ids)
+        ):
+            if scope not in correction.snapshot_scopes:
+                correction.snapshot_scopes.append(scope)
+        for scope in correction.snapshot_scopes:
+            db_snapshots.delete_snapshots(session=session, scope=scope, commit=False)
+
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+            correction.is_applied = True
+    except Exception:
+        session.rollback()
+        raise
+
+    return correction
+
+
+def update_hole_results_for_round(
+    session: Session, round_db: Round, playing_handicap: int
+) -> list[HoleResultCorrection]:
+    """Recomputes hole results for a round's playing handicap, without committing.
+
+    Hole results that differ are updated in a single bulk statement.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    round_db (`Round`): Round to update.
+    playing_handicap (int): Playing handicap for the round.
+
+    Returns
+    -------
+    list[`HoleResultCorrection`]: Changed hole results, in order of hole number.
+    """
+    # TODO: Make a utility/factory for this
+    if round_db.date_played.year >= 2022:
+        ahs = APLHandicapSystem()
+    else:
+        ahs = APLLegacyHandicapSystem()
+
+    corrections: list[HoleResultCorrection] = []
+    for hole_result_data in db_rounds.get_hole_results_for_rounds(
+        session=session, round_ids=[round_db.id]
+    ):
+        handicap_strokes = ahs.compute_hole_handicap_strokes(
+            hole_result_data.stroke_index, playing_handicap
+        )
+        adjusted_gross_score = ahs.compute_hole_adjusted_gross_score(
+            hole_result_data.par,
+            hole_result_data.stroke_index,
+            hole_result_data.gross_score,
+            playing_handicap,
+        )
+        net_score = hole_result_data.gross_score - handicap_strokes
+        if (
+            handicap_strokes,
+            adjusted_gross_score,
+            net_score,
+        ) != (
+            hole_result_data.handicap_strokes,
+            hole_result_data.adjusted_gross_score,
+            hole_result_data.net_score,
+        ):
+            corrections.append(
+                HoleResultCorrection(
+                    hole_result_id=hole_result_data.hole_result_id,
+                    round_id=hole_result_data.round_id,
+                    number=hole_result_data.number,
+                    handicap_strokes_prior=hole_result_data.handicap_strokes,
+                    handicap_strokes=handicap_strokes,
+                    adjusted_gross_score_prior=hole_result_data.adjusted_gross_score,
+                    adjusted_gross_score=adjusted_gross_score,
+                    net_score_prior=hole_result_data.net_score,
+                    net_score=net_score,
+                )
+            )
+
+    if len(corrections) > 0:
+        session.execute(
+            update(HoleResult),
+            [
+                {
+                    "id": c.hole_result_id,
+                    "handicap_strokes": c.handicap_strokes,
+                    "adjusted_gross_score": c.adjusted_gross_score,
+                    "net_score": c.net_score,
+                }
+                for c in corrections
+            ],
+        )
+    return corrections
+
+
+def update_handicap_indexes_for_golfer(
+    session: Session, golfer_id: int, min_date: datetime
+) -> list[HandicapIndexCorrection]:
+    """Recomputes posted handicap indexes for a golfer's rounds from a date onwards.
+
+    Only the tail of the golfer's scoring record is recomputed. Handicap indexes
+    that differ are updated in a single bulk statement, without committing.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    golfer_id (int): Golfer identifier.
+    min_date (datetime): Earliest date of rounds to recompute.
+
+    Returns
+    -------
+    list[`HandicapIndexCorrection`]: Changed handicap indexes, in order posted.
+    """
+    handicap_indexes = {
+        srr.round_id: srr.handicap_index
+        for srr in db_handicaps.get_scoring_record_rounds_for_golfer(
+            session=session, golfer_id=golfer_id, min_date=min_date
+        )
+    }
+    if len(handicap_indexes) == 0:
+        return []
+
+    corrections = [
+        HandicapIndexCorrection(
+            handicap_index_id=handicap_index_id,
+            golfer_id=golfer_id,
+            round_id=round_id,
+            handicap_index_prior=handicap_index_prior,
+            handicap_index=handicap_indexes[round_id],
+        )
+        for handicap_index_id, round_id, handicap_index_prior in session.exec(
+            select(
+                HandicapIndex.id, HandicapIndex.round_id, HandicapIndex.handicap_index
+            )
+            .where(HandicapIndex.golfer_id == golfer_id)
+            .where(HandicapIndex.round_id.in_(handicap_indexes.keys()))
+            .order_by(HandicapIndex.date_posted, HandicapIndex.round_number)
+        ).all()
+        if handicap_indexes[round_id] != handicap_index_prior
+    ]
+    if len(corrections) > 0:
+        session.execute(
+            update(HandicapIndex),
+            [
+                {"id": c.handicap_index_id, "handicap_index": c.handicap_index}
+                for c in corrections
+            ],
+        )
+    return corrections
+
+
+def compute_current_handicap_index(
+    session: Session, golfer_id: int, date_played: datetime, today: date
+) -> float | None:
+    """Computes golfer's current handicap index, if affected by a round.
+
+    The current handicap index is computed as in the weekly handicap update.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    golfer_id (int): Golfer identifier.
+    date_played (datetime): Date the round was played.
+    today (date): Date for determining current handicap index.
+
+    Returns
+    -------
+    float | None: Current handicap index, or None if the round is not in the
+        current scoring record window.
+    """
+    min_date = get_handicap_min_date(today)
+    _, max_date = get_handicap_update_dates(today)
+    if not (min_date <= date_played.date() <= max_date):
+        return None
+    return get_handicap_index_data(
+        session=session,
+        golfer_id=golfer_id,
+        min_date=min_date,
+        max_date=max_date,
+        limit=10,
+    ).active_handicap_index
+
+
+def compute_match_score(session: Session, match_id: int) -> tuple[float, float] | None:
+    """Computes match score from the rounds recorded for a match.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    match_id (int): Match identifier.
+
+    Returns
+    -------
+    tuple[float, float] | None: Home and away team scores, or None if the match
+        rounds are incomplete or invalid.
+    """
+    match_db = session.get(Match, match_id)
+    round_data = session.exec(
+        select(MatchRoundLink.team_id, Round, RoundGolferLink.playing_handicap)
+        .join(Round, onclause=Round.id == MatchRoundLink.round_id)
+        .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+        .where(MatchRoundLink.match_id == match_id)
+        .order_by(Round.id)
+    ).all()
+
+    holes_by_round: dict[int, list[HoleResultValidationRequest]] = {}
+    for hole_result_data in db_rounds.get_hole_results_for_rounds(
+        session=session, round_ids=[round_db.id for _, round_db, _ in round_data]
+    ):
+        holes_by_round.setdefault(hole_result_data.round_id, []).append(
+            HoleResultValidationRequest(
+                number=hole_result_data.number,
+                par=hole_result_data.par,
+                stroke_index=hole_result_data.stroke_index,
+                gross_score=hole_result_data.gross_score,
+            )
+        )
+
+    team_rounds: dict[int, list[RoundValidationRequest]] = {
+        match_db.home_team_id: [],
+        match_db.away_team_id: [],
+    }
+    for team_id, round_db, playing_handicap in round_data:
+        if team_id not in team_rounds or playing_handicap is None:
+            return None
+        team_rounds[team_id].append(
+            RoundValidationRequest(
+                date_played=round_db.date_played,
+                course_handicap=playing_handicap,
+                holes=holes_by_round.get(round_db.id, []),
+            )
+        )
+    if any(len(rounds) == 0 for rounds in team_rounds.values()):
+        return None
+
+    match_response = scoring.validate_match(
+        MatchValidationRequest(
+            home_team_rounds=team_rounds[match_db.home_team_id],
+            away_team_rounds=team_rounds[match_db.away_team_id],
+        )
+    )
+    if not match_response.is_valid:
+        return None
+    return match_response.home_team_score, match_response.away_team_score
@@ -80,6 +80,21 @@ def get_holes_by_tee_id(session: Session, tee_id: int) -> list[Hole]:
     return list(session.exec(select(Hole).where(Hole.tee_id == tee_id)).all())
 
 
+def get_holes_by_tee_ids(session: Session, tee_ids: list[int]) -> list[Hole]:
+    """Get holes from database for the given tee sets in a single query.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    tee_ids (list[int]): Tee identifiers.
+
+    Returns
+    -------
+    list['Hole']: Holes for these tee sets from database.
+    """
+    return list(session.exec(select(Hole).where(Hole.tee_id.in_(tee_ids))).all())
+
+
 def get_course_data_by_tee_id(
     session: Session, tee_id: int
 ) -> tuple[Course, Track, Tee, list[Hole]]:
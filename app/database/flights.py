@@ -22,6 +22,13 @@ from app.models.hole import Hole
 from app.models.hole_result import HoleResult
 from app.models.match import Match, MatchSummary
 from app.models.match_round_link import MatchRoundLink
+from app.models.query_helpers import (
+    FlightData,
+    get_divisions_in_flights,
+    get_flights,
+    get_matches_for_teams,
+    get_teams_in_flights,
+)
 from app.models.round import Round
 from app.models.round_golfer_link import RoundGolferLink
 from app.models.substitute import Substitute
@@ -42,6 +49,38 @@ def get_by_id(session: Session, flight_id: int) -> Flight | None:
     return session.get(Flight, flight_id)
 
 
+def get_data(session: Session, flight_id: int) -> FlightData | None:
+    # Query database for selected flight
+    flight_data = get_flights(session=session, flight_ids=(flight_id,))
+    if (not flight_data) or (len(flight_data) == 0):
+        return None
+    flight_data = flight_data[0]
+    # Add division and team data to selected flight
+    flight_data.divisions = get_divisions_in_flights(
+        session=session, flight_ids=(flight_id,)
+    )
+    flight_data.teams = get_teams_in_flights(session=session, flight_ids=(flight_id,))
+    # Compile match summary data and add to selected flight
+    team_matches = get_matches_for_teams(
+        session=session, team_ids=[t.id for t in flight_data.teams]
+    )
+    flight_data.matches = [
+        MatchSummary(
+            match_id=match.match_id,
+            home_team_id=match.home_team_id,
+            home_team_name=match.home_team_name,
+            away_team_id=match.away_team_id,
+            away_team_name=match.away_team_name,
+            flight_name=match.flight_name,
+            week=match.week,
+            home_score=match.home_score,
+            away_score=match.away_score,
+        )
+        for match in team_matches
+    ]
+    return flight_data
+
+
 def get_info(session: Session, flight_id: int) -> FlightInfo:
     flight = session.exec(select(Flight).where(Flight.id == flight_id)).one()
     teams = get_teams(session=session, flight_id=flight_id)
@@ -1,5 +1,6 @@
 from sqlmodel import Session, select
 
+from app.database import snapshots as db_snapshots
 from app.models.flight import FlightFreeAgent, FlightFreeAgentCreate
 from app.models.tournament import TournamentFreeAgent, TournamentFreeAgentCreate
 
@@ -35,6 +36,11 @@ def create_flight_free_agent(
         return None
     free_agent_db = FlightFreeAgent.model_validate(new_free_agent)
     session.add(free_agent_db)
+    db_snapshots.delete_snapshots(
+        session=session,
+        scope=db_snapshots.get_flight_scope(free_agent_db.flight_id),
+        commit=False,
+    )
     session.commit()
     session.refresh(free_agent_db)
     return free_agent_db
@@ -49,6 +55,9 @@ def delete_flight_free_agent(
     if free_agent_db is None:
         return None
     session.delete(free_agent_db)
+    db_snapshots.delete_snapshots(
+        session=session, scope=db_snapshots.get_flight_scope(flight_id), commit=False
+    )
     session.commit()
     return free_agent_db
 
@@ -84,6 +93,11 @@ def create_tournament_free_agent(
         return None
     free_agent_db = TournamentFreeAgent.model_validate(new_free_agent)
     session.add(free_agent_db)
+    db_snapshots.delete_snapshots(
+        session=session,
+        scope=db_snapshots.get_tournament_scope(free_agent_db.tournament_id),
+        commit=False,
+    )
     session.commit()
     session.refresh(free_agent_db)
     return free_agent_db
@@ -98,5 +112,10 @@ def delete_tournament_free_agent(
     if free_agent_db is None:
         return None
     session.delete(free_agent_db)
+    db_snapshots.delete_snapshots(
+        session=session,
+        scope=db_snapshots.get_tournament_scope(tournament_id),
+        commit=False,
+    )
     session.commit()
     return free_agent_db
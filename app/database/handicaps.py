@@ -1,8 +1,19 @@
-from sqlmodel import Session, select
+import json
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlmodel import Session, and_, col, desc, func, or_, select
 
 from app.models.course import Course
 from app.models.golfer import Golfer
-from app.models.handicap import HandicapIndex, ScoringRecordRound
+from app.models.handicap import (
+    GolferHandicapState,
+    GolferHandicapStateRead,
+    HandicapIndex,
+    PlayingConditionsCorrection,
+    ScoringRecordRound,
+    get_playing_conditions_onclause,
+)
 from app.models.hole_result import HoleResult
 from app.models.qualifying_score import QualifyingScore
 from app.models.round import Round, RoundType, ScoringType
@@ -10,6 +21,7 @@ from app.models.round_golfer_link import RoundGolferLink
 from app.models.tee import Tee
 from app.models.track import Track
 from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.handicap_index_state import HandicapIndexState
 
 
 def get_handicap_history_for_golfer(
@@ -32,9 +44,33 @@ def get_handicap_history_for_golfer(
 
 
 def get_scoring_record_rounds_for_golfer(
-    session: Session, golfer_id: int, year: int | None = None
+    session: Session,
+    golfer_id: int,
+    year: int | None = None,
+    min_date: datetime | None = None,
 ) -> list[ScoringRecordRound]:
-    """Gathers list of scoring record rounds for"""
+    """Gathers list of scoring record rounds for golfer.
+
+    Each league round includes the golfer's handicap index after that round,
+    computed from the round and the prior 9 league rounds (or qualifying scores,
+    if there are no prior league rounds).
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    golfer_id (int): Golfer identifier.
+    year (int | None, optional): Year for filtering scoring record, only the
+        rounds shown and the prior rounds needed for their handicap indexes are
+        loaded. Defaults to None.
+    min_date (datetime | None, optional): If given, only league rounds played on
+        or after this date are returned, loading just the prior rounds needed for
+        their handicap indexes (e.g. to recompute the record after a correction).
+        Defaults to None.
+
+    Returns
+    -------
+    list[`ScoringRecordRound`]: Scoring record rounds, in order played.
+    """
     ahs = APLHandicapSystem()  # TODO: Inject? Determine by time range?
 
     scoring_record: list[ScoringRecordRound] = []
@@ -80,33 +116,99 @@ def get_scoring_record_rounds_for_golfer(
             record=[sr.score_differential for sr in scoring_record]
         )
 
-    # League rounds
-    round_data_db: list[tuple[Round, RoundGolferLink, Tee, Track, Course]] = (
-        session.exec(
-            select(Round, RoundGolferLink, Tee, Track, Course)
+    # League rounds, with scores totalled over the golfer's hole results
+    hole_totals = (
+        select(
+            HoleResult.round_id,
+            func.sum(HoleResult.gross_score).label("gross_score"),
+            func.sum(HoleResult.adjusted_gross_score).label("adjusted_gross_score"),
+            func.sum(HoleResult.net_score).label("net_score"),
+        )
+        .join(RoundGolferLink, onclause=RoundGolferLink.round_id == HoleResult.round_id)
+        .where(RoundGolferLink.golfer_id == golfer_id)
+        .group_by(HoleResult.round_id)
+        .subquery()
+    )
+    round_query = (
+        select(
+            Round,
+            RoundGolferLink,
+            Tee,
+            Track,
+            Course,
+            func.coalesce(hole_totals.c.gross_score, 0),
+            func.coalesce(hole_totals.c.adjusted_gross_score, 0),
+            func.coalesce(hole_totals.c.net_score, 0),
+            func.coalesce(
+                PlayingConditionsCorrection.playing_conditions_correction, 0.0
+            ),
+        )
+        .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+        .join(Tee, onclause=Tee.id == Round.tee_id)
+        .join(Track, onclause=Track.id == Tee.track_id)
+        .join(Course, onclause=Course.id == Track.course_id)
+        .outerjoin(hole_totals, onclause=hole_totals.c.round_id == Round.id)
+        .outerjoin(
+            PlayingConditionsCorrection, onclause=get_playing_conditions_onclause()
+        )
+        .where(RoundGolferLink.golfer_id == golfer_id)
+        .where(Round.scoring_type == ScoringType.INDIVIDUAL)
+    )
+
+    # Rounds shown for a year are those played in the year, or at least the 10
+    # most recent rounds through the year
+    load_min_date = min_date
+    if min_date is None and year is not None:
+        year_end = datetime(year + 1, 1, 1)
+        round_query = round_query.where(Round.date_played < year_end)
+        tenth_date_played = session.exec(
+            select(Round.date_played)
             .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
-            .join(Tee, onclause=Tee.id == Round.tee_id)
-            .join(Track, onclause=Track.id == Tee.track_id)
-            .join(Course, onclause=Course.id == Track.course_id)
             .where(RoundGolferLink.golfer_id == golfer_id)
             .where(Round.scoring_type == ScoringType.INDIVIDUAL)
-            .order_by(Round.date_played, Round.id)
-        ).all()
-    )
+            .where(Round.date_played < year_end)
+            .order_by(desc(Round.date_played), desc(Round.id))
+            .offset(9)
+            .limit(1)
+        ).first()
+        if tenth_date_played is not None:
+            load_min_date = min(datetime(year, 1, 1), tenth_date_played)
 
-    for round_db, rgl_db, tee_db, track_db, course_db in round_data_db:
-        hole_results_db = session.exec(
-            select(HoleResult).where(HoleResult.round_id == round_db.id)
+    if load_min_date is None:
+        round_data_db = session.exec(
+            round_query.order_by(Round.date_played, Round.id)
         ).all()
-
-        gross_score = sum(hr_db.gross_score for hr_db in hole_results_db)
-        adjusted_gross_score = sum(
-            hr_db.adjusted_gross_score for hr_db in hole_results_db
+    else:
+        # Only the prior 9 rounds contribute to handicap indexes from min_date
+        prior_round_data_db = session.exec(
+            round_query.where(Round.date_played < load_min_date)
+            .order_by(desc(Round.date_played), desc(Round.id))
+            .limit(9)
+        ).all()
+        round_data_db = list(reversed(prior_round_data_db)) + list(
+            session.exec(
+                round_query.where(Round.date_played >= load_min_date).order_by(
+                    Round.date_played, Round.id
+                )
+            ).all()
         )
-        net_score = sum(hr_db.net_score for hr_db in hole_results_db)
 
+    for (
+        round_db,
+        rgl_db,
+        tee_db,
+        track_db,
+        course_db,
+        gross_score,
+        adjusted_gross_score,
+        net_score,
+        playing_conditions_correction,
+    ) in round_data_db:
         score_differential = ahs.compute_score_differential(
-            rating=tee_db.rating, slope=tee_db.slope, score=adjusted_gross_score
+            rating=tee_db.rating,
+            slope=tee_db.slope,
+            score=adjusted_gross_score,
+            playing_conditions_correction=playing_conditions_correction,
         )
 
         hcp_scoring_record = list(
@@ -135,6 +237,7 @@ def get_scoring_record_rounds_for_golfer(
                 tee_par=tee_db.par,
                 tee_rating=tee_db.rating,
                 tee_slope=tee_db.slope,
+                playing_conditions_correction=playing_conditions_correction,
                 playing_handicap=rgl_db.playing_handicap,
                 gross_score=gross_score,
                 adjusted_gross_score=adjusted_gross_score,
@@ -146,6 +249,13 @@ def get_scoring_record_rounds_for_golfer(
             )
         )
 
+    if min_date is not None:
+        scoring_record = [
+            srr
+            for srr in scoring_record
+            if srr.round_id is not None and srr.date_played >= min_date
+        ]
+
     # Filter by year
     if year is None:
         return scoring_record
@@ -160,3 +270,252 @@ def get_scoring_record_rounds_for_golfer(
         return scoring_record_limit[-10:]
 
     return scoring_record_year
+
+
+def get_handicap_state(
+    session: Session, golfer_id: int
+) -> GolferHandicapStateRead | None:
+    """Get stored handicap index state for a specific golfer.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    golfer_id (int): Golfer identifier.
+
+    Returns
+    -------
+    `GolferHandicapStateRead` | None: Handicap index state, or None if no
+        rounds have been posted to the golfer's state.
+    """
+    state_db = session.get(GolferHandicapState, golfer_id)
+    if state_db is None:
+        return None
+    state = HandicapIndexState.model_validate(state_db.state)
+    return GolferHandicapStateRead(
+        golfer_id=state_db.golfer_id,
+        round_id=state_db.round_id,
+        date_played=state_db.date_played,
+        date_updated=state_db.date_updated,
+        num_scores=state.num_scores,
+        handicap_index=state.handicap_index,
+        low_handicap_index=state.low_handicap_index,
+        score_differentials=state.score_differentials,
+    )
+
+
+def update_handicap_states(
+    session: Session,
+    golfer_ids: list[int] | None = None,
+    rebuild: bool = False,
+    max_date: datetime | None = None,
+    commit: bool = True,
+) -> list[GolferHandicapState]:
+    """Posts league rounds to golfers' stored handicap index states.
+
+    Only rounds played after the most recent round posted to each golfer's
+    state are loaded (in a single query), so states are updated without
+    rescanning scoring history. Rounds entered or changed after later rounds
+    have been posted are included by rebuilding the golfers' states, see
+    `rebuild_handicap_states`.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    golfer_ids (list[int] | None, optional): Golfers to update. Defaults to None,
+        for all golfers.
+    rebuild (bool, optional): If true, stored states are recomputed from the
+        rounds already posted to them (through their most recent posted round),
+        instead of posting newer rounds. Golfers without a stored state are
+        posted all rounds. Defaults to False.
+    max_date (datetime | None, optional): If given, only rounds played on or
+        before this date are posted. Defaults to None.
+    commit (bool, optional): If true, commits updated states. Defaults to True.
+
+    Returns
+    -------
+    list[`GolferHandicapState`]: Updated handicap index states.
+    """
+    ahs = APLHandicapSystem()
+
+    state_query = select(GolferHandicapState)
+    if golfer_ids is not None:
+        state_query = state_query.where(
+            col(GolferHandicapState.golfer_id).in_(golfer_ids)
+        )
+    states_db = {state_db.golfer_id: state_db for state_db in session.exec(state_query)}
+
+    # Scores are totalled only for the rounds selected
+    adjusted_gross_score = (
+        select(func.sum(HoleResult.adjusted_gross_score))
+        .where(HoleResult.round_id == Round.id)
+        .correlate(Round)
+        .scalar_subquery()
+    )
+    if rebuild:
+        round_condition = or_(
+            col(GolferHandicapState.date_played).is_(None),
+            Round.date_played < GolferHandicapState.date_played,
+            and_(
+                Round.date_played == GolferHandicapState.date_played,
+                Round.id <= GolferHandicapState.round_id,
+            ),
+        )
+    else:
+        round_condition = or_(
+            col(GolferHandicapState.date_played).is_(None),
+            Round.date_played > GolferHandicapState.date_played,
+            and_(
+                Round.date_played == GolferHandicapState.date_played,
+                Round.id > GolferHandicapState.round_id,
+            ),
+        )
+    round_query = (
+        select(
+            RoundGolferLink.golfer_id,
+            Round.id,
+            Round.date_played,
+            Tee.rating,
+            Tee.slope,
+            func.coalesce(adjusted_gross_score, 0),
+            func.coalesce(
+                PlayingConditionsCorrection.playing_conditions_correction, 0.0
+            ),
+        )
+        .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+        .join(Tee, onclause=Tee.id == Round.tee_id)
+        .join(Track, onclause=Track.id == Tee.track_id)
+        .outerjoin(
+            PlayingConditionsCorrection, onclause=get_playing_conditions_onclause()
+        )
+        .outerjoin(
+            GolferHandicapState,
+            onclause=GolferHandicapState.golfer_id == RoundGolferLink.golfer_id,
+        )
+        .where(Round.scoring_type == ScoringType.INDIVIDUAL)
+        .where(round_condition)
+    )
+    if golfer_ids is not None:
+        round_query = round_query.where(col(RoundGolferLink.golfer_id).in_(golfer_ids))
+    if max_date is not None:
+        round_query = round_query.where(Round.date_played <= max_date)
+
+    # Rounds are loaded before rebuilt states are cleared, as the round query
+    # selects rounds by each state's most recent posted round
+    round_data = session.exec(
+        round_query.order_by(RoundGolferLink.golfer_id, Round.date_played, Round.id)
+    ).all()
+
+    states: dict[int, tuple[GolferHandicapState, HandicapIndexState]] = {}
+    if rebuild:  # states without remaining rounds are cleared
+        states = {
+            golfer_id: (state_db, HandicapIndexState())
+            for golfer_id, state_db in states_db.items()
+        }
+        for state_db, _ in states.values():
+            state_db.round_id = None
+            state_db.date_played = None
+    for (
+        golfer_id,
+        round_id,
+        date_played,
+        rating,
+        slope,
+        adjusted_gross_score,
+        playing_conditions_correction,
+    ) in round_data:
+        if golfer_id not in states:
+            state_db = states_db.get(golfer_id) or GolferHandicapState(
+                golfer_id=golfer_id
+            )
+            states[golfer_id] = (
+                state_db,
+                HandicapIndexState.model_validate(state_db.state),
+            )
+        state_db, state = states[golfer_id]
+        state.post_score(
+            date_played=date_played,
+            score_differential=ahs.compute_score_differential(
+                rating=rating,
+                slope=slope,
+                score=adjusted_gross_score,
+                playing_conditions_correction=playing_conditions_correction,
+            ),
+            handicap_system=ahs,
+        )
+        state_db.round_id = round_id
+        state_db.date_played = date_played
+
+    for state_db, state in states.values():
+        state_db.state = json.loads(state.json())
+        state_db.date_updated = datetime.utcnow()
+        session.add(state_db)
+    if commit:
+        session.commit()
+    return [state_db for state_db, _ in states.values()]
+
+
+def rebuild_handicap_states(
+    session: Session,
+    golfer_ids: Iterable[int],
+    min_date: datetime,
+    commit: bool = True,
+) -> list[GolferHandicapState]:
+    """Rebuilds stored handicap index states after posted rounds have changed.
+
+    Used when score differentials of rounds played before a golfer's most
+    recent posted round change (e.g. corrected or late-entered rounds, or
+    updated playing conditions corrections). Only states that include rounds
+    played on or after the given date are rebuilt.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    golfer_ids (Iterable[int]): Golfers with changed rounds.
+    min_date (datetime): Date played of earliest changed round.
+    commit (bool, optional): If true, commits rebuilt states. Defaults to True.
+
+    Returns
+    -------
+    list[`GolferHandicapState`]: Rebuilt handicap index states.
+    """
+    golfer_ids = set(golfer_ids)
+    stale_golfer_ids = session.exec(
+        select(GolferHandicapState.golfer_id)
+        .where(col(GolferHandicapState.golfer_id).in_(golfer_ids))
+        .where(GolferHandicapState.date_played >= min_date)
+    ).all()
+    if len(stale_golfer_ids) == 0:
+        return []
+    return update_handicap_states(
+        session=session, golfer_ids=stale_golfer_ids, rebuild=True, commit=commit
+    )
+
+
+def rebuild_handicap_states_for_rounds(
+    session: Session, round_ids: Iterable[int], commit: bool = True
+) -> list[GolferHandicapState]:
+    """Rebuilds stored handicap index states of the golfers of changed rounds.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    round_ids (Iterable[int]): Rounds with changed score differentials.
+    commit (bool, optional): If true, commits rebuilt states. Defaults to True.
+
+    Returns
+    -------
+    list[`GolferHandicapState`]: Rebuilt handicap index states.
+    """
+    round_data = session.exec(
+        select(RoundGolferLink.golfer_id, Round.date_played)
+        .join(Round, onclause=Round.id == RoundGolferLink.round_id)
+        .where(col(RoundGolferLink.round_id).in_(set(round_ids)))
+    ).all()
+    if len(round_data) == 0:
+        return []
+    return rebuild_handicap_states(
+        session=session,
+        golfer_ids={golfer_id for golfer_id, _ in round_data},
+        min_date=min(date_played for _, date_played in round_data),
+        commit=commit,
+    )
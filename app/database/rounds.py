@@ -1,11 +1,29 @@
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import Connection, Table, insert
 from sqlmodel import Session, asc, select
 
 from app.database import courses as db_courses
+from app.database import handicaps as db_handicaps
+from app.database import snapshots as db_snapshots
 from app.models.golfer import Golfer
 from app.models.hole import Hole
-from app.models.hole_result import HoleResult, HoleResultData
-from app.models.round import Round, RoundResults
+from app.models.hole_result import (
+    HoleResult,
+    HoleResultData,
+    HoleResultValidationRequest,
+)
+from app.models.round import (
+    Round,
+    RoundImportRequest,
+    RoundImportResult,
+    RoundResults,
+    RoundValidationRequest,
+)
 from app.models.round_golfer_link import RoundGolferLink
+from app.utilities import scoring
 from app.utilities.apl_legacy_handicap_system import APLLegacyHandicapSystem
 from app.utilities.handicap_system import HandicapSystem
 
@@ -91,6 +109,80 @@ def get_hole_results_for_rounds(
     ]
 
 
+def insert_hole_results(
+    session: Session, hole_results: list[dict], use_copy: bool = False
+) -> None:
+    """Inserts hole results in a single bulk statement, without committing.
+
+    Bypasses creating ORM objects for each hole, which are not needed after
+    submitting a round.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    hole_results (list[dict]): Hole result column values, keyed by column name.
+    use_copy (bool, optional): Use PostgreSQL `COPY` for large batches, if
+        available. Defaults to False.
+    """
+    if len(hole_results) == 0:
+        return
+    connection = session.connection()
+    if use_copy and connection.dialect.name == "postgresql":
+        copy_rows(connection=connection, table=HoleResult.__table__, rows=hole_results)
+    else:
+        session.execute(insert(HoleResult), hole_results)
+
+
+def copy_rows(connection: Connection, table: Table, rows: list[dict]) -> None:
+    """Copies rows into a PostgreSQL table with `COPY ... FROM STDIN`.
+
+    Runs on the connection's current transaction. Rows must all have the same keys.
+
+    Parameters
+    ----------
+    connection (`Connection`): Database connection, using the psycopg2 driver.
+    table (`Table`): Table to copy rows into.
+    rows (list[dict]): Column values, keyed by column name.
+    """
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([row[column] for column in columns] for row in rows)
+    buffer.seek(0)
+
+    preparer = connection.dialect.identifier_preparer
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        preparer.format_table(table),
+        ", ".join(preparer.quote(column) for column in columns),
+    )
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+
+
+def get_hole_result_ids_for_round(session: Session, round_id: int) -> dict[int, int]:
+    """Gets identifiers of hole results for the given round.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    round_id (int): Round identifier.
+
+    Returns
+    -------
+    dict[int, int]: Hole result identifiers, keyed by hole identifier.
+    """
+    return {
+        hole_id: hole_result_id
+        for hole_result_id, hole_id in session.exec(
+            select(HoleResult.id, HoleResult.hole_id).where(
+                HoleResult.round_id == round_id
+            )
+        ).all()
+    }
+
+
 def get_round_results_by_id(
     session: Session,
     round_ids: list[int],
@@ -175,3 +267,160 @@ def get_round_results_by_id(
             )
 
     return round_results
+
+
+def import_rounds(
+    session: Session, rounds: list[RoundImportRequest], dry_run: bool = False
+) -> list[RoundImportResult]:
+    """Validates and imports a batch of rounds in a single transaction.
+
+    Hole pars and stroke indices are taken from the database for each round's
+    tee. Rounds that cannot be imported (e.g. unknown golfer, wrong number of
+    scores or invalid scoring) are skipped and reported, all other rounds are
+    imported together, with hole results copied in bulk.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    rounds (list[`RoundImportRequest`]): Rounds to import.
+    dry_run (bool, optional): Only validate rounds, without importing.
+        Defaults to False.
+
+    Returns
+    -------
+    list[`RoundImportResult`]: Import result for each round, in the given order.
+    """
+    golfer_ids = set(
+        session.exec(
+            select(Golfer.id).where(Golfer.id.in_({r.golfer_id for r in rounds}))
+        ).all()
+    )
+    holes_by_tee: dict[int, list[Hole]] = {}
+    for hole in db_courses.get_holes_by_tee_ids(
+        session=session, tee_ids=list({r.tee_id for r in rounds})
+    ):
+        holes_by_tee.setdefault(hole.tee_id, []).append(hole)
+    for holes in holes_by_tee.values():
+        holes.sort(key=lambda h: h.number)
+
+    results = [
+        RoundImportResult(index=idx, golfer_id=r.golfer_id, tee_id=r.tee_id)
+        for idx, r in enumerate(rounds)
+    ]
+
+    # Check references, then validate scoring of remaining rounds as a batch
+    validation_requests: dict[int, RoundValidationRequest] = {}
+    for idx, round in enumerate(rounds):
+        holes = holes_by_tee.get(round.tee_id, [])
+        if round.golfer_id not in golfer_ids:
+            results[idx].detail = f"Golfer (id={round.golfer_id}) not found"
+        elif len(holes) == 0:
+            results[idx].detail = f"Tee (id={round.tee_id}) not found"
+        elif len(holes) != len(round.gross_scores):
+            results[
+                idx
+            ].detail = f"Expected {len(holes)} scores for tee (id={round.tee_id}), found {len(round.gross_scores)}"
+        else:
+            validation_requests[idx] = RoundValidationRequest(
+                date_played=round.date_played,
+                course_handicap=round.course_handicap,
+                holes=[
+                    HoleResultValidationRequest(
+                        number=hole.number,
+                        par=hole.par,
+                        stroke_index=hole.stroke_index,
+                        gross_score=gross_score,
+                    )
+                    for hole, gross_score in zip(holes, round.gross_scores)
+                ],
+            )
+    validated = dict(
+        zip(
+            validation_requests,
+            scoring.validate_rounds(list(validation_requests.values())),
+        )
+    )
+    for idx, round_validated in validated.items():
+        if not round_validated.is_valid:
+            invalid_holes = [h.number for h in round_validated.holes if not h.is_valid]
+            results[idx].detail = "Invalid scoring on hole(s) " + ", ".join(
+                f"#{number}" for number in invalid_holes
+            )
+    valid_indices = [idx for idx, r in validated.items() if r.is_valid]
+    if dry_run or len(valid_indices) == 0:
+        return results
+
+    # Import valid rounds in a single transaction
+    try:
+        rounds_db = [
+            Round(
+                tee_id=rounds[idx].tee_id,
+                type=rounds[idx].round_type,
+                scoring_type=rounds[idx].scoring_type,
+                date_played=datetime(
+                    year=rounds[idx].date_played.year,
+                    month=rounds[idx].date_played.month,
+                    day=rounds[idx].date_played.day,
+                ),
+                date_updated=datetime.today(),
+            )
+            for idx in valid_indices
+        ]
+        session.add_all(rounds_db)
+        session.flush()  # assigns round identifiers
+
+        round_ids = {
+            idx: round_db.id for idx, round_db in zip(valid_indices, rounds_db)
+        }
+        session.add_all(
+            RoundGolferLink(
+                round_id=round_ids[idx],
+                golfer_id=rounds[idx].golfer_id,
+                playing_handicap=rounds[idx].course_handicap,
+            )
+            for idx in valid_indices
+        )
+        insert_hole_results(
+            session=session,
+            hole_results=[
+                {
+                    "round_id": round_ids[idx],
+                    "hole_id": hole.id,
+                    "handicap_strokes": hole_validated.handicap_strokes,
+                    "gross_score": hole_validated.gross_score,
+                    "adjusted_gross_score": hole_validated.adjusted_gross_score,
+                    "net_score": hole_validated.net_score,
+                }
+                for idx in valid_indices
+                for hole, hole_validated in zip(
+                    holes_by_tee[rounds[idx].tee_id], validated[idx].holes
+                )
+            ],
+            use_copy=True,
+        )
+        # Golfer handicaps are shown with flight and tournament rosters
+        db_snapshots.delete_scopes(
+            session=session,
+            scopes=db_snapshots.get_golfer_scopes(
+                session=session,
+                golfer_ids={rounds[idx].golfer_id for idx in valid_indices},
+            ),
+            commit=False,
+        )
+        # Rounds played before later posted rounds are included in golfers'
+        # handicap index states
+        db_handicaps.rebuild_handicap_states(
+            session=session,
+            golfer_ids={rounds[idx].golfer_id for idx in valid_indices},
+            min_date=min(round_db.date_played for round_db in rounds_db),
+            commit=False,
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    for idx in valid_indices:
+        results[idx].round_id = round_ids[idx]
+        results[idx].is_imported = True
+    return results
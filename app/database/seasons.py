@@ -1,6 +1,6 @@
 from sqlmodel import Session, desc, select
 
-from app.models.season import Season, SeasonCreate
+from app.models.season import GolferSeasonStatistics, Season, SeasonCreate
 
 
 def get_seasons(session: Session) -> list[Season]:
@@ -11,6 +11,16 @@ def get_season_by_year(session: Session, year: int) -> Season | None:
     return session.exec(select(Season).where(Season.year == year)).one_or_none()
 
 
+def get_season_statistics(session: Session, year: int) -> list[GolferSeasonStatistics]:
+    return list(
+        session.exec(
+            select(GolferSeasonStatistics)
+            .where(GolferSeasonStatistics.year == year)
+            .order_by(GolferSeasonStatistics.golfer_name)
+        ).all()
+    )
+
+
 def create_season(session: Session, new_season: SeasonCreate) -> Season | None:
     if get_season_by_year(session, new_season.year) is not None:
         return None
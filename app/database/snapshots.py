@@ -0,0 +1,195 @@
+import hashlib
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from sqlalchemy import Select, literal, union
+from sqlmodel import Session, delete, select
+
+from app.database import flights as db_flights
+from app.database import seasons as db_seasons
+from app.database import tournaments as db_tournaments
+from app.models.flight import Flight, FlightFreeAgent
+from app.models.flight_team_link import FlightTeamLink
+from app.models.match import Match
+from app.models.match_round_link import MatchRoundLink
+from app.models.snapshot import ResponseSnapshot
+from app.models.substitute import Substitute
+from app.models.team_golfer_link import TeamGolferLink
+from app.models.tournament import Tournament, TournamentFreeAgent
+from app.models.tournament_round_link import TournamentRoundLink
+from app.models.tournament_team_link import TournamentTeamLink
+from app.utilities.data_versions import touch
+from app.utilities.responses import render_json
+
+# Read endpoints that are snapshotted once an entity is frozen, keyed by path template
+FLIGHT_SNAPSHOT_VIEWS: dict[str, Callable[[Session, int], Any]] = {
+    "/flights/{flight_id}": db_flights.get_data,
+    "/flights/info/{flight_id}": db_flights.get_info,
+    "/flights/divisions/{flight_id}": db_flights.get_divisions,
+    "/flights/teams/{flight_id}": db_flights.get_teams,
+    "/flights/substitutes/{flight_id}": db_flights.get_substitutes,
+    "/flights/free-agents/{flight_id}": db_flights.get_free_agents,
+    "/flights/matches/{flight_id}": db_flights.get_match_summaries,
+    "/flights/standings/{flight_id}": db_flights.get_standings,
+    "/flights/statistics/{flight_id}": db_flights.get_statistics,
+}
+
+TOURNAMENT_SNAPSHOT_VIEWS: dict[str, Callable[[Session, int], Any]] = {
+    "/tournaments/{tournament_id}": db_tournaments.get_data,
+    "/tournaments/info/{tournament_id}": db_tournaments.get_info,
+    "/tournaments/divisions/{tournament_id}": db_tournaments.get_divisions,
+    "/tournaments/teams/{tournament_id}": db_tournaments.get_teams,
+    "/tournaments/free-agents/{tournament_id}": db_tournaments.get_free_agents,
+    "/tournaments/rounds/{tournament_id}": db_tournaments.get_round_summaries,
+    "/tournaments/standings/{tournament_id}": db_tournaments.get_standings,
+    "/tournaments/statistics/{tournament_id}": db_tournaments.get_statistics,
+}
+
+
+def get_flight_scope(flight_id: int) -> str:
+    return f"flight:{flight_id}"
+
+
+def get_tournament_scope(tournament_id: int) -> str:
+    return f"tournament:{tournament_id}"
+
+
+def get_scope_ids(scopes: Iterable[str]) -> tuple[list[int], list[int]]:
+    """Flight and tournament identifiers of snapshot scopes, in order."""
+    ids: dict[str, set[int]] = {"flight": set(), "tournament": set()}
+    for scope in scopes:
+        kind, _, entity_id = scope.partition(":")
+        ids[kind].add(int(entity_id))
+    return sorted(ids["flight"]), sorted(ids["tournament"])
+
+
+def _get_scopes(session: Session, statements: list[Select]) -> set[str]:
+    """Snapshot scopes from one query for ("flight" or "tournament", id) rows."""
+    scope_getters = {"flight": get_flight_scope, "tournament": get_tournament_scope}
+    rows = session.exec(union(*statements)).all()
+    return {scope_getters[kind](entity_id) for kind, entity_id in rows}
+
+
+def get_team_scopes(session: Session, team_ids: Iterable[int]) -> set[str]:
+    """Snapshot scopes of flights and tournaments the given teams play in."""
+    team_ids = set(team_ids)
+    return _get_scopes(
+        session=session,
+        statements=[
+            select(literal("flight"), FlightTeamLink.flight_id).where(
+                FlightTeamLink.team_id.in_(team_ids)
+            ),
+            select(literal("tournament"), TournamentTeamLink.tournament_id).where(
+                TournamentTeamLink.team_id.in_(team_ids)
+            ),
+        ],
+    )
+
+
+def get_golfer_scopes(session: Session, golfer_ids: Iterable[int]) -> set[str]:
+    """Snapshot scopes of flights and tournaments the given golfers appear in, as
+    team members, substitutes or free agents."""
+    golfer_ids = set(golfer_ids)
+    team_ids = select(TeamGolferLink.team_id).where(
+        TeamGolferLink.golfer_id.in_(golfer_ids)
+    )
+    return _get_scopes(
+        session=session,
+        statements=[
+            select(literal("flight"), FlightTeamLink.flight_id).where(
+                FlightTeamLink.team_id.in_(team_ids)
+            ),
+            select(literal("tournament"), TournamentTeamLink.tournament_id).where(
+                TournamentTeamLink.team_id.in_(team_ids)
+            ),
+            select(literal("flight"), Substitute.flight_id).where(
+                Substitute.golfer_id.in_(golfer_ids)
+            ),
+            select(literal("flight"), FlightFreeAgent.flight_id).where(
+                FlightFreeAgent.golfer_id.in_(golfer_ids)
+            ),
+            select(literal("tournament"), TournamentFreeAgent.tournament_id).where(
+                TournamentFreeAgent.golfer_id.in_(golfer_ids)
+            ),
+        ],
+    )
+
+
+def get_round_scopes(session: Session, round_ids: Iterable[int]) -> set[str]:
+    """Snapshot scopes of flights and tournaments the given rounds were played in."""
+    round_ids = set(round_ids)
+    return _get_scopes(
+        session=session,
+        statements=[
+            select(literal("flight"), Match.flight_id)
+            .join(MatchRoundLink, onclause=MatchRoundLink.match_id == Match.id)
+            .where(MatchRoundLink.round_id.in_(round_ids)),
+            select(literal("tournament"), TournamentRoundLink.tournament_id).where(
+                TournamentRoundLink.round_id.in_(round_ids)
+            ),
+        ],
+    )
+
+
+def render_content(content: Any) -> bytes:
+    """
+    Renders response content to JSON bytes, matching `JSONResponse` output.
+    """
+    return render_json(content)
+
+
+def get_snapshot(session: Session, key: str) -> ResponseSnapshot | None:
+    return session.get(ResponseSnapshot, key)
+
+
+def put_snapshot(
+    session: Session, key: str, scope: str, content: bytes
+) -> ResponseSnapshot:
+    snapshot_db = session.get(ResponseSnapshot, key)
+    if snapshot_db is None:
+        snapshot_db = ResponseSnapshot(key=key, scope=scope, digest="", content=b"")
+    snapshot_db.scope = scope
+    snapshot_db.content = content
+    snapshot_db.digest = hashlib.sha256(content).hexdigest()
+    session.add(snapshot_db)
+    session.commit()
+    session.refresh(snapshot_db)
+    return snapshot_db
+
+
+def delete_snapshots(session: Session, scope: str, commit: bool = True) -> None:
+    """Deletes snapshots of a scope whose data changed, bumping the data version
+    of the scope (e.g. "tournament:1") when the session commits."""
+    session.exec(delete(ResponseSnapshot).where(ResponseSnapshot.scope == scope))
+    touch(session, (scope,))
+    if commit:
+        session.commit()
+
+
+def delete_scopes(session: Session, scopes: Iterable[str], commit: bool = True) -> None:
+    """Deletes snapshots of all given scopes, see `get_team_scopes` and similar."""
+    scopes = set(scopes)
+    if scopes:
+        session.exec(delete(ResponseSnapshot).where(ResponseSnapshot.scope.in_(scopes)))
+        touch(session, scopes)
+    if commit:
+        session.commit()
+
+
+def _is_past_season(session: Session, year: int) -> bool:
+    active_season = db_seasons.get_active_season(session)
+    return active_season is not None and year < active_season.year
+
+
+def is_flight_frozen(session: Session, flight_id: int) -> bool:
+    flight_db = session.get(Flight, flight_id)
+    if flight_db is None:
+        return False
+    return flight_db.locked or _is_past_season(session, flight_db.year)
+
+
+def is_tournament_frozen(session: Session, tournament_id: int) -> bool:
+    tournament_db = session.get(Tournament, tournament_id)
+    if tournament_db is None:
+        return False
+    return bool(tournament_db.locked) or _is_past_season(session, tournament_db.year)
@@ -1,5 +1,6 @@
 from sqlmodel import Session, select
 
+from app.database import snapshots as db_snapshots
 from app.models.substitute import Substitute, SubstituteCreate
 
 
@@ -32,6 +33,11 @@ def create_substitute(
         return None
     substitute_db = Substitute.model_validate(new_substitute)
     session.add(substitute_db)
+    db_snapshots.delete_snapshots(
+        session=session,
+        scope=db_snapshots.get_flight_scope(substitute_db.flight_id),
+        commit=False,
+    )
     session.commit()
     session.refresh(substitute_db)
     return substitute_db
@@ -46,5 +52,8 @@ def delete_substitute(
     if substitute_db is None:
         return None
     session.delete(substitute_db)
+    db_snapshots.delete_snapshots(
+        session=session, scope=db_snapshots.get_flight_scope(flight_id), commit=False
+    )
     session.commit()
     return substitute_db
@@ -1,11 +1,19 @@
-import numpy as np
 from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
 
 from app.models.course import Course
 from app.models.division import Division, TournamentDivision
 from app.models.golfer import Golfer
-from app.models.query_helpers import get_hole_results_for_rounds, get_tournament_rounds
+from app.models.hole import Hole
+from app.models.query_helpers import (
+    TournamentData,
+    get_divisions_in_tournaments,
+    get_hole_results_for_rounds,
+    get_rounds_for_tournament,
+    get_teams_in_tournaments,
+    get_tournament_rounds,
+    get_tournaments,
+)
 from app.models.round import Round, RoundResults, RoundSummary
 from app.models.round_golfer_link import RoundGolferLink
 from app.models.team import Team
@@ -30,6 +38,29 @@ from app.models.tournament_team_link import TournamentTeamLink
 from app.models.track import Track
 from app.utilities.apl_handicap_system import APLHandicapSystem
 from app.utilities.apl_legacy_handicap_system import APLLegacyHandicapSystem
+from app.utilities.data_versions import data_versions
+from app.utilities.tournament_leaderboard import TournamentLeaderboard
+from app.utilities.tournament_scoring import (
+    build_score_matrix,
+    compute_best_ball_scores,
+    get_count_back_keys,
+    rank_scores,
+)
+from app.utilities.ttl_cache import TTLCache
+
+# Tables that tournament standings are derived from and that are shared between
+# tournaments. Writes to a tournament's teams and rounds delete its snapshots,
+# which bumps the data version of its snapshot scope instead.
+STANDINGS_TABLES = tuple(
+    sorted(model.__tablename__ for model in (Hole, Tee, Track, Course))
+)
+
+# Leaderboards of tournaments in progress, with data versions they are current for
+DEFAULT_LEADERBOARD_CACHE_SIZE = 16
+DEFAULT_LEADERBOARD_CACHE_TTL = 3600.0  # seconds
+leaderboard_cache = TTLCache(
+    maxsize=DEFAULT_LEADERBOARD_CACHE_SIZE, ttl=DEFAULT_LEADERBOARD_CACHE_TTL
+)
 
 
 def get_ids(session: Session, year: int | None = None) -> list[int]:
@@ -39,6 +70,26 @@ def get_ids(session: Session, year: int | None = None) -> list[int]:
     return session.exec(query.order_by(Tournament.id)).all()
 
 
+def get_data(session: Session, tournament_id: int) -> TournamentData | None:
+    # Query database for selected tournament
+    tournament_data = get_tournaments(session=session, tournament_ids=(tournament_id,))
+    if (not tournament_data) or (len(tournament_data) == 0):
+        return None
+    tournament_data = tournament_data[0]
+    # Add division and team data to selected tournament
+    tournament_data.divisions = get_divisions_in_tournaments(
+        session=session, tournament_ids=(tournament_id,)
+    )
+    tournament_data.teams = get_teams_in_tournaments(
+        session=session, tournament_ids=(tournament_id,)
+    )
+    # Compile round data and add to selected tournament teams
+    round_data = get_rounds_for_tournament(session=session, tournament_id=tournament_id)
+    for team in tournament_data.teams:
+        team.rounds = [round for round in round_data if round.team_id == team.id]
+    return tournament_data
+
+
 def get_info(session: Session, tournament_id: int) -> TournamentInfo:
     tournament = session.exec(
         select(Tournament).where(Tournament.id == tournament_id)
@@ -262,49 +313,25 @@ def get_rounds_for_team(session: Session, team_id: int) -> list[RoundResults]:
     )
 
 
-def _compute_team_scores_best_ball(
-    rounds: list[RoundResults], num_balls: int = 1
-) -> tuple[int, int]:
-    gross_score = 0
-    net_score = 0
-    for hole_num in np.unique([h.number for r in rounds for h in r.holes]):
-        hole_gross_scores = [
-            h.gross_score for r in rounds for h in r.holes if h.number == hole_num
-        ]
-        if len(hole_gross_scores) < num_balls:
-            gross_score += sum(
-                hole_gross_scores
-            )  # TODO: handle "fewer golfers than n" case
-        else:
-            gross_score += sum(
-                sorted(hole_gross_scores)[:num_balls]
-            )  # take the "n" smallest scores
-
-        hole_net_scores = [
-            h.net_score for r in rounds for h in r.holes if h.number == hole_num
-        ]
-        if len(hole_net_scores) < num_balls:
-            net_score += sum(
-                hole_net_scores
-            )  # TODO: handle "fewer golfers than n" case
-        else:
-            net_score += sum(sorted(hole_net_scores)[:num_balls])
-
-    return gross_score, net_score
+def get_standings(
+    session: Session, tournament_id: int, count_back: bool = False
+) -> TournamentStandings:
+    """Computes tournament standings for teams and golfers, sorted by net score.
 
+    Hole scores for all rounds are arranged in a team x golfer x hole score
+    matrix, so scramble and best-ball team scores are computed for all teams
+    together.
 
-def _compute_team_scores_scramble(rounds: list[RoundResults]) -> tuple[int, int]:
-    # NOTE: should only be one score per hole per team anyway
-    return _compute_team_scores_best_ball(rounds=rounds, num_balls=1)
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    tournament_id (int): Tournament identifier.
+    count_back (bool, optional): If true, ties are broken by count-back on net hole
+        scores (back 9, 6, 3 and last hole). Defaults to False.
 
+    """
+    import numpy as np
 
-def _compute_individual_scores(rounds: list[RoundResults]) -> tuple[int, int]:
-    gross_score = sum([r.gross_score for r in rounds])
-    net_score = sum([r.net_score for r in rounds])
-    return gross_score, net_score
-
-
-def get_standings(session: Session, tournament_id: int) -> TournamentStandings:
     tournament_info = get_info(session=session, tournament_id=tournament_id)
 
     round_ids = session.exec(
@@ -320,57 +347,230 @@ def get_standings(session: Session, tournament_id: int) -> TournamentStandings:
 
     standings = TournamentStandings(tournament_id=tournament_id)
 
-    for team in teams:
-        team_rounds = [r for r in round_data if r.team_id == team.team_id]
-
-        gross_score: int | None = None
-        net_score: int | None = None
-        if tournament_info.scramble:
-            gross_score, net_score = _compute_team_scores_scramble(rounds=team_rounds)
-        elif tournament_info.bestball > 0:
-            gross_score, net_score = _compute_team_scores_best_ball(
-                rounds=team_rounds, num_balls=tournament_info.bestball
+    # Hole scores for all rounds
+    team_ids, golfer_ids, hole_numbers, gross_scores, net_scores = (
+        np.array(
+            [
+                (r.team_id, r.golfer_id, h.number, h.gross_score, h.net_score)
+                for r in round_data
+                for h in r.holes
+            ],
+            dtype=np.float64,
+        )
+        .reshape(-1, 5)
+        .T
+    )
+    holes, hole_idx = np.unique(hole_numbers, return_inverse=True)
+
+    num_balls = 1 if tournament_info.scramble else tournament_info.bestball
+    if num_balls > 0:
+        tournament_team_ids = np.array([team.team_id for team in teams])
+        team_order = np.argsort(tournament_team_ids)
+        team_idx = team_order[
+            np.searchsorted(tournament_team_ids[team_order], team_ids)
+        ]
+        team_gross, team_net = (
+            compute_best_ball_scores(
+                build_score_matrix(
+                    group_idx=team_idx,
+                    hole_idx=hole_idx,
+                    scores=scores,
+                    num_groups=len(teams),
+                    num_holes=len(holes),
+                ),
+                num_balls=num_balls,
             )
+            for scores in (gross_scores, net_scores)
+        )
 
-        if gross_score is not None and net_score is not None:
+        # Teams without scores are listed last, without position
+        has_scores = np.bincount(team_idx.astype(np.int64), minlength=len(teams)) > 0
+        ranked = np.flatnonzero(has_scores)
+        order, positions = rank_scores(
+            team_net[ranked].sum(axis=1),
+            tie_breaks=get_count_back_keys(team_net[ranked]) if count_back else None,
+        )
+        team_positions = dict(zip(ranked[order].tolist(), positions))
+        for idx in [*ranked[order].tolist(), *np.flatnonzero(~has_scores).tolist()]:
             standings.teams.append(
                 TournamentStandingsTeam(
-                    team_id=team.team_id,
-                    team_name=team.name,
-                    gross_score=gross_score,
-                    net_score=net_score,
+                    team_id=teams[idx].team_id,
+                    team_name=teams[idx].name,
+                    gross_score=int(team_gross[idx].sum()),
+                    net_score=int(team_net[idx].sum()),
+                    position=team_positions.get(idx, ""),
                 )
             )
 
-    # TODO: Sort team standings and determine positions
-
-    if tournament_info.individual:
-        for golfer_id in np.unique([r.golfer_id for r in round_data]):
-            golfer_rounds = [r for r in round_data if r.golfer_id == golfer_id]
-
-            indiv_gross, indiv_net = _compute_individual_scores(rounds=golfer_rounds)
-
+    if tournament_info.individual and round_data:
+        golfers, golfer_round_idx = np.unique(
+            [r.golfer_id for r in round_data], return_inverse=True
+        )
+        golfer_gross, golfer_net, golfer_playing_handicap = (
+            np.bincount(golfer_round_idx, weights=values, minlength=len(golfers))
+            for values in np.array(
+                [
+                    (r.gross_score, r.net_score, r.golfer_playing_handicap or 0)
+                    for r in round_data
+                ],
+                dtype=np.float64,
+            ).T
+        )
+        golfer_names = {r.golfer_id: r.golfer_name for r in reversed(round_data)}
+
+        tie_breaks = None
+        if count_back:
+            golfer_hole_net = np.zeros((len(golfers), len(holes)))
+            np.add.at(
+                golfer_hole_net,
+                (np.searchsorted(golfers, golfer_ids), hole_idx),
+                net_scores,
+            )
+            tie_breaks = get_count_back_keys(golfer_hole_net)
+        order, positions = rank_scores(golfer_net, tie_breaks=tie_breaks)
+        for idx, position in zip(order, positions):
             standings.golfers.append(
                 TournamentStandingsGolfer(
-                    golfer_id=golfer_rounds[0].golfer_id,
-                    golfer_name=golfer_rounds[0].golfer_name,
-                    golfer_playing_handicap=sum(
-                        [
-                            r.golfer_playing_handicap
-                            for r in golfer_rounds
-                            if r.golfer_playing_handicap is not None
-                        ]
-                    ),
-                    gross_score=indiv_gross,
-                    net_score=indiv_net,
+                    golfer_id=int(golfers[idx]),
+                    golfer_name=golfer_names[int(golfers[idx])],
+                    golfer_playing_handicap=int(golfer_playing_handicap[idx]),
+                    gross_score=int(golfer_gross[idx]),
+                    net_score=int(golfer_net[idx]),
+                    position=position,
                 )
             )
 
-    # TODO: Sort individual standings and determine positions
-
     return standings
 
 
+def get_standings_version(tournament_id: int) -> str:
+    """Returns the current data version of a tournament's standings.
+
+    Parameters
+    ----------
+    tournament_id (int): Tournament identifier.
+
+    """
+    # Data version of the tournament's snapshot scope, see `snapshots.delete_snapshots`
+    return data_versions.get_etag((*STANDINGS_TABLES, f"tournament:{tournament_id}"))
+
+
+def build_leaderboard(session: Session, tournament_id: int) -> TournamentLeaderboard:
+    """Builds a tournament leaderboard from all rounds posted for the tournament.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    tournament_id (int): Tournament identifier.
+
+    """
+    tournament_info = get_info(session=session, tournament_id=tournament_id)
+    leaderboard = TournamentLeaderboard(
+        tournament_id=tournament_id,
+        teams=get_teams(session=session, tournament_id=tournament_id),
+        num_balls=1 if tournament_info.scramble else tournament_info.bestball,
+        individual=tournament_info.individual,
+    )
+    round_ids = session.exec(
+        select(Round.id)
+        .join(TournamentRoundLink, onclause=TournamentRoundLink.round_id == Round.id)
+        .where(TournamentRoundLink.tournament_id == tournament_id)
+    ).all()
+    for round_results in get_tournament_rounds(
+        session=session, tournament_id=tournament_id, round_ids=round_ids
+    ):
+        leaderboard.apply_round(round_results)
+    return leaderboard
+
+
+def get_leaderboard(session: Session, tournament_id: int) -> TournamentLeaderboard:
+    """Gets the leaderboard for a tournament, rebuilding it from all rounds only if
+    tournament data has changed other than through `apply_leaderboard_rounds`.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    tournament_id (int): Tournament identifier.
+
+    """
+    version = get_standings_version(tournament_id)
+    entry = leaderboard_cache.get(tournament_id)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    leaderboard = build_leaderboard(session=session, tournament_id=tournament_id)
+    leaderboard_cache.set(tournament_id, (version, leaderboard))
+    return leaderboard
+
+
+def get_leaderboard_standings(
+    session: Session, tournament_id: int
+) -> TournamentStandings:
+    """Gets tournament standings from the tournament leaderboard.
+
+    Equivalent to `get_standings` (without count-back), but only rounds posted
+    since the leaderboard was built are loaded.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    tournament_id (int): Tournament identifier.
+
+    """
+    return get_leaderboard(session=session, tournament_id=tournament_id).get_standings()
+
+
+def apply_leaderboard_rounds(
+    session: Session, tournament_id: int, round_ids: list[int], version: str
+) -> None:
+    """Applies newly posted rounds to the tournament leaderboard, if one is loaded.
+
+    The leaderboard is discarded (and rebuilt when next requested) if it was not
+    current before the rounds were posted.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    tournament_id (int): Tournament identifier.
+    round_ids (list[int]): Round identifiers of posted rounds.
+    version (str): Data version before the rounds were posted, see
+        `get_standings_version`.
+
+    """
+    entry = leaderboard_cache.get(tournament_id)
+    if entry is None:
+        return
+    if entry[0] != version:
+        leaderboard_cache.invalidate(tournament_id)
+        return
+    leaderboard = entry[1]
+    if round_ids:
+        for round_results in get_tournament_rounds(
+            session=session, tournament_id=tournament_id, round_ids=round_ids
+        ):
+            leaderboard.apply_round(round_results)
+    leaderboard_cache.set(
+        tournament_id, (get_standings_version(tournament_id), leaderboard)
+    )
+
+
+def verify_leaderboard(session: Session, tournament_id: int) -> bool:
+    """Checks the tournament leaderboard against standings rebuilt from all rounds,
+    discarding the leaderboard if they differ.
+
+    Parameters
+    ----------
+    session (`Session`): Database session.
+    tournament_id (int): Tournament identifier.
+
+    """
+    leaderboard = get_leaderboard(session=session, tournament_id=tournament_id)
+    standings = get_standings(session=session, tournament_id=tournament_id)
+    if leaderboard.get_standings().model_dump() == standings.model_dump():
+        return True
+    leaderboard_cache.invalidate(tournament_id)
+    return False
+
+
 def get_statistics(session: Session, tournament_id: int) -> TournamentStatistics:
     round_ids = session.exec(
         select(Round.id)
@@ -1,7 +1,11 @@
-from datetime import datetime, timedelta
+import inspect
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from functools import lru_cache
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -10,6 +14,10 @@ from sqlmodel import Session, SQLModel, create_engine, select
 
 from app.config import Settings
 from app.models.user import User
+from app.utilities.data_versions import data_versions
+from app.utilities.profiling import PROFILE_ID_HEADER, request_profiler
+from app.utilities.query_counter import get_current_query_stats
+from app.utilities.ttl_cache import TTLCache
 
 
 @lru_cache()
@@ -56,6 +64,12 @@ def get_sql_db_session() -> Session:
 """ Authentication """
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token", auto_error=False)
+
+# Users resolved from access tokens, keyed by token subject (username)
+DEFAULT_USER_CACHE_SIZE = 256
+DEFAULT_USER_CACHE_TTL = 30.0  # seconds
+user_cache = TTLCache(maxsize=DEFAULT_USER_CACHE_SIZE, ttl=DEFAULT_USER_CACHE_TTL)
 
 
 def get_user(*, session: Session = Depends(get_sql_db_session), username: str) -> User:
@@ -85,6 +99,7 @@ def change_user_password(
     setattr(user, "hashed_password", pwd_context.hash(password))
     session.commit()
     session.refresh(user)
+    user_cache.invalidate(user.username)
     return user
 
 
@@ -123,13 +138,154 @@ async def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user(session=session, username=username)
-    if user is None:
-        raise credentials_exception
-    return user
+    user_data = user_cache.get(username)
+    if user_data is None:
+        user = get_user(session=session, username=username)
+        if user is None:
+            raise credentials_exception
+        user_data = user.dict()
+        user_cache.set(username, user_data)
+    return User(**user_data)  # detached copy, safe to modify per request
 
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if current_user.disabled:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+""" Conditional Requests """
+
+
+def conditional_request(*models: type[SQLModel], daily: bool = False):
+    """
+    Creates a dependency answering conditional GET requests.
+
+    The response is tagged with an `ETag` and `Last-Modified` header derived
+    from the data versions of the given tables. If the client's cached copy
+    is still current (`If-None-Match` or `If-Modified-Since`), the request is
+    answered with `304 Not Modified` before the endpoint is run.
+
+    Parameters
+    ----------
+    *models : type[SQLModel]
+        table models the response is derived from
+    daily : bool, optional
+        if true, response also depends on the current date (e.g. default
+        query parameters or handicap calculations relative to today).
+        Default: False
+
+    Returns
+    -------
+    dependency : Callable
+        router or path operation dependency
+
+    """
+    tables = tuple(sorted({model.__tablename__ for model in models}))
+
+    async def check_conditional_request(request: Request, response: Response):
+        extra = (date.today().isoformat(),) if daily else ()
+        etag = data_versions.get_etag(tables, *extra)
+        last_modified = data_versions.get_last_modified(tables)
+        if daily:
+            last_modified = max(
+                last_modified,
+                datetime.combine(date.today(), datetime.min.time(), timezone.utc),
+            )
+        headers = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        if _is_not_modified(request, etag=etag, last_modified=last_modified):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        response.headers.update(headers)
+
+    return check_conditional_request
+
+
+def _is_not_modified(request: Request, *, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:  # takes precedence over If-Modified-Since
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or any(
+            tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates
+        )
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+""" Profiling """
+
+
+@contextmanager
+def _resolve_sql_db_session(request: Request) -> Iterator[Session]:
+    """Resolves database session outside of dependency injection, honoring
+    dependency overrides."""
+    get_session = request.app.dependency_overrides.get(
+        get_sql_db_session, get_sql_db_session
+    )
+    session = get_session()
+    if not inspect.isgenerator(session):
+        yield session
+        return
+    try:
+        yield next(session)
+    finally:
+        session.close()
+
+
+async def profile_request(*, request: Request, response: Response):
+    """
+    Profiles request if requested by an admin (`X-Profile` header or `profile`
+    query parameter).
+
+    Included as router-level dependency. The profile identifier is returned in
+    the `X-Profile-Id` header, and reports are available from `/profiles/`.
+    Requests that are not flagged only pay for the flag check, the token and
+    user are only resolved for flagged requests.
+
+    """
+    if not request_profiler.is_requested(request):
+        yield
+        return
+
+    token = await optional_oauth2_scheme(request)
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    with _resolve_sql_db_session(request) as session:
+        user = await get_current_user(session=session, token=token)
+    if user.disabled or not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not authorized to profile requests",
+        )
+
+    profile = request_profiler.start(request, username=user.username)
+    if profile is None:  # rate-limited
+        yield
+        return
+
+    query_stats = get_current_query_stats()
+    sql_count_start = query_stats.count if query_stats else 0
+    sql_time_start = query_stats.duration if query_stats else 0.0
+    response.headers[PROFILE_ID_HEADER] = profile.id
+    try:
+        yield
+    finally:
+        request_profiler.stop(
+            profile,
+            sql_time=(query_stats.duration - sql_time_start) if query_stats else 0.0,
+            sql_query_count=(query_stats.count - sql_count_start) if query_stats else 0,
+        )
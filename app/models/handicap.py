@@ -1,11 +1,13 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Optional
 
-from sqlmodel import Field, Relationship
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, Relationship, and_, func
 
 from app.models.base import APLGLBaseModel
 from app.models.golfer import Golfer
 from app.models.round import Round, RoundType, ScoringType
+from app.models.track import Track
 
 
 class HandicapIndexBase(APLGLBaseModel):
@@ -51,9 +53,56 @@ class ScoringRecordRound(APLGLBaseModel):
     tee_par: int | None
     tee_rating: float | None
     tee_slope: int | None
+    playing_conditions_correction: float = 0.0
     playing_handicap: int | None
     gross_score: int | None
     adjusted_gross_score: int | None
     net_score: int | None
     score_differential: float
     handicap_index: float | None
+
+
+class GolferHandicapState(APLGLBaseModel, table=True):
+    golfer_id: int = Field(default=None, foreign_key="golfer.id", primary_key=True)
+    round_id: int | None = Field(
+        default=None,
+        foreign_key="round.id",
+        description="Most recent round posted to the handicap index state",
+    )
+    date_played: datetime | None = Field(
+        default=None, description="Date played of most recent round posted"
+    )
+    state: dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column(JSON, nullable=False)
+    )
+    date_updated: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GolferHandicapStateRead(APLGLBaseModel):
+    golfer_id: int
+    round_id: int | None
+    date_played: datetime | None
+    date_updated: datetime
+    num_scores: int
+    handicap_index: float | None
+    low_handicap_index: float | None
+    score_differentials: list[float]
+
+
+class PlayingConditionsCorrection(APLGLBaseModel, table=True):
+    course_id: int = Field(default=None, foreign_key="course.id", primary_key=True)
+    date_played: date = Field(default=None, primary_key=True)
+    num_scores: int = Field(description="Number of acceptable scores on course and day")
+    playing_conditions_correction: float = Field(default=0.0)
+    date_updated: datetime = Field(default_factory=datetime.utcnow)
+
+
+def get_playing_conditions_onclause():
+    """Join condition for the playing conditions correction of a round.
+
+    Requires the round's tee track in the query, for the course played.
+    """
+    return and_(
+        PlayingConditionsCorrection.course_id == Track.course_id,
+        PlayingConditionsCorrection.date_played == func.date(Round.date_played),
+    )
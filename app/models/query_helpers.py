@@ -2,7 +2,7 @@ from datetime import date as dt_date
 from datetime import datetime, timedelta
 
 from sqlalchemy.orm import aliased
-from sqlmodel import Field, Session, desc, or_, select
+from sqlmodel import Field, Session, desc, func, or_, select
 
 from app.models.base import APLGLBaseModel
 from app.models.course import Course
@@ -11,7 +11,11 @@ from app.models.flight import Flight
 from app.models.flight_division_link import FlightDivisionLink
 from app.models.flight_team_link import FlightTeamLink
 from app.models.golfer import Golfer, GolferAffiliation, GolferStatisticsOLD
-from app.models.handicap import HandicapIndex
+from app.models.handicap import (
+    HandicapIndex,
+    PlayingConditionsCorrection,
+    get_playing_conditions_onclause,
+)
 from app.models.hole import Hole
 from app.models.hole_result import HoleResult, HoleResultData
 from app.models.match import Match, MatchData, MatchSummary
@@ -1243,12 +1247,25 @@ def get_round_summaries(
         handicap_system = APLHandicapSystem()
 
     round_query_data = session.exec(
-        select(Round, RoundGolferLink, Golfer, Course, Track, Tee)
+        select(
+            Round,
+            RoundGolferLink,
+            Golfer,
+            Course,
+            Track,
+            Tee,
+            func.coalesce(
+                PlayingConditionsCorrection.playing_conditions_correction, 0.0
+            ),
+        )
         .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
         .join(Golfer, onclause=Golfer.id == RoundGolferLink.golfer_id)
         .join(Tee)
         .join(Track)
         .join(Course)
+        .outerjoin(
+            PlayingConditionsCorrection, onclause=get_playing_conditions_onclause()
+        )
         .where(Round.id.in_(round_ids))
     ).all()
     round_summaries = [
@@ -1266,8 +1283,17 @@ def get_round_summaries(
             tee_rating=tee.rating,
             tee_slope=tee.slope,
             tee_color=tee.color if tee.color else "none",
+            playing_conditions_correction=playing_conditions_correction,
         )
-        for round, round_golfer_link, golfer, course, track, tee in round_query_data
+        for (
+            round,
+            round_golfer_link,
+            golfer,
+            course,
+            track,
+            tee,
+            playing_conditions_correction,
+        ) in round_query_data
     ]
 
     # Query hole data for selected rounds
@@ -1281,7 +1307,10 @@ def get_round_summaries(
         r.adjusted_gross_score = sum([h.adjusted_gross_score for h in round_holes])
         r.net_score = sum([h.net_score for h in round_holes])
         r.score_differential = handicap_system.compute_score_differential(
-            r.tee_rating, r.tee_slope, r.adjusted_gross_score
+            r.tee_rating,
+            r.tee_slope,
+            r.adjusted_gross_score,
+            playing_conditions_correction=r.playing_conditions_correction,
         )
     return round_summaries
 
@@ -101,6 +101,7 @@ class RoundSummary(APLGLBaseModel):
     tee_par: int | None = None
     tee_rating: float | None = None
     tee_slope: float | None = None
+    playing_conditions_correction: float = 0.0
     gross_score: int | None = None
     adjusted_gross_score: int | None = None
     net_score: int | None = None
@@ -176,3 +177,81 @@ class RoundSubmissionResponse(APLGLBaseModel):
     course_handicap: int
     holes: list[HoleResultSubmissionResponse] = Field(default_factory=list)
     is_valid: bool = False
+
+
+class RoundImportRequest(APLGLBaseModel):
+    golfer_id: int
+    tee_id: int
+    date_played: Union[datetime, date]
+    course_handicap: int
+    round_type: RoundType
+    scoring_type: ScoringType
+    gross_scores: list[int] = Field(default_factory=list)  # in order of hole number
+
+
+class RoundImportResult(APLGLBaseModel):
+    index: int
+    golfer_id: int | None = None
+    tee_id: int | None = None
+    round_id: int | None = None
+    is_imported: bool = False
+    detail: str | None = None
+
+
+class RoundImportResponse(APLGLBaseModel):
+    num_rounds: int
+    num_imported: int
+    results: list[RoundImportResult] = Field(default_factory=list)
+
+
+class HoleResultCorrection(APLGLBaseModel):
+    hole_result_id: int
+    round_id: int
+    number: int
+    handicap_strokes_prior: int
+    handicap_strokes: int
+    adjusted_gross_score_prior: int
+    adjusted_gross_score: int
+    net_score_prior: int
+    net_score: int
+
+
+class HandicapIndexCorrection(APLGLBaseModel):
+    handicap_index_id: int
+    golfer_id: int
+    round_id: int
+    handicap_index_prior: float | None = None
+    handicap_index: float | None = None
+
+
+class GolferHandicapIndexCorrection(APLGLBaseModel):
+    golfer_id: int
+    handicap_index_prior: float | None = None
+    handicap_index: float | None = None
+
+
+class MatchScoreCorrection(APLGLBaseModel):
+    match_id: int
+    home_score_prior: float | None = None
+    home_score: float | None = None
+    away_score_prior: float | None = None
+    away_score: float | None = None
+
+
+class RoundCorrectionRequest(APLGLBaseModel):
+    golfer_id: int | None = None
+    playing_handicap: int | None = None
+
+
+class RoundCorrection(APLGLBaseModel):
+    round_id: int
+    is_applied: bool = False
+    golfer_id_prior: int
+    golfer_id: int
+    playing_handicap_prior: int | None = None
+    playing_handicap: int | None = None
+    hole_results: list[HoleResultCorrection] = Field(default_factory=list)
+    handicap_indexes: list[HandicapIndexCorrection] = Field(default_factory=list)
+    golfers: list[GolferHandicapIndexCorrection] = Field(default_factory=list)
+    matches: list[MatchScoreCorrection] = Field(default_factory=list)
+    snapshot_scopes: list[str] = Field(default_factory=list)
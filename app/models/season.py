@@ -1,3 +1,6 @@
+from datetime import date, datetime
+from typing import Optional
+
 from sqlmodel import Field
 
 from app.models.base import APLGLBaseModel
@@ -6,7 +9,35 @@ from app.models.base import APLGLBaseModel
 class Season(APLGLBaseModel, table=True):
     year: int = Field(..., description="Year for this season", primary_key=True)
     is_active: bool = Field(False, description="True if this is the active season")
+    start_date: Optional[date] = Field(
+        None, description="First day of regular season play"
+    )
+    playoffs_start_date: Optional[date] = Field(
+        None, description="First day of playoffs, later flight rounds are playoffs"
+    )
 
 
 class SeasonCreate(APLGLBaseModel):
     year: int = Field(..., description="Year for this season")
+    start_date: Optional[date] = Field(
+        None, description="First day of regular season play"
+    )
+    playoffs_start_date: Optional[date] = Field(
+        None, description="First day of playoffs, later flight rounds are playoffs"
+    )
+
+
+class GolferSeasonStatistics(APLGLBaseModel, table=True):
+    year: int = Field(..., description="Season year", primary_key=True)
+    golfer_id: int = Field(..., foreign_key="golfer.id", primary_key=True)
+    golfer_name: str
+    starting_handicap_index: Optional[float] = Field(
+        None, description="Handicap index at start of season"
+    )
+    current_handicap_index: Optional[float] = None
+    rounds_played: int = Field(..., description="Regular season flight rounds played")
+    avg_gross_to_par: float
+    avg_gross_differential: float
+    avg_net_to_par: float
+    avg_net_differential: float
+    date_updated: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import Field
+
+from app.models.base import APLGLBaseModel
+
+
+class ResponseSnapshot(APLGLBaseModel, table=True):
+    key: str = Field(
+        ..., primary_key=True, description="Request path of the snapshot response"
+    )
+    scope: str = Field(
+        ..., index=True, description="Entity this snapshot belongs to (e.g. flight:1)"
+    )
+    digest: str = Field(..., description="SHA-256 digest of the snapshot content")
+    content: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    date_created: datetime = Field(default_factory=datetime.utcnow)
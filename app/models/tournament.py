@@ -166,3 +166,32 @@ class TournamentFreeAgentCreate(TournamentFreeAgentBase):
 
 class TournamentFreeAgentGolfer(TournamentTeamGolfer):
     pass
+
+
+class TournamentGolferHandicap(APLGLBaseModel):
+    team_id: int
+    golfer_id: int
+    golfer_name: str
+    division_id: int
+    division_name: str
+    handicap_index: float | None
+    primary_tee_name: str
+    primary_course_handicap: float
+    secondary_tee_name: str | None = None
+    secondary_course_handicap: float | None = None
+    course_handicap: int
+
+
+class TournamentTeamHandicap(APLGLBaseModel):
+    team_id: int
+    team_name: str
+    golfers: list[TournamentGolferHandicap] = Field(default_factory=list)
+    team_handicap: int | None = None
+
+
+class TournamentHandicaps(APLGLBaseModel):
+    tournament_id: int
+    name: str
+    year: int
+    handicap_allowance: float
+    teams: list[TournamentTeamHandicap] = Field(default_factory=list)
@@ -28,7 +28,7 @@ class UserCreate(UserBase):
 class UserUpdate(APLGLBaseModel):
     username: Optional[str] = None
     hashed_password: Optional[str] = None
-    email: Optional[int] = None
+    email: Optional[str] = None
     name: Optional[str] = None
     disabled: Optional[bool] = None
     is_admin: Optional[bool] = None
@@ -1,31 +1,100 @@
+from collections.abc import Callable
+from functools import partial
 from http import HTTPStatus
+from typing import Any
 
-from fastapi import APIRouter, Depends, Path, Query, status
+from fastapi import APIRouter, Depends, Path, Query, Request, status
 from fastapi.exceptions import HTTPException
 from sqlmodel import Session, select
 
 from app.database import flights as db_flights
+from app.database import snapshots as db_snapshots
 from app.database import teams as db_teams
-from app.dependencies import get_current_active_user, get_sql_db_session
+from app.dependencies import (
+    conditional_request,
+    get_current_active_user,
+    get_sql_db_session,
+)
 from app.models.base import APLGLBaseModel
-from app.models.flight import Flight, FlightCreate, FlightInfo, FlightRead
-from app.models.flight_team_link import FlightTeamLink
-from app.models.match import MatchSummary
-from app.models.query_helpers import (
-    FlightData,
-    get_divisions_in_flights,
-    get_flights,
-    get_matches_for_teams,
-    get_teams_in_flights,
+from app.models.course import Course
+from app.models.division import Division
+from app.models.flight import (
+    Flight,
+    FlightCreate,
+    FlightFreeAgent,
+    FlightInfo,
+    FlightRead,
 )
+from app.models.flight_division_link import FlightDivisionLink
+from app.models.flight_team_link import FlightTeamLink
+from app.models.golfer import Golfer
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.match import Match
+from app.models.match_round_link import MatchRoundLink
+from app.models.query_helpers import FlightData
+from app.models.round import Round
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.substitute import Substitute
+from app.models.team import Team
 from app.models.team_golfer_link import TeamGolferLink
+from app.models.tee import Tee
+from app.models.track import Track
 from app.models.user import User
-from app.routers.utilities import upsert_division
+from app.routers.utilities import (
+    coalesced,
+    get_flight_stream,
+    live_event_response,
+    snapshot_response,
+    upsert_division,
+)
+from app.utilities.responses import FastJSONRoute
+
+router = APIRouter(prefix="/flights", tags=["Flights"], route_class=FastJSONRoute)
+
+# Tables that flight data responses are derived from, for conditional requests
+FLIGHT_DATA_MODELS = (
+    Flight,
+    FlightDivisionLink,
+    FlightTeamLink,
+    FlightFreeAgent,
+    Division,
+    Course,
+    Track,
+    Tee,
+    Hole,
+    Team,
+    TeamGolferLink,
+    Golfer,
+    Substitute,
+    Match,
+    MatchRoundLink,
+    Round,
+    RoundGolferLink,
+    HoleResult,
+)
+
 
-router = APIRouter(prefix="/flights", tags=["Flights"])
+async def _snapshot_response(
+    *, session: Session, request: Request, flight_id: int, build: Callable[[], Any]
+) -> Any:
+    """Serves a snapshot of flight data, stored once the flight is frozen."""
+    return await snapshot_response(
+        session=session,
+        request=request,
+        scope=db_snapshots.get_flight_scope(flight_id),
+        is_frozen=partial(
+            db_snapshots.is_flight_frozen, session=session, flight_id=flight_id
+        ),
+        build=build,
+    )
 
 
-@router.get("/", response_model=list[FlightInfo])
+@router.get(
+    "/",
+    response_model=list[FlightInfo],
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def read_flights(
     *,
     session: Session = Depends(get_sql_db_session),
@@ -39,39 +108,31 @@ async def read_flights(
     return sorted(infos, key=lambda info: info.name)
 
 
-@router.get("/{flight_id}", response_model=FlightData)
+@router.get(
+    "/{flight_id}",
+    response_model=FlightData,
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def read_flight(
-    *, session: Session = Depends(get_sql_db_session), flight_id: int
+    *,
+    session: Session = Depends(get_sql_db_session),
+    request: Request,
+    flight_id: int,
 ):
-    # Query database for selected flight, error if not found
-    flight_data = get_flights(session=session, flight_ids=(flight_id,))
-    if (not flight_data) or (len(flight_data) == 0):
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Flight not found")
-    flight_data = flight_data[0]
-    # Add division and team data to selected flight
-    flight_data.divisions = get_divisions_in_flights(
-        session=session, flight_ids=(flight_id,)
-    )
-    flight_data.teams = get_teams_in_flights(session=session, flight_ids=(flight_id,))
-    # Compile match summary data and add to selected flight
-    team_matches = get_matches_for_teams(
-        session=session, team_ids=[t.id for t in flight_data.teams]
+    def build_flight_data() -> FlightData:
+        flight_data = db_flights.get_data(session=session, flight_id=flight_id)
+        if flight_data is None:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="Flight not found"
+            )
+        return flight_data
+
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=build_flight_data,
     )
-    flight_data.matches = [
-        MatchSummary(
-            match_id=match.match_id,
-            home_team_id=match.home_team_id,
-            home_team_name=match.home_team_name,
-            away_team_id=match.away_team_id,
-            away_team_name=match.away_team_name,
-            flight_name=match.flight_name,
-            week=match.week,
-            home_score=match.home_score,
-            away_score=match.away_score,
-        )
-        for match in team_matches
-    ]
-    return flight_data
 
 
 @router.post("/", response_model=FlightRead)
@@ -131,6 +192,9 @@ async def delete_flight(
     if not flight_db:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Flight not found")
     session.delete(flight_db)
+    db_snapshots.delete_snapshots(
+        session=session, scope=db_snapshots.get_flight_scope(flight_id), commit=False
+    )
     session.commit()
     # TODO: Delete linked resources (divisions, teams, etc.)
     return {"ok": True}
@@ -152,6 +216,12 @@ def upsert_flight(*, session: Session, flight_data: FlightCreate) -> FlightRead:
         flight_dict = flight_data.model_dump(exclude_unset=True, exclude={"divisions"})
         for key, value in flight_dict.items():
             setattr(flight_db, key, value)
+        # Stored snapshots are stale once a flight is modified (e.g. unlocked)
+        db_snapshots.delete_snapshots(
+            session=session,
+            scope=db_snapshots.get_flight_scope(flight_db.id),
+            commit=False,
+        )
     session.add(flight_db)
     session.commit()
     session.refresh(flight_db)
@@ -171,76 +241,182 @@ def upsert_flight(*, session: Session, flight_data: FlightCreate) -> FlightRead:
     return flight_db
 
 
-@router.get("/info/{flight_id}")
+@router.get(
+    "/info/{flight_id}",
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def get_info(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_info(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(db_flights.get_info, session=session, flight_id=flight_id),
+    )
 
 
-@router.get("/divisions/{flight_id}")
+@router.get(
+    "/divisions/{flight_id}",
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def get_divisions(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_divisions(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(db_flights.get_divisions, session=session, flight_id=flight_id),
+    )
 
 
-@router.get("/teams/{flight_id}")
+@router.get(
+    "/teams/{flight_id}",
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def get_teams(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_teams(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(db_flights.get_teams, session=session, flight_id=flight_id),
+    )
 
 
-@router.get("/substitutes/{flight_id}")
+@router.get(
+    "/substitutes/{flight_id}",
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def get_substitutes(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_substitutes(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(db_flights.get_substitutes, session=session, flight_id=flight_id),
+    )
 
 
-@router.get("/free-agents/{flight_id}")
+@router.get(
+    "/free-agents/{flight_id}",
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def get_free_agents(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_free_agents(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(db_flights.get_free_agents, session=session, flight_id=flight_id),
+    )
 
 
-@router.get("/matches/{flight_id}")
+@router.get(
+    "/matches/{flight_id}",
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def get_matches(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_match_summaries(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(
+            db_flights.get_match_summaries, session=session, flight_id=flight_id
+        ),
+    )
 
 
-@router.get("/standings/{flight_id}")
+@router.get(
+    "/standings/{flight_id}",
+    dependencies=[Depends(conditional_request(Flight, Team, Match))],
+)
 async def get_standings(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_standings(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(
+            coalesced,
+            request=request,
+            session=session,
+            build=partial(db_flights.get_standings, flight_id=flight_id),
+        ),
+    )
 
 
-@router.get("/statistics/{flight_id}")
+@router.get("/live/{flight_id}")
+async def get_live_results(
+    *,
+    # Session is closed once the initial event is built, not held while streaming
+    session: Session = Depends(get_sql_db_session, scope="function"),
+    request: Request,
+    flight_id: int = Path(..., description="Flight identifier"),
+):
+    """Streams standings ("standings") and posted matches ("match") as they change."""
+    if session.get(Flight, flight_id) is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f"Flight (id={flight_id}) not found",
+        )
+    return live_event_response(
+        request=request,
+        stream=get_flight_stream(flight_id),
+        event="standings",
+        build=partial(db_flights.get_standings, session=session, flight_id=flight_id),
+    )
+
+
+@router.get(
+    "/statistics/{flight_id}",
+    dependencies=[Depends(conditional_request(*FLIGHT_DATA_MODELS))],
+)
 async def get_statistics(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     flight_id: int = Path(..., description="Flight identifier"),
 ):
-    return db_flights.get_statistics(session=session, flight_id=flight_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        flight_id=flight_id,
+        build=partial(
+            coalesced,
+            request=request,
+            session=session,
+            build=partial(db_flights.get_statistics, flight_id=flight_id),
+        ),
+    )
 
 
 class MoveTeamRequest(APLGLBaseModel):
@@ -343,6 +519,12 @@ async def move_team(
 
         session.delete(tgl_db)
 
+    for flight_id in (ftl_db.flight_id, new_flight_db.id):
+        db_snapshots.delete_snapshots(
+            session=session,
+            scope=db_snapshots.get_flight_scope(flight_id),
+            commit=False,
+        )
     session.commit()
     session.refresh(team_db)
     return team_db
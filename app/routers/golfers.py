@@ -8,7 +8,16 @@ from fastapi.exceptions import HTTPException
 from sqlmodel import Session, select
 
 from app.database import golfers as db_golfers
-from app.dependencies import get_current_active_user, get_sql_db_session
+from app.database import snapshots as db_snapshots
+from app.dependencies import (
+    conditional_request,
+    get_current_active_user,
+    get_sql_db_session,
+)
+from app.models.course import Course
+from app.models.division import Division
+from app.models.flight import Flight
+from app.models.flight_team_link import FlightTeamLink
 from app.models.golfer import (
     Golfer,
     GolferCreate,
@@ -16,6 +25,11 @@ from app.models.golfer import (
     GolferStatistics,
     GolferUpdate,
 )
+from app.models.handicap import HandicapIndex
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.match_round_link import MatchRoundLink
+from app.models.qualifying_score import QualifyingScore
 from app.models.query_helpers import (
     GolferData,
     GolferDataWithCount,
@@ -23,12 +37,48 @@ from app.models.query_helpers import (
     get_golfer_team_data,
     get_golfers,
 )
+from app.models.round import Round
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.team import Team
+from app.models.team_golfer_link import TeamGolferLink
+from app.models.tee import Tee
+from app.models.tournament import Tournament
+from app.models.tournament_round_link import TournamentRoundLink
+from app.models.tournament_team_link import TournamentTeamLink
+from app.models.track import Track
 from app.models.user import User
 
 router = APIRouter(prefix="/golfers", tags=["Golfers"])
 
+# Tables that golfer data responses are derived from, for conditional requests
+GOLFER_DATA_MODELS = (
+    Golfer,
+    HandicapIndex,
+    QualifyingScore,
+    Team,
+    TeamGolferLink,
+    Division,
+    Flight,
+    FlightTeamLink,
+    Tournament,
+    TournamentTeamLink,
+    Course,
+    Track,
+    Tee,
+    Hole,
+    Round,
+    RoundGolferLink,
+    MatchRoundLink,
+    TournamentRoundLink,
+    HoleResult,
+)
+
 
-@router.get("/", response_model=GolferDataWithCount)
+@router.get(
+    "/",
+    response_model=GolferDataWithCount,
+    dependencies=[Depends(conditional_request(*GOLFER_DATA_MODELS, daily=True))],
+)
 async def read_golfers(
     *,
     session: Session = Depends(get_sql_db_session),
@@ -44,7 +94,11 @@ async def read_golfers(
     )
 
 
-@router.get("/info", response_model=List[GolferRead])
+@router.get(
+    "/info",
+    response_model=List[GolferRead],
+    dependencies=[Depends(conditional_request(*GOLFER_DATA_MODELS, daily=True))],
+)
 async def read_all_golfers(*, session: Session = Depends(get_sql_db_session)):
     return session.exec(select(Golfer)).all()
 
@@ -102,7 +156,11 @@ async def create_golfer(
     return golfer_db
 
 
-@router.get("/{golfer_id}", response_model=GolferData)
+@router.get(
+    "/{golfer_id}",
+    response_model=GolferData,
+    dependencies=[Depends(conditional_request(*GOLFER_DATA_MODELS, daily=True))],
+)
 async def read_golfer(
     *,
     session: Session = Depends(get_sql_db_session),
@@ -140,6 +198,11 @@ async def update_golfer(
     for key, value in golfer_data.items():
         setattr(golfer_db, key, value)
     session.add(golfer_db)
+    db_snapshots.delete_scopes(
+        session=session,
+        scopes=db_snapshots.get_golfer_scopes(session=session, golfer_ids=[golfer_id]),
+        commit=False,
+    )
     session.commit()
     session.refresh(golfer_db)
     return golfer_db
@@ -155,12 +218,21 @@ async def delete_golfer(
     golfer_db = session.get(Golfer, golfer_id)
     if not golfer_db:
         raise HTTPException(status_code=404, detail="Golfer not found")
+    db_snapshots.delete_scopes(
+        session=session,
+        scopes=db_snapshots.get_golfer_scopes(session=session, golfer_ids=[golfer_id]),
+        commit=False,
+    )
     session.delete(golfer_db)
     session.commit()
     return {"ok": True}
 
 
-@router.get("/{golfer_id}/teams", response_model=List[GolferTeamData])
+@router.get(
+    "/{golfer_id}/teams",
+    response_model=List[GolferTeamData],
+    dependencies=[Depends(conditional_request(*GOLFER_DATA_MODELS, daily=True))],
+)
 async def read_golfer_team_data(
     *,
     session: Session = Depends(get_sql_db_session),
@@ -170,7 +242,11 @@ async def read_golfer_team_data(
     return get_golfer_team_data(session=session, golfer_ids=(golfer_id,), year=year)
 
 
-@router.get("/{golfer_id}/statistics", response_model=GolferStatistics)
+@router.get(
+    "/{golfer_id}/statistics",
+    response_model=GolferStatistics,
+    dependencies=[Depends(conditional_request(*GOLFER_DATA_MODELS, daily=True))],
+)
 async def get_statistics(
     *,
     session: Session = Depends(get_sql_db_session),
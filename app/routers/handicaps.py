@@ -8,7 +8,7 @@ from sqlmodel import Session, select
 from app.database import handicaps as db_handicap
 from app.dependencies import get_current_active_user, get_sql_db_session
 from app.models.golfer import Golfer
-from app.models.handicap import ScoringRecordRound
+from app.models.handicap import GolferHandicapStateRead, ScoringRecordRound
 from app.models.qualifying_score import (
     QualifyingScore,
     QualifyingScoreCreate,
@@ -73,6 +73,23 @@ async def get_handicap_index(
     )
 
 
+@router.get("/state/{golfer_id}", response_model=GolferHandicapStateRead)
+async def get_handicap_state(
+    *,
+    session: Session = Depends(get_sql_db_session),
+    golfer_id: int = Path(..., description="Golfer identifier"),
+):
+    handicap_state = db_handicap.get_handicap_state(
+        session=session, golfer_id=golfer_id
+    )
+    if handicap_state is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f"No handicap state found for golfer (id={golfer_id})",
+        )
+    return handicap_state
+
+
 @router.get("/", response_model=List[QualifyingScoreInfo])
 async def read_qualifying_scores(
     *, session: Session = Depends(get_sql_db_session), year: int
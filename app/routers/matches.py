@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import partial
 from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, Query
@@ -6,12 +7,14 @@ from fastapi.exceptions import HTTPException
 from pydantic.v1 import root_validator
 from sqlmodel import Session, select
 
+from app.database import courses as db_courses
+from app.database import flights as db_flights
+from app.database import rounds as db_rounds
+from app.database import snapshots as db_snapshots
 from app.dependencies import get_current_active_user, get_sql_db_session
 from app.models.base import APLGLBaseModel
 from app.models.flight import Flight
 from app.models.golfer import Golfer
-from app.models.hole import Hole
-from app.models.hole_result import HoleResult
 from app.models.match import (
     Match,
     MatchCreate,
@@ -27,8 +30,12 @@ from app.models.query_helpers import get_matches
 from app.models.round import Round, RoundType, ScoringType
 from app.models.round_golfer_link import RoundGolferLink
 from app.models.team import Team
-from app.models.tee import Tee
 from app.models.user import User
+from app.routers.utilities import (
+    get_flight_stream,
+    publish_live_events,
+    publish_standings,
+)
 from app.utilities import scoring
 from app.utilities.apl_handicap_system import APLHandicapSystem
 
@@ -107,7 +114,10 @@ async def create_match(
 ):
     match_db = Match.model_validate(match)
     session.add(match_db)
+    scope = db_snapshots.get_flight_scope(match_db.flight_id)
+    db_snapshots.delete_snapshots(session=session, scope=scope, commit=False)
     session.commit()
+    publish_standings(session=session, scopes=[scope])
     session.refresh(match_db)
     return match_db
 
@@ -131,11 +141,16 @@ async def update_match(
     match_db = session.get(Match, match_id)
     if not match_db:
         raise HTTPException(status_code=404, detail="Match not found")
+    scope = db_snapshots.get_flight_scope(match_db.flight_id)
     match_data = match.model_dump(exclude_unset=True)
     for key, value in match_data.items():
         setattr(match_db, key, value)
     session.add(match_db)
+    scopes = {scope, db_snapshots.get_flight_scope(match_db.flight_id)}
+    for flight_scope in scopes:
+        db_snapshots.delete_snapshots(session=session, scope=flight_scope, commit=False)
     session.commit()
+    publish_standings(session=session, scopes=scopes)
     session.refresh(match_db)
     return match_db
 
@@ -150,8 +165,11 @@ async def delete_match(
     match_db = session.get(Match, match_id)
     if not match_db:
         raise HTTPException(status_code=404, detail="Match not found")
+    scope = db_snapshots.get_flight_scope(match_db.flight_id)
+    db_snapshots.delete_snapshots(session=session, scope=scope, commit=False)
     session.delete(match_db)
     session.commit()
+    publish_standings(session=session, scopes=[scope])
     # TODO: Delete related resources (match-round-links)
     return {"ok": True}
 
@@ -196,92 +214,154 @@ async def post_match_rounds(
             detail=f"Rounds already submitted for match (id={match_input.match_id})",
         )
 
+    # Load and validate all referenced data before writing anything
+    golfers_db = {
+        golfer_db.id: golfer_db
+        for golfer_db in session.exec(
+            select(Golfer).where(
+                Golfer.id.in_(
+                    {
+                        golfer_id
+                        for round_input in match_input.rounds
+                        for golfer_id in round_input.golfer_ids
+                    }
+                )
+            )
+        ).all()
+    }
+    teams_db = {
+        team_db.id: team_db
+        for team_db in session.exec(
+            select(Team).where(
+                Team.id.in_({round_input.team_id for round_input in match_input.rounds})
+            )
+        ).all()
+    }
+    tee_ids = list({round_input.tee_id for round_input in match_input.rounds})
+    tees_db = {
+        tee_db.id: tee_db
+        for tee_db in db_courses.get_tees_by_id(session=session, tee_ids=tee_ids)
+    }
+    holes_db = {
+        hole_db.id: hole_db
+        for hole_db in db_courses.get_holes_by_tee_ids(session=session, tee_ids=tee_ids)
+    }
+
+    hole_results_by_round: list[list[dict]] = []
     for round_input in match_input.rounds:
-        golfers_db = []
         for golfer_id in round_input.golfer_ids:
-            golfer_db = session.get(Golfer, golfer_id)
-            if not golfer_db:
+            if golfer_id not in golfers_db:
                 raise HTTPException(
                     status_code=HTTPStatus.NOT_FOUND,
                     detail=f"Golfer (id={golfer_id}) not found",
                 )
-            golfers_db.append(golfer_db)
 
-        team_db = session.get(Team, round_input.team_id)
-        if not team_db:
+        if round_input.team_id not in teams_db:
             raise HTTPException(
-                status_code=HTTPStatus,
+                status_code=HTTPStatus.NOT_FOUND,
                 detail=f"Team (id={round_input.team_id}) not found",
             )
 
-        tee_db = session.get(Tee, round_input.tee_id)
-        if not tee_db:
+        if round_input.tee_id not in tees_db:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f"Tee (id={round_input.tee_id}) not found",
             )
 
-        round_db = Round(
-            tee_id=tee_db.id,
-            type=RoundType.FLIGHT,
-            scoring_type=ScoringType.INDIVIDUAL,
-            date_played=match_input.date_played,
-            date_updated=datetime.today(),
-        )
-        session.add(round_db)
-        session.commit()
-        session.refresh(round_db)
-
-        match_round_link_db = MatchRoundLink(
-            match_id=match_db.id, round_id=round_db.id, team_id=team_db.id
-        )
-        session.add(match_round_link_db)
-        session.commit()
-        session.refresh(match_round_link_db)
-
-        for golfer_db in golfers_db:
-            round_golfer_link_db = RoundGolferLink(
-                round_id=round_db.id,
-                golfer_id=golfer_db.id,
-                playing_handicap=round_input.golfer_playing_handicap,
-            )
-            session.add(round_golfer_link_db)
-        session.commit()
-        session.refresh(round_golfer_link_db)
-
+        hole_results = []
         for hole_result_input in round_input.holes:
-            hole_db = session.get(Hole, hole_result_input.hole_id)
-            if not hole_db:
+            hole_db = holes_db.get(hole_result_input.hole_id)
+            if hole_db is None or hole_db.tee_id != round_input.tee_id:
                 raise HTTPException(
                     status_code=HTTPStatus.NOT_FOUND,
-                    detail=f"Hole (id={hole_result_input.hole_id}) not found",
+                    detail=f"Hole (id={hole_result_input.hole_id}) not found for tee (id={round_input.tee_id})",
                 )
 
             handicap_strokes = ahs.compute_hole_handicap_strokes(
                 hole_db.stroke_index, round_input.golfer_playing_handicap
             )
-
-            hole_result_db = HoleResult(
-                round_id=round_db.id,
-                hole_id=hole_result_input.hole_id,
-                handicap_strokes=handicap_strokes,
-                gross_score=hole_result_input.gross_score,
-                adjusted_gross_score=ahs.compute_hole_adjusted_gross_score(
-                    par=hole_db.par,
-                    stroke_index=hole_db.stroke_index,
-                    score=hole_result_input.gross_score,
-                    course_handicap=round_input.golfer_playing_handicap,
-                ),
-                net_score=(hole_result_input.gross_score - handicap_strokes),
+            hole_results.append(
+                {
+                    "hole_id": hole_db.id,
+                    "handicap_strokes": handicap_strokes,
+                    "gross_score": hole_result_input.gross_score,
+                    "adjusted_gross_score": ahs.compute_hole_adjusted_gross_score(
+                        par=hole_db.par,
+                        stroke_index=hole_db.stroke_index,
+                        score=hole_result_input.gross_score,
+                        course_handicap=round_input.golfer_playing_handicap,
+                    ),
+                    "net_score": hole_result_input.gross_score - handicap_strokes,
+                }
+            )
+        hole_results_by_round.append(hole_results)
+
+    # Write all rounds and results in a single transaction
+    try:
+        rounds_db = [
+            Round(
+                tee_id=round_input.tee_id,
+                type=RoundType.FLIGHT,
+                scoring_type=ScoringType.INDIVIDUAL,
+                date_played=match_input.date_played,
+                date_updated=datetime.today(),
+            )
+            for round_input in match_input.rounds
+        ]
+        session.add_all(rounds_db)
+        session.flush()  # assigns round identifiers
+
+        for round_db, round_input in zip(rounds_db, match_input.rounds):
+            session.add(
+                MatchRoundLink(
+                    match_id=match_db.id,
+                    round_id=round_db.id,
+                    team_id=round_input.team_id,
+                )
+            )
+            session.add_all(
+                RoundGolferLink(
+                    round_id=round_db.id,
+                    golfer_id=golfer_id,
+                    playing_handicap=round_input.golfer_playing_handicap,
+                )
+                for golfer_id in round_input.golfer_ids
             )
-            session.add(hole_result_db)
 
-    match_db.home_score = match_input.home_score
-    match_db.away_score = match_input.away_score
-    session.add(match_db)
-    session.commit()
+        db_rounds.insert_hole_results(
+            session=session,
+            hole_results=[
+                {**hole_result, "round_id": round_db.id}
+                for round_db, hole_results in zip(rounds_db, hole_results_by_round)
+                for hole_result in hole_results
+            ],
+        )
 
-    return get_matches(session=session, match_ids=(match_input.match_id,))[0]
+        match_db.home_score = match_input.home_score
+        match_db.away_score = match_input.away_score
+        session.add(match_db)
+        db_snapshots.delete_snapshots(
+            session=session,
+            scope=db_snapshots.get_flight_scope(match_db.flight_id),
+            commit=False,
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    match_data = get_matches(session=session, match_ids=(match_input.match_id,))[0]
+
+    publish_live_events(
+        get_flight_stream(flight_db.id),
+        {
+            "match": lambda: match_data,
+            "standings": partial(
+                db_flights.get_standings, session=session, flight_id=flight_db.id
+            ),
+        },
+    )
+    return match_data
 
 
 # TODO: Add route to get hole-by-hole team handicaps
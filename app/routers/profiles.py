@@ -0,0 +1,43 @@
+"""
+Request Profile Router
+"""
+
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.dependencies import get_current_active_user
+from app.models.user import User
+from app.utilities.profiling import ProfileReport, ProfileSummary, request_profiler
+
+router = APIRouter(prefix="/profiles", tags=["Profiles"])
+
+
+def _check_admin(user: User) -> None:
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=HTTPStatus.UNAUTHORIZED,
+            detail="User not authorized to view request profiles",
+        )
+
+
+@router.get("/", response_model=list[ProfileSummary])
+async def read_profiles(*, current_user: User = Depends(get_current_active_user)):
+    _check_admin(current_user)
+    return [
+        ProfileSummary(**report.dict(exclude={"stats", "truncated"}))
+        for report in request_profiler.get_reports()
+    ]
+
+
+@router.get("/{profile_id}", response_model=ProfileReport)
+async def read_profile(
+    *, current_user: User = Depends(get_current_active_user), profile_id: str
+):
+    _check_admin(current_user)
+    report = request_profiler.get_report(profile_id)
+    if report is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail="Request profile not found"
+        )
+    return report
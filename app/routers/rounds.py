@@ -1,11 +1,17 @@
+import csv
+import io
 from datetime import date, datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
 from fastapi.exceptions import HTTPException
+from pydantic.v1 import ValidationError
 from sqlmodel import Session, select
 
+from app.database import corrections as db_corrections
+from app.database import handicaps as db_handicaps
 from app.database import rounds as db_rounds
+from app.database import snapshots as db_snapshots
 from app.dependencies import get_current_active_user, get_sql_db_session
 from app.models.golfer import Golfer
 from app.models.hole import Hole
@@ -20,7 +26,12 @@ from app.models.hole_result import (
 from app.models.query_helpers import get_flight_rounds, get_tournament_rounds
 from app.models.round import (
     Round,
+    RoundCorrection,
+    RoundCorrectionRequest,
     RoundCreate,
+    RoundImportRequest,
+    RoundImportResponse,
+    RoundImportResult,
     RoundRead,
     RoundReadWithData,
     RoundResults,
@@ -35,11 +46,11 @@ from app.models.round_golfer_link import RoundGolferLink
 from app.models.tournament import Tournament
 from app.models.tournament_round_link import TournamentRoundLink
 from app.models.user import User
+from app.routers.utilities import publish_standings
 from app.utilities import scoring
-from app.utilities.apl_handicap_system import APLHandicapSystem
-from app.utilities.apl_legacy_handicap_system import APLLegacyHandicapSystem
+from app.utilities.responses import FastJSONRoute
 
-router = APIRouter(prefix="/rounds", tags=["Rounds"])
+router = APIRouter(prefix="/rounds", tags=["Rounds"], route_class=FastJSONRoute)
 
 
 @router.get("/", response_model=List[RoundResults])
@@ -134,11 +145,26 @@ async def update_round(
     round_db = session.get(Round, round_id)
     if not round_db:
         raise HTTPException(status_code=404, detail="Round not found")
+    date_played_prior = round_db.date_played
     round_data = round.model_dump(exclude_unset=True)
     for key, value in round_data.items():
         setattr(round_db, key, value)
     session.add(round_db)
+    scopes = db_snapshots.get_round_scopes(session=session, round_ids=[round_id])
+    db_snapshots.delete_scopes(session=session, scopes=scopes, commit=False)
+    session.flush()
+    db_handicaps.rebuild_handicap_states(
+        session=session,
+        golfer_ids=session.exec(
+            select(RoundGolferLink.golfer_id).where(
+                RoundGolferLink.round_id == round_id
+            )
+        ).all(),
+        min_date=min(date_played_prior, round_db.date_played),
+        commit=False,
+    )
     session.commit()
+    publish_standings(session=session, scopes=scopes)
     session.refresh(round_db)
     return round_db
 
@@ -153,8 +179,19 @@ async def delete_round(
     round_db = session.get(Round, round_id)
     if not round_db:
         raise HTTPException(status_code=404, detail="Round not found")
+    scopes = db_snapshots.get_round_scopes(session=session, round_ids=[round_id])
+    db_snapshots.delete_scopes(session=session, scopes=scopes, commit=False)
+    golfer_ids = session.exec(
+        select(RoundGolferLink.golfer_id).where(RoundGolferLink.round_id == round_id)
+    ).all()
+    date_played = round_db.date_played
     session.delete(round_db)
+    session.flush()
+    db_handicaps.rebuild_handicap_states(
+        session=session, golfer_ids=golfer_ids, min_date=date_played, commit=False
+    )
     session.commit()
+    publish_standings(session=session, scopes=scopes)
     # TODO: Delete related resources (match-round-links, round-golfer-links, hole results, etc.)
     return {"ok": True}
 
@@ -178,7 +215,15 @@ async def create_hole_result(
 ):
     hole_result_db = HoleResult.model_validate(hole_result)
     session.add(hole_result_db)
+    scopes = db_snapshots.get_round_scopes(
+        session=session, round_ids=[hole_result_db.round_id]
+    )
+    db_snapshots.delete_scopes(session=session, scopes=scopes, commit=False)
+    db_handicaps.rebuild_handicap_states_for_rounds(
+        session=session, round_ids=[hole_result_db.round_id], commit=False
+    )
     session.commit()
+    publish_standings(session=session, scopes=scopes)
     session.refresh(hole_result_db)
     return hole_result_db
 
@@ -208,7 +253,15 @@ async def update_hole_result(
     for key, value in round_data.items():
         setattr(hole_result_db, key, value)
     session.add(hole_result_db)
+    scopes = db_snapshots.get_round_scopes(
+        session=session, round_ids=[hole_result_db.round_id]
+    )
+    db_snapshots.delete_scopes(session=session, scopes=scopes, commit=False)
+    db_handicaps.rebuild_handicap_states_for_rounds(
+        session=session, round_ids=[hole_result_db.round_id], commit=False
+    )
     session.commit()
+    publish_standings(session=session, scopes=scopes)
     session.refresh(hole_result_db)
     return hole_result_db
 
@@ -223,8 +276,17 @@ async def delete_hole_result(
     hole_result_db = session.get(HoleResult, hole_result_id)
     if not hole_result_db:
         raise HTTPException(status_code=404, detail="Hole result not found")
+    scopes = db_snapshots.get_round_scopes(
+        session=session, round_ids=[hole_result_db.round_id]
+    )
+    db_snapshots.delete_scopes(session=session, scopes=scopes, commit=False)
     session.delete(hole_result_db)
+    session.flush()
+    db_handicaps.rebuild_handicap_states_for_rounds(
+        session=session, round_ids=[hole_result_db.round_id], commit=False
+    )
     session.commit()
+    publish_standings(session=session, scopes=scopes)
     return {"ok": True}
 
 
@@ -263,102 +325,260 @@ async def submit_round(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Expected {len(round.holes)} holes, found {len(holes_db)} in database for tee (id={round.tee_id})",
         )
-    holes_db = sorted(holes_db, key=lambda h: h.number)
-
-    # Add round to database
-    round_db = Round(
-        tee_id=round.tee_id,
-        type=round.round_type,
-        scoring_type=round.scoring_type,
-        date_played=datetime(
-            year=round.date_played.year,
-            month=round.date_played.month,
-            day=round.date_played.day,
-        ),
-        date_updated=datetime.today(),
-    )
-    session.add(round_db)
-    session.commit()
-    session.refresh(round_db)
-
-    # Link round to golfer
-    round_golfer_link_db = RoundGolferLink(
-        round_id=round_db.id,
-        golfer_id=golfer_db.id,
-        playing_handicap=round.course_handicap,
-    )
-    session.add(round_golfer_link_db)
-    session.commit()
-    session.refresh(round_golfer_link_db)
-
-    # Add hole results to database
-    hole_results_db: list[HoleResult] = []
+    holes_by_number = {hole_db.number: hole_db for hole_db in holes_db}
     for hole_validated in round_validated.holes:
-        hole_db = next(
-            filter(lambda h: h.number == hole_validated.number, holes_db), None
-        )
-        if hole_db is None:
+        if hole_validated.number not in holes_by_number:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Hole #{hole_validated.number} for tee (id={round.tee_id}) not found",
             )
 
-        hole_result_db = HoleResult(
+    # Add round, golfer link and hole results to database in a single transaction
+    try:
+        round_db = Round(
+            tee_id=round.tee_id,
+            type=round.round_type,
+            scoring_type=round.scoring_type,
+            date_played=datetime(
+                year=round.date_played.year,
+                month=round.date_played.month,
+                day=round.date_played.day,
+            ),
+            date_updated=datetime.today(),
+        )
+        session.add(round_db)
+        session.flush()  # assigns round identifier
+
+        round_golfer_link_db = RoundGolferLink(
             round_id=round_db.id,
-            hole_id=hole_db.id,
-            handicap_strokes=hole_validated.handicap_strokes,
-            gross_score=hole_validated.gross_score,
-            adjusted_gross_score=hole_validated.adjusted_gross_score,
-            net_score=hole_validated.net_score,
+            golfer_id=golfer_db.id,
+            playing_handicap=round.course_handicap,
         )
-        session.add(hole_result_db)
-        session.commit()
-        session.refresh(hole_result_db)
+        session.add(round_golfer_link_db)
+
+        db_rounds.insert_hole_results(
+            session=session,
+            hole_results=[
+                {
+                    "round_id": round_db.id,
+                    "hole_id": holes_by_number[hole_validated.number].id,
+                    "handicap_strokes": hole_validated.handicap_strokes,
+                    "gross_score": hole_validated.gross_score,
+                    "adjusted_gross_score": hole_validated.adjusted_gross_score,
+                    "net_score": hole_validated.net_score,
+                }
+                for hole_validated in round_validated.holes
+            ],
+        )
+        hole_result_ids = db_rounds.get_hole_result_ids_for_round(
+            session=session, round_id=round_db.id
+        )
+
+        # Construct response from validated results and preloaded holes, before
+        # committing expires the loaded objects
+        holes_response: list[HoleResultSubmissionResponse] = []
+        for hole_validated in round_validated.holes:
+            hole_db = holes_by_number[hole_validated.number]
+            holes_response.append(
+                HoleResultSubmissionResponse(
+                    hole_result_id=hole_result_ids[hole_db.id],
+                    hole_id=hole_db.id,
+                    number=hole_db.number,
+                    par=hole_db.par,
+                    stroke_index=hole_db.stroke_index,
+                    gross_score=hole_validated.gross_score,
+                    handicap_strokes=hole_validated.handicap_strokes,
+                    adjusted_gross_score=hole_validated.adjusted_gross_score,
+                    net_score=hole_validated.net_score,
+                    max_gross_score=hole_validated.max_gross_score,
+                    is_valid=hole_validated.is_valid,
+                )
+            )
 
-        hole_results_db.append(hole_result_db)
+        round_response = RoundSubmissionResponse(
+            round_id=round_db.id,
+            golfer_id=golfer_db.id,
+            tee_id=round_db.tee_id,
+            round_type=round_db.type,
+            scoring_type=round_db.scoring_type,
+            date_played=round_db.date_played,
+            course_handicap=round_golfer_link_db.playing_handicap,
+            holes=holes_response,
+            is_valid=round_validated.is_valid,
+        )
 
-    # Construct response from database objects
-    holes_response: list[HoleResultSubmissionResponse] = []
-    for hole_result_db in hole_results_db:
-        hole_validated = next(
-            filter(
-                lambda h: h.number == hole_result_db.hole.number, round_validated.holes
+        # Golfer handicaps are shown with flight and tournament rosters
+        db_snapshots.delete_scopes(
+            session=session,
+            scopes=db_snapshots.get_golfer_scopes(
+                session=session, golfer_ids=[golfer_db.id]
             ),
-            None,
+            commit=False,
         )
-        if hole_validated is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Validated results for hole #{hole_result_db.hole.number} not found",
-            )
+        # Rounds entered after later rounds were posted are included in the
+        # golfer's handicap index state
+        db_handicaps.rebuild_handicap_states(
+            session=session,
+            golfer_ids=[golfer_db.id],
+            min_date=round_db.date_played,
+            commit=False,
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return round_response
+
+
+@router.post("/import/", response_model=RoundImportResponse)
+async def import_rounds(
+    *,
+    session: Session = Depends(get_sql_db_session),
+    current_user: User = Depends(get_current_active_user),
+    rounds: list[RoundImportRequest],
+    dry_run: bool = Query(default=False, description="Only validate rounds"),
+):
+    results = db_rounds.import_rounds(session=session, rounds=rounds, dry_run=dry_run)
+    return RoundImportResponse(
+        num_rounds=len(results),
+        num_imported=sum(result.is_imported for result in results),
+        results=results,
+    )
+
+
+@router.post("/import/csv/", response_model=RoundImportResponse)
+async def import_rounds_csv(
+    *,
+    session: Session = Depends(get_sql_db_session),
+    current_user: User = Depends(get_current_active_user),
+    file: UploadFile = File(
+        ...,
+        description="CSV with columns: golfer_id, tee_id, date_played, course_handicap, round_type, scoring_type, hole_1, hole_2, ...",
+    ),
+    dry_run: bool = Query(default=False, description="Only validate rounds"),
+):
+    try:
+        reader = csv.DictReader(io.StringIO((await file.read()).decode("utf-8-sig")))
+        rows = list(reader)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unable to read CSV file: {e}",
+        )
+    hole_columns = sorted(
+        (
+            column
+            for column in reader.fieldnames or []
+            if column.startswith("hole_") and column.removeprefix("hole_").isdigit()
+        ),
+        key=lambda column: int(column.removeprefix("hole_")),
+    )
 
-        holes_response.append(
-            HoleResultSubmissionResponse(
-                hole_result_id=hole_result_db.id,
-                hole_id=hole_result_db.hole_id,
-                number=hole_result_db.hole.number,
-                par=hole_result_db.hole.par,
-                stroke_index=hole_result_db.hole.stroke_index,
-                gross_score=hole_result_db.gross_score,
-                handicap_strokes=hole_result_db.handicap_strokes,
-                adjusted_gross_score=hole_result_db.adjusted_gross_score,
-                net_score=hole_result_db.net_score,
-                max_gross_score=hole_validated.max_gross_score,
-                is_valid=hole_validated.is_valid,
+    # Parse rows, failed rows are reported alongside imported rounds
+    parsed_indices: list[int] = []
+    parsed_rounds: list[RoundImportRequest] = []
+    results: list[RoundImportResult] = []
+    for idx, row in enumerate(rows):
+        if None in row:  # fields beyond the header are collected under a `None` key
+            results.append(
+                RoundImportResult(
+                    index=idx,
+                    detail=f"Row has {len(row[None])} more field(s) than the header",
+                )
+            )
+            continue
+        try:
+            parsed_rounds.append(
+                RoundImportRequest(
+                    **{
+                        key: value
+                        for key, value in row.items()
+                        if key not in hole_columns and value
+                    },
+                    gross_scores=[
+                        row[column] for column in hole_columns if row[column]
+                    ],
+                )
+            )
+            parsed_indices.append(idx)
+        except ValidationError as e:
+            results.append(
+                RoundImportResult(
+                    index=idx,
+                    detail="; ".join(
+                        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                        for error in e.errors()
+                    ),
+                )
             )
+
+    for result in db_rounds.import_rounds(
+        session=session, rounds=parsed_rounds, dry_run=dry_run
+    ):
+        result.index = parsed_indices[result.index]
+        results.append(result)
+    results.sort(key=lambda result: result.index)
+
+    return RoundImportResponse(
+        num_rounds=len(results),
+        num_imported=sum(result.is_imported for result in results),
+        results=results,
+    )
+
+
+def get_round_golfer_link(session: Session, round_id: int) -> RoundGolferLink:
+    round_golfer_links_db = list(
+        session.exec(
+            select(RoundGolferLink).where(RoundGolferLink.round_id == round_id)
+        ).all()
+    )
+    if len(round_golfer_links_db) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Expected 1 round-golfer link, found {len(round_golfer_links_db)}",
+        )
+    return round_golfer_links_db[0]
+
+
+@router.patch("/{round_id}/correction", response_model=RoundCorrection)
+async def correct_round(
+    *,
+    session: Session = Depends(get_sql_db_session),
+    current_user: User = Depends(get_current_active_user),
+    round_id: int,
+    correction: RoundCorrectionRequest,
+    dry_run: bool = Query(default=False, description="Only report changes"),
+):
+    round_db = session.get(Round, round_id)
+    if round_db is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Round not found"
+        )
+    if correction.golfer_id is None and correction.playing_handicap is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="No golfer or playing handicap correction given",
+        )
+    if (
+        correction.golfer_id is not None
+        and session.get(Golfer, correction.golfer_id) is None
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Golfer not found"
         )
 
-    return RoundSubmissionResponse(
-        round_id=round_db.id,
-        golfer_id=round_db.id,
-        tee_id=round_db.tee_id,
-        round_type=round_db.type,
-        scoring_type=round_db.scoring_type,
-        date_played=round_db.date_played,
-        course_handicap=round_golfer_link_db.playing_handicap,
-        holes=holes_response,
-        is_valid=round_validated.is_valid,
+    round_correction = db_corrections.correct_round(
+        session=session,
+        round_db=round_db,
+        round_golfer_link_db=get_round_golfer_link(session=session, round_id=round_id),
+        golfer_id=correction.golfer_id,
+        playing_handicap=correction.playing_handicap,
+        dry_run=dry_run,
     )
+    if round_correction.is_applied:
+        publish_standings(session=session, scopes=round_correction.snapshot_scopes)
+    return round_correction
 
 
 @router.patch("/golfer/", response_model=RoundReadWithData)
@@ -382,37 +602,21 @@ async def update_round_golfer_link(
             status_code=status.HTTP_404_NOT_FOUND, detail="Golfer not found"
         )
 
-    round_golfer_links_db = list(
-        session.exec(
-            select(RoundGolferLink).where(RoundGolferLink.round_id == round_id)
-        ).all()
-    )
-    if len(round_golfer_links_db) != 1:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-            detail=f"Expected 1 round-golfer link, found {len(round_golfer_links_db)}",
-        )
-
-    round_golfer_link_db = round_golfer_links_db[0]
+    round_golfer_link_db = get_round_golfer_link(session=session, round_id=round_id)
     if round_golfer_link_db.golfer_id == golfer_id:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
             detail="Golfer already assigned to this round",
         )
 
-    # Remove existing round golfer link
-    playing_handicap = round_golfer_link_db.playing_handicap
-    session.delete(round_golfer_link_db)
-
-    # Link round to new golfer
-    new_round_golfer_link_db = RoundGolferLink(
-        round_id=round_db.id,
-        golfer_id=golfer_db.id,
-        playing_handicap=playing_handicap,
+    # Link round to new golfer, updating dependent records
+    round_correction = db_corrections.correct_round(
+        session=session,
+        round_db=round_db,
+        round_golfer_link_db=round_golfer_link_db,
+        golfer_id=golfer_id,
     )
-    session.add(new_round_golfer_link_db)
-
-    session.commit()
+    publish_standings(session=session, scopes=round_correction.snapshot_scopes)
     session.refresh(round_db)
     return round_db
 
@@ -439,18 +643,7 @@ async def update_round_golfer_playing_handicap(
             status_code=status.HTTP_404_NOT_FOUND, detail="Golfer not found"
         )
 
-    round_golfer_links_db = list(
-        session.exec(
-            select(RoundGolferLink).where(RoundGolferLink.round_id == round_id)
-        ).all()
-    )
-    if len(round_golfer_links_db) != 1:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-            detail=f"Expected 1 round-golfer link, found {len(round_golfer_links_db)}",
-        )
-
-    round_golfer_link_db = round_golfer_links_db[0]
+    round_golfer_link_db = get_round_golfer_link(session=session, round_id=round_id)
     if round_golfer_link_db.golfer_id != golfer_id:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
@@ -462,38 +655,13 @@ async def update_round_golfer_playing_handicap(
             detail=f"Playing handicap is already {round_golfer_link_db.playing_handicap}",
         )
 
-    # Determine handicapping system by year
-    # TODO: Make a utility/factory for this
-    if round_db.date_played.year >= 2022:
-        ahs = APLHandicapSystem()
-    else:
-        ahs = APLLegacyHandicapSystem()
-
-    # Update hole results
-    hole_results_data = db_rounds.get_hole_results_for_rounds(
-        session=session, round_ids=[round_db.id]
+    # Update playing handicap and hole results, updating dependent records
+    round_correction = db_corrections.correct_round(
+        session=session,
+        round_db=round_db,
+        round_golfer_link_db=round_golfer_link_db,
+        playing_handicap=playing_handicap,
     )
-    for hole_result_data in hole_results_data:
-        hole_result_db = session.get(HoleResult, hole_result_data.hole_result_id)
-
-        hole_result_db.handicap_strokes = ahs.compute_hole_handicap_strokes(
-            hole_result_data.stroke_index, playing_handicap
-        )
-        hole_result_db.adjusted_gross_score = ahs.compute_hole_adjusted_gross_score(
-            hole_result_data.par,
-            hole_result_data.stroke_index,
-            hole_result_data.gross_score,
-            playing_handicap,
-        )
-        hole_result_db.net_score = (
-            hole_result_data.gross_score - hole_result_db.handicap_strokes
-        )
-        session.add(hole_result_db)
-
-    # Update playing handicap in round golfer link
-    round_golfer_link_db.playing_handicap = playing_handicap
-    session.add(round_golfer_link_db)
-
-    session.commit()
+    publish_standings(session=session, scopes=round_correction.snapshot_scopes)
     session.refresh(round_db)
     return round_db
@@ -6,7 +6,7 @@ from sqlmodel import Session
 
 from app.database import seasons as db_seasons
 from app.dependencies import get_current_active_user, get_sql_db_session
-from app.models.season import Season, SeasonCreate
+from app.models.season import GolferSeasonStatistics, Season, SeasonCreate
 from app.models.user import User
 
 router = APIRouter(prefix="/seasons", tags=["Seasons"])
@@ -34,6 +34,15 @@ async def get_season_by_year(
     return season_db
 
 
+@router.get("/{year}/statistics", response_model=List[GolferSeasonStatistics])
+async def get_season_statistics(
+    *,
+    session: Session = Depends(get_sql_db_session),
+    year: int = Path(..., description="Season year"),
+):
+    return db_seasons.get_season_statistics(session, year)
+
+
 @router.post("/", response_model=Season)
 async def create_season(
     *,
@@ -8,9 +8,6 @@ from typing import List, Optional
 import fastapi
 
 from app.models.base import APLGLBaseModel
-from app.scheduler import app as app_scheduler
-
-session = app_scheduler.session
 
 router = fastapi.APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -38,6 +35,18 @@ class Task(APLGLBaseModel):
     last_crash: Optional[datetime.datetime]
 
 
+def get_scheduler_session():
+    """
+    Returns task scheduler session.
+
+    The scheduler (and the task modules it loads) is imported on first use,
+    to keep API startup fast.
+    """
+    from app.scheduler import app as app_scheduler
+
+    return app_scheduler.session
+
+
 def serialize_task(task: Task):
     return Task(
         start_cond=str(task.start_cond),
@@ -49,11 +58,12 @@ def serialize_task(task: Task):
 
 @router.get("/", response_model=List[Task])
 async def list_tasks():
-    return [serialize_task(task) for task in session.tasks]
+    return [serialize_task(task) for task in get_scheduler_session().tasks]
 
 
 @router.get("/{task_name}", response_model=Task)
 async def get_task(task_name: str = fastapi.Path(..., description="Task name")):
+    session = get_scheduler_session()
     try:
         task = session[task_name]
         return serialize_task(task)
@@ -69,6 +79,7 @@ async def run_task(
     request: fastapi.Request,
     task_name: str = fastapi.Query(..., description="Task name to run"),
 ):
+    session = get_scheduler_session()
     if task_name not in session:
         raise fastapi.HTTPException(
             status_code=fastapi.status.HTTP_400_BAD_REQUEST,
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, Query, status
 from fastapi.exceptions import HTTPException
 from sqlmodel import Session, select
 
+from app.database import snapshots as db_snapshots
 from app.dependencies import get_current_active_user, get_sql_db_session
 from app.models.base import APLGLBaseModel
 from app.models.flight import Flight
@@ -102,14 +103,19 @@ async def create_team(
 
     # Create team
     if team_data.flight_id:
-        return create_team_for_flight(session=session, team_data=team_data)
+        team_db = create_team_for_flight(session=session, team_data=team_data)
     elif team_data.tournament_id:
-        return create_team_for_tournament(session=session, team_data=team_data)
+        team_db = create_team_for_tournament(session=session, team_data=team_data)
     else:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail=f"Invalid team data, must specify flight or tournament id",
         )
+    db_snapshots.delete_scopes(
+        session=session,
+        scopes=db_snapshots.get_team_scopes(session=session, team_ids=[team_db.id]),
+    )
+    return team_db
 
 
 @router.put("/{team_id}", response_model=TeamRead)
@@ -129,8 +135,15 @@ async def update_team(
         session=session, team_data=team_data, exclude_team_id=team_db.id
     )
 
-    # Update team
-    return update_team_signups(session=session, team_data=team_data, team_db=team_db)
+    # Update team, snapshots of previous and new flight or tournament are outdated
+    scopes = db_snapshots.get_team_scopes(session=session, team_ids=[team_db.id])
+    team_db = update_team_signups(session=session, team_data=team_data, team_db=team_db)
+    db_snapshots.delete_scopes(
+        session=session,
+        scopes=scopes
+        | db_snapshots.get_team_scopes(session=session, team_ids=[team_db.id]),
+    )
+    return team_db
 
 
 @router.delete("/{team_id}")
@@ -149,6 +162,8 @@ async def delete_team(
     if not team_db:
         raise HTTPException(status_code=404, detail="Team not found")
 
+    scopes = db_snapshots.get_team_scopes(session=session, team_ids=[team_id])
+
     # Remove all golfer, flight, and tournament team links
     if flight_id := session.exec(
         select(Flight.id)
@@ -200,6 +215,7 @@ async def delete_team(
     # Remove team
     print(f"Deleting team: id={team_db.id}")
     session.delete(team_db)
+    db_snapshots.delete_scopes(session=session, scopes=scopes, commit=False)
 
     # Commit database changes
     session.commit()
@@ -1,42 +1,84 @@
+from collections.abc import Callable
 from datetime import datetime
+from functools import partial
 from http import HTTPStatus
+from typing import Any
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request
 from fastapi.exceptions import HTTPException
 from sqlmodel import Session, select
 
+from app.database import snapshots as db_snapshots
 from app.database import tournaments as db_tournaments
-from app.dependencies import get_current_active_user, get_sql_db_session
+from app.dependencies import (
+    conditional_request,
+    get_current_active_user,
+    get_sql_db_session,
+)
 from app.models.base import APLGLBaseModel
+from app.models.course import Course
+from app.models.division import Division
 from app.models.golfer import Golfer
 from app.models.hole import Hole
 from app.models.hole_result import HoleResult
 from app.models.query_helpers import (
     TournamentData,
-    get_divisions_in_tournaments,
     get_round_summaries,
-    get_rounds_for_tournament,
-    get_teams_in_tournaments,
-    get_tournaments,
 )
 from app.models.round import Round, RoundSummary, RoundType, ScoringType
 from app.models.round_golfer_link import RoundGolferLink
 from app.models.team import Team
+from app.models.team_golfer_link import TeamGolferLink
 from app.models.tee import Tee
 from app.models.tournament import (
     Tournament,
     TournamentCreate,
+    TournamentFreeAgent,
+    TournamentHandicaps,
     TournamentInfo,
     TournamentRead,
 )
+from app.models.tournament_division_link import TournamentDivisionLink
 from app.models.tournament_round_link import TournamentRoundLink
 from app.models.tournament_team_link import TournamentTeamLink
+from app.models.track import Track
 from app.models.user import User
 from app.routers.matches import RoundInput
-from app.routers.utilities import upsert_division
+from app.routers.utilities import (
+    coalesced,
+    get_tournament_stream,
+    live_event_response,
+    publish_live_events,
+    snapshot_response,
+    upsert_division,
+)
+from app.tasks.compute_tournament_handicaps import get_tournament_handicaps
 from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.responses import FastJSONRoute
 
-router = APIRouter(prefix="/tournaments", tags=["Tournaments"])
+router = APIRouter(
+    prefix="/tournaments", tags=["Tournaments"], route_class=FastJSONRoute
+)
+
+# Tables that tournament data responses are derived from, for conditional requests
+TOURNAMENT_DATA_MODELS = (
+    Tournament,
+    TournamentDivisionLink,
+    TournamentTeamLink,
+    TournamentRoundLink,
+    TournamentFreeAgent,
+    Division,
+    Course,
+    Track,
+    Tee,
+    Hole,
+    Team,
+    TeamGolferLink,
+    Golfer,
+    Round,
+    RoundGolferLink,
+    HoleResult,
+)
 
 
 class TournamentInput(APLGLBaseModel):
@@ -45,7 +87,28 @@ class TournamentInput(APLGLBaseModel):
     rounds: list[RoundInput]
 
 
-@router.get("/", response_model=list[TournamentInfo])
+async def _snapshot_response(
+    *, session: Session, request: Request, tournament_id: int, build: Callable[[], Any]
+) -> Any:
+    """Serves a snapshot of tournament data, stored once the tournament is frozen."""
+    return await snapshot_response(
+        session=session,
+        request=request,
+        scope=db_snapshots.get_tournament_scope(tournament_id),
+        is_frozen=partial(
+            db_snapshots.is_tournament_frozen,
+            session=session,
+            tournament_id=tournament_id,
+        ),
+        build=build,
+    )
+
+
+@router.get(
+    "/",
+    response_model=list[TournamentInfo],
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def read_tournaments(
     *,
     session: Session = Depends(get_sql_db_session),
@@ -59,29 +122,33 @@ async def read_tournaments(
     return sorted(tournaments, key=lambda t: t.date)
 
 
-@router.get("/{tournament_id}", response_model=TournamentData)
+@router.get(
+    "/{tournament_id}",
+    response_model=TournamentData,
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def read_tournament(
-    *, session: Session = Depends(get_sql_db_session), tournament_id: int
+    *,
+    session: Session = Depends(get_sql_db_session),
+    request: Request,
+    tournament_id: int,
 ):
-    # Query database for selected tournament, error if not found
-    tournament_data = get_tournaments(session=session, tournament_ids=(tournament_id,))
-    if (not tournament_data) or (len(tournament_data) == 0):
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail="Tournament not found"
+    def build_tournament_data() -> TournamentData:
+        tournament_data = db_tournaments.get_data(
+            session=session, tournament_id=tournament_id
         )
-    tournament_data = tournament_data[0]
-    # Add division and team data to selected tournament
-    tournament_data.divisions = get_divisions_in_tournaments(
-        session=session, tournament_ids=(tournament_id,)
-    )
-    tournament_data.teams = get_teams_in_tournaments(
-        session=session, tournament_ids=(tournament_id,)
+        if tournament_data is None:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="Tournament not found"
+            )
+        return tournament_data
+
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=build_tournament_data,
     )
-    # Compile round data and add to selected tournament teams
-    round_data = get_rounds_for_tournament(session=session, tournament_id=tournament_id)
-    for team in tournament_data.teams:
-        team.rounds = [round for round in round_data if round.team_id == team.id]
-    return tournament_data
 
 
 @router.post("/", response_model=TournamentRead)
@@ -146,6 +213,11 @@ async def delete_tournament(
             status_code=HTTPStatus.NOT_FOUND, detail="Tournament not found"
         )
     session.delete(tournament_db)
+    db_snapshots.delete_snapshots(
+        session=session,
+        scope=db_snapshots.get_tournament_scope(tournament_id),
+        commit=False,
+    )
     session.commit()
     return {"ok": True}
 
@@ -171,6 +243,7 @@ async def post_tournament_rounds(
             detail=f"Tournament '{tournament_db.name} ({tournament_db.year})' is locked",
         )
 
+    standings_version = db_tournaments.get_standings_version(tournament_db.id)
     round_ids = []
     for round_input in tournament_input.rounds:
         golfers_db = []
@@ -270,10 +343,32 @@ async def post_tournament_rounds(
                 session.add(hole_result_db)
             session.commit()
 
-    return get_round_summaries(
+    db_snapshots.delete_snapshots(
+        session=session, scope=db_snapshots.get_tournament_scope(tournament_db.id)
+    )
+    db_tournaments.apply_leaderboard_rounds(
+        session=session,
+        tournament_id=tournament_db.id,
+        round_ids=round_ids,
+        version=standings_version,
+    )
+    round_summaries = get_round_summaries(
         session=session, round_ids=round_ids
     )  # TODO: clean up implementation of response
 
+    publish_live_events(
+        get_tournament_stream(tournament_db.id),
+        {
+            "rounds": lambda: round_summaries,
+            "standings": partial(
+                db_tournaments.get_leaderboard_standings,
+                session=session,
+                tournament_id=tournament_db.id,
+            ),
+        },
+    )
+    return round_summaries
+
 
 def upsert_tournament(
     *, session: Session, tournament_data: TournamentCreate
@@ -295,6 +390,12 @@ def upsert_tournament(
         )
         for key, value in tournament_dict.items():
             setattr(tournament_db, key, value)
+        # Stored snapshots are stale once a tournament is modified (e.g. unlocked)
+        db_snapshots.delete_snapshots(
+            session=session,
+            scope=db_snapshots.get_tournament_scope(tournament_db.id),
+            commit=False,
+        )
     session.add(tournament_db)
     session.commit()
     session.refresh(tournament_db)
@@ -314,54 +415,112 @@ def upsert_tournament(
     return tournament_db
 
 
-@router.get("/info/{tournament_id}")
+@router.get(
+    "/info/{tournament_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_info(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     tournament_id: int = Path(..., description="Tournament identifier"),
 ):
-    return db_tournaments.get_info(session=session, tournament_id=tournament_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=partial(
+            db_tournaments.get_info, session=session, tournament_id=tournament_id
+        ),
+    )
 
 
-@router.get("/divisions/{tournament_id}")
+@router.get(
+    "/divisions/{tournament_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_divisions(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     tournament_id: int = Path(..., description="Tournament identifier"),
 ):
-    return db_tournaments.get_divisions(session=session, tournament_id=tournament_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=partial(
+            db_tournaments.get_divisions, session=session, tournament_id=tournament_id
+        ),
+    )
 
 
-@router.get("/teams/{tournament_id}")
+@router.get(
+    "/teams/{tournament_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_teams(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     tournament_id: int = Path(..., description="Tournament identifier"),
 ):
-    return db_tournaments.get_teams(session=session, tournament_id=tournament_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=partial(
+            db_tournaments.get_teams, session=session, tournament_id=tournament_id
+        ),
+    )
 
 
-@router.get("/free-agents/{tournament_id}")
+@router.get(
+    "/free-agents/{tournament_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_free_agents(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     tournament_id: int = Path(..., description="Tournament identifier"),
 ):
-    return db_tournaments.get_free_agents(session=session, tournament_id=tournament_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=partial(
+            db_tournaments.get_free_agents, session=session, tournament_id=tournament_id
+        ),
+    )
 
 
-@router.get("/rounds/{tournament_id}")
+@router.get(
+    "/rounds/{tournament_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_rounds(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     tournament_id: int = Path(..., description="Tournament identifier"),
 ):
-    return db_tournaments.get_round_summaries(
-        session=session, tournament_id=tournament_id
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=partial(
+            db_tournaments.get_round_summaries,
+            session=session,
+            tournament_id=tournament_id,
+        ),
     )
 
 
-@router.get("/team-rounds/{team_id}")
+@router.get(
+    "/team-rounds/{team_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_rounds_for_team(
     *,
     session: Session = Depends(get_sql_db_session),
@@ -370,19 +529,101 @@ async def get_rounds_for_team(
     return db_tournaments.get_rounds_for_team(session=session, team_id=team_id)
 
 
-@router.get("/standings/{tournament_id}")
+@router.get(
+    "/standings/{tournament_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_standings(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
+    tournament_id: int = Path(..., description="Tournament identifier"),
+    count_back: bool = Query(
+        default=False, description="Break ties by count-back on net hole scores"
+    ),
+):
+    if count_back:  # computed from all rounds, not the leaderboard or snapshot
+        return await coalesced(
+            request=request,
+            session=session,
+            build=partial(
+                db_tournaments.get_standings,
+                tournament_id=tournament_id,
+                count_back=True,
+            ),
+        )
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=partial(
+            coalesced,
+            request=request,
+            session=session,
+            build=partial(
+                db_tournaments.get_leaderboard_standings, tournament_id=tournament_id
+            ),
+        ),
+    )
+
+
+@router.get("/live/{tournament_id}")
+async def get_live_results(
+    *,
+    # Session is closed once the initial event is built, not held while streaming
+    session: Session = Depends(get_sql_db_session, scope="function"),
+    request: Request,
     tournament_id: int = Path(..., description="Tournament identifier"),
 ):
-    return db_tournaments.get_standings(session=session, tournament_id=tournament_id)
+    """Streams standings ("standings") and posted rounds ("rounds") as they change."""
+    if session.get(Tournament, tournament_id) is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f"Tournament (id={tournament_id}) not found",
+        )
+    return live_event_response(
+        request=request,
+        stream=get_tournament_stream(tournament_id),
+        event="standings",
+        build=partial(
+            db_tournaments.get_leaderboard_standings,
+            session=session,
+            tournament_id=tournament_id,
+        ),
+    )
 
 
-@router.get("/statistics/{tournament_id}")
+@router.get(
+    "/statistics/{tournament_id}",
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
 async def get_statistics(
     *,
     session: Session = Depends(get_sql_db_session),
+    request: Request,
     tournament_id: int = Path(..., description="Tournament identifier"),
 ):
-    return db_tournaments.get_statistics(session=session, tournament_id=tournament_id)
+    return await _snapshot_response(
+        session=session,
+        request=request,
+        tournament_id=tournament_id,
+        build=partial(
+            coalesced,
+            request=request,
+            session=session,
+            build=partial(db_tournaments.get_statistics, tournament_id=tournament_id),
+        ),
+    )
+
+
+@router.get(
+    "/handicaps/",
+    response_model=list[TournamentHandicaps],
+    dependencies=[Depends(conditional_request(*TOURNAMENT_DATA_MODELS))],
+)
+async def get_handicaps(
+    *,
+    session: Session = Depends(get_sql_db_session),
+    tournament_ids: list[int] = Query(..., description="Tournament identifiers"),
+):
+    return get_tournament_handicaps(session=session, tournament_ids=tournament_ids)
@@ -9,8 +9,9 @@ from app.dependencies import (
     get_current_active_user,
     get_settings,
     get_sql_db_session,
+    user_cache,
 )
-from app.models.user import User, UserRead, UserWithToken
+from app.models.user import User, UserRead, UserUpdate, UserWithToken
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -85,3 +86,34 @@ async def change_password(
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user
+
+
+@router.patch("/{user_id}", response_model=UserRead)
+async def update_user(
+    *,
+    session: Session = Depends(get_sql_db_session),
+    current_user: User = Depends(get_current_active_user),
+    user_id: int,
+    user: UserUpdate,
+):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not authorized to update users",
+        )
+    user_db = session.get(User, user_id)
+    if not user_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    prior_username = user_db.username
+    user_data = user.dict(exclude_unset=True, exclude={"hashed_password"})
+    for key, value in user_data.items():
+        setattr(user_db, key, value)
+    session.add(user_db)
+    session.commit()
+    session.refresh(user_db)
+    # Disabled status and permission changes take effect on the next request
+    user_cache.invalidate(prior_username)
+    user_cache.invalidate(user_db.username)
+    return user_db
@@ -1,9 +1,27 @@
+import inspect
+from collections.abc import Awaitable, Callable, Iterable
+from functools import partial
 from http import HTTPStatus
+from typing import Any
 
+from fastapi import Request, Response
 from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
+from app.database import flights as db_flights
+from app.database import snapshots as db_snapshots
+from app.database import tournaments as db_tournaments
 from app.models.division import Division, DivisionCreate, DivisionRead
+from app.utilities.coalescing import coalescer
+from app.utilities.live_events import LiveEvent, live_events
+from app.utilities.responses import render_json
+
+# Snapshots only change if an entity is unlocked, so allow caching for a day
+SNAPSHOT_CACHE_CONTROL = "public, max-age=86400"
+
+# Live event streams must not be cached or buffered by proxies
+LIVE_EVENT_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 
 def upsert_division(*, session: Session, division_data: DivisionCreate) -> DivisionRead:
@@ -24,3 +42,213 @@ def upsert_division(*, session: Session, division_data: DivisionCreate) -> Divis
     session.commit()
     session.refresh(division_db)
     return division_db
+
+
+async def snapshot_response(
+    *,
+    session: Session,
+    request: Request,
+    scope: str,
+    is_frozen: Callable[[], bool],
+    build: Callable[[], Any | Awaitable[Any]],
+) -> Any:
+    """
+    Serves a stored response snapshot, if available.
+
+    Otherwise, builds the response content and, if the entity it belongs to is
+    frozen (locked or from a past season), stores it as a snapshot for later
+    requests.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    request : Request
+        request being served, path is used as snapshot key
+    scope : str
+        entity the snapshot belongs to, used for invalidation
+    is_frozen : Callable[[], bool]
+        returns true if the entity can no longer change
+    build : Callable[[], Any | Awaitable[Any]]
+        computes response content, may be a coroutine function
+
+    Returns
+    -------
+    response : Any
+        snapshot response or built response content
+
+    """
+    key = request.url.path
+    snapshot_db = db_snapshots.get_snapshot(session=session, key=key)
+    if snapshot_db is None:
+        content = build()
+        if inspect.isawaitable(content):
+            content = await content
+        if not is_frozen():
+            return content
+        snapshot_db = db_snapshots.put_snapshot(
+            session=session,
+            key=key,
+            scope=scope,
+            content=db_snapshots.render_content(content),
+        )
+
+    headers = {
+        "ETag": f'"{snapshot_db.digest}"',
+        "Cache-Control": SNAPSHOT_CACHE_CONTROL,
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return Response(
+        content=snapshot_db.content, media_type="application/json", headers=headers
+    )
+
+
+async def coalesced(
+    *, request: Request, session: Session, build: Callable[..., Any]
+) -> Any:
+    """
+    Computes response content, shared between identical in-flight requests.
+
+    Coalescing is only applied if enabled for the request route, otherwise
+    the content is computed directly with the request session. The shared
+    computation uses its own session, as the requests that wait for it may
+    close theirs (including the one that started it).
+
+    Parameters
+    ----------
+    request : Request
+        request being served
+    session : Session
+        database session of the request
+    build : Callable[..., Any]
+        computes response content, given a database session as `session`
+
+    Returns
+    -------
+    content : Any
+        response content
+
+    """
+    route = request.scope.get("route")
+    if route is None or not coalescer.is_enabled(route.path):
+        return build(session=session)
+    engine = session.get_bind()
+
+    def build_shared() -> Any:
+        with Session(engine) as build_session:
+            return build(session=build_session)
+
+    key = (request.method, request.url.path, request.url.query)
+    return await coalescer.run(key, build_shared)
+
+
+def get_tournament_stream(tournament_id: int) -> str:
+    return f"tournaments/{tournament_id}"
+
+
+def get_flight_stream(flight_id: int) -> str:
+    return f"flights/{flight_id}"
+
+
+def publish_live_events(stream: str, builds: dict[str, Callable[[], Any]]) -> None:
+    """
+    Publishes events to subscribers of a live stream, after data has changed.
+
+    Event content is only built if the stream has subscribers. Otherwise, the
+    stream history is discarded, so clients reconnecting later are sent current
+    data instead of resuming.
+
+    Parameters
+    ----------
+    stream : str
+        live event stream
+    builds : dict[str, Callable[[], Any]]
+        computes content of each event, by event type (in publishing order)
+
+    """
+    if live_events.num_subscribers(stream) == 0:
+        live_events.discard_history(stream)
+        return
+    for event, build in builds.items():
+        live_events.publish(stream, event, render_json(build()))
+
+
+def publish_standings(session: Session, scopes: Iterable[str]) -> None:
+    """
+    Publishes current standings to the live streams of flights and tournaments
+    whose results were edited (e.g. a corrected round), after committing.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    scopes : Iterable[str]
+        snapshot scopes of the edited flights and tournaments, e.g. from
+        `db_snapshots.get_round_scopes`
+
+    """
+    flight_ids, tournament_ids = db_snapshots.get_scope_ids(scopes)
+    for flight_id in flight_ids:
+        publish_live_events(
+            get_flight_stream(flight_id),
+            {
+                "standings": partial(
+                    db_flights.get_standings, session=session, flight_id=flight_id
+                )
+            },
+        )
+    for tournament_id in tournament_ids:
+        publish_live_events(
+            get_tournament_stream(tournament_id),
+            {
+                "standings": partial(
+                    db_tournaments.get_leaderboard_standings,
+                    session=session,
+                    tournament_id=tournament_id,
+                )
+            },
+        )
+
+
+def live_event_response(
+    *, request: Request, stream: str, event: str, build: Callable[[], Any]
+) -> StreamingResponse:
+    """
+    Streams live events to a client as server-sent events.
+
+    A client reconnecting with a `Last-Event-ID` header is first sent the events
+    it missed. Otherwise, or if these are no longer available, the client is
+    first sent an event with current data.
+
+    Parameters
+    ----------
+    request : Request
+        request being served
+    stream : str
+        live event stream, e.g. `get_tournament_stream(tournament_id)`
+    event : str
+        event type for current data, e.g. "standings"
+    build : Callable[[], Any]
+        computes current data, in the format of published events of this type
+
+    Returns
+    -------
+    response : StreamingResponse
+        event stream response
+
+    """
+    last_event_id = request.headers.get("last-event-id")
+    initial = None
+    if last_event_id:
+        initial = live_events.get_events_since(stream, last_event_id)
+    if initial is None:
+        # Current data is identified by the last event published before building
+        event_id = live_events.get_last_event_id(stream)
+        initial = [LiveEvent(id=event_id, event=event, data=render_json(build()))]
+    return StreamingResponse(
+        live_events.subscribe(stream, initial),
+        media_type="text/event-stream",
+        headers=LIVE_EVENT_HEADERS,
+    )
@@ -5,11 +5,21 @@ from rocketry import Rocketry
 from rocketry.conds import cron
 from sqlmodel import Session, select
 
+from app.database import tournaments as db_tournaments
 from app.dependencies import get_sql_db_engine
 from app.models.officer import Officer
-from app.tasks.handicaps import update_golfer_handicaps
+from app.tasks.compile_season_stats import compile_season_statistics
+from app.tasks.compute_tournament_handicaps import get_tournament_handicaps
+from app.tasks.handicap_replay import replay_handicaps
+from app.tasks.handicaps import (
+    get_handicap_update_dates,
+    update_golfer_handicaps,
+    update_playing_conditions_corrections,
+)
 from app.tasks.matches import initialize_matches_for_flight
-from app.utilities.notifications import EmailSchema, send_email
+from app.tasks.snapshots import build_snapshots_for_year
+from app.utilities.metrics import time_task
+from app.utilities.notifications import EmailSchema, enqueue_email
 
 app = Rocketry(execution="async")
 
@@ -18,12 +28,19 @@ app = Rocketry(execution="async")
     parameters={
         "flight_id": -1,
         "bye_weeks_by_team": None,
+        "off_weeks": None,
+        "generate": False,
         "dry_run": False,
         "force": False,
     }
 )
 async def initialize_flight_schedule(
-    flight_id: int, bye_weeks_by_team: str | None, dry_run: bool, force: bool
+    flight_id: int,
+    bye_weeks_by_team: str | None,
+    off_weeks: str | None,
+    generate: bool,
+    dry_run: bool,
+    force: bool,
 ):
     if bye_weeks_by_team is None:
         bye_week_requests = None
@@ -32,11 +49,16 @@ async def initialize_flight_schedule(
             int(team): int(week) for team, week in json.loads(bye_weeks_by_team).items()
         }
 
-    with Session(get_sql_db_engine()) as session:
+    with (
+        time_task("initialize_flight_schedule"),
+        Session(get_sql_db_engine()) as session,
+    ):
         initialize_matches_for_flight(
             session=session,
             flight_id=flight_id,
             bye_weeks_by_team=bye_week_requests,
+            off_weeks=json.loads(off_weeks) if off_weeks is not None else None,
+            generate=generate in (True, "true", "True", "1"),
             dry_run=dry_run,
             force=force,
         )
@@ -45,43 +67,122 @@ async def initialize_flight_schedule(
 @app.task(
     cron("0 23 * * 0"),
     parameters={"golfer_id": None, "force_update": False, "dry_run": False},
+    execution="thread",
 )
-async def run_handicap_update(golfer_id: int | None, force_update: bool, dry_run: bool):
+def run_handicap_update(golfer_id: int | None, force_update: bool, dry_run: bool):
     # TODO: Allow input of date range
-    date_today = datetime.date.today()
-    date_sunday_current = date_today - datetime.timedelta(
-        days=(date_today.weekday() + 1) % 7
+    date_monday_previous, date_monday_current = get_handicap_update_dates(
+        datetime.date.today()
     )
-    date_monday_current = date_sunday_current + datetime.timedelta(days=1)
-    date_monday_previous = date_monday_current - datetime.timedelta(days=7)
 
-    update_start = datetime.datetime.now()
-    with Session(get_sql_db_engine()) as session:
-        updates_info = update_golfer_handicaps(
+    with time_task("run_handicap_update"):
+        update_start = datetime.datetime.now()
+        with Session(get_sql_db_engine()) as session:
+            update_playing_conditions_corrections(
+                session=session,
+                min_date=date_monday_previous,
+                max_date=date_monday_current,
+                dry_run=dry_run,
+            )
+            updates_info = update_golfer_handicaps(
+                session=session,
+                golfer_id=golfer_id,
+                prior_end_date=date_monday_previous,
+                new_end_date=date_monday_current,
+                force_update=force_update,
+                dry_run=dry_run,
+            )
+            handicappers = session.exec(
+                select(Officer)
+                .where(Officer.year == update_start.year)
+                .where(Officer.role == "Handicapper")
+            ).all()
+
+        if not dry_run and len(handicappers) > 0:
+            print("Queueing handicap update report to handicappers...")
+            email = EmailSchema(
+                subject=f"[APL Golf League] Handicap Update Report - {update_start.date().isoformat()}",
+                to_addresses=[hc.email for hc in handicappers if hc.email is not None],
+                body={
+                    "update_date": update_start.replace(microsecond=0).isoformat(),
+                    "updates": updates_info,
+                },
+            )
+            enqueue_email(email=email, template_name="handicap_update_report.html")
+
+
+@app.task(
+    cron("30 23 * * 0"),
+    parameters={"year": None, "dry_run": False},
+    execution="thread",
+)
+def run_season_statistics(year: int | None, dry_run: bool):
+    with time_task("run_season_statistics"):
+        with Session(get_sql_db_engine()) as session:
+            compile_season_statistics(
+                session=session,
+                year=int(year) if year is not None else None,
+                dry_run=dry_run in (True, "true", "True", "1"),
+            )
+
+
+@app.task(parameters={"year": None}, execution="thread")
+def run_playing_conditions_update(year: int | None):
+    year = int(year) if year is not None else datetime.date.today().year
+    with time_task("run_playing_conditions_update"):
+        with Session(get_sql_db_engine()) as session:
+            update_playing_conditions_corrections(
+                session=session,
+                min_date=datetime.date(year, 1, 1),
+                max_date=datetime.date(year + 1, 1, 1),
+            )
+
+
+@app.task(parameters={"tournament_ids": ""}, execution="thread")
+def run_tournament_handicaps(tournament_ids: str):
+    with time_task("run_tournament_handicaps"):
+        with Session(get_sql_db_engine()) as session:
+            get_tournament_handicaps(
+                session=session,
+                tournament_ids=[
+                    int(tournament_id)
+                    for tournament_id in str(tournament_ids).split(",")
+                    if tournament_id.strip()
+                ],
+            )
+
+
+@app.task(parameters={"tournament_ids": ""}, execution="thread")
+def verify_tournament_leaderboards(tournament_ids: str):
+    with time_task("verify_tournament_leaderboards"):
+        with Session(get_sql_db_engine()) as session:
+            for tournament_id in str(tournament_ids).split(","):
+                if tournament_id.strip():
+                    db_tournaments.verify_leaderboard(
+                        session=session, tournament_id=int(tournament_id)
+                    )
+
+
+@app.task(parameters={"golfer_id": None, "write_back": False}, execution="thread")
+def run_handicap_replay(golfer_id: int | None, write_back: bool):
+    write_back = write_back in (True, "true", "True", "1")
+    with time_task("run_handicap_replay"), Session(get_sql_db_engine()) as session:
+        replay_handicaps(
             session=session,
-            golfer_id=golfer_id,
-            prior_end_date=date_monday_previous,
-            new_end_date=date_monday_current,
-            force_update=force_update,
-            dry_run=dry_run,
+            golfer_ids=[int(golfer_id)] if golfer_id is not None else None,
+            recompute_hole_results=not write_back,  # write back stored hole results
+            write_back=write_back,
         )
-        handicappers = session.exec(
-            select(Officer)
-            .where(Officer.year == update_start.year)
-            .where(Officer.role == "Handicapper")
-        ).all()
-
-    if not dry_run and len(handicappers) > 0:
-        print("Sending handicap update report to handicappers...")
-        email = EmailSchema(
-            subject=f"[APL Golf League] Handicap Update Report - {update_start.date().isoformat()}",
-            to_addresses=[hc.email for hc in handicappers if hc.email is not None],
-            body={
-                "update_date": update_start.replace(microsecond=0).isoformat(),
-                "updates": updates_info,
-            },
+
+
+@app.task(parameters={"year": -1, "dry_run": False}, execution="thread")
+def build_snapshots(year: int, dry_run: bool):
+    with time_task("build_snapshots"), Session(get_sql_db_engine()) as session:
+        build_snapshots_for_year(
+            session=session,
+            year=int(year),
+            dry_run=dry_run in (True, "true", "True", "1"),
         )
-        await send_email(email=email, template_name="handicap_update_report.html")
 
 
 if __name__ == "__main__":
@@ -1,263 +1,270 @@
-from datetime import datetime, timedelta
-from typing import List
+from bisect import bisect_left
+from datetime import date as dt_date
+from datetime import datetime, time
 
-import numpy as np
-import pandas as pd
-import pytz
-from sqlmodel import Session, create_engine, select
+from sqlalchemy import delete
+from sqlmodel import Session, col, desc, func, select
 
-from app.dependencies import get_settings
 from app.models.golfer import Golfer
-from app.models.round import RoundSummary, RoundType
-from app.tasks.handicaps import (
-    get_handicap_index_data,
-    get_rounds_in_scoring_record,
+from app.models.handicap import (
+    HandicapIndex,
+    PlayingConditionsCorrection,
+    get_playing_conditions_onclause,
 )
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.round import Round, RoundType, ScoringType
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.season import GolferSeasonStatistics, Season
+from app.models.tee import Tee
+from app.models.track import Track
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.metrics import PhaseTimer
 
+# Regular season dates used by the league before they were stored per season
+DEFAULT_START_MONTH_DAY = (4, 21)
+DEFAULT_PLAYOFFS_START_MONTH_DAY = (9, 1)
 
-def get_rounds_for_golfer(*, session: Session, year: int, golfer_db: Golfer):
+
+def get_season_dates(session: Session, year: int) -> tuple[dt_date, dt_date]:
     """
-    Gets all rounds played by the given golfer in the given year.
+    Gets regular season dates for the given year from the season.
+
+    Dates not set for the season (or if there is no season) default to the
+    league's usual dates, so playoff rounds are not counted as regular season.
+
+    Returns
+    -------
+    start_date : date
+        first day of regular season, or April 21 if not set
+    playoffs_start_date : date
+        first day of playoffs, or September 1 if not set
+
     """
-    rounds_db = get_rounds_in_scoring_record(
-        session=session,
-        golfer_id=golfer_db.id,
-        min_date=datetime(year, 1, 1),
-        max_date=datetime(year + 1, 1, 1),
-        limit=None,
-        use_legacy_handicapping=False,
+    season_db = session.get(Season, year)
+    start_date = season_db.start_date if season_db is not None else None
+    playoffs_start_date = (
+        season_db.playoffs_start_date if season_db is not None else None
     )
-    if (rounds_db is None) or (len(rounds_db) == 0):
-        return None
-    return rounds_db
+    if start_date is None or playoffs_start_date is None:
+        print(f"WARNING: Season dates not set for {year}, using default dates")
+    if start_date is None:
+        start_date = dt_date(year, *DEFAULT_START_MONTH_DAY)
+    if playoffs_start_date is None:
+        playoffs_start_date = dt_date(year, *DEFAULT_PLAYOFFS_START_MONTH_DAY)
+    return start_date, playoffs_start_date
 
 
-def filter_rounds(
-    *,
-    rounds_db: List[RoundSummary],
-    include_tournaments: bool = False,
-    include_playoffs: bool = False,
-    playoffs_start_date: datetime = datetime.now(),
-):
+def get_handicap_index_before(
+    history: list[tuple[datetime, float]], max_date: datetime
+) -> float | None:
     """
-    Filters rounds to those to be used for statistics.
+    Gets latest handicap index posted before the given date from a golfer's
+    handicap index history (ordered by date posted).
     """
-    flight_rounds_db = [
-        round_db
-        for round_db in rounds_db
-        if round_db.round_type == RoundType.FLIGHT
-        and round_db.date_played < playoffs_start_date
-    ]
-    filtered_rounds_db = flight_rounds_db
+    idx = bisect_left(history, max_date, key=lambda entry: entry[0])
+    return history[idx - 1][1] if idx > 0 else None
 
-    tournament_rounds_db = [
-        round_db
-        for round_db in rounds_db
-        if round_db.round_type == RoundType.TOURNAMENT
-    ]
-    if include_tournaments:
-        filtered_rounds_db.extend(tournament_rounds_db)
 
-    playoff_rounds_db = [
-        round_db
-        for round_db in rounds_db
-        if round_db.round_type == RoundType.PLAYOFF
-        or (
-            round_db.round_type == RoundType.FLIGHT
-            and round_db.date_played >= playoffs_start_date
-        )
-    ]
-    if include_playoffs:
-        filtered_rounds_db.extend(playoff_rounds_db)
+def compile_season_statistics(
+    *, session: Session, year: int | None = None, dry_run: bool = False
+) -> list[GolferSeasonStatistics]:
+    """
+    Compiles season statistics for each golfer who played in the given year.
 
-    print(
-        f"\tFlights: {len(flight_rounds_db)}, Tournaments: {len(tournament_rounds_db)}, Playoffs: {len(playoff_rounds_db)}"
-    )
-    if (not filtered_rounds_db) or (len(filtered_rounds_db) == 0):
-        return None
-    return filtered_rounds_db
+    Statistics use regular season flight rounds (excluding tournaments and
+    playoffs). Rounds are loaded with their hole results totalled in a single
+    query, and per-golfer averages are computed together over all rounds.
+    Stored statistics for the year are replaced.
 
+    Parameters
+    ----------
+    session : Session
+        database session
+    year : int, optional
+        season year
+        Default: None, active season (or current year if none active)
+    dry_run : bool, optional
+        if true, does not commit statistics to database
+        Default: False
 
-def compile_season_statistics(*, session: Session, year: int):
-    """ """
-    print(f"Compiling season statistics for {year}")
+    Returns
+    -------
+    statistics : list of GolferSeasonStatistics
+        season statistics for each golfer, ordered by golfer identifier
 
-    SEASON_START_DATE = datetime(year, 4, 21, tzinfo=pytz.UTC)  # TODO: un-hardcode
-    PLAYOFFS_START_DATE = datetime(year, 9, 1, tzinfo=pytz.UTC)  # TODO: un-hardcode
-    rounds = {}
-    stats = {}
+    """
+    import numpy as np
 
-    # Get all rounds played by each golfer in the given year
-    golfers_db = session.exec(select(Golfer)).all()
-    for golfer_db in golfers_db:
-        rounds_db = get_rounds_for_golfer(
-            session=session, year=year, golfer_db=golfer_db
+    if year is None:
+        year = (
+            session.exec(
+                select(Season.year)
+                .where(Season.is_active == True)
+                .order_by(desc(Season.year))
+            ).first()
+            or datetime.today().year
         )
-        if rounds_db:
-            print(
-                f"Golfer '{golfer_db.name}' (id={golfer_db.id}) played {len(rounds_db)} rounds in {year}"
-            )
+    start_date, playoffs_start_date = get_season_dates(session=session, year=year)
+    print(f"Compiling season statistics for {year}")
 
-            # Compile round summary data
-            for round_db in rounds_db:
-                if round_db.round_type != RoundType.QUALIFYING:
-                    rounds[len(rounds)] = {
-                        "golfer_id": golfer_db.id,
-                        "golfer_name": golfer_db.name,
-                        "golfer_playing_handicap": round_db.golfer_playing_handicap,
-                        "round_type": round_db.round_type,
-                        "round_date": round_db.date_played,
-                        "course_name": round_db.course_name,
-                        "track_name": round_db.track_name,
-                        "tee_name": round_db.tee_name,
-                        "tee_par": round_db.tee_par,
-                        "tee_rating": round(round_db.tee_rating, 2),
-                        "tee_slope": round_db.tee_slope,
-                        "gross_score": round_db.gross_score,
-                        "gross_to_par": round_db.gross_score - round_db.tee_par,
-                        "gross_differential": round(round_db.score_differential, 3),
-                        "net_score": round_db.net_score,
-                        "net_to_par": round_db.net_score - round_db.tee_par,
-                        "net_differential": round(
-                            round_db.score_differential
-                            - round_db.golfer_playing_handicap,
-                            3,
-                        ),
-                    }
+    ahs = APLHandicapSystem()
+    timer = PhaseTimer("compile_season_statistics")
 
-            # Filter to statistics-relevant rounds (exclude tournaments and playoffs)
-            filtered_rounds_db = filter_rounds(
-                rounds_db=rounds_db, playoffs_start_date=PLAYOFFS_START_DATE
+    with timer.phase("load_rounds"):
+        round_data = session.exec(
+            select(
+                RoundGolferLink.golfer_id,
+                Round.date_played,
+                RoundGolferLink.playing_handicap,
+                Tee.rating,
+                Tee.slope,
+                func.coalesce(
+                    PlayingConditionsCorrection.playing_conditions_correction, 0.0
+                ),
+                func.sum(Hole.par),
+                func.sum(HoleResult.gross_score),
+                func.sum(HoleResult.adjusted_gross_score),
+                func.sum(HoleResult.net_score),
             )
-            if filtered_rounds_db:
-                print(f"\tCompiling statistics using {len(filtered_rounds_db)} rounds")
-
-                # Determine golfer starting handicap index
-                golfer_starting_handicap = get_handicap_index_data(
-                    session=session,
-                    golfer_id=golfer_db.id,
-                    min_date=datetime(year - 2, 1, 1).date(),
-                    max_date=SEASON_START_DATE.date(),
-                    limit=10,
-                    include_rounds=True,
-                )
-
-                if golfer_starting_handicap.active_handicap_index is None:
-                    # Check for qualifying scores entered after season start
-                    print(f"WARNING: Expanding starting handicap search into season")
-                    first_round = sorted(
-                        filtered_rounds_db, key=lambda r: r.date_played
-                    )[0]
-                    golfer_starting_handicap = get_handicap_index_data(
-                        session=session,
-                        golfer_id=golfer_db.id,
-                        min_date=datetime(year - 2, 1, 1).date(),
-                        max_date=(first_round.date_played - timedelta(days=1)).date(),
-                        limit=10,
-                        include_rounds=True,
-                    )
-
-                    if golfer_starting_handicap.active_handicap_index is None:
-                        print(
-                            f"WARNING: No starting handicap found - using first playing handicap to calculate"
-                        )
-                        golfer_starting_handicap.active_handicap_index = (
-                            first_round.golfer_playing_handicap
-                            - (first_round.tee_rating - first_round.tee_par)
-                        ) / (first_round.tee_slope / 113)
-
-                # Determine golfer current/ending handicap index
-                golfer_current_handicap = get_handicap_index_data(
-                    session=session,
-                    golfer_id=golfer_db.id,
-                    min_date=datetime(year - 2, 1, 1).date(),
-                    max_date=datetime.today().date(),
-                    limit=10,
-                    include_rounds=True,
-                )
-
-                # Compile golfer season statistics
-                stats[len(stats)] = {
-                    "golfer_id": golfer_db.id,
-                    "name": golfer_db.name,
-                    "starting_handicap_index": round(
-                        golfer_starting_handicap.active_handicap_index, 1
-                    ),
-                    "current_handicap_index": round(
-                        golfer_current_handicap.active_handicap_index, 1
-                    ),
-                    "rounds_played": len(filtered_rounds_db),
-                    "avg_gross_to_par": round(
-                        np.mean(
-                            [
-                                (round_db.gross_score - round_db.tee_par)
-                                for round_db in filtered_rounds_db
-                            ]
-                        ),
-                        3,
-                    ),
-                    "avg_gross_differential": round(
-                        np.mean(
-                            [
-                                round_db.score_differential
-                                for round_db in filtered_rounds_db
-                            ]
-                        ),
-                        3,
-                    ),
-                    "avg_net_to_par": round(
-                        np.mean(
-                            [
-                                (round_db.net_score - round_db.tee_par)
-                                for round_db in filtered_rounds_db
-                            ]
-                        ),
-                        3,
-                    ),
-                    "avg_net_differential": round(
-                        np.mean(
-                            [
-                                (
-                                    round_db.score_differential
-                                    - round_db.golfer_playing_handicap
-                                )
-                                for round_db in filtered_rounds_db
-                            ]
-                        ),
-                        3,
-                    ),
-                }
+            .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+            .join(Tee, onclause=Tee.id == Round.tee_id)
+            .join(Track, onclause=Track.id == Tee.track_id)
+            .join(HoleResult, onclause=HoleResult.round_id == Round.id)
+            .join(Hole, onclause=Hole.id == HoleResult.hole_id)
+            .outerjoin(
+                PlayingConditionsCorrection, onclause=get_playing_conditions_onclause()
+            )
+            .where(Round.type == RoundType.FLIGHT)
+            .where(Round.scoring_type == ScoringType.INDIVIDUAL)
+            .where(col(RoundGolferLink.playing_handicap).is_not(None))
+            .where(Round.date_played >= dt_date(year, 1, 1))
+            .where(Round.date_played < playoffs_start_date)
+            .group_by(
+                Round.id,
+                RoundGolferLink.golfer_id,
+                Round.date_played,
+                RoundGolferLink.playing_handicap,
+                Tee.rating,
+                Tee.slope,
+                PlayingConditionsCorrection.playing_conditions_correction,
+            )
+            .order_by(Round.date_played, Round.id)
+        ).all()
 
-    # Save round summaries to file
-    rounds_filename = f"APLGolfLeague_Rounds_{year}.csv"
-    rounds_df = pd.DataFrame(rounds)
-    rounds_df = rounds_df.transpose()
-    rounds_df.to_csv(rounds_filename)
-    print(f"Saved rounds to file: {rounds_filename}")
+    with timer.phase("compute"):
+        (
+            golfer_ids,
+            playing_handicap,
+            rating,
+            slope,
+            playing_conditions_correction,
+            par,
+            gross_score,
+            adjusted_gross_score,
+            net_score,
+        ) = (
+            np.array([(row[0], *row[2:]) for row in round_data], dtype=np.float64)
+            .reshape(-1, 9)
+            .T
+        )
+        score_differential = ahs.compute_score_differential(
+            rating=rating,
+            slope=slope,
+            score=adjusted_gross_score,
+            playing_conditions_correction=playing_conditions_correction,
+        )
 
-    # Save season statistics to file
-    stats_filename = f"APLGolfLeague_SeasonStats_{year}.csv"
-    stats_df = pd.DataFrame(stats)
-    stats_df = stats_df.transpose()
-    stats_df.to_csv(stats_filename)
-    print(f"Saved season statistics to file: {stats_filename}")
+        stats_golfer_ids, first_round_index, golfer_index, rounds_played = np.unique(
+            golfer_ids.astype(np.int64),
+            return_index=True,
+            return_inverse=True,
+            return_counts=True,
+        )
 
+        def compute_averages(values: "np.ndarray") -> list[float]:
+            return np.round(
+                np.bincount(golfer_index, weights=values) / rounds_played, 3
+            ).tolist()
 
-if __name__ == "__main__":
-    # TODO: Make this a runnable task
+        avg_gross_to_par = compute_averages(gross_score - par)
+        avg_gross_differential = compute_averages(score_differential)
+        avg_net_to_par = compute_averages(net_score - par)
+        avg_net_differential = compute_averages(score_differential - playing_handicap)
 
-    YEAR = 2025  # TODO: un-hardcode year for analysis
+        # If no handicap index before season, use first playing handicap
+        estimated_handicap_index = (playing_handicap - (rating - par)) / (slope / 113)
 
-    settings = get_settings()
+    with timer.phase("load_golfers"):
+        golfers = {
+            golfer_id: (name, handicap_index)
+            for golfer_id, name, handicap_index in session.exec(
+                select(Golfer.id, Golfer.name, Golfer.handicap_index).where(
+                    col(Golfer.id).in_(stats_golfer_ids.tolist())
+                )
+            )
+        }
+        handicap_index_history: dict[int, list[tuple[datetime, float]]] = {}
+        for golfer_id, date_posted, handicap_index in session.exec(
+            select(
+                HandicapIndex.golfer_id,
+                HandicapIndex.date_posted,
+                HandicapIndex.handicap_index,
+            )
+            .where(col(HandicapIndex.golfer_id).in_(stats_golfer_ids.tolist()))
+            .where(HandicapIndex.date_posted >= dt_date(year - 2, 1, 1))
+            .where(HandicapIndex.date_posted < playoffs_start_date)
+            .order_by(HandicapIndex.date_posted, HandicapIndex.round_number)
+        ):
+            handicap_index_history.setdefault(golfer_id, []).append(
+                (date_posted, handicap_index)
+            )
 
-    DB_URL = settings.apl_golf_league_api_url
-    DB_PORT = (
-        settings.apl_golf_league_api_database_port_external
-    )  # NOTE: using external port, not running from inside container
-    db_uri = f"postgresql://{settings.apl_golf_league_api_database_user}:{settings.apl_golf_league_api_database_password}@{DB_URL}:{DB_PORT}/{settings.apl_golf_league_api_database_name}"
+    statistics: list[GolferSeasonStatistics] = []
+    for idx, golfer_id in enumerate(stats_golfer_ids.tolist()):
+        # Handicap index at season start, or before first round if posted in season
+        history = handicap_index_history.get(golfer_id, [])
+        starting_handicap_index = get_handicap_index_before(
+            history, datetime.combine(start_date, time.min)
+        )
+        if starting_handicap_index is None:
+            first_round_date = round_data[first_round_index[idx]][1]
+            starting_handicap_index = get_handicap_index_before(
+                history, datetime.combine(first_round_date.date(), time.min)
+            )
+        if starting_handicap_index is None:
+            starting_handicap_index = float(
+                estimated_handicap_index[first_round_index[idx]]
+            )
 
-    engine = create_engine(db_uri, echo=False)
+        golfer_name, current_handicap_index = golfers[golfer_id]
+        statistics.append(
+            GolferSeasonStatistics(
+                year=year,
+                golfer_id=golfer_id,
+                golfer_name=golfer_name,
+                starting_handicap_index=round(starting_handicap_index, 1),
+                current_handicap_index=current_handicap_index,
+                rounds_played=int(rounds_played[idx]),
+                avg_gross_to_par=avg_gross_to_par[idx],
+                avg_gross_differential=avg_gross_differential[idx],
+                avg_net_to_par=avg_net_to_par[idx],
+                avg_net_differential=avg_net_differential[idx],
+            )
+        )
+    print(
+        f"Compiled statistics for {len(statistics)} golfers ({len(round_data)} rounds)"
+    )
 
-    with Session(engine) as session:
-        compile_season_statistics(session=session, year=YEAR)
-    print("Done!")
+    if not dry_run:
+        with timer.phase("update"):
+            session.execute(
+                delete(GolferSeasonStatistics).where(
+                    GolferSeasonStatistics.year == year
+                )
+            )
+            session.add_all(statistics)
+        with timer.phase("commit"):
+            session.commit()
+    timer.observe()
+    return statistics
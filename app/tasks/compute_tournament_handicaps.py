@@ -1,29 +1,49 @@
-import csv
-from typing import List, Optional
+from sqlmodel import Session, col, func, select
 
-from sqlmodel import Session, create_engine, select
-
-from app.dependencies import get_settings
-from app.models.base import APLGLBaseModel
-from app.models.course import Course
 from app.models.division import Division
 from app.models.golfer import Golfer
-from app.models.round import RoundSummary
+from app.models.hole import Hole
 from app.models.team import Team
 from app.models.team_golfer_link import TeamGolferLink
 from app.models.tee import Tee
-from app.models.tournament import Tournament
+from app.models.tournament import (
+    Tournament,
+    TournamentGolferHandicap,
+    TournamentHandicaps,
+    TournamentTeamHandicap,
+)
 from app.models.tournament_division_link import TournamentDivisionLink
 from app.models.tournament_team_link import TournamentTeamLink
 from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.data_versions import data_versions
+from app.utilities.metrics import PhaseTimer
+from app.utilities.ttl_cache import TTLCache
+
+# Tables that tournament handicaps are derived from (rosters, tees, golfer indexes)
+TOURNAMENT_HANDICAP_TABLES = tuple(
+    sorted(
+        model.__tablename__
+        for model in (
+            Tournament,
+            TournamentDivisionLink,
+            TournamentTeamLink,
+            Division,
+            Tee,
+            Hole,
+            Team,
+            TeamGolferLink,
+            Golfer,
+        )
+    )
+)
 
-
-class HandicapIndexData(APLGLBaseModel):
-    active_date: str
-    active_handicap_index: float = None
-    active_rounds: Optional[List[RoundSummary]] = None
-    pending_handicap_index: Optional[float] = None
-    pending_rounds: Optional[List[RoundSummary]] = None
+# Computed handicaps, keyed by tournaments and data versions of source tables
+DEFAULT_TOURNAMENT_HANDICAPS_CACHE_SIZE = 64
+DEFAULT_TOURNAMENT_HANDICAPS_CACHE_TTL = 3600.0  # seconds
+tournament_handicaps_cache = TTLCache(
+    maxsize=DEFAULT_TOURNAMENT_HANDICAPS_CACHE_SIZE,
+    ttl=DEFAULT_TOURNAMENT_HANDICAPS_CACHE_TTL,
+)
 
 
 def organize_team_handicaps_scramble(
@@ -57,224 +77,217 @@ def compute_team_handicap_scramble(
     return round(0.25 * hcp_a + 0.20 * hcp_b + 0.15 * hcp_c + 0.10 * hcp_d)
 
 
-if __name__ == "__main__":
-    # TODO: Make this a runnable task
-
-    # TODO: un-hardcode ids
-    # TOURNAMENT_ID = 24  # Musket Ridge (2023)
-    # TOURNAMENT_ID = 27  # Worthington Manor (2023)
-    # TOURNAMENT_ID = 31  # Lake Presidential (2023)
-    # TOURNAMENT_ID = 29  # Maryland National (2023)
-    # TOURNAMENT_ID = 32  # Musket Ridge (2024)
-    # TOURNAMENT_ID = 33  # Lake Presidential (2024)
-    # TOURNAMENT_ID = 34  # Eagle's Nest (2024)
-    # TOURNAMENT_ID = 35  # Montgomery CC (2024)
-    # TOURNAMENT_ID = 36  # PB Dye (2024)
-    # TOURNAMENT_ID = 38  # Maryland National (2025)
-    # TOURNAMENT_ID = 43  # Waverly Woods (2025)
-    # TOURNAMENT_ID = 42  # Norbeck (2025)
-    # TOURNAMENT_ID = 39  # Eagle's Nest (2025)
-    # TOURNAMENT_ID = 41  # Banquet (2025)
-    TOURNAMENT_ID = 44  # Maryland National (2026)
-
-    print(f"Computing tournament (id={TOURNAMENT_ID}) handicaps")
-
+def compute_tournament_handicaps(
+    *, session: Session, tournament_ids: list[int]
+) -> list[TournamentHandicaps]:
+    """
+    Computes course handicaps for each golfer and team handicaps for each team
+    signed up for the given tournaments.
+
+    Tournaments, division tees and team rosters for all tournaments are loaded
+    together, rather than per division or team. Tournament course handicaps
+    combine the division's primary (front) and secondary (back) tees with the
+    tournament's handicap allowance, using each golfer's current handicap index.
+    Team handicaps are only computed for scramble tournaments.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    tournament_ids : list of int
+        tournament identifiers
+
+    Returns
+    -------
+    handicaps : list of TournamentHandicaps
+        handicaps for each tournament found, ordered by tournament identifier
+
+    """
     ahs = APLHandicapSystem()
+    timer = PhaseTimer("compute_tournament_handicaps")
 
-    settings = get_settings()
-
-    DB_URL = settings.apl_golf_league_api_url
-    DB_PORT = (
-        settings.apl_golf_league_api_database_port_external
-    )  # NOTE: using external port, not running from inside container
-    db_uri = f"postgresql://{settings.apl_golf_league_api_database_user}:{settings.apl_golf_league_api_database_password}@{DB_URL}:{DB_PORT}/{settings.apl_golf_league_api_database_name}"
-
-    print(
-        f"Computing tournament (id={TOURNAMENT_ID}) handicaps in database: {settings.apl_golf_league_api_database_url}"
-    )
-    engine = create_engine(db_uri, echo=False)
-
-    with Session(engine) as session:
-        # Get tournament and course info
-        tournament_db = session.exec(
-            select(Tournament).where(Tournament.id == TOURNAMENT_ID)
-        ).one()
-        course_db = session.exec(
-            select(Course).where(Course.id == tournament_db.course_id)
-        ).one()
-
-        # Get handicap allowance
-        handicap_allowance = ahs.get_handicap_allowance(
-            is_shamble=(not (tournament_db.shamble is None) and tournament_db.shamble)
-        )
-
-        # Get divisions and associated tees for this tournament
-        divisions_list = session.exec(
-            select(Division)
-            .join(
-                TournamentDivisionLink,
-                onclause=TournamentDivisionLink.division_id == Division.id,
-            )
-            .where(TournamentDivisionLink.tournament_id == TOURNAMENT_ID)
-        ).all()
-        division_tees = {}
-        for division_db in divisions_list:
-            division_tees[division_db.id] = {
-                "primary": session.exec(
-                    select(Tee)
-                    .join(Division, onclause=Division.primary_tee_id == Tee.id)
-                    .where(Division.id == division_db.id)
-                ).one(),
-                "secondary": session.exec(
-                    select(Tee)
-                    .join(Division, onclause=Division.secondary_tee_id == Tee.id)
-                    .where(Division.id == division_db.id)
-                ).one(),
-            }
-
-        # Get golfers signed up for this tournament
-        golfer_team_list = session.exec(
-            select(Golfer, Team, Division)
-            .join(TeamGolferLink, onclause=TeamGolferLink.golfer_id == Golfer.id)
-            .join(Division, onclause=Division.id == TeamGolferLink.division_id)
-            .join(
-                TournamentTeamLink,
-                onclause=TournamentTeamLink.team_id == TeamGolferLink.team_id,
-            )
-            .join(Team, onclause=Team.id == TournamentTeamLink.team_id)
-            .where(TournamentTeamLink.tournament_id == TOURNAMENT_ID)
+    with timer.phase("load_tournaments"):
+        tournaments = session.exec(
+            select(Tournament)
+            .where(col(Tournament.id).in_(tournament_ids))
+            .order_by(Tournament.id)
         ).all()
-
-        # For each golfer:
-        GOLFER_HEADERS = [
-            "Team",
-            "Golfer",
-            "Handicap Index",
-            "Division",
-            "Front Tee",
-            "Front Par",
-            "Front Rating",
-            "Front Slope",
-            "Front CH",
-            "Back Tee",
-            "Back Par",
-            "Back Rating",
-            "Back Slope",
-            "Back CH",
-            "Tournament CH",
-        ]
-        GOLFER_DATA = []
-        for golfer_db, team_db, division_db in golfer_team_list:
-            # TODO: Fix handicap validity date, get relevant handicap index
-            # NOTE: This will be much easier when historical handicap table is available
-
-            # Compute course handicaps
-            if golfer_db.handicap_index is None:
-                course_handicap_primary = 0
-                course_handicap_secondary = 0
-            else:
-                tee_primary = division_tees[division_db.id]["primary"]
-                course_handicap_primary = ahs.compute_course_handicap(
-                    par=tee_primary.par,
-                    rating=tee_primary.rating,
-                    slope=tee_primary.slope,
-                    handicap_index=golfer_db.handicap_index,
+        divisions = {
+            division.id: division
+            for division in session.exec(
+                select(Division)
+                .join(
+                    TournamentDivisionLink,
+                    onclause=TournamentDivisionLink.division_id == Division.id,
                 )
-
-                tee_secondary = division_tees[division_db.id]["secondary"]
-                course_handicap_secondary = ahs.compute_course_handicap(
-                    par=tee_secondary.par,
-                    rating=tee_secondary.rating,
-                    slope=tee_secondary.slope,
-                    handicap_index=golfer_db.handicap_index,
+                .where(col(TournamentDivisionLink.tournament_id).in_(tournament_ids))
+            )
+        }
+
+    with timer.phase("load_tees"):
+        tee_ids = {division.primary_tee_id for division in divisions.values()} | {
+            division.secondary_tee_id
+            for division in divisions.values()
+            if division.secondary_tee_id is not None
+        }
+        tees = {
+            tee_id: (name, rating, slope, par)
+            for tee_id, name, rating, slope, par in session.exec(
+                select(
+                    Tee.id,
+                    Tee.name,
+                    Tee.rating,
+                    Tee.slope,
+                    func.coalesce(func.sum(Hole.par), 0),
                 )
-
-            course_handicap = round(
-                handicap_allowance
-                * (course_handicap_primary + course_handicap_secondary)
+                .outerjoin(Hole, onclause=Hole.tee_id == Tee.id)
+                .where(col(Tee.id).in_(tee_ids))
+                .group_by(Tee.id, Tee.name, Tee.rating, Tee.slope)
             )
-
-            GOLFER_DATA.append(
-                [
-                    team_db.name,
-                    golfer_db.name,
-                    golfer_db.handicap_index,
-                    division_db.name,
-                    tee_primary.name,
-                    tee_primary.par,
-                    tee_primary.rating,
-                    tee_primary.slope,
-                    round(course_handicap_primary, 2),
-                    tee_secondary.name,
-                    tee_secondary.par,
-                    tee_secondary.rating,
-                    tee_secondary.slope,
-                    round(course_handicap_secondary, 2),
-                    course_handicap,
-                ]
+        }
+
+    with timer.phase("load_teams"):
+        roster = session.exec(
+            select(
+                TournamentTeamLink.tournament_id,
+                Team.id,
+                Team.name,
+                Golfer.id,
+                Golfer.name,
+                Golfer.handicap_index,
+                TeamGolferLink.division_id,
             )
+            .join(Team, onclause=Team.id == TournamentTeamLink.team_id)
+            .join(TeamGolferLink, onclause=TeamGolferLink.team_id == Team.id)
+            .join(Golfer, onclause=Golfer.id == TeamGolferLink.golfer_id)
+            .where(col(TournamentTeamLink.tournament_id).in_(tournament_ids))
+            .order_by(Team.name, Team.id, Golfer.name)
+        ).all()
 
-            print(
-                f"{team_db.name}: {golfer_db.name} ({golfer_db.handicap_index}), Front: {tee_primary.name} ({tee_primary.rating}/{tee_primary.slope}) -> {course_handicap_primary:0.2f}, Back: {tee_secondary.name} ({tee_secondary.rating}/{tee_secondary.slope}) -> {course_handicap_secondary:0.2f} | Course Handicap = {course_handicap}"
+    with timer.phase("compute"):
+        handicaps = {
+            tournament.id: TournamentHandicaps(
+                tournament_id=tournament.id,
+                name=tournament.name,
+                year=tournament.year,
+                handicap_allowance=ahs.get_handicap_allowance(
+                    is_shamble=bool(tournament.shamble)
+                ),
             )
-
-        # Compute team handicaps
-        TEAM_DATA = None
-        if tournament_db.scramble:
-            print(f"Team handicaps (scramble)")
-
-            TEAM_HEADERS = ["Team", "CH A", "CH B", "CH C", "CH D", "Team CH"]
-            TEAM_DATA = []
-
-            team_names: list[str] = []
-            for golfer_db, team_db, division_db in golfer_team_list:
-                if team_db.name not in team_names:
-                    team_names.append(team_db.name)
-
-                    # TODO: Make less fragile in case column numbers change
-                    team_hcps = [
-                        golfer_data[14]
-                        for golfer_data in GOLFER_DATA
-                        if golfer_data[0] == team_db.name
-                    ]
-                    hcp_a, hcp_b, hcp_c, hcp_d = organize_team_handicaps_scramble(
-                        team_hcps
-                    )
-                    team_hcp = compute_team_handicap_scramble(
-                        hcp_a, hcp_b, hcp_c, hcp_d
-                    )
-
-                    TEAM_DATA.append(
-                        [team_db.name, hcp_a, hcp_b, hcp_c, hcp_d, team_hcp]
-                    )
-
-                    print(
-                        f"{team_db.name}: [{hcp_a}, {hcp_b}, {hcp_c}, {hcp_d}] -> {team_hcp}"
+            for tournament in tournaments
+        }
+        teams: dict[tuple[int, int], TournamentTeamHandicap] = {}
+        for (
+            tournament_id,
+            team_id,
+            team_name,
+            golfer_id,
+            golfer_name,
+            handicap_index,
+            division_id,
+        ) in roster:
+            if tournament_id not in handicaps or division_id not in divisions:
+                continue
+            if (tournament_id, team_id) not in teams:
+                teams[(tournament_id, team_id)] = TournamentTeamHandicap(
+                    team_id=team_id, team_name=team_name
+                )
+                handicaps[tournament_id].teams.append(teams[(tournament_id, team_id)])
+
+            # TODO: Use handicap index valid on tournament date
+            division = divisions[division_id]
+            course_handicaps = []
+            for tee_id in (division.primary_tee_id, division.secondary_tee_id):
+                if tee_id is None:
+                    course_handicaps.append(None)
+                elif handicap_index is None:
+                    course_handicaps.append(0.0)
+                else:
+                    _, rating, slope, par = tees[tee_id]
+                    course_handicaps.append(
+                        ahs.compute_course_handicap(
+                            par=par,
+                            rating=rating,
+                            slope=slope,
+                            handicap_index=handicap_index,
+                        )
                     )
-
-        # Output to spreadsheet
-        filename = f"handicaps_{tournament_db.name.lower().replace(' ', '')}_{tournament_db.year}.csv"
-        print(f"Writing results to file: {filename}")
-
-        with open(filename, "w", newline="") as file:
-            csvwriter = csv.writer(file)
-
-            csvwriter.writerow(
-                ["Tournament:", f"{tournament_db.name} ({tournament_db.year})"]
-            )
-            csvwriter.writerow(
-                ["Date:", f"{tournament_db.date.replace(tzinfo=None).isoformat()}"]
+            primary_course_handicap, secondary_course_handicap = course_handicaps
+            teams[(tournament_id, team_id)].golfers.append(
+                TournamentGolferHandicap(
+                    team_id=team_id,
+                    golfer_id=golfer_id,
+                    golfer_name=golfer_name,
+                    division_id=division_id,
+                    division_name=division.name,
+                    handicap_index=handicap_index,
+                    primary_tee_name=tees[division.primary_tee_id][0],
+                    primary_course_handicap=round(primary_course_handicap, 2),
+                    secondary_tee_name=(
+                        tees[division.secondary_tee_id][0]
+                        if division.secondary_tee_id is not None
+                        else None
+                    ),
+                    secondary_course_handicap=(
+                        round(secondary_course_handicap, 2)
+                        if secondary_course_handicap is not None
+                        else None
+                    ),
+                    course_handicap=round(
+                        handicaps[tournament_id].handicap_allowance
+                        * (primary_course_handicap + (secondary_course_handicap or 0))
+                    ),
+                )
             )
-            csvwriter.writerow(["Course:", f"{course_db.name} ({course_db.year})"])
-
-            csvwriter.writerow([])
 
-            csvwriter.writerow(GOLFER_HEADERS)
-            csvwriter.writerows(GOLFER_DATA)
-
-            if TEAM_DATA is not None:
-                csvwriter.writerow([])
-                csvwriter.writerow(TEAM_HEADERS)
-                csvwriter.writerows(TEAM_DATA)
+        # Team handicaps (scramble), from golfers' tournament course handicaps
+        for tournament in tournaments:
+            if not tournament.scramble:
+                continue
+            for team in handicaps[tournament.id].teams:
+                if 2 <= len(team.golfers) <= 4:
+                    team.team_handicap = compute_team_handicap_scramble(
+                        *organize_team_handicaps_scramble(
+                            [golfer.course_handicap for golfer in team.golfers]
+                        )
+                    )
 
-        print("Done!")
+    print(
+        f"Computed handicaps for {len(teams)} teams ({len(roster)} golfers) in {len(handicaps)} tournaments"
+    )
+    timer.observe()
+    return list(handicaps.values())
+
+
+def get_tournament_handicaps(
+    *, session: Session, tournament_ids: list[int]
+) -> list[TournamentHandicaps]:
+    """
+    Gets handicaps for the given tournaments, computing them only if rosters,
+    tees or golfer handicap indexes have changed since they were last computed.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    tournament_ids : list of int
+        tournament identifiers
+
+    Returns
+    -------
+    handicaps : list of TournamentHandicaps
+        handicaps for each tournament found, ordered by tournament identifier
+
+    """
+    tournament_ids = sorted(set(tournament_ids))
+    key = (
+        tuple(tournament_ids),
+        data_versions.get_etag(TOURNAMENT_HANDICAP_TABLES),
+    )
+    handicaps = tournament_handicaps_cache.get(key)
+    if handicaps is None:
+        handicaps = compute_tournament_handicaps(
+            session=session, tournament_ids=tournament_ids
+        )
+        tournament_handicaps_cache.set(key, handicaps)
+    return handicaps
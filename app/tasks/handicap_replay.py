@@ -0,0 +1,511 @@
+import multiprocessing
+import os
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date as dt_date
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import update
+from sqlmodel import Field, Session, func, select
+
+from app.database import snapshots as db_snapshots
+from app.models.base import APLGLBaseModel
+from app.models.course import Course
+from app.models.golfer import Golfer
+from app.models.handicap import (
+    HandicapIndex,
+    PlayingConditionsCorrection,
+    get_playing_conditions_onclause,
+)
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.qualifying_score import QualifyingScore
+from app.models.round import HandicapIndexCorrection, Round, ScoringType
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.tee import Tee
+from app.models.track import Track
+from app.tasks.handicaps import (
+    compute_hole_scores,
+    get_handicap_min_date,
+    get_handicap_update_dates,
+)
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.metrics import PhaseTimer
+
+# Maximum number of rounds in scoring record for weekly handicap updates
+SCORING_RECORD_LIMIT = 10
+
+
+class WeeklyHandicapIndex(APLGLBaseModel):
+    date_updated: dt_date
+    handicap_index: float | None = None
+
+
+class HandicapReplayGolferDiff(APLGLBaseModel):
+    golfer_id: int
+    golfer_name: str
+    handicap_index_prior: float | None = None
+    handicap_index: float | None = None
+    handicap_indexes: list[HandicapIndexCorrection] = Field(default_factory=list)
+    weekly_handicap_indexes: list[WeeklyHandicapIndex] = Field(default_factory=list)
+
+
+class HandicapReplayReport(APLGLBaseModel):
+    date_replayed: dt_date
+    num_golfers: int
+    num_rounds: int
+    is_applied: bool = False
+    golfers: list[HandicapReplayGolferDiff] = Field(default_factory=list)
+
+
+@dataclass
+class GolferReplayData:
+    """Rows needed to replay a golfer's handicap history, loaded up front."""
+
+    golfer_id: int
+    golfer_name: str
+    handicap_index: float | None = None
+    # (round_id, date_played, score_differential), in order played
+    rounds: list[tuple[int, datetime, float]] = field(default_factory=list)
+    # (year, date_played, score_differential), in order played
+    qualifying_scores: list[tuple[int, datetime | None, float]] = field(
+        default_factory=list
+    )
+    # round_id -> (handicap_index_id, handicap_index)
+    handicap_indexes: dict[int, tuple[int, float | None]] = field(default_factory=dict)
+
+
+def load_replay_data(
+    session: Session,
+    golfer_ids: list[int] | None = None,
+    recompute_hole_results: bool = True,
+) -> list[GolferReplayData]:
+    """
+    Loads rows needed to replay handicap history, with one query per table.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    golfer_ids : list of int, optional
+        golfers to load
+        Default: None, all golfers
+    recompute_hole_results : bool, optional
+        if true, adjusted gross scores are recomputed from gross hole scores with
+        the current handicap rules, rather than using stored hole results
+        Default: True
+
+    Returns
+    -------
+    golfers : list of GolferReplayData
+        replay data for each golfer, in order of golfer id
+
+    """
+    import numpy as np
+
+    ahs = APLHandicapSystem()
+
+    def filter_golfers(query, golfer_id_column):
+        if golfer_ids is None:
+            return query
+        return query.where(golfer_id_column.in_(golfer_ids))
+
+    golfers = {
+        golfer_id: GolferReplayData(
+            golfer_id=golfer_id, golfer_name=name, handicap_index=handicap_index
+        )
+        for golfer_id, name, handicap_index in session.exec(
+            filter_golfers(
+                select(Golfer.id, Golfer.name, Golfer.handicap_index), Golfer.id
+            ).order_by(Golfer.id)
+        ).all()
+    }
+
+    # League rounds in scoring records, see `get_rounds_in_scoring_record`
+    round_data = session.exec(
+        filter_golfers(
+            select(
+                Round.id,
+                RoundGolferLink.golfer_id,
+                Round.date_played,
+                Tee.rating,
+                Tee.slope,
+                func.coalesce(
+                    PlayingConditionsCorrection.playing_conditions_correction, 0.0
+                ),
+            )
+            .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+            .join(Tee, onclause=Tee.id == Round.tee_id)
+            .join(Track, onclause=Track.id == Tee.track_id)
+            .join(Course, onclause=Course.id == Track.course_id)
+            .outerjoin(
+                PlayingConditionsCorrection, onclause=get_playing_conditions_onclause()
+            )
+            .where(Round.scoring_type == ScoringType.INDIVIDUAL),
+            RoundGolferLink.golfer_id,
+        ).order_by(Round.date_played, Round.id)
+    ).all()
+    round_index = {round_id: idx for idx, (round_id, *_) in enumerate(round_data)}
+
+    # Adjusted gross scores, totalled over hole results
+    hole_data = np.array(
+        session.exec(
+            filter_golfers(
+                select(
+                    HoleResult.round_id,
+                    Hole.par,
+                    Hole.stroke_index,
+                    RoundGolferLink.playing_handicap,
+                    HoleResult.gross_score,
+                    HoleResult.adjusted_gross_score,
+                )
+                .join(Hole, onclause=Hole.id == HoleResult.hole_id)
+                .join(Round, onclause=Round.id == HoleResult.round_id)
+                .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+                .where(Round.scoring_type == ScoringType.INDIVIDUAL),
+                RoundGolferLink.golfer_id,
+            )
+        ).all(),
+        dtype=object,
+    ).reshape(-1, 6)
+    hole_data = hole_data[
+        [round_id in round_index for round_id in hole_data[:, 0]]
+    ]  # rounds excluded from scoring records
+    hole_round_index = np.array(
+        [round_index[round_id] for round_id in hole_data[:, 0]], dtype=np.int64
+    )
+    adjusted_gross_score = hole_data[:, 5].astype(np.int64)
+    if recompute_hole_results:
+        has_playing_handicap = np.array([ph is not None for ph in hole_data[:, 3]])
+        round_years = np.array(
+            [date_played.year for _, _, date_played, *_ in round_data],
+            dtype=np.int64,
+        )
+        hole_years = round_years[hole_round_index]
+        for year in np.unique(hole_years[has_playing_handicap]).tolist():
+            is_year = has_playing_handicap & (hole_years == year)
+            _, adjusted_gross_score[is_year] = compute_hole_scores(
+                year,
+                *(hole_data[is_year, col].astype(np.int64) for col in (1, 2, 3, 4)),
+            )
+    round_adjusted_gross_scores = np.bincount(
+        hole_round_index, weights=adjusted_gross_score, minlength=len(round_data)
+    ).astype(np.int64)
+
+    for (
+        round_id,
+        golfer_id,
+        date_played,
+        rating,
+        slope,
+        playing_conditions_correction,
+    ), score in zip(round_data, round_adjusted_gross_scores.tolist()):
+        golfers[golfer_id].rounds.append(
+            (
+                round_id,
+                date_played,
+                float(
+                    ahs.compute_score_differential(
+                        rating=rating,
+                        slope=slope,
+                        score=score,
+                        playing_conditions_correction=playing_conditions_correction,
+                    )
+                ),
+            )
+        )
+
+    for golfer_id, year, date_played, score_differential in session.exec(
+        filter_golfers(
+            select(
+                QualifyingScore.golfer_id,
+                QualifyingScore.year,
+                QualifyingScore.date_played,
+                QualifyingScore.score_differential,
+            ),
+            QualifyingScore.golfer_id,
+        ).order_by(QualifyingScore.date_played, QualifyingScore.id)
+    ).all():
+        golfers[golfer_id].qualifying_scores.append(
+            (year, date_played, score_differential)
+        )
+
+    for handicap_index_id, golfer_id, round_id, handicap_index in session.exec(
+        filter_golfers(
+            select(
+                HandicapIndex.id,
+                HandicapIndex.golfer_id,
+                HandicapIndex.round_id,
+                HandicapIndex.handicap_index,
+            ),
+            HandicapIndex.golfer_id,
+        )
+    ).all():
+        golfers[golfer_id].handicap_indexes[round_id] = (
+            handicap_index_id,
+            handicap_index,
+        )
+
+    return list(golfers.values())
+
+
+def is_equal_handicap_index(a: float | None, b: float | None) -> bool:
+    if a is None or b is None:
+        return a is b
+    return abs(a - b) < 1e-6
+
+
+def compute_handicap_index(record: list[float]) -> float | None:
+    if len(record) == 0:
+        return None
+    return float(APLHandicapSystem().compute_handicap_index(record=record))
+
+
+def replay_golfer(
+    golfer: GolferReplayData, today: dt_date
+) -> HandicapReplayGolferDiff | None:
+    """
+    Replays a golfer's handicap history.
+
+    Recomputes the handicap index posted for each league round (as in
+    `get_scoring_record_rounds_for_golfer`) and walks the weekly handicap update
+    calendar (as in `run_handicap_update`) through the given date.
+
+    Parameters
+    ----------
+    golfer : GolferReplayData
+        golfer rounds, qualifying scores and stored handicap indexes
+    today : date
+        date of final weekly handicap update
+
+    Returns
+    -------
+    diff : HandicapReplayGolferDiff | None
+        differences from stored handicap indexes, or None if there are none
+
+    """
+    diff = HandicapReplayGolferDiff(
+        golfer_id=golfer.golfer_id,
+        golfer_name=golfer.golfer_name,
+        handicap_index_prior=golfer.handicap_index,
+    )
+
+    # Handicap index posted for each round, from prior 9 league rounds (or
+    # qualifying scores, if there are no prior league rounds)
+    qualifying_record = [
+        score_differential
+        for _, date_played, score_differential in sorted(
+            golfer.qualifying_scores, key=lambda qs: (qs[1] is None, qs[1] or 0)
+        )
+    ]
+    league_record: list[float] = []
+    for round_id, _, score_differential in golfer.rounds:
+        record = (league_record or qualifying_record)[-9:] + [score_differential]
+        handicap_index = compute_handicap_index(record)
+        league_record.append(score_differential)
+        if round_id not in golfer.handicap_indexes:
+            continue
+        handicap_index_id, handicap_index_prior = golfer.handicap_indexes[round_id]
+        if not is_equal_handicap_index(handicap_index, handicap_index_prior):
+            diff.handicap_indexes.append(
+                HandicapIndexCorrection(
+                    handicap_index_id=handicap_index_id,
+                    golfer_id=golfer.golfer_id,
+                    round_id=round_id,
+                    handicap_index_prior=handicap_index_prior,
+                    handicap_index=handicap_index,
+                )
+            )
+
+    # Weekly updates, from the first update including the golfer's rounds
+    dates_played = [date_played for _, date_played, _ in golfer.rounds]
+    date_update = today - timedelta(days=(today.weekday() + 1) % 7)  # Sunday
+    if len(dates_played) > 0:
+        first_date_update = dates_played[0].date() - timedelta(days=1)
+        first_date_update += timedelta(days=(6 - first_date_update.weekday()) % 7)
+        date_update = min(date_update, first_date_update)
+    handicap_index = None
+    while date_update <= today:
+        _, max_date = get_handicap_update_dates(date_update)
+        min_date = get_handicap_min_date(date_update)
+        idx_max = bisect_right(dates_played, datetime.combine(max_date, time.min))
+        idx_min = bisect_left(dates_played, datetime.combine(min_date, time.min))
+        record = [
+            score_differential
+            for _, _, score_differential in golfer.rounds[
+                max(idx_min, idx_max - SCORING_RECORD_LIMIT) : idx_max
+            ]
+        ]
+        if len(record) < 2:  # include qualifying scores
+            record += [
+                score_differential
+                for year, _, score_differential in golfer.qualifying_scores
+                if year >= min_date.year
+            ]
+        weekly_handicap_index = compute_handicap_index(record)
+        if not is_equal_handicap_index(weekly_handicap_index, handicap_index) or (
+            len(diff.weekly_handicap_indexes) == 0
+        ):
+            diff.weekly_handicap_indexes.append(
+                WeeklyHandicapIndex(
+                    date_updated=date_update, handicap_index=weekly_handicap_index
+                )
+            )
+        handicap_index = weekly_handicap_index
+        date_update += timedelta(days=7)
+    diff.handicap_index = handicap_index
+
+    if (
+        is_equal_handicap_index(diff.handicap_index, diff.handicap_index_prior)
+        and len(diff.handicap_indexes) == 0
+    ):
+        return None
+    return diff
+
+
+def replay_golfers(
+    golfers: list[GolferReplayData], today: dt_date
+) -> list[HandicapReplayGolferDiff]:
+    """
+    Replays handicap history for a shard of golfers (in a worker process).
+    """
+    diffs = [replay_golfer(golfer=golfer, today=today) for golfer in golfers]
+    return [diff for diff in diffs if diff is not None]
+
+
+def replay_handicaps(
+    *,
+    session: Session,
+    today: dt_date | None = None,
+    golfer_ids: list[int] | None = None,
+    recompute_hole_results: bool = True,
+    write_back: bool = False,
+    max_workers: int | None = None,
+) -> HandicapReplayReport:
+    """
+    Replays handicap history for all golfers and compares with stored values.
+
+    All rows needed are loaded once, and golfers are sharded across worker
+    processes, which recompute each golfer's posted handicap indexes and walk
+    the weekly handicap update calendar. Results are deterministic, independent
+    of the number of workers.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    today : date, optional
+        date of final weekly handicap update
+        Default: None, today's date
+    golfer_ids : list of int, optional
+        golfers to replay
+        Default: None, all golfers
+    recompute_hole_results : bool, optional
+        if true, adjusted gross scores are recomputed from gross hole scores with
+        the current handicap rules, rather than using stored hole results
+        Default: True
+    write_back : bool, optional
+        if true, updates differing handicap indexes (posted and current) in bulk,
+        requires `recompute_hole_results` to be false, as recomputed hole results
+        are not written back
+        Default: False
+    max_workers : int, optional
+        maximum number of worker processes
+        Default: None, number of processors
+
+    Returns
+    -------
+    report : HandicapReplayReport
+        differences from stored handicap indexes for each golfer
+
+    """
+    if write_back and recompute_hole_results:
+        raise ValueError(
+            "Unable to write back handicap indexes replayed from recomputed hole results"
+        )
+    if today is None:
+        today = datetime.today().date()
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    timer = PhaseTimer("replay_handicaps")
+    with timer.phase("load"):
+        golfers = load_replay_data(
+            session=session,
+            golfer_ids=golfer_ids,
+            recompute_hole_results=recompute_hole_results,
+        )
+    print(f"Replaying handicap history for {len(golfers)} golfers through {today}")
+
+    with timer.phase("replay"):
+        num_shards = max(min(max_workers, len(golfers)), 1)
+        if num_shards == 1:
+            diffs = replay_golfers(golfers=golfers, today=today)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=num_shards,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                shards = [golfers[idx::num_shards] for idx in range(num_shards)]
+                diffs = [
+                    diff
+                    for shard_diffs in executor.map(
+                        replay_golfers, shards, [today] * num_shards
+                    )
+                    for diff in shard_diffs
+                ]
+    diffs.sort(key=lambda diff: diff.golfer_id)
+
+    report = HandicapReplayReport(
+        date_replayed=today,
+        num_golfers=len(golfers),
+        num_rounds=sum(len(golfer.rounds) for golfer in golfers),
+        golfers=diffs,
+    )
+    for diff in diffs:
+        print(
+            f"'{diff.golfer_name}' (id={diff.golfer_id}): index {diff.handicap_index_prior} -> {diff.handicap_index}, "
+            + f"{len(diff.handicap_indexes)} posted handicap index(es) differ"
+        )
+
+    if write_back and len(diffs) > 0:
+        with timer.phase("write_back"):
+            handicap_indexes = [hi for diff in diffs for hi in diff.handicap_indexes]
+            if len(handicap_indexes) > 0:
+                session.execute(
+                    update(HandicapIndex),
+                    [
+                        {
+                            "id": hi.handicap_index_id,
+                            "handicap_index": hi.handicap_index,
+                        }
+                        for hi in handicap_indexes
+                    ],
+                )
+            golfer_updates = [
+                {
+                    "id": diff.golfer_id,
+                    "handicap_index": diff.handicap_index,
+                    "handicap_index_updated": datetime.now(),
+                }
+                for diff in diffs
+                if not is_equal_handicap_index(
+                    diff.handicap_index, diff.handicap_index_prior
+                )
+            ]
+            if len(golfer_updates) > 0:
+                session.execute(update(Golfer), golfer_updates)
+            db_snapshots.delete_scopes(
+                session=session,
+                scopes=db_snapshots.get_golfer_scopes(
+                    session=session, golfer_ids=[diff.golfer_id for diff in diffs]
+                ),
+                commit=False,
+            )
+            session.commit()
+        report.is_applied = True
+    timer.observe()
+
+    print(f"Completed handicap replay: {len(diffs)} golfer(s) with differences")
+    return report
@@ -1,21 +1,47 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import date as dt_date
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-from sqlmodel import Session, desc, select
+from sqlalchemy import delete, update
+from sqlmodel import Field, Session, desc, func, select
 
+from app.database import snapshots as db_snapshots
+from app.database.handicaps import (
+    rebuild_handicap_states,
+    rebuild_handicap_states_for_rounds,
+    update_handicap_states,
+)
 from app.models.base import APLGLBaseModel
 from app.models.course import Course
 from app.models.golfer import Golfer
+from app.models.handicap import (
+    GolferHandicapState,
+    PlayingConditionsCorrection,
+    get_playing_conditions_onclause,
+)
 from app.models.hole import Hole
 from app.models.hole_result import HoleResult, HoleResultData
 from app.models.qualifying_score import QualifyingScore
-from app.models.round import Round, RoundSummary, RoundType, ScoringType
+from app.models.round import (
+    HoleResultCorrection,
+    Round,
+    RoundSummary,
+    RoundType,
+    ScoringType,
+)
 from app.models.round_golfer_link import RoundGolferLink
 from app.models.tee import Tee
 from app.models.track import Track
 from app.utilities.apl_handicap_system import APLHandicapSystem
 from app.utilities.apl_legacy_handicap_system import APLLegacyHandicapSystem
+from app.utilities.handicap_index_state import HandicapIndexState
+from app.utilities.metrics import PhaseTimer
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class HandicapIndexData(APLGLBaseModel):
@@ -77,12 +103,25 @@ def get_round_summaries(
         handicap_system = APLHandicapSystem()
 
     round_query_data = session.exec(
-        select(Round, RoundGolferLink, Golfer, Course, Track, Tee)
+        select(
+            Round,
+            RoundGolferLink,
+            Golfer,
+            Course,
+            Track,
+            Tee,
+            func.coalesce(
+                PlayingConditionsCorrection.playing_conditions_correction, 0.0
+            ),
+        )
         .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
         .join(Golfer, onclause=Golfer.id == RoundGolferLink.golfer_id)
         .join(Tee)
         .join(Track)
         .join(Course)
+        .outerjoin(
+            PlayingConditionsCorrection, onclause=get_playing_conditions_onclause()
+        )
         .where(Round.id.in_(round_ids))
     ).all()
     round_summaries = [
@@ -100,8 +139,17 @@ def get_round_summaries(
             tee_rating=tee.rating,
             tee_slope=tee.slope,
             tee_color=tee.color if tee.color else "none",
+            playing_conditions_correction=playing_conditions_correction,
         )
-        for round, round_golfer_link, golfer, course, track, tee in round_query_data
+        for (
+            round,
+            round_golfer_link,
+            golfer,
+            course,
+            track,
+            tee,
+            playing_conditions_correction,
+        ) in round_query_data
     ]
 
     # Query hole data for selected rounds
@@ -115,7 +163,10 @@ def get_round_summaries(
         r.adjusted_gross_score = sum([h.adjusted_gross_score for h in round_holes])
         r.net_score = sum([h.net_score for h in round_holes])
         r.score_differential = handicap_system.compute_score_differential(
-            r.tee_rating, r.tee_slope, r.adjusted_gross_score
+            r.tee_rating,
+            r.tee_slope,
+            r.adjusted_gross_score,
+            playing_conditions_correction=r.playing_conditions_correction,
         )
     return round_summaries
 
@@ -328,6 +379,39 @@ def get_handicap_index_data(
     return data
 
 
+def get_handicap_update_dates(today: dt_date) -> tuple[dt_date, dt_date]:
+    """
+    Determines scoring record end dates for the weekly handicap update.
+
+    Updates run on Sundays, and include rounds played through the following
+    Monday.
+
+    Parameters
+    ----------
+    today : date
+        date of handicap update
+
+    Returns
+    -------
+    prior_end_date : date
+        end date of prior weekly update
+    new_end_date : date
+        end date for this weekly update
+
+    """
+    date_sunday_current = today - timedelta(days=(today.weekday() + 1) % 7)
+    date_monday_current = date_sunday_current + timedelta(days=1)
+    date_monday_previous = date_monday_current - timedelta(days=7)
+    return date_monday_previous, date_monday_current
+
+
+def get_handicap_min_date(today: dt_date) -> dt_date:
+    """
+    Determines earliest date for rounds in handicap consideration (last three calendar years).
+    """
+    return dt_date(today.year - 3, 1, 1)
+
+
 def update_golfer_handicaps(
     *,
     session: Session,
@@ -341,6 +425,12 @@ def update_golfer_handicaps(
     """
     Updates handicap index for each golfer with pending rounds.
 
+    Rounds played through the new end date are posted to the golfers' stored
+    handicap index states, and handicap indexes are computed from the scoring
+    records kept in the states, without rescanning scoring history. Golfers
+    with fewer than two rounds in their scoring record also use qualifying
+    scores, which are loaded separately.
+
     Parameters
     ----------
     session : Session
@@ -370,44 +460,72 @@ def update_golfer_handicaps(
         print(f"NOTE: Dry-run, won't commit changes to database!")
 
     if min_date is None:
-        min_date = datetime(datetime.today().year - 3, 1, 1).date()
+        min_date = get_handicap_min_date(datetime.today().date())
     print(f"Minimum date for rounds in handicap consideration: {min_date}")
 
-    if golfer_id is not None:
-        golfer_db = session.exec(
-            select(Golfer).where(Golfer.id == golfer_id)
-        ).one_or_none()
-        if golfer_db is None:
-            raise ValueError(
-                f"Unable to find golfer with id= {golfer_id} for handicap update"
-            )
-        golfers_db = [golfer_db]
-    else:
-        golfers_db = session.exec(select(Golfer).order_by(Golfer.id)).all()
+    ahs = APLHandicapSystem()
+    timer = PhaseTimer("run_handicap_update")
+    with timer.phase("load_golfers"):
+        if golfer_id is not None:
+            golfer_db = session.exec(
+                select(Golfer).where(Golfer.id == golfer_id)
+            ).one_or_none()
+            if golfer_db is None:
+                raise ValueError(
+                    f"Unable to find golfer with id= {golfer_id} for handicap update"
+                )
+            golfers_db = [golfer_db]
+        else:
+            golfers_db = session.exec(select(Golfer).order_by(Golfer.id)).all()
 
-    updates_info: list[dict] = []
-    for golfer_db in golfers_db:
-        prior_handicap_index_data = get_handicap_index_data(
+    min_datetime = datetime.combine(min_date, datetime.min.time())
+    prior_end_datetime = datetime.combine(prior_end_date, datetime.min.time())
+    new_end_datetime = datetime.combine(new_end_date, datetime.min.time())
+    with timer.phase("post_rounds"):
+        update_handicap_states(
             session=session,
-            golfer_id=golfer_db.id,
-            min_date=min_date,
-            max_date=prior_end_date,
-            limit=10,
-            include_rounds=True,
-            use_legacy_handicapping=False,
+            golfer_ids=[golfer_id] if golfer_id is not None else None,
+            max_date=new_end_datetime,
+            commit=False,
         )
-        new_handicap_index_data = get_handicap_index_data(
-            session=session,
-            golfer_id=golfer_db.id,
-            min_date=min_date,
-            max_date=new_end_date,
-            limit=10,
-            include_rounds=True,
-            use_legacy_handicapping=False,
+        state_query = select(GolferHandicapState)
+        if golfer_id is not None:
+            state_query = state_query.where(GolferHandicapState.golfer_id == golfer_id)
+        states = {
+            state_db.golfer_id: HandicapIndexState.model_validate(state_db.state)
+            for state_db in session.exec(state_query)
+        }
+
+    updates_info: list[dict] = []
+    for golfer_db in golfers_db:
+        state = states.get(golfer_db.id)
+        scores = (
+            [
+                score
+                for score in state.scores
+                if min_datetime <= score[0] <= new_end_datetime
+            ]
+            if state is not None
+            else []
         )
+        # Scoring history is loaded to include qualifying scores, or if rounds
+        # after the update window have displaced scores from the state
+        if len(scores) < 2 or state.scores[-1][0] > new_end_datetime:
+            with timer.phase("new_handicap_index"):
+                new_handicap_index = get_handicap_index_data(
+                    session=session,
+                    golfer_id=golfer_db.id,
+                    min_date=min_date,
+                    max_date=new_end_date,
+                    limit=10,
+                    use_legacy_handicapping=False,
+                ).active_handicap_index
+        else:
+            new_handicap_index = ahs.compute_handicap_index(
+                record=[score_differential for _, score_differential, _ in scores]
+            )
 
         current_handicap_index = golfer_db.handicap_index
-        new_handicap_index = new_handicap_index_data.active_handicap_index
 
         if current_handicap_index is None and new_handicap_index is None:
             continue
@@ -422,15 +540,13 @@ def update_golfer_handicaps(
             update_required = True
             update_reasons.append("golfer handicap index mismatch")
 
-        for pending_round in prior_handicap_index_data.pending_rounds:
-            if pending_round in new_handicap_index_data.active_rounds:
-                update_required = True
-                update_reasons.append("pending rounds")
-                break
+        if any(date_played > prior_end_datetime for date_played, _, _ in scores):
+            update_required = True
+            update_reasons.append("pending rounds")
 
         if update_required:
             print(
-                f"Updating handicap index for '{golfer_db.name}' (id={golfer_db.id}): db={current_handicap_index}, prior={prior_handicap_index_data.active_handicap_index}, new={new_handicap_index} : "
+                f"Updating handicap index for '{golfer_db.name}' (id={golfer_db.id}): db={current_handicap_index}, new={new_handicap_index} : "
                 + ", ".join(update_reasons)
             )
             updates_info.append(
@@ -448,22 +564,239 @@ def update_golfer_handicaps(
                 session.add(golfer_db)
 
     if not dry_run:
-        session.commit()  # update all handicaps at once
+        with timer.phase("commit"):
+            db_snapshots.delete_scopes(
+                session=session,
+                scopes=db_snapshots.get_golfer_scopes(
+                    session=session,
+                    golfer_ids=[info["golfer_id"] for info in updates_info],
+                ),
+                commit=False,
+            )
+            session.commit()  # update all handicaps and states at once
+    timer.observe()
 
     print(f"Completed handicap update!")
     return updates_info
 
 
+class HoleResultRecalculationReport(APLGLBaseModel):
+    year: int
+    num_rounds: int
+    num_hole_results: int
+    num_rounds_corrected: int
+    hole_results: list[HoleResultCorrection] = Field(default_factory=list)
+
+
+# Columns of hole result arrays used in recalculation
+HOLE_RESULT_COLUMNS = (
+    "id",
+    "round_id",
+    "number",
+    "par",
+    "stroke_index",
+    "playing_handicap",
+    "gross_score",
+    "handicap_strokes",
+    "adjusted_gross_score",
+    "net_score",
+)
+
+
+def load_hole_results_for_year(session: Session, year: int) -> "np.ndarray":
+    """
+    Loads hole results with hole and playing handicap data for rounds in a year.
+
+    Only rounds with a single golfer and a playing handicap are included.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    year : int
+        year for rounds played
+
+    Returns
+    -------
+    hole_results : numpy.ndarray
+        hole result data, one row per hole result with `HOLE_RESULT_COLUMNS`
+
+    """
+    import numpy as np
+
+    single_golfer_round_ids = (
+        select(RoundGolferLink.round_id)
+        .group_by(RoundGolferLink.round_id)
+        .having(func.count() == 1)
+    )
+    hole_result_data = session.exec(
+        select(
+            HoleResult.id,
+            HoleResult.round_id,
+            Hole.number,
+            Hole.par,
+            Hole.stroke_index,
+            RoundGolferLink.playing_handicap,
+            HoleResult.gross_score,
+            HoleResult.handicap_strokes,
+            HoleResult.adjusted_gross_score,
+            HoleResult.net_score,
+        )
+        .join(Hole, onclause=Hole.id == HoleResult.hole_id)
+        .join(Round, onclause=Round.id == HoleResult.round_id)
+        .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+        .where(Round.date_played >= datetime(year, 1, 1))
+        .where(Round.date_played < datetime(year + 1, 1, 1))
+        .where(Round.id.in_(single_golfer_round_ids))
+        .where(RoundGolferLink.playing_handicap.is_not(None))
+        .order_by(HoleResult.round_id, Hole.number)
+    ).all()
+    return np.array(hole_result_data, dtype=np.int64).reshape(
+        -1, len(HOLE_RESULT_COLUMNS)
+    )
+
+
+def compute_hole_scores(
+    year: int,
+    par: "np.ndarray",
+    stroke_index: "np.ndarray",
+    playing_handicap: "np.ndarray",
+    gross_score: "np.ndarray",
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Computes handicap strokes and adjusted gross scores for arrays of hole scores.
+
+    Handicap rules are only evaluated once for each distinct combination of
+    hole par, stroke index, playing handicap and gross score.
+
+    Parameters
+    ----------
+    year : int
+        year rounds were played, determines handicap system
+    par, stroke_index, playing_handicap, gross_score : numpy.ndarray
+        hole data and scores, one element per hole result
+
+    Returns
+    -------
+    handicap_strokes : numpy.ndarray
+        handicap strokes for each hole result
+    adjusted_gross_score : numpy.ndarray
+        adjusted gross score for each hole result
+
+    """
+    import numpy as np
+
+    # TODO: Make a utility/factory for this
+    if year >= 2022:
+        ahs = APLHandicapSystem()
+    else:
+        ahs = APLLegacyHandicapSystem()
+
+    keys, key_index = np.unique(
+        np.column_stack([par, stroke_index, playing_handicap, gross_score]),
+        axis=0,
+        return_inverse=True,
+    )
+    key_index = key_index.reshape(-1)
+    key_results = np.array(
+        [
+            (
+                ahs.compute_hole_handicap_strokes(key_si, key_ph),
+                ahs.compute_hole_adjusted_gross_score(
+                    key_par, key_si, key_gross, key_ph
+                ),
+            )
+            for key_par, key_si, key_ph, key_gross in keys.tolist()
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    return key_results[key_index, 0], key_results[key_index, 1]
+
+
+def compute_hole_result_corrections(
+    year: int, hole_results: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Recomputes hole results and finds those that differ from the database values.
+
+    Parameters
+    ----------
+    year : int
+        year rounds were played, determines handicap system
+    hole_results : numpy.ndarray
+        hole result data, one row per hole result with `HOLE_RESULT_COLUMNS`
+
+    Returns
+    -------
+    corrections : numpy.ndarray
+        differing hole results, one row per hole result with columns: id,
+        round_id, number, and prior and new handicap_strokes,
+        adjusted_gross_score and net_score
+
+    """
+    import numpy as np
+
+    if len(hole_results) == 0:
+        return np.empty((0, 9), dtype=np.int64)
+
+    (
+        hole_result_id,
+        round_id,
+        number,
+        par,
+        stroke_index,
+        playing_handicap,
+        gross_score,
+        handicap_strokes_prior,
+        adjusted_gross_score_prior,
+        net_score_prior,
+    ) = hole_results.T
+
+    handicap_strokes, adjusted_gross_score = compute_hole_scores(
+        year, par, stroke_index, playing_handicap, gross_score
+    )
+    net_score = gross_score - handicap_strokes
+
+    is_changed = (
+        (handicap_strokes != handicap_strokes_prior)
+        | (adjusted_gross_score != adjusted_gross_score_prior)
+        | (net_score != net_score_prior)
+    )
+    return np.column_stack(
+        [
+            hole_result_id,
+            round_id,
+            number,
+            handicap_strokes_prior,
+            handicap_strokes,
+            adjusted_gross_score_prior,
+            adjusted_gross_score,
+            net_score_prior,
+            net_score,
+        ]
+    )[is_changed]
+
+
 def recalculate_hole_results(
-    *, session: Session, year: int = 2022, dry_run: bool = False
-):
+    *,
+    session: Session,
+    year: int = 2022,
+    years: list[int] | None = None,
+    dry_run: bool = False,
+    max_workers: int | None = None,
+) -> list[HoleResultRecalculationReport]:
     """
-    Recalculates hole results for any rounds played in the given year.
+    Recalculates hole results for any rounds played in the given year(s).
 
     If a discrepancy is found between the (new) calculated values and the
     (old) database values, the database is updated.
 
-    Based on error from early 2022 season in adjusted gross calculation.
+    Hole results are loaded with one query per year, and recalculated for
+    multiple years in parallel worker processes. All differing hole results are
+    updated in bulk and committed together.
+
+    Originally based on error from early 2022 season in adjusted gross
+    calculation, also used to apply handicap rule changes to prior seasons.
 
     Parameters
     ----------
@@ -472,64 +805,308 @@ def recalculate_hole_results(
     year : int, optional
         year for rounds played to be analyzed and corrected
         Default: 2022
+    years : list of int, optional
+        years for rounds played to be analyzed and corrected, overrides `year`
+        Default: None, only `year`
     dry_run : bool, optional
         if true, does not commit changes to database records
         Default: False
+    max_workers : int, optional
+        maximum number of worker processes
+        Default: None, one per year (up to number of processors)
+
+    Returns
+    -------
+    reports : list of HoleResultRecalculationReport
+        differing hole results for each year
+
+    """
+    import numpy as np
+
+    years = sorted(set(years)) if years is not None else [year]
+    if max_workers is None:
+        max_workers = min(len(years), os.cpu_count() or 1)
+    print(f"Recalculating hole results for {', '.join(map(str, years))} season(s)")
+
+    timer = PhaseTimer("recalculate_hole_results")
+    executor = None
+    if max_workers > 1 and len(years) > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    try:
+        results: dict[int, tuple[int, int, "Future | np.ndarray"]] = {}
+        for year in years:
+            with timer.phase("load_hole_results"):
+                hole_results = load_hole_results_for_year(session=session, year=year)
+            num_rounds = len(np.unique(hole_results[:, 1]))
+            if executor is not None:  # recalculate while loading next year
+                corrections = executor.submit(
+                    compute_hole_result_corrections, year, hole_results
+                )
+            else:
+                with timer.phase("recalculate"):
+                    corrections = compute_hole_result_corrections(year, hole_results)
+            results[year] = (num_rounds, len(hole_results), corrections)
+
+        reports: list[HoleResultRecalculationReport] = []
+        for year, (num_rounds, num_hole_results, corrections) in results.items():
+            if executor is not None:
+                with timer.phase("recalculate"):
+                    corrections = corrections.result()
+            report = HoleResultRecalculationReport(
+                year=year,
+                num_rounds=num_rounds,
+                num_hole_results=num_hole_results,
+                num_rounds_corrected=len(np.unique(corrections[:, 1])),
+                hole_results=[
+                    HoleResultCorrection(
+                        hole_result_id=hole_result_id,
+                        round_id=round_id,
+                        number=number,
+                        handicap_strokes_prior=handicap_strokes_prior,
+                        handicap_strokes=handicap_strokes,
+                        adjusted_gross_score_prior=adjusted_gross_score_prior,
+                        adjusted_gross_score=adjusted_gross_score,
+                        net_score_prior=net_score_prior,
+                        net_score=net_score,
+                    )
+                    for (
+                        hole_result_id,
+                        round_id,
+                        number,
+                        handicap_strokes_prior,
+                        handicap_strokes,
+                        adjusted_gross_score_prior,
+                        adjusted_gross_score,
+                        net_score_prior,
+                        net_score,
+                    ) in corrections.tolist()
+                ],
+            )
+            print(
+                f"{year}: analyzed {report.num_rounds} rounds ({report.num_hole_results} hole results), "
+                + f"corrected {len(report.hole_results)} hole results in {report.num_rounds_corrected} rounds"
+            )
+            for hole_result in report.hole_results:
+                print(
+                    f"Round {hole_result.round_id}, Hole #{hole_result.number}: "
+                    + f"HS={hole_result.handicap_strokes_prior}->{hole_result.handicap_strokes}, "
+                    + f"AG={hole_result.adjusted_gross_score_prior}->{hole_result.adjusted_gross_score}, "
+                    + f"Net={hole_result.net_score_prior}->{hole_result.net_score}"
+                )
+            reports.append(report)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    hole_results = [
+        hole_result for report in reports for hole_result in report.hole_results
+    ]
+    if not dry_run and len(hole_results) > 0:
+        with timer.phase("update"):
+            session.execute(
+                update(HoleResult),
+                [
+                    {
+                        "id": hole_result.hole_result_id,
+                        "handicap_strokes": hole_result.handicap_strokes,
+                        "adjusted_gross_score": hole_result.adjusted_gross_score,
+                        "net_score": hole_result.net_score,
+                    }
+                    for hole_result in hole_results
+                ],
+            )
+            round_ids = {hole_result.round_id for hole_result in hole_results}
+            session.execute(
+                update(Round)
+                .where(Round.id.in_(round_ids))
+                .values(date_updated=datetime.now())
+            )
+            db_snapshots.delete_scopes(
+                session=session,
+                scopes=db_snapshots.get_round_scopes(
+                    session=session, round_ids=round_ids
+                ),
+                commit=False,
+            )
+            rebuild_handicap_states_for_rounds(
+                session=session, round_ids=round_ids, commit=False
+            )
+        with timer.phase("commit"):
+            session.commit()
+    timer.observe()
+
+    print(f"Corrected errors in {sum(r.num_rounds_corrected for r in reports)} rounds")
+    return reports
+
+
+def update_playing_conditions_corrections(
+    *,
+    session: Session,
+    min_date: dt_date,
+    max_date: dt_date,
+    dry_run: bool = False,
+) -> list[PlayingConditionsCorrection]:
+    """
+    Computes playing conditions corrections for each course and day played.
+
+    Acceptable scores (individual rounds with a playing handicap) in the date
+    range are gathered with a single query, grouped by course and day, and
+    corrected by how much they differ from each golfer's expected score.
+    Stored corrections in the date range are replaced.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    min_date : date
+        first date played to compute corrections for
+    max_date : date
+        date played to compute corrections until (exclusive)
+    dry_run : bool, optional
+        if true, does not commit corrections to database
+        Default: False
+
+    Returns
+    -------
+    corrections : list of PlayingConditionsCorrection
+        corrections for each course and day with acceptable scores
 
     """
-    print(f"Recalculating hole results for {year} season")
+    import numpy as np
+
     ahs = APLHandicapSystem()
-    round_data = session.exec(
-        select(Round, RoundGolferLink, Golfer)
-        .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
-        .join(Golfer, onclause=Golfer.id == RoundGolferLink.golfer_id)
-        .where(Round.date_played >= datetime(year, 1, 1))
-    ).all()
-    print(f"Analyzing {len(round_data)} rounds")
-    round_error_counter = 0
-    for round_db, round_golfer_link_db, golfer_db in round_data:
-        hole_results_db = session.exec(
-            select(HoleResult).where(HoleResult.round_id == round_db.id)
+    timer = PhaseTimer("update_playing_conditions_corrections")
+
+    with timer.phase("load_scores"):
+        # Scores are totalled only for rounds played in the date range
+        hole_totals = (
+            select(
+                HoleResult.round_id,
+                func.sum(Hole.par).label("par"),
+                func.sum(HoleResult.adjusted_gross_score).label("adjusted_gross_score"),
+            )
+            .join(Hole, onclause=Hole.id == HoleResult.hole_id)
+            .join(Round, onclause=Round.id == HoleResult.round_id)
+            .where(Round.date_played >= min_date)
+            .where(Round.date_played < max_date)
+            .group_by(HoleResult.round_id)
+            .subquery()
+        )
+        score_data = session.exec(
+            select(
+                Track.course_id,
+                Round.date_played,
+                hole_totals.c.adjusted_gross_score
+                - hole_totals.c.par
+                - RoundGolferLink.playing_handicap,
+            )
+            .join(RoundGolferLink, onclause=RoundGolferLink.round_id == Round.id)
+            .join(Tee, onclause=Tee.id == Round.tee_id)
+            .join(Track, onclause=Track.id == Tee.track_id)
+            .join(hole_totals, onclause=hole_totals.c.round_id == Round.id)
+            .where(Round.scoring_type == ScoringType.INDIVIDUAL)
+            .where(RoundGolferLink.playing_handicap.is_not(None))
+            .where(Round.date_played >= min_date)
+            .where(Round.date_played < max_date)
         ).all()
-        error_found_in_round = False
-        for hole_result_db in hole_results_db:
-            hole_db = hole_result_db.hole
-            handicap_strokes = ahs.compute_hole_handicap_strokes(
-                stroke_index=hole_db.stroke_index,
-                course_handicap=round_golfer_link_db.playing_handicap,
+
+    with timer.phase("compute"):
+        course_ids = np.array(
+            [course_id for course_id, _, _ in score_data], dtype=np.int64
+        )
+        days = np.array(
+            [date_played.toordinal() for _, date_played, _ in score_data],
+            dtype=np.int64,
+        )
+        net_scores_over_par = np.array(
+            [net_score_over_par for _, _, net_score_over_par in score_data],
+            dtype=np.float64,
+        )
+        order = np.lexsort((days, course_ids))
+        keys, starts, counts = np.unique(
+            np.stack((course_ids[order], days[order]), axis=1),
+            axis=0,
+            return_index=True,
+            return_counts=True,
+        )
+        corrections = [
+            PlayingConditionsCorrection(
+                course_id=course_id,
+                date_played=dt_date.fromordinal(day),
+                num_scores=num_scores,
+                playing_conditions_correction=ahs.compute_playing_conditions_correction(
+                    net_scores_over_par=group_scores
+                ),
             )
-            adj_gross_score = ahs.compute_hole_adjusted_gross_score(
-                par=hole_db.par,
-                stroke_index=hole_db.stroke_index,
-                score=hole_result_db.gross_score,
-                course_handicap=round_golfer_link_db.playing_handicap,
+            for (course_id, day), num_scores, group_scores in zip(
+                keys.tolist(),
+                counts.tolist(),
+                np.split(net_scores_over_par[order], starts[1:]),
             )
-            net_score = hole_result_db.gross_score - handicap_strokes
-            if (
-                (handicap_strokes != hole_result_db.handicap_strokes)
-                or (adj_gross_score != hole_result_db.adjusted_gross_score)
-                or (net_score != hole_result_db.net_score)
-            ):
-                if not error_found_in_round:
-                    print(
-                        f"Golfer: {golfer_db.name}, Date: {round_db.date_played}, Course Handicap: {round_golfer_link_db.playing_handicap}"
+        ]
+
+    print(
+        f"Computed playing conditions corrections for {len(corrections)} course-days, "
+        + f"{sum(c.playing_conditions_correction != 0.0 for c in corrections)} non-zero"
+    )
+    if not dry_run:
+        with timer.phase("update"):
+            corrections_prior = {
+                (course_id, date_played): playing_conditions_correction
+                for course_id, date_played, playing_conditions_correction in session.execute(
+                    delete(PlayingConditionsCorrection)
+                    .where(PlayingConditionsCorrection.date_played >= min_date)
+                    .where(PlayingConditionsCorrection.date_played < max_date)
+                    .returning(
+                        PlayingConditionsCorrection.course_id,
+                        PlayingConditionsCorrection.date_played,
+                        PlayingConditionsCorrection.playing_conditions_correction,
                     )
-                    error_found_in_round = True
-                    round_error_counter += 1
-                print(
-                    f"Hole #{hole_db.number}: Par={hole_db.par}, SI={hole_db.stroke_index}, HS={handicap_strokes}, Gross={hole_result_db.gross_score}, Old AG={hole_result_db.adjusted_gross_score}, New AG={adj_gross_score}"
                 )
-                hole_result_db.handicap_strokes = handicap_strokes
-                hole_result_db.adjusted_gross_score = adj_gross_score
-                hole_result_db.net_score = net_score
-                if not dry_run:
-                    session.add(hole_result_db)
-                    session.commit()
-                    session.refresh(hole_result_db)
-            if error_found_in_round:
-                round_db.date_updated = datetime.now()
-                if not dry_run:
-                    session.add(round_db)
-                    session.commit()
-                    session.refresh(round_db)
-    print(f"Corrected errors in {round_error_counter} rounds")
+            }
+            session.add_all(corrections)
+
+            # Rebuild handicap index states that include rounds on course-days
+            # with changed corrections
+            corrections_new = {
+                (c.course_id, c.date_played): c.playing_conditions_correction
+                for c in corrections
+            }
+            changed_keys = {
+                key
+                for key in corrections_prior.keys() | corrections_new.keys()
+                if corrections_prior.get(key, 0.0) != corrections_new.get(key, 0.0)
+            }
+            if len(changed_keys) > 0:
+                golfer_ids = {
+                    golfer_id
+                    for golfer_id, course_id, date_played in session.exec(
+                        select(
+                            RoundGolferLink.golfer_id,
+                            Track.course_id,
+                            Round.date_played,
+                        )
+                        .join(Round, onclause=Round.id == RoundGolferLink.round_id)
+                        .join(Tee, onclause=Tee.id == Round.tee_id)
+                        .join(Track, onclause=Track.id == Tee.track_id)
+                        .where(Round.scoring_type == ScoringType.INDIVIDUAL)
+                        .where(Round.date_played >= min_date)
+                        .where(Round.date_played < max_date)
+                    ).all()
+                    if (course_id, date_played.date()) in changed_keys
+                }
+                rebuild_handicap_states(
+                    session=session,
+                    golfer_ids=golfer_ids,
+                    min_date=datetime.combine(
+                        min(day for _, day in changed_keys), datetime.min.time()
+                    ),
+                    commit=False,
+                )
+        with timer.phase("commit"):
+            session.commit()
+    timer.observe()
+
+    return corrections
@@ -0,0 +1,79 @@
+from sqlmodel import Session, select
+
+from app.database import snapshots as db_snapshots
+from app.models.flight import Flight
+from app.models.tournament import Tournament
+
+
+def build_snapshots_for_year(
+    *, session: Session, year: int, dry_run: bool = False
+) -> list[str]:
+    """
+    Builds response snapshots for all frozen flights and tournaments in a year.
+
+    Flights and tournaments are frozen if they are locked or belong to a past
+    season. Existing snapshots for these entities are replaced.
+
+    Parameters
+    ----------
+    session : Session
+        database session
+    year : int
+        season year
+    dry_run : bool, optional
+        if true, only reports which snapshots would be built. Default: False
+
+    Returns
+    -------
+    keys : list[str]
+        keys (request paths) of the snapshots built
+
+    """
+    print(f"Building response snapshots for year: {year}")
+    if dry_run:
+        print(f"NOTE: Dry-run, won't commit changes to database!")
+
+    entities = [
+        (
+            flight_id,
+            db_snapshots.get_flight_scope(flight_id),
+            db_snapshots.FLIGHT_SNAPSHOT_VIEWS,
+            "flight_id",
+        )
+        for flight_id in session.exec(select(Flight.id).where(Flight.year == year))
+        if db_snapshots.is_flight_frozen(session=session, flight_id=flight_id)
+    ] + [
+        (
+            tournament_id,
+            db_snapshots.get_tournament_scope(tournament_id),
+            db_snapshots.TOURNAMENT_SNAPSHOT_VIEWS,
+            "tournament_id",
+        )
+        for tournament_id in session.exec(
+            select(Tournament.id).where(Tournament.year == year)
+        )
+        if db_snapshots.is_tournament_frozen(
+            session=session, tournament_id=tournament_id
+        )
+    ]
+
+    keys = []
+    for entity_id, scope, views, id_param in entities:
+        print(f"Building snapshots for '{scope}'")
+        for path, view in views.items():
+            key = path.format(**{id_param: entity_id})
+            keys.append(key)
+            if dry_run:
+                continue
+            content = view(session, entity_id)
+            if content is None:
+                continue
+            db_snapshots.put_snapshot(
+                session=session,
+                key=key,
+                scope=scope,
+                content=db_snapshots.render_content(content),
+            )
+
+    print(f"Built {len(keys)} snapshots for {len(entities)} flights/tournaments")
+    return keys
@@ -1,7 +1,5 @@
 import math
 
-import numpy as np
-
 from app.models.match import MatchHoleResult, MatchHoleWinner
 from app.utilities.world_handicap_system import WorldHandicapSystem
 
@@ -98,6 +96,8 @@ class APLLegacyHandicapSystem(WorldHandicapSystem):
 
     def compute_handicap_index(self, record: list[float]) -> float:
         # Reference: APL Golf League Handicapping
+        import numpy as np
+
         record_sorted = np.sort(record)
         if len(record) < 4:
             score_diffs_avg = record_sorted[0]
@@ -143,6 +143,16 @@ class APLLegacyHandicapSystem(WorldHandicapSystem):
         # Reference: APL Golf League Handicapping
         return 30.0
 
+    @property
+    def scoring_record_size(self) -> int:
+        # Reference: APL Golf League Handicapping
+        return 10
+
+    @property
+    def expected_net_score_over_par(self) -> float:
+        # Half of 18-hole expectation, for 9-hole rounds
+        return 1.5
+
     @property
     def match_points_for_winning_hole(self) -> float:
         return 1.0
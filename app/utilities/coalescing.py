@@ -0,0 +1,91 @@
+"""
+Request Coalescing
+
+Shares a single execution of identical in-flight computations between
+concurrent requests (single-flight). The first request for a key runs the
+computation in a worker thread, and any identical requests arriving before it
+completes wait for and receive the same result (or exception).
+"""
+
+import asyncio
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+
+# Heavy read routes that are coalesced by default
+DEFAULT_COALESCED_ROUTES = (
+    "/flights/standings/{flight_id}",
+    "/flights/statistics/{flight_id}",
+    "/tournaments/standings/{tournament_id}",
+)
+
+
+class RequestCoalescer:
+    """
+    Coalesces identical in-flight computations, keyed by request.
+
+    Parameters
+    ----------
+    routes : Iterable[str], optional
+        route path templates for which coalescing is enabled.
+        Default: `DEFAULT_COALESCED_ROUTES`
+
+    """
+
+    def __init__(self, routes: Iterable[str] = DEFAULT_COALESCED_ROUTES):
+        self.routes = set(routes)
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+
+    def configure(self, routes: Iterable[str]) -> None:
+        """
+        Sets route path templates for which coalescing is enabled.
+
+        Parameters
+        ----------
+        routes : Iterable[str]
+            route path templates (e.g. "/flights/standings/{flight_id}")
+
+        """
+        self.routes = set(routes)
+
+    def is_enabled(self, route: str) -> bool:
+        return route in self.routes
+
+    @property
+    def num_in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def run(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Runs computation, or waits for an identical one already in flight.
+
+        Parameters
+        ----------
+        key : Hashable
+            identifies identical computations
+        func : Callable[[], Any]
+            blocking computation, run in a worker thread
+
+        Returns
+        -------
+        result : Any
+            result of the (shared) computation
+
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(run_in_threadpool(func))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda f: self._on_done(key, f))
+        # Shield shared computation from cancellation of a single waiter
+        return await asyncio.shield(future)
+
+    def _on_done(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            future.exception()  # mark as retrieved if all waiters went away
+
+
+coalescer = RequestCoalescer()
@@ -1,9 +1,21 @@
 import json
 import logging
+import random
 import sys
+import time
+import uuid
+from collections.abc import Iterable
 from pathlib import Path
 
 from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utilities.query_counter import get_current_query_stats
+
+# Request headers included in sampled debug detail of access log
+DEFAULT_ACCESS_LOG_HEADERS = ("user-agent", "referer", "x-forwarded-for", "origin")
+DEFAULT_ACCESS_LOG_DEBUG_SAMPLE_RATE = 0.1
 
 
 class InterceptHandler(logging.Handler):
@@ -78,3 +90,134 @@ class CustomizeLogger:
         with open(config_path) as config_file:
             config = json.load(config_file)
         return config
+
+
+class AccessLogOptions:
+    """
+    Options for request access logging.
+
+    Parameters
+    ----------
+    headers : Iterable[str], optional
+        request headers included in debug detail (never credentials).
+        Default: `DEFAULT_ACCESS_LOG_HEADERS`
+    debug_sample_rate : float, optional
+        fraction of requests for which debug detail (path parameters and
+        allowed headers) is logged. Default: `DEFAULT_ACCESS_LOG_DEBUG_SAMPLE_RATE`
+
+    """
+
+    def __init__(
+        self,
+        headers: Iterable[str] = DEFAULT_ACCESS_LOG_HEADERS,
+        debug_sample_rate: float = DEFAULT_ACCESS_LOG_DEBUG_SAMPLE_RATE,
+    ):
+        self.configure(headers=headers, debug_sample_rate=debug_sample_rate)
+
+    def configure(
+        self,
+        *,
+        headers: Iterable[str] | None = None,
+        debug_sample_rate: float | None = None,
+    ) -> None:
+        if headers is not None:
+            self.headers = tuple(
+                header.lower()
+                for header in headers
+                if header.lower() not in ("authorization", "cookie")
+            )
+        if debug_sample_rate is not None:
+            self.debug_sample_rate = debug_sample_rate
+
+
+access_log_options = AccessLogOptions()
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware emitting a single structured access-log line per request.
+
+    The line is logged once the response has been sent, with status, latency
+    and database statistics as bound fields. Messages are formatted lazily, so
+    requests cost little when the log level filters them out.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        application to wrap
+    options : AccessLogOptions, optional
+        access logging options. Default: `access_log_options`
+
+    """
+
+    def __init__(self, app: ASGIApp, options: AccessLogOptions = access_log_options):
+        self.app = app
+        self.options = options
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        headers = Headers(scope=scope)
+        request_id = headers.get("x-request-id") or uuid.uuid4().hex[:12]
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._log(
+                scope, headers, request_id, status_code, time.perf_counter() - start
+            )
+
+    def _log(
+        self,
+        scope: Scope,
+        headers: Headers,
+        request_id: str,
+        status_code: int,
+        duration: float,
+    ) -> None:
+        route = getattr(scope.get("route"), "path", None)
+        fields = {
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status_code,
+            "latency_ms": round(duration * 1000, 1),
+        }
+        query_stats = get_current_query_stats()
+        if query_stats is not None:
+            fields["db_query_count"] = query_stats.count
+            fields["db_time_ms"] = round(query_stats.duration_ms, 1)
+        request_logger = logger.bind(**fields)
+        request_logger.info(
+            "{} {} {} {:.1f}ms",
+            scope["method"],
+            scope["path"],
+            status_code,
+            fields["latency_ms"],
+        )
+
+        if random.random() < self.options.debug_sample_rate:
+            request_logger.opt(lazy=True).debug(
+                "{} {} params={} headers={}",
+                lambda: scope["method"],
+                lambda: scope["path"],
+                lambda: scope.get("path_params", {}),
+                lambda: {
+                    name: headers[name]
+                    for name in self.options.headers
+                    if name in headers
+                },
+            )
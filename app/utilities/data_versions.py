@@ -0,0 +1,181 @@
+"""
+Data Versions
+
+Tracks a version counter and last-modified time for each database table.
+Versions are bumped by SQLAlchemy session events whenever a commit includes
+writes to a table, which lets read endpoints answer conditional requests
+(`If-None-Match` / `If-Modified-Since`) without querying the database.
+
+Versions can also be kept for data narrower than a table (e.g. the results of
+a single tournament), by recording writes to it with `touch`.
+
+Note: Writes made outside of this process (e.g. migrations or manual edits)
+are not observed; versions are reset when the process restarts.
+"""
+
+import hashlib
+import threading
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+_SESSION_INFO_KEY = "data_versions_touched_tables"
+
+
+class DataVersions:
+    """
+    Registry of per-table data versions for this process.
+
+    Each table starts at version zero, last modified at process start.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex[:12]
+        self._started = datetime.now(timezone.utc).replace(microsecond=0)
+        self._versions: dict[str, int] = {}
+        self._modified: dict[str, datetime] = {}
+
+    def bump(self, tables: Iterable[str]) -> None:
+        """
+        Increments the version of the given tables.
+
+        Parameters
+        ----------
+        tables : Iterable[str]
+            names of tables that have been modified
+
+        """
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._modified[table] = now
+
+    def get_version(self, table: str) -> int:
+        """
+        Returns current version of the given table.
+
+        Parameters
+        ----------
+        table : str
+            table name
+
+        Returns
+        -------
+        version : int
+            number of committed transactions that have modified this table
+
+        """
+        return self._versions.get(table, 0)
+
+    def get_etag(self, tables: Iterable[str], *extra: str) -> str:
+        """
+        Computes a weak entity tag for data read from the given tables.
+
+        Parameters
+        ----------
+        tables : Iterable[str]
+            names of tables the response is derived from
+        *extra : str
+            additional values that the response depends on
+
+        Returns
+        -------
+        etag : str
+            weak entity tag, quoted for use in an `ETag` header
+
+        """
+        with self._lock:
+            parts = [self._epoch] + [
+                f"{table}:{self._versions.get(table, 0)}" for table in sorted(tables)
+            ]
+        digest = hashlib.sha1("|".join(parts + list(extra)).encode()).hexdigest()
+        return f'W/"{digest[:20]}"'
+
+    def get_last_modified(self, tables: Iterable[str]) -> datetime:
+        """
+        Returns latest modification time over the given tables.
+
+        Parameters
+        ----------
+        tables : Iterable[str]
+            names of tables the response is derived from
+
+        Returns
+        -------
+        last_modified : datetime
+            latest modification time (UTC, truncated to seconds)
+
+        """
+        with self._lock:
+            return max(
+                [self._modified.get(table, self._started) for table in tables],
+                default=self._started,
+            )
+
+
+data_versions = DataVersions()
+
+
+def _touch(session: Session, tables: Iterable[str]) -> None:
+    session.info.setdefault(_SESSION_INFO_KEY, set()).update(tables)
+
+
+def touch(session: Session, names: Iterable[str]) -> None:
+    """
+    Records writes in a session to data tracked by name rather than by table,
+    bumping their versions when the session commits.
+
+    Parameters
+    ----------
+    session : Session
+        database session with uncommitted writes
+    names : Iterable[str]
+        names of modified data, e.g. "tournament:1"
+
+    """
+    _touch(session, names)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session: Session, flush_context) -> None:
+    _touch(
+        session,
+        {
+            obj.__table__.name
+            for obj in (*session.new, *session.dirty, *session.deleted)
+            if hasattr(obj, "__table__")
+        },
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_executed_tables(orm_execute_state) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _touch(orm_execute_state.session, (table.name,))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session: Session) -> None:
+    tables = session.info.pop(_SESSION_INFO_KEY, None)
+    if tables:
+        data_versions.bump(tables)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_rolled_back_tables(
+    session: Session, transaction: SessionTransaction
+) -> None:
+    if transaction.parent is None:
+        # Outermost transaction ended without a commit (e.g. rollback)
+        session.info.pop(_SESSION_INFO_KEY, None)
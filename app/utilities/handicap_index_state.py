@@ -0,0 +1,119 @@
+"""
+Handicap Index State
+
+Rolling handicap index state for a golfer, for handicap rules that depend on
+scoring history (USGA 2020 RoH 5.7 - 5.9): the low handicap index, soft/hard
+caps and exceptional score reductions.
+
+Each posted score updates the state without rescanning history: the scoring
+record keeps only the most recent scores, exceptional score reductions are
+accumulated in a running total, and the low handicap index is tracked with a
+monotonic window (increasing handicap indexes over the low handicap index
+period, so the lowest is always first). The state is a model, so it can be
+stored between handicap updates and updated with newly posted scores.
+"""
+
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Deque
+
+from sqlmodel import Field
+
+from app.models.base import APLGLBaseModel
+from app.utilities.world_handicap_system import WorldHandicapSystem
+
+
+class HandicapIndexState(APLGLBaseModel):
+    num_scores: int = 0
+    date_played: datetime | None = None  # most recent score
+    handicap_index: float | None = None
+    low_handicap_index: float | None = None
+    # Most recent scores: (date_played, score_differential, reduction_total before score)
+    scores: Deque[tuple[datetime, float, float]] = Field(default_factory=deque)
+    # Running total of exceptional score reductions
+    reduction_total: float = 0.0
+    # Final handicap index by day, increasing in value and date
+    low_window: Deque[tuple[date, float]] = Field(default_factory=deque)
+
+    @property
+    def score_differentials(self) -> list[float]:
+        """
+        Score differentials in scoring record, with exceptional score reductions.
+
+        Reductions apply to the scores in the scoring record when an exceptional
+        score is posted, including the exceptional score itself.
+        """
+        return [
+            round(score_differential - (self.reduction_total - reduction_total), 1)
+            for _, score_differential, reduction_total in self.scores
+        ]
+
+    def post_score(
+        self,
+        date_played: datetime,
+        score_differential: float,
+        handicap_system: WorldHandicapSystem,
+    ) -> float:
+        """
+        Posts a score, updating the handicap index.
+
+        Parameters
+        ----------
+        date_played : datetime
+            date the round was played, scores must be posted in order played
+        score_differential : float
+            score differential of the round
+        handicap_system : WorldHandicapSystem
+            handicap system for computing handicap index
+
+        Returns
+        -------
+        handicap_index : float
+            updated handicap index
+
+        """
+        if self.date_played is not None and date_played < self.date_played:
+            raise ValueError(
+                f"Score played {date_played} posted after score played {self.date_played}"
+            )
+
+        # Add final handicap index from day of prior score to low handicap window
+        day_played = date_played.date()
+        if self.date_played is not None and self.date_played.date() < day_played:
+            while self.low_window and self.low_window[-1][1] >= self.handicap_index:
+                self.low_window.pop()
+            self.low_window.append((self.date_played.date(), self.handicap_index))
+
+        # Low handicap index: lowest in period preceding day played, once established
+        period_start = day_played - timedelta(
+            days=handicap_system.low_handicap_index_period
+        )
+        while self.low_window and self.low_window[0][0] < period_start:
+            self.low_window.popleft()
+        self.low_handicap_index = None
+        if self.low_window and self.num_scores >= handicap_system.scoring_record_size:
+            self.low_handicap_index = self.low_window[0][1]
+
+        # Exceptional score reduction, compared to handicap index when played
+        reduction = handicap_system.compute_exceptional_score_reduction(
+            score_differential=score_differential, handicap_index=self.handicap_index
+        )
+        self.scores.append(
+            (date_played, float(score_differential), self.reduction_total)
+        )
+        self.reduction_total += reduction
+        while len(self.scores) > handicap_system.scoring_record_size:
+            self.scores.popleft()
+        self.num_scores += 1
+
+        handicap_index = handicap_system.compute_capped_handicap_index(
+            handicap_index=float(
+                handicap_system.compute_handicap_index(record=self.score_differentials)
+            ),
+            low_handicap_index=self.low_handicap_index,
+        )
+        self.handicap_index = min(
+            handicap_index, handicap_system.maximum_handicap_index
+        )
+        self.date_played = date_played
+        return self.handicap_index
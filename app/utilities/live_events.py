@@ -0,0 +1,281 @@
+"""
+Live Events
+
+Server-sent events (SSE) for live results, so spectators receive standings and
+score updates when results are posted instead of polling.
+
+Events are published to streams (e.g. "tournaments/1") and delivered to each
+subscriber through a bounded queue. Each stream keeps a short history of recent
+events, so a client reconnecting with the `Last-Event-ID` header resumes where
+it left off. Subscribers that fall behind (full queue) are disconnected instead
+of buffering without bound, and resume from history when they reconnect.
+Subscribers are sent a comment line as a heartbeat while no events arrive, to
+keep connections open through proxies.
+"""
+
+import asyncio
+import threading
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+
+from app.utilities import metrics
+
+DEFAULT_HISTORY_SIZE = 32  # events per stream
+DEFAULT_QUEUE_SIZE = 16  # events per subscriber
+DEFAULT_HEARTBEAT_INTERVAL = 15.0  # seconds
+
+HEARTBEAT = b": heartbeat\n\n"
+
+live_event_subscribers = metrics.registry.gauge(
+    "live_event_subscribers", "Number of connected live event subscribers"
+)
+live_event_subscribers_dropped_total = metrics.registry.counter(
+    "live_event_subscribers_dropped_total",
+    "Number of live event subscribers disconnected for falling behind",
+)
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    """Event published to a stream, with data rendered as single-line JSON."""
+
+    id: str
+    event: str
+    data: bytes
+
+    def encode(self) -> bytes:
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+            self.id.encode(),
+            self.event.encode(),
+            self.data,
+        )
+
+
+class _Subscriber:
+    def __init__(self, queue_size: int):
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[LiveEvent | None] = asyncio.Queue(queue_size)
+        self.closed = False
+
+    def deliver(self, event: LiveEvent) -> None:
+        """Queues event, or disconnects subscriber if its queue is full."""
+        if self.closed:
+            return
+        if self.queue.full():
+            # Replace pending events with disconnect, client resumes from history
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            live_event_subscribers_dropped_total.inc()
+            return
+        self.queue.put_nowait(event)
+
+
+class _Stream:
+    def __init__(self, history_size: int):
+        self.next_id = 1
+        self.history: deque[LiveEvent] = deque(maxlen=history_size)
+        self.subscribers: set[_Subscriber] = set()
+
+
+class LiveEventBroker:
+    """
+    Publishes events to subscribers of live event streams.
+
+    Parameters
+    ----------
+    history_size : int, optional
+        number of recent events kept per stream for resuming clients.
+        Default: `DEFAULT_HISTORY_SIZE`
+    queue_size : int, optional
+        number of undelivered events per subscriber before it is disconnected.
+        Default: `DEFAULT_QUEUE_SIZE`
+    heartbeat_interval : float, optional
+        seconds without events before a heartbeat is sent.
+        Default: `DEFAULT_HEARTBEAT_INTERVAL`
+
+    """
+
+    def __init__(
+        self,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+    ):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex[:8]  # event ids do not survive restarts
+        self._streams: dict[str, _Stream] = {}
+
+    def configure(
+        self,
+        *,
+        history_size: int | None = None,
+        queue_size: int | None = None,
+        heartbeat_interval: float | None = None,
+    ) -> None:
+        if history_size is not None:
+            self.history_size = history_size
+            with self._lock:
+                for stream in self._streams.values():
+                    stream.history = deque(stream.history, maxlen=history_size)
+        if queue_size is not None:
+            self.queue_size = queue_size
+        if heartbeat_interval is not None:
+            self.heartbeat_interval = heartbeat_interval
+
+    def num_subscribers(self, name: str) -> int:
+        with self._lock:
+            stream = self._streams.get(name)
+            return len(stream.subscribers) if stream is not None else 0
+
+    def get_last_event_id(self, name: str) -> str:
+        """Identifier of the last event published to a stream, for snapshots."""
+        with self._lock:
+            stream = self._streams.get(name)
+            return f"{self._epoch}-{stream.next_id - 1 if stream is not None else 0}"
+
+    def discard_history(self, name: str) -> None:
+        """
+        Discards stream history, e.g. if a change is not published.
+
+        Clients resuming from an earlier event are sent current data instead.
+
+        Parameters
+        ----------
+        name : str
+            stream name
+
+        """
+        with self._lock:
+            stream = self._streams.get(name)
+            if stream is not None:
+                stream.history.clear()
+                stream.next_id += 1
+
+    def publish(self, name: str, event: str, data: bytes) -> LiveEvent:
+        """
+        Publishes an event to a stream.
+
+        Parameters
+        ----------
+        name : str
+            stream name, e.g. "tournaments/1"
+        event : str
+            event type, e.g. "standings"
+        data : bytes
+            event data, rendered as single-line JSON
+
+        Returns
+        -------
+        event : LiveEvent
+            published event
+
+        """
+        with self._lock:
+            stream = self._streams.setdefault(name, _Stream(self.history_size))
+            live_event = LiveEvent(
+                id=f"{self._epoch}-{stream.next_id}", event=event, data=data
+            )
+            stream.next_id += 1
+            stream.history.append(live_event)
+            subscribers = list(stream.subscribers)
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.deliver, live_event)
+        return live_event
+
+    def get_events_since(self, name: str, last_event_id: str) -> list[LiveEvent] | None:
+        """
+        Gets events published to a stream after the given event.
+
+        Parameters
+        ----------
+        name : str
+            stream name
+        last_event_id : str
+            identifier of last event received by the client
+
+        Returns
+        -------
+        events : list of LiveEvent or None
+            events published since, or None if the given event is no longer in
+            (or never was in) the stream history
+
+        """
+        epoch, _, number = last_event_id.partition("-")
+        if epoch != self._epoch or not number.isdigit():
+            return None
+        number = int(number)
+        with self._lock:
+            stream = self._streams.get(name)
+            if stream is None:
+                return [] if number == 0 else None
+            if number >= stream.next_id:
+                return None
+            first = stream.next_id - len(stream.history)
+            if number < first - 1:
+                return None
+            return list(stream.history)[number - first + 1 :]
+
+    def subscribe(
+        self, name: str, initial: Iterable[LiveEvent] = ()
+    ) -> AsyncIterator[bytes]:
+        """
+        Subscribes to a stream, receiving events published from now on.
+
+        Parameters
+        ----------
+        name : str
+            stream name
+        initial : Iterable[LiveEvent], optional
+            events sent before published events, e.g. events missed while the
+            client was disconnected or a snapshot of current data.
+            Default: no initial events
+
+        Returns
+        -------
+        chunks : AsyncIterator[bytes]
+            encoded events and heartbeats, for an SSE response
+
+        """
+        subscriber = _Subscriber(self.queue_size)
+        with self._lock:
+            stream = self._streams.setdefault(name, _Stream(self.history_size))
+            stream.subscribers.add(subscriber)
+        live_event_subscribers.inc()
+        return self._stream(name, subscriber, list(initial))
+
+    async def _stream(
+        self, name: str, subscriber: _Subscriber, initial: list[LiveEvent]
+    ) -> AsyncIterator[bytes]:
+        try:
+            for event in initial:
+                yield event.encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=self.heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if event is None:
+                    return
+                yield event.encode()
+        finally:
+            self._unsubscribe(name, subscriber)
+            live_event_subscribers.dec()
+
+    def _unsubscribe(self, name: str, subscriber: _Subscriber) -> None:
+        with self._lock:
+            stream = self._streams.get(name)
+            if stream is not None:
+                stream.subscribers.discard(subscriber)
+
+
+live_events = LiveEventBroker()
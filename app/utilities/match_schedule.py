@@ -0,0 +1,332 @@
+"""
+Match Schedule
+
+Generates balanced round-robin match schedules for a flight with any number of
+teams and weeks.
+
+A single round robin is built with the circle method (with a bye slot for an odd
+number of teams) and repeated over the play weeks, swapping home and away teams
+each cycle. Team slots and the order of rounds within each cycle are then
+searched (hill climbing from a fixed seed) to minimize a schedule-quality score:
+requested bye weeks, then balance of matches played, opponents met and home/away
+matches, and avoiding back-to-back rematches. Weeks where a team would sit out
+are filled with extra matches (double-headers) to even out matches played.
+
+Schedules are lists of weeks, each a list of (home, away) team indexes.
+"""
+
+import random
+
+MatchSchedule = list[list[tuple[int, int]]]
+
+# Schedule-quality score weights, by priority
+UNMET_BYE_WEEK_PENALTY = 1000.0
+MATCH_COUNT_PENALTY = 100.0
+OPPONENT_COUNT_PENALTY = 10.0
+DOUBLE_HEADER_PENALTY = 10.0
+REMATCH_PENALTY = 20.0
+HOME_AWAY_PENALTY = 5.0
+
+DEFAULT_NUM_CANDIDATES = 2000
+
+
+def get_round_robin_rounds(num_teams: int) -> list[list[tuple[int, int]]]:
+    """
+    Builds a single round robin with the circle method.
+
+    Parameters
+    ----------
+    num_teams : int
+        number of teams
+
+    Returns
+    -------
+    rounds : list of list of (int, int)
+        (home, away) team indexes for each round, each pair of teams meets once
+        (for an odd number of teams, one team has a bye each round)
+
+    """
+    num_slots = num_teams + num_teams % 2
+    fixed_slot = num_slots - 1
+    rounds = []
+    for round_idx in range(num_slots - 1):
+        pairs = [
+            (round_idx, fixed_slot) if round_idx % 2 == 0 else (fixed_slot, round_idx)
+        ]
+        for offset in range(1, num_slots // 2):
+            slot_a = (round_idx + offset) % fixed_slot
+            slot_b = (round_idx - offset) % fixed_slot
+            pairs.append((slot_a, slot_b) if offset % 2 == 0 else (slot_b, slot_a))
+        rounds.append([pair for pair in pairs if max(pair) < num_teams])
+    return rounds
+
+
+def score_schedule(
+    schedule: MatchSchedule,
+    num_teams: int,
+    bye_weeks: dict[int, int] | None = None,
+) -> float:
+    """
+    Computes a schedule-quality score (lower is better, zero is perfectly balanced).
+
+    Parameters
+    ----------
+    schedule : MatchSchedule
+        (home, away) team indexes for each week
+    num_teams : int
+        number of teams
+    bye_weeks : dict of int to int, optional
+        requested bye week (starting from 1) by team index
+        Default: None
+
+    Returns
+    -------
+    score : float
+        weighted sum of unmet bye weeks, spread (maximum - minimum over teams or
+        pairs of teams) of matches played, opponents met and double-headers,
+        back-to-back rematches and home/away imbalance beyond one match
+
+    """
+    unmet_bye_weeks = 0
+    for team, week in (bye_weeks or {}).items():
+        if any(team in match for match in schedule[week - 1]):
+            unmet_bye_weeks += 1
+
+    matches = [0] * num_teams
+    home_matches = [0] * num_teams
+    double_headers = [0] * num_teams
+    meetings = [[0] * num_teams for _ in range(num_teams)]
+    rematches = 0
+    prior_pairs: set[tuple[int, int]] = set()
+    for week_matches in schedule:
+        if not week_matches:
+            continue  # off week
+        pairs = set()
+        teams_playing = set()
+        for home, away in week_matches:
+            matches[home] += 1
+            matches[away] += 1
+            home_matches[home] += 1
+            meetings[home][away] += 1
+            meetings[away][home] += 1
+            for team in (home, away):
+                if team in teams_playing:
+                    double_headers[team] += 1
+                teams_playing.add(team)
+            pairs.add((min(home, away), max(home, away)))
+        rematches += len(pairs & prior_pairs)
+        prior_pairs = pairs
+
+    pair_meetings = [
+        meetings[team_a][team_b]
+        for team_a in range(num_teams)
+        for team_b in range(team_a + 1, num_teams)
+    ]
+    home_away_imbalance = sum(
+        max(abs(2 * home_matches[team] - matches[team]) - 1, 0)
+        for team in range(num_teams)
+    )
+    return (
+        UNMET_BYE_WEEK_PENALTY * unmet_bye_weeks
+        + MATCH_COUNT_PENALTY * (max(matches) - min(matches))
+        + OPPONENT_COUNT_PENALTY * (max(pair_meetings) - min(pair_meetings))
+        + DOUBLE_HEADER_PENALTY * (max(double_headers) - min(double_headers))
+        + REMATCH_PENALTY * rematches
+        + HOME_AWAY_PENALTY * home_away_imbalance
+    )
+
+
+def _build_schedule(
+    *,
+    rounds: list[list[tuple[int, int]]],
+    slots: list[int],
+    orders: list[list[int]],
+    num_teams: int,
+    num_weeks: int,
+    play_weeks: list[int],
+    bye_weeks: dict[int, int],
+) -> MatchSchedule:
+    """Builds a candidate schedule from team slots and round order each cycle."""
+    schedule: MatchSchedule = [[] for _ in range(num_weeks)]
+    byes_by_week: dict[int, set[int]] = {}
+    for team, week in bye_weeks.items():
+        byes_by_week.setdefault(week - 1, set()).add(team)
+
+    matches = [0] * num_teams
+    home_matches = [0] * num_teams
+    for idx, week_idx in enumerate(play_weeks):
+        cycle, position = divmod(idx, len(rounds))
+        byes = byes_by_week.get(week_idx, ())
+        week_matches = schedule[week_idx]
+        for slot_a, slot_b in rounds[orders[cycle][position]]:
+            home, away = slots[slot_a], slots[slot_b]
+            if cycle % 2:
+                home, away = away, home
+            if home in byes or away in byes:
+                continue
+            week_matches.append((home, away))
+            matches[home] += 1
+            matches[away] += 1
+            home_matches[home] += 1
+
+    # Fill weeks where teams sit out with extra matches, to even out matches played
+    target = max(matches)
+    if min(matches) == target:
+        return schedule
+    double_headers = [0] * num_teams
+    for week_idx in play_weeks:
+        week_matches = schedule[week_idx]
+        byes = byes_by_week.get(week_idx, set())
+        playing = {team for match in week_matches for team in match}
+        idle = [
+            team
+            for team in range(num_teams)
+            if team not in playing and team not in byes and matches[team] < target
+        ]
+        doubled: set[int] = set()
+        for team in idle:
+            if team in doubled or matches[team] >= target:
+                continue
+            candidates = [
+                other
+                for other in range(num_teams)
+                if other != team
+                and other not in byes
+                and other not in doubled
+                and matches[other] < target
+            ]
+            if not candidates:
+                continue
+            opponents = {
+                other
+                for match in schedule[week_idx]
+                if team in match
+                for other in match
+            }
+            # Prefer another idle team (no double-header), then fewest double-headers
+            other = min(
+                (other for other in candidates if other not in opponents),
+                key=lambda other: (other in playing, double_headers[other], other),
+                default=None,
+            )
+            if other is None:
+                continue
+            if other in playing:
+                double_headers[other] += 1
+            playing.update((team, other))
+            doubled.update((team, other))
+            if home_matches[team] * 2 < matches[team]:
+                week_matches.append((team, other))
+                home_matches[team] += 1
+            else:
+                week_matches.append((other, team))
+                home_matches[other] += 1
+            matches[team] += 1
+            matches[other] += 1
+    return schedule
+
+
+def generate_schedule(
+    num_teams: int,
+    num_weeks: int,
+    bye_weeks: dict[int, int] | None = None,
+    off_weeks: list[int] | None = None,
+    num_candidates: int = DEFAULT_NUM_CANDIDATES,
+    seed: int = 0,
+) -> MatchSchedule:
+    """
+    Generates a balanced round-robin match schedule.
+
+    Parameters
+    ----------
+    num_teams : int
+        number of teams, at least two
+    num_weeks : int
+        number of weeks in schedule
+    bye_weeks : dict of int to int, optional
+        requested bye week (starting from 1) by team index
+        Default: None
+    off_weeks : list of int, optional
+        weeks (starting from 1) without any matches
+        Default: None
+    num_candidates : int, optional
+        number of candidate schedules to evaluate
+        Default: 2000
+    seed : int, optional
+        random seed for candidate search, same seed gives same schedule
+        Default: 0
+
+    Returns
+    -------
+    schedule : MatchSchedule
+        (home, away) team indexes for each week, best-scoring candidate found
+
+    """
+    if num_teams < 2:
+        raise ValueError(f"Unable to schedule matches for {num_teams} teams")
+    bye_weeks = dict(bye_weeks or {})
+    off_weeks = set(off_weeks or [])
+    for team, week in bye_weeks.items():
+        if not 0 <= team < num_teams:
+            raise ValueError(f"Invalid team index '{team}' for {num_teams} teams")
+        if not 1 <= week <= num_weeks:
+            raise ValueError(f"Invalid bye week '{week}' for {num_weeks} weeks")
+
+    rounds = get_round_robin_rounds(num_teams)
+    play_weeks = [
+        week_idx for week_idx in range(num_weeks) if week_idx + 1 not in off_weeks
+    ]
+    num_cycles = max(-(-len(play_weeks) // len(rounds)), 1)
+
+    def evaluate(
+        slots: list[int], orders: list[list[int]]
+    ) -> tuple[float, MatchSchedule]:
+        schedule = _build_schedule(
+            rounds=rounds,
+            slots=slots,
+            orders=orders,
+            num_teams=num_teams,
+            num_weeks=num_weeks,
+            play_weeks=play_weeks,
+            bye_weeks=bye_weeks,
+        )
+        return score_schedule(schedule, num_teams, bye_weeks), schedule
+
+    rng = random.Random(seed)
+    num_slots = num_teams + num_teams % 2
+    slots = list(range(num_slots))
+    orders = [list(range(len(rounds))) for _ in range(num_cycles)]
+    score, schedule = evaluate(slots, orders)
+
+    # Hill climbing: swap two team slots or two rounds within a cycle, until no
+    # improvement over the last quarter of candidates
+    last_improvement = 0
+    for candidate_idx in range(num_candidates):
+        if score == 0 or candidate_idx - last_improvement > num_candidates // 4:
+            break
+        candidate_slots, candidate_orders = slots, orders
+        if len(rounds) < 2 or rng.random() < 0.5:
+            idx_a, idx_b = rng.sample(range(num_teams), 2)
+            candidate_slots = slots.copy()
+            candidate_slots[idx_a], candidate_slots[idx_b] = (
+                candidate_slots[idx_b],
+                candidate_slots[idx_a],
+            )
+        else:
+            cycle = rng.randrange(num_cycles)
+            idx_a, idx_b = rng.sample(range(len(rounds)), 2)
+            candidate_orders = orders.copy()
+            candidate_orders[cycle] = orders[cycle].copy()
+            candidate_orders[cycle][idx_a], candidate_orders[cycle][idx_b] = (
+                orders[cycle][idx_b],
+                orders[cycle][idx_a],
+            )
+        candidate_score, candidate_schedule = evaluate(
+            candidate_slots, candidate_orders
+        )
+        if candidate_score < score:
+            last_improvement = candidate_idx
+        if candidate_score <= score:
+            score, schedule = candidate_score, candidate_schedule
+            slots, orders = candidate_slots, candidate_orders
+    return schedule
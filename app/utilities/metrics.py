@@ -0,0 +1,380 @@
+"""
+Metrics
+
+Minimal in-process metrics registry (counters, gauges and histograms), served
+in the Prometheus text exposition format from the `/metrics` endpoint.
+
+Includes ASGI middleware recording per-route request counts, latencies and
+in-flight requests, and helpers for timing scheduled task runs and phases.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TASK_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def collect(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        return lines + self._collect_samples()
+
+    def _collect_samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing value, e.g. number of requests.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _collect_samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, e.g. number of in-flight requests.
+
+    Unlabelled gauges can instead be computed on collection with `set_function`.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def get(self, **labels: str) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def _collect_samples(self) -> list[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values (e.g. latencies) over cumulative buckets.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: [bucket counts..., +Inf count], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[idx] += 1
+            total[0] += value
+
+    def get_count(self, **labels: str) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+        return sum(counts)
+
+    def _collect_samples(self) -> list[str]:
+        label_names = self.label_names + ("le",)
+        with self._lock:
+            values = [
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._values.items()
+            ]
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    label_names, key + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            sample_labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{sample_labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{sample_labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics, rendered together in text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "Number of HTTP requests handled",
+    labels=("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    labels=("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Number of HTTP requests currently being handled"
+)
+task_runs_total = registry.counter(
+    "task_runs_total", "Number of scheduled task runs", labels=("task", "outcome")
+)
+task_run_duration_seconds = registry.histogram(
+    "task_run_duration_seconds",
+    "Scheduled task run duration in seconds",
+    labels=("task",),
+    buckets=TASK_BUCKETS,
+)
+task_phase_duration_seconds = registry.histogram(
+    "task_phase_duration_seconds",
+    "Duration of phases within a scheduled task run in seconds",
+    labels=("task", "phase"),
+    buckets=TASK_BUCKETS,
+)
+
+
+def register_pool_metrics(pool: Pool) -> None:
+    """
+    Registers gauges reporting usage of a database connection pool.
+
+    Parameters
+    ----------
+    pool : Pool
+        database connection pool (e.g. `engine.pool`)
+
+    """
+    for name, documentation, attribute in (
+        ("db_pool_size", "Configured size of database connection pool", "size"),
+        ("db_pool_checked_out", "Database connections in use", "checkedout"),
+        ("db_pool_checked_in", "Idle database connections in pool", "checkedin"),
+        ("db_pool_overflow", "Database connections above pool size", "overflow"),
+    ):
+        function = getattr(pool, attribute, None)
+        if callable(function):
+            registry.gauge(name, documentation).set_function(function)
+
+
+@contextmanager
+def time_task(task: str) -> Iterator[None]:
+    """
+    Records duration and outcome (success or failure) of a scheduled task run.
+
+    Parameters
+    ----------
+    task : str
+        task name
+
+    """
+    start = time.perf_counter()
+    outcome = "failure"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        task_run_duration_seconds.observe(time.perf_counter() - start, task=task)
+        task_runs_total.inc(task=task, outcome=outcome)
+
+
+class PhaseTimer:
+    """
+    Accumulates time spent in named phases of a task run.
+
+    Phases may be entered repeatedly (e.g. once per golfer), and their total
+    durations are recorded once the run completes with `observe`.
+
+    Parameters
+    ----------
+    task : str
+        task name
+
+    """
+
+    def __init__(self, task: str):
+        self.task = task
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = (
+                self.durations.get(name, 0.0) + time.perf_counter() - start
+            )
+
+    def observe(self) -> None:
+        for name, duration in self.durations.items():
+            task_phase_duration_seconds.observe(duration, task=self.task, phase=name)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, latencies and in-flight requests.
+
+    Requests are labelled by route path template (e.g. "/flights/{flight_id}")
+    to keep the number of label values bounded.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        application to wrap
+
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            method = scope["method"]
+            http_request_duration_seconds.observe(
+                time.perf_counter() - start, method=method, route=route
+            )
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
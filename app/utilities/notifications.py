@@ -1,12 +1,55 @@
+"""
+Notifications
+
+Outbound email delivery through an in-process outbox. Callers only enqueue
+messages (`enqueue_email`), which are rendered immediately from cached,
+compiled Jinja templates and delivered by a background sender thread. The
+sender reuses its SMTP connection between messages (closing it when idle)
+and retries failed deliveries with exponential backoff, so a slow or
+unavailable mail server never blocks a request or scheduled task.
+
+Note: The outbox is held in memory, messages still queued when the process
+exits are lost. Messages that exhaust their delivery attempts are logged.
+"""
+
+import heapq
+import itertools
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from email.message import EmailMessage
+from email.utils import formataddr
 from functools import lru_cache
+from pathlib import Path
 from typing import Any, Dict, List
 
-from fastapi import BackgroundTasks
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from loguru import logger
 from pydantic.v1 import EmailStr
 
 from app.dependencies import get_settings
 from app.models.base import APLGLBaseModel
+from app.utilities import metrics
+
+TEMPLATE_FOLDER = Path(__file__).parents[1] / "templates"
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 2.0  # seconds, doubled after each failed attempt
+DEFAULT_MAX_BACKOFF = 300.0  # seconds
+DEFAULT_IDLE_TIMEOUT = 30.0  # seconds
+DEFAULT_SMTP_TIMEOUT = 30.0  # seconds
+
+email_messages_total = metrics.registry.counter(
+    "email_messages_total",
+    "Number of outbound email messages by outcome",
+    labels=("outcome",),
+)
+email_outbox_size = metrics.registry.gauge(
+    "email_outbox_size", "Number of outbound email messages awaiting delivery"
+)
 
 
 class EmailSchema(APLGLBaseModel):
@@ -15,36 +58,378 @@ class EmailSchema(APLGLBaseModel):
     body: Dict[str, Any]
 
 
+class SMTPConfig:
+    """
+    Connection and sender details for the outgoing mail server.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        port: int,
+        from_address: str,
+        from_name: str | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        starttls: bool = True,
+        timeout: float = DEFAULT_SMTP_TIMEOUT,
+    ):
+        self.server = server
+        self.port = port
+        self.from_address = from_address
+        self.from_name = from_name
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    @property
+    def sender(self) -> str:
+        if self.from_name:
+            return formataddr((self.from_name, self.from_address))
+        return self.from_address
+
+
 @lru_cache()
-def get_email_config() -> ConnectionConfig:
+def get_smtp_config() -> SMTPConfig:
     settings = get_settings()
-    return ConnectionConfig(
-        MAIL_USERNAME=settings.mail_username,
-        MAIL_PASSWORD=settings.mail_password,
-        MAIL_FROM=settings.mail_from_address,
-        MAIL_FROM_NAME=settings.mail_from_name,
-        MAIL_SERVER=settings.mail_server,
-        MAIL_PORT=settings.mail_port,
-        TEMPLATE_FOLDER="app/templates/",
-        MAIL_STARTTLS=True,
-        MAIL_SSL_TLS=False,
+    return SMTPConfig(
+        server=settings.mail_server,
+        port=settings.mail_port,
+        from_address=settings.mail_from_address,
+        from_name=settings.mail_from_name,
+        username=settings.mail_username,
+        password=settings.mail_password,
     )
 
 
-async def send_email(
-    email: EmailSchema,
-    template_name: str,
-    background_tasks: BackgroundTasks | None = None,
-):
-    message = MessageSchema(
-        subject=email.dict().get("subject"),
-        recipients=email.dict().get("to_addresses"),
-        template_body=email.dict().get("body"),
-        subtype=MessageType.html,
+@lru_cache()
+def get_template_environment() -> Environment:
+    """
+    Returns Jinja environment for email templates, which caches compiled templates.
+    """
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_FOLDER),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
     )
-    fm = FastMail(get_email_config())
 
-    if background_tasks is None:
-        await fm.send_message(message=message, template_name=template_name)
-    else:
-        background_tasks.add_task(fm.send_message, message, template_name=template_name)
+
+def render_email(email: EmailSchema, template_name: str) -> str:
+    """
+    Renders email body from template.
+
+    Parameters
+    ----------
+    email : EmailSchema
+        email details, including template variables as `body`
+    template_name : str
+        name of template file in `TEMPLATE_FOLDER`
+
+    Returns
+    -------
+    html : str
+        rendered email body
+
+    """
+    template = get_template_environment().get_template(template_name)
+    return template.render(**email.body)
+
+
+class OutboxMessage:
+    """
+    Rendered email message awaiting delivery.
+    """
+
+    def __init__(self, subject: str, recipients: List[str], html: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.subject = subject
+        self.recipients = recipients
+        self.html = html
+        self.attempts = 0
+
+    def to_email_message(self, sender: str) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = self.subject
+        message["From"] = sender
+        message["To"] = ", ".join(self.recipients)
+        message.set_content(self.html, subtype="html")
+        return message
+
+
+def connect_smtp(config: SMTPConfig) -> smtplib.SMTP:
+    """
+    Opens an (authenticated) connection to the mail server.
+    """
+    connection = smtplib.SMTP(config.server, config.port, timeout=config.timeout)
+    try:
+        connection.ehlo()
+        if config.starttls:
+            connection.starttls(context=ssl.create_default_context())
+            connection.ehlo()
+        if config.username:
+            connection.login(config.username, config.password or "")
+    except BaseException:
+        connection.close()
+        raise
+    return connection
+
+
+class EmailOutbox:
+    """
+    Queue of outbound email messages, delivered by a background sender thread.
+
+    The sender thread is started when the first message is enqueued.
+
+    Parameters
+    ----------
+    config : SMTPConfig, optional
+        mail server details. Default: None, read from settings on first delivery
+    max_attempts : int, optional
+        delivery attempts per message before it is dropped.
+        Default: `DEFAULT_MAX_ATTEMPTS`
+    backoff : float, optional
+        delay before first retry, doubled after each failed attempt, in seconds.
+        Default: `DEFAULT_BACKOFF`
+    max_backoff : float, optional
+        maximum delay between retries, in seconds. Default: `DEFAULT_MAX_BACKOFF`
+    idle_timeout : float, optional
+        time after which an unused connection is closed, in seconds.
+        Default: `DEFAULT_IDLE_TIMEOUT`
+    connect : Callable[[SMTPConfig], smtplib.SMTP], optional
+        opens connection to mail server. Default: `connect_smtp`
+
+    """
+
+    def __init__(
+        self,
+        config: SMTPConfig | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        connect: Callable[[SMTPConfig], smtplib.SMTP] = connect_smtp,
+    ):
+        self.config = config
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.connect = connect
+        self._condition = threading.Condition()
+        self._pending: list[tuple[float, int, OutboxMessage]] = []  # heap by due time
+        self._sequence = itertools.count()
+        self._in_progress = 0
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._connection: smtplib.SMTP | None = None
+        self._connection_config: SMTPConfig | None = None
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending) + self._in_progress
+
+    def configure(self, *, config: SMTPConfig | None = None, **options: Any) -> None:
+        """
+        Updates mail server details and delivery options.
+
+        A new mail server connection is opened for the next delivery if the
+        mail server details change.
+        """
+        with self._condition:
+            if config is not None:
+                self.config = config
+            for name, value in options.items():
+                if not hasattr(self, name):
+                    raise AttributeError(f"Unknown email outbox option: {name}")
+                setattr(self, name, value)
+
+    def enqueue(self, message: OutboxMessage) -> str:
+        """
+        Adds a message to the outbox for delivery.
+
+        Returns
+        -------
+        message_id : str
+            identifier of the queued message, used in delivery logs
+
+        """
+        with self._condition:
+            self._push(message, time.monotonic())
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="email-outbox", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        email_messages_total.inc(outcome="queued")
+        logger.bind(request_id=None).info(
+            "Queued email {} '{}' to {} recipient(s)",
+            message.id,
+            message.subject,
+            len(message.recipients),
+        )
+        return message.id
+
+    def wait_until_idle(self, timeout: float | None = None) -> bool:
+        """
+        Waits until all queued messages are delivered or dropped.
+
+        Returns
+        -------
+        is_idle : bool
+            true if the outbox emptied before the timeout
+
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and self._in_progress == 0, timeout
+            )
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Stops the sender after attempting delivery of queued messages once more.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _push(self, message: OutboxMessage, due: float) -> None:
+        heapq.heappush(self._pending, (due, next(self._sequence), message))
+        email_outbox_size.set(len(self._pending))
+
+    def _wait_for_message(self) -> tuple[OutboxMessage | None, bool]:
+        """
+        Waits for next message due for delivery, returning (message, is_stopping).
+
+        Returns no message when stopping, or when the connection has been idle.
+        Must be called with the lock held.
+        """
+        while True:
+            now = time.monotonic()
+            if self._pending and (self._stopping or self._pending[0][0] <= now):
+                _, _, message = heapq.heappop(self._pending)
+                email_outbox_size.set(len(self._pending))
+                self._in_progress += 1
+                return message, False
+            if self._stopping:
+                return None, True
+            timeout = self._pending[0][0] - now if self._pending else None
+            if timeout is None and self._connection is not None:
+                timeout = self.idle_timeout
+            if not self._condition.wait(timeout) and not self._pending:
+                return None, False
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                message, is_stopping = self._wait_for_message()
+            if message is None:
+                self._close_connection()
+                if is_stopping:
+                    return
+                continue
+            try:
+                self._deliver(message)
+            finally:
+                with self._condition:
+                    self._in_progress -= 1
+                    self._condition.notify_all()
+
+    def _deliver(self, message: OutboxMessage) -> None:
+        message.attempts += 1
+        message_logger = logger.bind(request_id=None, email_id=message.id)
+        try:
+            self._send(message)
+        except (smtplib.SMTPException, OSError) as e:
+            self._close_connection()
+            if message.attempts >= self.max_attempts or self._stopping:
+                email_messages_total.inc(outcome="failed")
+                message_logger.error(
+                    "Unable to send email {} '{}' after {} attempt(s): {}",
+                    message.id,
+                    message.subject,
+                    message.attempts,
+                    e,
+                )
+                return
+            delay = min(self.backoff * 2 ** (message.attempts - 1), self.max_backoff)
+            email_messages_total.inc(outcome="retried")
+            message_logger.warning(
+                "Unable to send email {} (attempt {}), retrying in {:.1f} s: {}",
+                message.id,
+                message.attempts,
+                delay,
+                e,
+            )
+            with self._condition:
+                self._push(message, time.monotonic() + delay)
+            return
+        email_messages_total.inc(outcome="sent")
+        message_logger.info(
+            "Sent email {} '{}' (attempt {})",
+            message.id,
+            message.subject,
+            message.attempts,
+        )
+
+    def _send(self, message: OutboxMessage) -> None:
+        config = self.config or get_smtp_config()
+        email_message = message.to_email_message(config.sender)
+        if self._connection is not None and self._connection_config is not config:
+            self._close_connection()
+        reused = self._connection is not None
+        if self._connection is None:
+            self._connection = self.connect(config)
+            self._connection_config = config
+        try:
+            self._connection.send_message(email_message)
+        except smtplib.SMTPServerDisconnected:
+            if not reused:
+                raise
+            # Server closed the pooled connection, reconnect once
+            self._close_connection()
+            self._connection = self.connect(config)
+            self._connection_config = config
+            self._connection.send_message(email_message)
+
+    def _close_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+
+email_outbox = EmailOutbox()
+
+
+def enqueue_email(email: EmailSchema, template_name: str) -> str:
+    """
+    Renders an email from a template and queues it for delivery.
+
+    Parameters
+    ----------
+    email : EmailSchema
+        email details, including template variables as `body`
+    template_name : str
+        name of template file in `TEMPLATE_FOLDER`
+
+    Returns
+    -------
+    message_id : str
+        identifier of the queued message
+
+    """
+    message = OutboxMessage(
+        subject=email.subject,
+        recipients=[str(address) for address in email.to_addresses],
+        html=render_email(email, template_name),
+    )
+    return email_outbox.enqueue(message)
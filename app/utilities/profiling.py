@@ -0,0 +1,206 @@
+"""
+Request Profiling
+
+Opt-in deterministic profiling (cProfile) of individual requests, for
+diagnosing slow pages against real data. Profiling is requested with the
+`X-Profile` header or `profile` query parameter and is restricted to admins
+(see `app.dependencies.profile_request`).
+
+Reports include wall time split into SQL and Python time, and the functions
+with the largest cumulative time. Only one request is profiled at a time,
+profiles are rate-limited, and reports are size-capped and kept in a bounded
+in-memory store.
+
+Note: Work from other requests running concurrently may appear in a report.
+"""
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from starlette.requests import Request
+
+from app.models.base import APLGLBaseModel
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+DEFAULT_MAX_REPORTS = 20
+DEFAULT_MAX_REPORT_BYTES = 64 * 1024
+DEFAULT_MIN_INTERVAL = 10.0  # seconds
+DEFAULT_NUM_FUNCTIONS = 40
+
+
+class ProfileSummary(APLGLBaseModel):
+    id: str
+    date: datetime
+    username: str
+    method: str
+    path: str
+    wall_time_ms: float
+    sql_time_ms: float
+    sql_query_count: int
+    python_time_ms: float
+
+
+class ProfileReport(ProfileSummary):
+    stats: str
+    truncated: bool = False
+
+
+class RequestProfile:
+    """
+    Profile of a single request, started by `RequestProfiler.start`.
+    """
+
+    def __init__(self, request: Request, username: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.date = datetime.now()
+        self.username = username
+        self.method = request.method
+        self.path = request.url.path
+        self._profile = cProfile.Profile()
+        self._start = time.perf_counter()
+        self._profile.enable()
+
+    def stop(
+        self,
+        *,
+        sql_time: float,
+        sql_query_count: int,
+        num_functions: int,
+        max_bytes: int,
+    ) -> ProfileReport:
+        self._profile.disable()
+        wall_time = time.perf_counter() - self._start
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats(num_functions)
+        text = stream.getvalue()
+        truncated = len(text.encode()) > max_bytes
+        if truncated:
+            text = text.encode()[:max_bytes].decode(errors="ignore")
+
+        return ProfileReport(
+            id=self.id,
+            date=self.date,
+            username=self.username,
+            method=self.method,
+            path=self.path,
+            wall_time_ms=round(wall_time * 1000, 1),
+            sql_time_ms=round(sql_time * 1000, 1),
+            sql_query_count=sql_query_count,
+            python_time_ms=round(max(wall_time - sql_time, 0) * 1000, 1),
+            stats=text,
+            truncated=truncated,
+        )
+
+
+class RequestProfiler:
+    """
+    Rate-limited request profiler with a bounded report store.
+
+    Parameters
+    ----------
+    max_reports : int, optional
+        number of most recent reports kept. Default: `DEFAULT_MAX_REPORTS`
+    max_report_bytes : int, optional
+        maximum size of profile statistics in a report.
+        Default: `DEFAULT_MAX_REPORT_BYTES`
+    min_interval : float, optional
+        minimum time between starting profiles, in seconds.
+        Default: `DEFAULT_MIN_INTERVAL`
+    num_functions : int, optional
+        number of functions (by cumulative time) included in reports.
+        Default: `DEFAULT_NUM_FUNCTIONS`
+
+    """
+
+    def __init__(
+        self,
+        max_reports: int = DEFAULT_MAX_REPORTS,
+        max_report_bytes: int = DEFAULT_MAX_REPORT_BYTES,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        num_functions: int = DEFAULT_NUM_FUNCTIONS,
+    ):
+        self.max_reports = max_reports
+        self.max_report_bytes = max_report_bytes
+        self.min_interval = min_interval
+        self.num_functions = num_functions
+        self._lock = threading.Lock()
+        self._active: RequestProfile | None = None
+        self._last_start: float | None = None
+        self._reports: OrderedDict[str, ProfileReport] = OrderedDict()
+
+    @staticmethod
+    def is_requested(request: Request) -> bool:
+        flag = request.headers.get(PROFILE_HEADER) or request.query_params.get(
+            PROFILE_QUERY_PARAM
+        )
+        return flag is not None and flag.lower() in ("1", "true", "yes")
+
+    def start(self, request: Request, username: str) -> RequestProfile | None:
+        """
+        Starts profiling a request, unless rate-limited or already profiling.
+
+        Returns
+        -------
+        profile : RequestProfile | None
+            running profile, or None if request will not be profiled
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._active is not None:
+                return None
+            if self._last_start is not None and now - self._last_start < (
+                self.min_interval
+            ):
+                return None
+            try:
+                self._active = RequestProfile(request, username)
+            except ValueError:  # another profiler is active
+                return None
+            self._last_start = now
+            return self._active
+
+    def stop(
+        self, profile: RequestProfile, *, sql_time: float, sql_query_count: int
+    ) -> ProfileReport:
+        """
+        Stops a running profile and stores its report.
+        """
+        try:
+            report = profile.stop(
+                sql_time=sql_time,
+                sql_query_count=sql_query_count,
+                num_functions=self.num_functions,
+                max_bytes=self.max_report_bytes,
+            )
+        finally:
+            with self._lock:
+                self._active = None
+        with self._lock:
+            self._reports[report.id] = report
+            while len(self._reports) > self.max_reports:
+                self._reports.popitem(last=False)
+        return report
+
+    def get_reports(self) -> list[ProfileReport]:
+        with self._lock:
+            return list(reversed(self._reports.values()))
+
+    def get_report(self, profile_id: str) -> ProfileReport | None:
+        with self._lock:
+            return self._reports.get(profile_id)
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,267 @@
+"""
+Query Counter
+
+Counts SQL statements and accumulates database time per request, using
+SQLAlchemy engine events. Statements are grouped by shape (parameters and
+expanded `IN` lists removed) so that statements repeated many times within a
+single request, typically caused by N+1 query patterns, can be flagged.
+
+Per-request results are included in the access log (see `custom_logger`) and,
+in debug mode, returned as response headers (`X-DB-Query-Count` and
+`X-DB-Time-ms`).
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_REPEAT_THRESHOLD = 10
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-ms"
+
+_IN_LIST_PATTERN = re.compile(r"\bIN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def get_statement_shape(statement: str) -> str:
+    """
+    Normalizes SQL statement so that statements differing only by parameters match.
+
+    Parameters
+    ----------
+    statement : str
+        SQL statement, as sent to the database driver
+
+    Returns
+    -------
+    shape : str
+        normalized statement
+
+    """
+    shape = _IN_LIST_PATTERN.sub("IN (...)", statement)
+    shape = _LITERAL_PATTERN.sub("?", shape)
+    return _WHITESPACE_PATTERN.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """
+    SQL statements executed within a scope (e.g. a request).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        shape = get_statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def get_repeated_statements(self, threshold: int) -> dict[str, int]:
+        """
+        Returns statement shapes executed at least `threshold` times.
+
+        Parameters
+        ----------
+        threshold : int
+            minimum number of executions of the same statement shape
+
+        Returns
+        -------
+        repeated : dict[str, int]
+            number of executions, keyed by statement shape
+
+        """
+        with self._lock:
+            return {
+                shape: count
+                for shape, count in self.shapes.most_common()
+                if count >= threshold
+            }
+
+
+_request_stats: ContextVar[QueryStats | None] = ContextVar(
+    "query_counter_request_stats", default=None
+)
+_captures: list[QueryStats] = []
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Tracks statements executed in the current context (e.g. a request).
+
+    Context is propagated to worker threads started from it, such as
+    FastAPI's threadpool for synchronous dependencies.
+    """
+    stats = QueryStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def get_current_query_stats() -> QueryStats | None:
+    """
+    Returns statistics for statements tracked in the current context, if any.
+    """
+    return _request_stats.get()
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Captures all statements executed in this process, from any thread.
+
+    Intended for tests and diagnostics, e.g. asserting query budgets for
+    requests made through a test client running the app in another thread.
+    """
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None or _captures:
+        conn.info.setdefault("query_counter_start_times", []).append(
+            time.perf_counter()
+        )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_counter_start_times")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for capture in list(_captures):
+        capture.record(statement, duration)
+
+
+class QueryCounterOptions:
+    """
+    Options for per-request query counting.
+
+    Parameters
+    ----------
+    debug_headers : bool, optional
+        if true, adds query count and database time headers to responses.
+        Default: False
+    repeat_threshold : int, optional
+        number of executions of the same statement shape within a request
+        at which a possible N+1 query pattern is logged.
+        Default: `DEFAULT_REPEAT_THRESHOLD`
+
+    """
+
+    def __init__(
+        self,
+        debug_headers: bool = False,
+        repeat_threshold: int = DEFAULT_REPEAT_THRESHOLD,
+    ):
+        self.debug_headers = debug_headers
+        self.repeat_threshold = repeat_threshold
+
+    def configure(
+        self, *, debug_headers: bool | None = None, repeat_threshold: int | None = None
+    ) -> None:
+        if debug_headers is not None:
+            self.debug_headers = debug_headers
+        if repeat_threshold is not None:
+            self.repeat_threshold = repeat_threshold
+
+
+query_counter_options = QueryCounterOptions()
+
+
+class QueryCounterMiddleware:
+    """
+    ASGI middleware counting SQL statements and database time per request.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        application to wrap
+    options : QueryCounterOptions, optional
+        query counting options. Default: `query_counter_options`
+
+    """
+
+    def __init__(
+        self, app: ASGIApp, options: QueryCounterOptions = query_counter_options
+    ):
+        self.app = app
+        self.options = options
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if (
+                    message["type"] == "http.response.start"
+                    and self.options.debug_headers
+                ):
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(stats.count)
+                    headers[QUERY_TIME_HEADER] = f"{stats.duration_ms:.1f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                self._log(scope, stats)
+
+    def _log(self, scope: Scope, stats: QueryStats) -> None:
+        if stats.count < self.options.repeat_threshold:
+            return
+        route = scope.get("route")
+        path = getattr(route, "path", scope["path"])
+        request_logger = logger.bind(
+            request_id=scope.get("state", {}).get("request_id"),
+            method=scope["method"],
+            path=path,
+            db_query_count=stats.count,
+            db_time_ms=round(stats.duration_ms, 1),
+        )
+        for shape, count in stats.get_repeated_statements(
+            self.options.repeat_threshold
+        ).items():
+            request_logger.bind(db_repeated_count=count).warning(
+                "Possible N+1 query in {} {}: statement executed {} times: {}",
+                scope["method"],
+                path,
+                count,
+                shape[:200],
+            )
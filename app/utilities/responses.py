@@ -0,0 +1,195 @@
+"""
+Fast JSON Responses
+
+Optimized response path for large, already-typed payloads (e.g. `FlightData`,
+`TournamentData` or lists of `RoundResults`). By default, FastAPI converts an
+endpoint's pydantic models to dictionaries, validates them again against the
+route's `response_model` and serializes the result with the stdlib encoder.
+
+Routes created with `FastJSONRoute` skip this round-trip when an endpoint
+returns trusted internal models that already match the route's response model,
+and serialize them directly with orjson (which handles datetimes natively).
+Any other return value falls through to the standard FastAPI path.
+
+Enable per router with `APIRouter(..., route_class=FastJSONRoute)`.
+"""
+
+import inspect
+from collections.abc import Callable
+from enum import Enum
+from functools import wraps
+from typing import Any, get_args, get_origin
+
+import orjson
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from app.models.base import DisplayEnum
+
+# Global switch, e.g. for comparing against the standard response path
+fast_json_enabled = True
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Name of response parameter injected into wrapped endpoints
+_SUB_RESPONSE_PARAM = "fast_json_sub_response"
+
+
+def _encode_value(value: Any) -> Any:
+    # orjson serializes enums by value, so model enum fields must be labelled first
+    if isinstance(value, DisplayEnum):
+        return value.label
+    if isinstance(value, list):
+        if value and isinstance(value[0], (DisplayEnum, list, dict)):
+            return [_encode_value(item) for item in value]
+        return value
+    if isinstance(value, dict):
+        return {key: _encode_value(item) for key, item in value.items()}
+    return value
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return {name: _encode_value(getattr(obj, name)) for name in obj.__fields__}
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "total_seconds"):  # timedelta
+        return obj.total_seconds()
+    if hasattr(obj, "as_tuple"):  # Decimal
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Renders content to JSON bytes, matching output of the standard response path.
+
+    Parameters
+    ----------
+    content : Any
+        content to render, may include pydantic models
+
+    Returns
+    -------
+    body : bytes
+        UTF-8 encoded JSON
+
+    """
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, without re-validating content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def _get_trusted_type(response_model: Any) -> tuple[type | None, bool] | None:
+    """
+    Returns model type (and whether a list of it is expected) for trusted content.
+    """
+    if response_model is None or isinstance(response_model, DefaultPlaceholder):
+        return None, False
+    if get_origin(response_model) is list:
+        (item_type,) = get_args(response_model) or (None,)
+        if inspect.isclass(item_type) and issubclass(item_type, BaseModel):
+            return item_type, True
+        return None
+    if inspect.isclass(response_model) and issubclass(response_model, BaseModel):
+        return response_model, False
+    return None
+
+
+def _is_trusted(content: Any, model_type: type | None, is_list: bool) -> bool:
+    if model_type is None:
+        return isinstance(content, BaseModel)
+    # Exact types only, as subclasses may include fields the response model omits
+    if is_list:
+        return isinstance(content, list) and all(
+            type(item) is model_type for item in content
+        )
+    return type(content) is model_type
+
+
+class FastJSONRoute(APIRoute):
+    """
+    API route that serializes trusted model responses with `FastJSONResponse`.
+
+    Content is trusted if the endpoint returns an instance (or list of
+    instances) of exactly the route's response model, or any pydantic model if the
+    route has no response model. Routes that customize response serialization
+    (response class, status code or field filtering) always use the standard
+    response path.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if inspect.iscoroutinefunction(endpoint) and self._supports_fast_json(kwargs):
+            endpoint = self._wrap_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _supports_fast_json(kwargs: dict[str, Any]) -> bool:
+        if kwargs.get("status_code") not in (None, 200):
+            return False
+        if not isinstance(
+            kwargs.get("response_class", DefaultPlaceholder(None)), DefaultPlaceholder
+        ):
+            return False
+        if not kwargs.get("response_model_by_alias", True):
+            return False
+        return not any(
+            kwargs.get(name)
+            for name in (
+                "response_model_include",
+                "response_model_exclude",
+                "response_model_exclude_unset",
+                "response_model_exclude_defaults",
+                "response_model_exclude_none",
+            )
+        )
+
+    def _wrap_endpoint(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(endpoint)
+        if _SUB_RESPONSE_PARAM in signature.parameters or any(
+            p.kind == inspect.Parameter.VAR_KEYWORD
+            for p in signature.parameters.values()
+        ):
+            return endpoint
+
+        @wraps(endpoint)
+        async def fast_json_endpoint(*args: Any, **kwargs: Any) -> Any:
+            sub_response: Response = kwargs.pop(_SUB_RESPONSE_PARAM)
+            content = await endpoint(*args, **kwargs)
+            if not fast_json_enabled or isinstance(content, Response):
+                return content
+            trusted_type = _get_trusted_type(self.response_model)
+            if trusted_type is None or not _is_trusted(content, *trusted_type):
+                return content
+            response = FastJSONResponse(content)
+            # Keep headers set by dependencies (e.g. entity tags)
+            response.headers.update(
+                {k: v for k, v in sub_response.headers.items() if k != "content-length"}
+            )
+            if sub_response.status_code:
+                response.status_code = sub_response.status_code
+            return response
+
+        fast_json_endpoint.__signature__ = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(
+                    _SUB_RESPONSE_PARAM,
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Response,
+                ),
+            ]
+        )
+        return fast_json_endpoint
@@ -30,53 +30,92 @@ def validate_round(round: RoundValidationRequest) -> RoundValidationResponse:
         round data with validation
 
     """
-    # Determine handicapping system by year
-    # TODO: Make a utility/factory for this
-    if round.date_played.year >= 2022:
-        ahs = APLHandicapSystem()
-    else:
-        ahs = APLLegacyHandicapSystem()
+    return validate_rounds([round])[0]
 
-    # Prepare round response
-    round_response = RoundValidationResponse(
-        date_played=round.date_played, course_handicap=round.course_handicap
-    )
 
-    for hole in round.holes:
-        # Compute handicapping scores for this hole
-        handicap_strokes = ahs.compute_hole_handicap_strokes(
-            hole.stroke_index, round.course_handicap
-        )
-        adjusted_gross_score = ahs.compute_hole_adjusted_gross_score(
-            hole.par, hole.stroke_index, hole.gross_score, round.course_handicap
-        )
-        net_score = hole.gross_score - handicap_strokes
-        max_gross_score = ahs.compute_hole_maximum_strokes(hole.par, handicap_strokes)
-
-        # Populate hole validation response
-        hole_response = HoleResultValidationResponse(
-            number=hole.number,
-            par=hole.par,
-            stroke_index=hole.stroke_index,
-            gross_score=hole.gross_score,
-            handicap_strokes=handicap_strokes,
-            adjusted_gross_score=adjusted_gross_score,
-            net_score=net_score,
-            max_gross_score=max_gross_score,
-        )
+def validate_rounds(
+    rounds: list[RoundValidationRequest],
+) -> list[RoundValidationResponse]:
+    """Determines whether each of a batch of rounds is valid, see `validate_round`.
+
+    Handicap strokes and score limits depend only on the handicap system, hole
+    par and stroke index, and course handicap, which repeat across rounds played
+    on the same tees (e.g. a league night), so each distinct combination is only
+    computed once per batch.
+
+    Parameters
+    ----------
+    rounds: list[RoundValidationRequest]
+        round data to be validated
+
+    Returns
+    -------
+    responses: list[RoundValidationResponse]
+        round data with validation, in the given order
 
-        # Update validity for this hole
-        hole_response.is_valid = (
-            hole_response.gross_score > 0
-            and hole_response.gross_score <= hole_response.max_gross_score
+    """
+    handicap_systems = {True: APLHandicapSystem(), False: APLLegacyHandicapSystem()}
+    hole_limits: dict[tuple[bool, int, int, int], tuple[int, int, int]] = {}
+
+    round_responses: list[RoundValidationResponse] = []
+    for round in rounds:
+        # Determine handicapping system by year
+        # TODO: Make a utility/factory for this
+        is_current_system = round.date_played.year >= 2022
+        ahs = handicap_systems[is_current_system]
+
+        # Prepare round response
+        round_response = RoundValidationResponse(
+            date_played=round.date_played, course_handicap=round.course_handicap
         )
 
-        # Add hole to round response
-        round_response.holes.append(hole_response)
+        for hole in round.holes:
+            # Compute handicapping limits for this hole, unless already known
+            key = (
+                is_current_system,
+                hole.par,
+                hole.stroke_index,
+                round.course_handicap,
+            )
+            if key not in hole_limits:
+                handicap_strokes = ahs.compute_hole_handicap_strokes(
+                    hole.stroke_index, round.course_handicap
+                )
+                hole_limits[key] = (
+                    handicap_strokes,
+                    ahs.compute_hole_maximum_score(
+                        hole.par, hole.stroke_index, round.course_handicap
+                    ),
+                    ahs.compute_hole_maximum_strokes(hole.par, handicap_strokes),
+                )
+            handicap_strokes, max_score, max_gross_score = hole_limits[key]
+
+            # Populate hole validation response
+            hole_response = HoleResultValidationResponse(
+                number=hole.number,
+                par=hole.par,
+                stroke_index=hole.stroke_index,
+                gross_score=hole.gross_score,
+                handicap_strokes=handicap_strokes,
+                adjusted_gross_score=min(hole.gross_score, max_score),
+                net_score=hole.gross_score - handicap_strokes,
+                max_gross_score=max_gross_score,
+            )
+
+            # Update validity for this hole
+            hole_response.is_valid = (
+                hole_response.gross_score > 0
+                and hole_response.gross_score <= hole_response.max_gross_score
+            )
+
+            # Add hole to round response
+            round_response.holes.append(hole_response)
+
+        # Update validity for this round
+        round_response.is_valid = all([hole.is_valid for hole in round_response.holes])
+        round_responses.append(round_response)
 
-    # Update validity for this round and return
-    round_response.is_valid = all([hole.is_valid for hole in round_response.holes])
-    return round_response
+    return round_responses
 
 
 def validate_match(match: MatchValidationRequest) -> MatchValidationResponse:
@@ -0,0 +1,114 @@
+"""
+Startup
+
+Helpers for fast application startup: checking whether the database schema
+is already at the latest Alembic revision (so `create_all` can be skipped),
+and timing startup phases.
+
+Modules loaded at startup import numpy within the functions that use it, as
+importing it would dominate startup time. `python -X importtime -c "import
+app.api"` should not list numpy.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy.engine import Engine
+
+from app.utilities import metrics
+
+ALEMBIC_CONFIG_FILENAME = "alembic.ini"
+
+startup_phase_seconds = metrics.registry.gauge(
+    "app_startup_phase_seconds",
+    "Duration of application startup phases in seconds",
+    labels=("phase",),
+)
+
+
+def find_alembic_config() -> Path | None:
+    """
+    Locates Alembic configuration in the working directory or above the app package.
+    """
+    candidates = [Path.cwd() / ALEMBIC_CONFIG_FILENAME] + [
+        parent / ALEMBIC_CONFIG_FILENAME for parent in Path(__file__).parents
+    ]
+    return next((path for path in candidates if path.is_file()), None)
+
+
+def is_schema_current(engine: Engine, config_path: Path | None = None) -> bool:
+    """
+    Checks if the database is at the head revision(s) of the Alembic migrations.
+
+    Parameters
+    ----------
+    engine : Engine
+        database engine
+    config_path : Path, optional
+        Alembic configuration file. Default: None, searched for
+
+    Returns
+    -------
+    is_current : bool
+        true if the database revision matches the migration head(s), false
+        if it differs or cannot be determined
+
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    config_path = config_path or find_alembic_config()
+    if config_path is None:
+        logger.warning("Alembic configuration not found, unable to check schema")
+        return False
+
+    script_heads = set(ScriptDirectory.from_config(Config(config_path)).get_heads())
+    with engine.connect() as connection:
+        database_heads = set(MigrationContext.configure(connection).get_current_heads())
+    if database_heads != script_heads:
+        logger.warning(
+            "Database revision {} does not match migration head {}",
+            ", ".join(sorted(database_heads)) or "<none>",
+            ", ".join(sorted(script_heads)),
+        )
+        return False
+    return True
+
+
+class StartupTimer:
+    """
+    Records durations of startup phases and reports a breakdown.
+    """
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = time.perf_counter() - start
+
+    def report(self) -> None:
+        for name, duration in self.durations.items():
+            startup_phase_seconds.set(duration, phase=name)
+        logger.bind(
+            request_id=None,
+            startup_ms={
+                name: round(duration * 1000, 1)
+                for name, duration in self.durations.items()
+            },
+        ).info(
+            "Startup completed in {:.1f} ms ({})",
+            sum(self.durations.values()) * 1000,
+            ", ".join(
+                f"{name}: {duration * 1000:.1f} ms"
+                for name, duration in self.durations.items()
+            ),
+        )
@@ -0,0 +1,223 @@
+"""
+Tournament Leaderboard
+
+Incremental standings for a tournament in progress.
+
+The leaderboard keeps the hole scores posted by each team, the totals of each
+golfer and rankings of teams and golfers sorted by net score. Applying a posted
+round only recomputes the score of that round's team and golfer and moves them
+within the rankings, and standings are cached until the next round is applied,
+so refreshing standings does not depend on the number of rounds posted.
+
+Standings match `app.database.tournaments.get_standings` (without count-back),
+which rebuilds them from all rounds and serves as a consistency check.
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+from app.models.round import RoundResults
+from app.models.tournament import (
+    TournamentStandings,
+    TournamentStandingsGolfer,
+    TournamentStandingsTeam,
+    TournamentTeam,
+)
+
+
+def _remove_ranking(ranking: list[tuple[int, int]], key: tuple[int, int]) -> None:
+    idx = bisect_left(ranking, key)
+    if idx < len(ranking) and ranking[idx] == key:
+        del ranking[idx]
+
+
+def _get_positions(ranking: list[tuple[int, int]]) -> list[str]:
+    """Positions for a ranking sorted by score, prefixed with "T" if tied."""
+    positions = []
+    start = 0
+    for idx in range(len(ranking) + 1):
+        if idx == len(ranking) or ranking[idx][0] != ranking[start][0]:
+            size = idx - start
+            positions += [f"T{start + 1}" if size > 1 else f"{start + 1}"] * size
+            start = idx
+    return positions
+
+
+class TournamentLeaderboard:
+    """
+    Leaderboard for a tournament, updated as rounds are posted.
+
+    Parameters
+    ----------
+    tournament_id : int
+        tournament identifier
+    teams : list of TournamentTeam
+        teams signed up for the tournament
+    num_balls : int
+        number of lowest scores counted on each hole for team scores (one for
+        scramble), or zero if teams are not scored
+    individual : bool
+        if true, golfers are also scored individually
+
+    """
+
+    def __init__(
+        self,
+        tournament_id: int,
+        teams: list[TournamentTeam],
+        num_balls: int,
+        individual: bool,
+    ):
+        self.tournament_id = tournament_id
+        self.num_balls = num_balls
+        self.individual = individual
+        self._lock = threading.Lock()
+        self._rounds: dict[int, RoundResults] = {}
+        self._teams = teams
+        self._team_idx = {team.team_id: idx for idx, team in enumerate(teams)}
+        # Hole scores posted by each team: hole number -> round -> (gross, net)
+        self._team_holes: list[dict[int, dict[int, tuple[int, int]]]] = [
+            {} for _ in teams
+        ]
+        self._team_scores: dict[int, tuple[int, int]] = {}  # teams with scores
+        self._team_ranking: list[tuple[int, int]] = []  # (net score, team index)
+        self._golfer_rounds: dict[int, int] = {}
+        # Golfer totals: (name, gross score, net score, playing handicap)
+        self._golfer_scores: dict[int, tuple[str, int, int, int]] = {}
+        self._golfer_ranking: list[tuple[int, int]] = []  # (net score, golfer)
+        self._standings: TournamentStandings | None = None
+
+    @property
+    def num_rounds(self) -> int:
+        return len(self._rounds)
+
+    def apply_round(self, round_results: RoundResults) -> None:
+        """
+        Applies a posted round, replacing it if it was already applied.
+
+        Parameters
+        ----------
+        round_results : RoundResults
+            round results, including hole results
+
+        """
+        with self._lock:
+            previous = self._rounds.pop(round_results.round_id, None)
+            if previous is not None:
+                self._update_golfer(previous, sign=-1)
+                self._update_team_holes(previous, remove=True)
+            self._rounds[round_results.round_id] = round_results
+            self._update_golfer(round_results, sign=1)
+            self._update_team_holes(round_results, remove=False)
+            self._standings = None
+
+    def _update_team_holes(self, round_results: RoundResults, remove: bool) -> None:
+        team_idx = self._team_idx.get(round_results.team_id)
+        if self.num_balls <= 0 or team_idx is None:
+            return
+        team_holes = self._team_holes[team_idx]
+        for hole in round_results.holes:
+            entries = team_holes.setdefault(hole.number, {})
+            if remove:
+                entries.pop(round_results.round_id, None)
+                if not entries:
+                    del team_holes[hole.number]
+            else:
+                entries[round_results.round_id] = (hole.gross_score, hole.net_score)
+
+        # Recompute team score and move team within ranking
+        previous = self._team_scores.pop(team_idx, None)
+        if previous is not None:
+            _remove_ranking(self._team_ranking, (previous[1], team_idx))
+        if team_holes:
+            scores = (
+                sum(
+                    sum(
+                        sorted(entry[idx] for entry in entries.values())[
+                            : self.num_balls
+                        ]
+                    )
+                    for entries in team_holes.values()
+                )
+                for idx in (0, 1)
+            )
+            self._team_scores[team_idx] = tuple(scores)
+            insort(self._team_ranking, (self._team_scores[team_idx][1], team_idx))
+
+    def _update_golfer(self, round_results: RoundResults, sign: int) -> None:
+        golfer_id = round_results.golfer_id
+        name, gross_score, net_score, playing_handicap = self._golfer_scores.pop(
+            golfer_id, (round_results.golfer_name, 0, 0, 0)
+        )
+        _remove_ranking(self._golfer_ranking, (net_score, golfer_id))
+        self._golfer_rounds[golfer_id] = self._golfer_rounds.get(golfer_id, 0) + sign
+        if self._golfer_rounds[golfer_id] == 0:
+            del self._golfer_rounds[golfer_id]
+            return
+        net_score += sign * round_results.net_score
+        self._golfer_scores[golfer_id] = (
+            name,
+            gross_score + sign * round_results.gross_score,
+            net_score,
+            playing_handicap + sign * (round_results.golfer_playing_handicap or 0),
+        )
+        insort(self._golfer_ranking, (net_score, golfer_id))
+
+    def get_standings(self) -> TournamentStandings:
+        """
+        Gets tournament standings, sorted by net score.
+
+        Returns
+        -------
+        standings : TournamentStandings
+            team and golfer standings, shared until the next round is applied
+
+        """
+        with self._lock:
+            if self._standings is None:
+                self._standings = self._build_standings()
+            return self._standings
+
+    def _build_standings(self) -> TournamentStandings:
+        standings = TournamentStandings(tournament_id=self.tournament_id)
+        if self.num_balls > 0:
+            for (net_score, team_idx), position in zip(
+                self._team_ranking, _get_positions(self._team_ranking)
+            ):
+                standings.teams.append(
+                    TournamentStandingsTeam(
+                        team_id=self._teams[team_idx].team_id,
+                        team_name=self._teams[team_idx].name,
+                        gross_score=self._team_scores[team_idx][0],
+                        net_score=net_score,
+                        position=position,
+                    )
+                )
+            # Teams without scores are listed last, without position
+            for team_idx, team in enumerate(self._teams):
+                if team_idx in self._team_scores:
+                    continue
+                standings.teams.append(
+                    TournamentStandingsTeam(
+                        team_id=team.team_id,
+                        team_name=team.name,
+                        gross_score=0,
+                        net_score=0,
+                    )
+                )
+        if self.individual:
+            for (net_score, golfer_id), position in zip(
+                self._golfer_ranking, _get_positions(self._golfer_ranking)
+            ):
+                name, gross_score, _, playing_handicap = self._golfer_scores[golfer_id]
+                standings.golfers.append(
+                    TournamentStandingsGolfer(
+                        golfer_id=golfer_id,
+                        golfer_name=name,
+                        golfer_playing_handicap=playing_handicap,
+                        gross_score=gross_score,
+                        net_score=net_score,
+                        position=position,
+                    )
+                )
+        return standings
@@ -0,0 +1,172 @@
+"""
+Tournament Scoring
+
+Vectorized scoring for tournament leaderboards.
+
+Hole scores are arranged in a score matrix (team or golfer x entry x hole, with
+NaN for missing scores), so best-ball and scramble team scores are a partial
+sort along the entry axis and a sum along the hole axis. Leaderboards are sorted
+by total score, optionally breaking ties by count-back (back nine, back six,
+back three and last hole), with tied entries sharing a "T" position.
+"""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Holes compared for count-back tie-breaks, from the last hole played
+COUNT_BACK_HOLES = (9, 6, 3, 1)
+
+
+def build_score_matrix(
+    group_idx: "np.ndarray",
+    hole_idx: "np.ndarray",
+    scores: "np.ndarray",
+    num_groups: int,
+    num_holes: int,
+) -> "np.ndarray":
+    """
+    Arranges hole scores in a score matrix.
+
+    Parameters
+    ----------
+    group_idx : np.ndarray
+        team (or golfer) index of each hole score
+    hole_idx : np.ndarray
+        hole index of each hole score
+    scores : np.ndarray
+        hole scores
+    num_groups : int
+        number of teams (or golfers)
+    num_holes : int
+        number of holes
+
+    Returns
+    -------
+    matrix : np.ndarray
+        hole scores by group, entry and hole (shape: groups x entries x holes),
+        where entries are the scores each group posted on a hole (one per
+        golfer), padded with NaN
+
+    """
+    import numpy as np
+
+    group_idx = np.asarray(group_idx, dtype=np.int64)
+    hole_idx = np.asarray(hole_idx, dtype=np.int64)
+
+    # Entry of each score within its (group, hole) cell
+    cell = group_idx * num_holes + hole_idx
+    order = np.argsort(cell, kind="stable")
+    cell_sorted = cell[order]
+    is_first = np.ones(len(cell_sorted), dtype=bool)
+    is_first[1:] = cell_sorted[1:] != cell_sorted[:-1]
+    first_idx = np.maximum.accumulate(
+        np.where(is_first, np.arange(len(cell_sorted)), 0)
+    )
+    entry_idx = np.empty(len(cell), dtype=np.int64)
+    entry_idx[order] = np.arange(len(cell_sorted)) - first_idx
+
+    num_entries = int(entry_idx.max()) + 1 if len(entry_idx) else 1
+    matrix = np.full((num_groups, num_entries, num_holes), np.nan)
+    matrix[group_idx, entry_idx, hole_idx] = scores
+    return matrix
+
+
+def compute_best_ball_scores(matrix: "np.ndarray", num_balls: int) -> "np.ndarray":
+    """
+    Computes best-ball hole scores from a score matrix.
+
+    Parameters
+    ----------
+    matrix : np.ndarray
+        hole scores by group, entry and hole, see `build_score_matrix`
+    num_balls : int
+        number of lowest scores counted on each hole (one for scramble)
+
+    Returns
+    -------
+    hole_scores : np.ndarray
+        sum of the lowest `num_balls` scores on each hole (or of all scores if
+        fewer were posted, zero if none) by group and hole
+
+    """
+    import numpy as np
+
+    num_balls = min(num_balls, matrix.shape[1])
+    if num_balls < matrix.shape[1]:
+        # Partial sort, missing scores (NaN) are placed last
+        matrix = np.partition(matrix, num_balls - 1, axis=1)
+    return np.nansum(matrix[:, :num_balls, :], axis=1)
+
+
+def get_count_back_keys(hole_scores: "np.ndarray") -> "np.ndarray":
+    """
+    Computes count-back tie-break keys from hole scores.
+
+    Parameters
+    ----------
+    hole_scores : np.ndarray
+        hole scores by group and hole, with holes in order played
+
+    Returns
+    -------
+    keys : np.ndarray
+        scores over the last 9, 6, 3 and 1 holes by group
+
+    """
+    import numpy as np
+
+    return np.stack(
+        [
+            np.nansum(hole_scores[:, -num_holes:], axis=1)
+            for num_holes in COUNT_BACK_HOLES
+        ],
+        axis=1,
+    ).reshape(len(hole_scores), len(COUNT_BACK_HOLES))
+
+
+def rank_scores(
+    scores: "np.ndarray", tie_breaks: "np.ndarray | None" = None
+) -> tuple[list[int], list[str]]:
+    """
+    Sorts a leaderboard and determines positions (lower scores are better).
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        total score of each entry
+    tie_breaks : np.ndarray, optional
+        tie-break keys of each entry (shape: entries x keys), compared in order
+        when scores are tied, e.g. count-back keys
+        Default: None, tied entries share a position
+
+    Returns
+    -------
+    order : list of int
+        entry indexes, in leaderboard order
+    positions : list of str
+        position of each entry in leaderboard order, prefixed with "T" if tied
+
+    """
+    import numpy as np
+
+    keys = np.asarray(scores, dtype=np.float64).reshape(-1, 1)
+    if tie_breaks is not None:
+        keys = np.hstack([keys, np.asarray(tie_breaks, dtype=np.float64)])
+    order = np.lexsort(keys.T[::-1], axis=0)
+    sorted_keys = keys[order]
+
+    # Position of first entry in each group of tied entries
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    group_idx = np.cumsum(is_first) - 1
+    group_start = np.flatnonzero(is_first)
+    group_size = np.diff(np.append(group_start, len(order)))
+    positions = [
+        f"T{start + 1}" if size > 1 else f"{start + 1}"
+        for start, size in zip(
+            group_start[group_idx].tolist(), group_size[group_idx].tolist()
+        )
+    ]
+    return order.tolist(), positions
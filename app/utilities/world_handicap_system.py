@@ -1,9 +1,10 @@
-from typing import List
-
-import numpy as np
+from typing import TYPE_CHECKING, List
 
 from app.utilities.handicap_system import HandicapSystem
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class WorldHandicapSystem(HandicapSystem):
     """
@@ -59,11 +60,15 @@ class WorldHandicapSystem(HandicapSystem):
         playing_conditions_correction: float = 0.0,
     ):
         # Reference: USGA 2020 RoH 5.1
+        import numpy as np
+
         score_diff = (113 / slope) * (score - rating - playing_conditions_correction)
         return np.round(score_diff, 1)  # round to nearest tenth
 
     def compute_handicap_index(self, record: List[float]) -> float:
         # Reference: USGA 2020 RoH 5.2, 5.3, 5.8
+        import numpy as np
+
         record_sorted = np.sort(record)
         if len(record_sorted) < 4:
             handicap_index = record_sorted[0] - 2.0
@@ -87,7 +92,7 @@ class WorldHandicapSystem(HandicapSystem):
             handicap_index = np.mean(record_sorted[0:7])
         else:
             handicap_index = np.mean(record_sorted[0:8])
-        # TODO: Add soft/hard cap logic, see USGA 2020 RoH 5.8
+        # Note: soft/hard caps depend on scoring history, see `compute_capped_handicap_index`
         return np.round(
             min(handicap_index, self.maximum_handicap_index), 1
         )  # round to nearest tenth
@@ -96,3 +101,121 @@ class WorldHandicapSystem(HandicapSystem):
     def maximum_handicap_index(self) -> float:
         # Reference: USGA 2020 RoH 5.3
         return 54.0
+
+    @property
+    def scoring_record_size(self) -> int:
+        # Reference: USGA 2020 RoH 5.2
+        return 20
+
+    @property
+    def low_handicap_index_period(self) -> int:
+        # Reference: USGA 2020 RoH 5.7, in days
+        return 365
+
+    def compute_capped_handicap_index(
+        self, handicap_index: float, low_handicap_index: float | None
+    ) -> float:
+        """
+        Limits an increase of a handicap index above the low handicap index.
+
+        Increases of more than 3.0 strokes are reduced by half (soft cap), and
+        limited to 5.0 strokes (hard cap).
+
+        Parameters
+        ----------
+        handicap_index : float
+            handicap index computed from scoring record
+        low_handicap_index : float | None
+            lowest handicap index in the period before the most recent score,
+            or None if not established
+
+        Returns
+        -------
+        handicap_index : float
+            capped handicap index
+
+        """
+        # Reference: USGA 2020 RoH 5.8
+        if low_handicap_index is None:
+            return handicap_index
+        increase = handicap_index - low_handicap_index
+        if increase > 3.0:  # soft cap
+            increase = 3.0 + (increase - 3.0) / 2.0
+        increase = min(increase, 5.0)  # hard cap
+        return round(low_handicap_index + increase, 1)
+
+    def compute_exceptional_score_reduction(
+        self, score_differential: float, handicap_index: float | None
+    ) -> float:
+        """
+        Computes reduction for an exceptional score.
+
+        The reduction is applied to the score differentials in the scoring
+        record when the exceptional score is posted.
+
+        Parameters
+        ----------
+        score_differential : float
+            score differential of posted score
+        handicap_index : float | None
+            golfer's handicap index when the round was played, or None if not
+            established
+
+        Returns
+        -------
+        reduction : float
+            reduction of score differentials (zero if not exceptional)
+
+        """
+        # Reference: USGA 2020 RoH 5.9
+        if handicap_index is None:
+            return 0.0
+        difference = round(handicap_index - score_differential, 1)
+        if difference >= 10.0:
+            return 2.0
+        if difference >= 7.0:
+            return 1.0
+        return 0.0
+
+    @property
+    def minimum_playing_conditions_scores(self) -> int:
+        # Reference: USGA 2020 RoH 5.6, in acceptable scores on course and day
+        return 8
+
+    @property
+    def expected_net_score_over_par(self) -> float:
+        # Typical score above course handicap, as handicap index uses best scores
+        return 3.0
+
+    def compute_playing_conditions_correction(
+        self, net_scores_over_par: "np.ndarray"
+    ) -> float:
+        """
+        Computes playing conditions correction for a course and day.
+
+        Note: USGA does not publish the exact calculation, this corrects by how
+        much the median golfer's score differs from expected (their course
+        handicap over par, plus `expected_net_score_over_par`), rounded to the
+        nearest stroke.
+
+        Parameters
+        ----------
+        net_scores_over_par : np.ndarray
+            adjusted gross scores less par and playing handicap, for acceptable
+            scores on the course and day
+
+        Returns
+        -------
+        playing_conditions_correction : float
+            correction in strokes, in range [-1.0, 3.0]
+
+        """
+        # Reference: USGA 2020 RoH 5.6
+        import numpy as np
+
+        if len(net_scores_over_par) < self.minimum_playing_conditions_scores:
+            return 0.0
+        correction = np.round(
+            np.median(net_scores_over_par) - self.expected_net_score_over_par
+        )
+        return float(np.clip(correction, -1.0, 3.0)) + 0.0  # no negative zero
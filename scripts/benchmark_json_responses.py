@@ -0,0 +1,192 @@
+r"""
+Benchmark for JSON response serialization
+
+Compares serialization time of a synthetic full-season tournament payload
+(`TournamentData`: teams -> rounds -> holes) on the standard FastAPI response
+path (convert to dict, re-validate against response model, stdlib JSON
+encoding) and the fast response path (`FastJSONResponse`, orjson).
+
+Usage
+-----
+python -m scripts.benchmark_json_responses [--teams 48] [--rounds 4] [--repeat 20]
+
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.division import DivisionData
+from app.models.hole_result import HoleResultData
+from app.models.query_helpers import GolferTeamData, TournamentData, TournamentTeamData
+from app.models.round import RoundResults, RoundType
+from app.models.tee import TeeGender
+from app.utilities.responses import FastJSONResponse
+
+NUM_HOLES = 18
+GOLFERS_PER_TEAM = 4
+
+
+def build_tournament_data(num_teams: int, num_rounds: int) -> TournamentData:
+    divisions = [
+        DivisionData(
+            id=division_id,
+            tournament_id=1,
+            name=f"Division {division_id}",
+            gender=TeeGender.MENS if division_id % 2 else TeeGender.LADIES,
+            primary_track_id=1,
+            primary_track_name="Front",
+            primary_tee_id=division_id,
+            primary_tee_name="Blue",
+            primary_tee_par=72,
+            primary_tee_rating=71.3,
+            primary_tee_slope=128,
+            secondary_track_id=2,
+            secondary_track_name="Back",
+            secondary_tee_id=division_id + 10,
+            secondary_tee_name="Blue",
+            secondary_tee_par=72,
+            secondary_tee_rating=71.3,
+            secondary_tee_slope=128,
+        )
+        for division_id in range(1, 5)
+    ]
+
+    teams = []
+    round_id = 0
+    for team_id in range(1, num_teams + 1):
+        golfers = [
+            GolferTeamData(
+                team_id=team_id,
+                golfer_id=team_id * GOLFERS_PER_TEAM + idx,
+                golfer_name=f"Golfer {team_id}-{idx}",
+                golfer_email=f"golfer{team_id}-{idx}@example.com",
+                division_id=divisions[idx % len(divisions)].id,
+                division_name=divisions[idx % len(divisions)].name,
+                tournament_id=1,
+                tournament_name="Season Tournament",
+                team_name=f"Team {team_id}",
+                role="Captain" if idx == 0 else "Player",
+                year=2024,
+            )
+            for idx in range(GOLFERS_PER_TEAM)
+        ]
+        rounds = []
+        for golfer in golfers:
+            for round_idx in range(num_rounds):
+                round_id += 1
+                date_played = datetime(2024, 4, 1, 8) + timedelta(weeks=round_idx)
+                rounds.append(
+                    RoundResults(
+                        round_id=round_id,
+                        team_id=team_id,
+                        round_type=RoundType.TOURNAMENT,
+                        date_played=date_played,
+                        date_updated=date_played + timedelta(hours=5),
+                        golfer_id=golfer.golfer_id,
+                        golfer_name=golfer.golfer_name,
+                        golfer_playing_handicap=12,
+                        team_name=golfer.team_name,
+                        course_id=1,
+                        course_name="Course",
+                        track_id=1,
+                        track_name="Front",
+                        tee_id=1,
+                        tee_name="Blue",
+                        tee_gender=TeeGender.MENS,
+                        tee_par=72,
+                        tee_rating=71.3,
+                        tee_slope=128,
+                        tee_color="Blue",
+                        gross_score=88,
+                        adjusted_gross_score=86,
+                        net_score=76,
+                        score_differential=13.1,
+                        holes=[
+                            HoleResultData(
+                                hole_result_id=round_id * NUM_HOLES + number,
+                                round_id=round_id,
+                                hole_id=number,
+                                number=number,
+                                par=4,
+                                yardage=380,
+                                stroke_index=number,
+                                handicap_strokes=1 if number <= 12 else 0,
+                                gross_score=5,
+                                adjusted_gross_score=5,
+                                net_score=4,
+                            )
+                            for number in range(1, NUM_HOLES + 1)
+                        ],
+                    )
+                )
+        teams.append(
+            TournamentTeamData(
+                id=team_id,
+                name=f"Team {team_id}",
+                year=2024,
+                tournament_id=1,
+                golfers=golfers,
+                rounds=rounds,
+            )
+        )
+
+    return TournamentData(
+        id=1,
+        year=2024,
+        name="Season Tournament",
+        date="2024-04-01",
+        course_id=1,
+        course="Course",
+        locked=True,
+        divisions=divisions,
+        teams=teams,
+        bestball=2,
+    )
+
+
+def render_standard(payload: TournamentData) -> bytes:
+    field = create_model_field(name="Response", type_=TournamentData)
+    content = asyncio.run(serialize_response(field=field, response_content=payload))
+    return JSONResponse(content).body
+
+
+def render_fast(payload: TournamentData) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def time_render(render, payload: TournamentData, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(payload)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--teams", type=int, default=48)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = build_tournament_data(num_teams=args.teams, num_rounds=args.rounds)
+    standard_body = render_standard(payload)
+    fast_body = render_fast(payload)
+    print(
+        f"Payload: {args.teams} teams, {len(payload.teams[0].rounds)} rounds per team,"
+        f" {len(standard_body) / 1024:.0f} KiB"
+    )
+    print(f"Identical output: {standard_body == fast_body}")
+
+    standard_time = time_render(render_standard, payload, args.repeat)
+    fast_time = time_render(render_fast, payload, args.repeat)
+    print(f"Standard response path: {standard_time * 1000:.1f} ms")
+    print(f"Fast response path:     {fast_time * 1000:.1f} ms")
+    print(f"Speedup: {standard_time / fast_time:.1f}x")
@@ -0,0 +1,96 @@
+r"""
+Benchmark for match schedule generation
+
+Times `generate_schedule` for a range of team counts, reports the rate at which
+candidate schedules are evaluated and compares schedule-quality scores with the
+pre-defined matchup matrices used by `initialize_matches_for_flight`.
+
+Usage
+-----
+python -m scripts.benchmark_match_schedule [--weeks 18] [--min-teams 4] [--max-teams 16] [--repeat 3]
+
+"""
+
+import argparse
+import random
+import time
+
+from app.tasks.matches import MATCHUP_MATRICES, get_schedule_from_matchup_matrix
+from app.utilities.match_schedule import (
+    _build_schedule,
+    generate_schedule,
+    get_round_robin_rounds,
+    score_schedule,
+)
+
+# League off weeks in pre-defined matchup matrices for even numbers of teams
+PREDEFINED_OFF_WEEKS = [7, 12]
+
+
+def time_candidates(num_teams: int, num_weeks: int, num_candidates: int) -> float:
+    """Returns candidate schedules built and scored per second."""
+    rng = random.Random(0)
+    rounds = get_round_robin_rounds(num_teams)
+    play_weeks = list(range(num_weeks))
+    num_cycles = -(-num_weeks // len(rounds))
+    candidates = []
+    for _ in range(num_candidates):
+        slots = rng.sample(range(num_teams), num_teams)
+        orders = [
+            rng.sample(range(len(rounds)), len(rounds)) for _ in range(num_cycles)
+        ]
+        candidates.append((slots, orders))
+
+    start = time.perf_counter()
+    for slots, orders in candidates:
+        schedule = _build_schedule(
+            rounds=rounds,
+            slots=slots,
+            orders=orders,
+            num_teams=num_teams,
+            num_weeks=num_weeks,
+            play_weeks=play_weeks,
+            bye_weeks={},
+        )
+        score_schedule(schedule, num_teams)
+    return num_candidates / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--weeks", type=int, default=18)
+    parser.add_argument("--min-teams", type=int, default=4)
+    parser.add_argument("--max-teams", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'Teams':>5} {'Time (ms)':>10} {'Candidates/s':>13} {'Score':>7} {'Pre-defined':>12}"
+    )
+    for num_teams in range(args.min_teams, args.max_teams + 1):
+        predefined = MATCHUP_MATRICES.get((args.weeks, num_teams))
+        off_weeks = (
+            PREDEFINED_OFF_WEEKS
+            if predefined is not None
+            and not any(predefined[PREDEFINED_OFF_WEEKS[0] - 1])
+            else None
+        )
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            schedule = generate_schedule(
+                num_teams=num_teams, num_weeks=args.weeks, off_weeks=off_weeks
+            )
+            times.append(time.perf_counter() - start)
+
+        predefined_score = (
+            f"{score_schedule(get_schedule_from_matchup_matrix(predefined), num_teams):.0f}"
+            if predefined is not None
+            else "-"
+        )
+        print(
+            f"{num_teams:>5} {min(times) * 1000:>10.1f}"
+            f" {time_candidates(num_teams, args.weeks, 500):>13.0f}"
+            f" {score_schedule(schedule, num_teams):>7.0f} {predefined_score:>12}"
+        )
@@ -0,0 +1,102 @@
+r"""
+Benchmark for tournament team scoring
+
+Compares best-ball scoring of a synthetic shotgun tournament computed per team
+and hole by rescanning round results (previous `get_standings` approach) and
+with a team x golfer x hole score matrix (`app.utilities.tournament_scoring`),
+including sorting the leaderboard with count-back.
+
+Usage
+-----
+python -m scripts.benchmark_tournament_scoring [--teams 36] [--golfers 4] [--balls 2] [--repeat 5]
+
+"""
+
+import argparse
+import time
+from random import Random
+
+import numpy as np
+
+from app.utilities.tournament_scoring import (
+    build_score_matrix,
+    compute_best_ball_scores,
+    get_count_back_keys,
+    rank_scores,
+)
+
+NUM_HOLES = 18
+
+
+def build_hole_scores(num_teams: int, num_golfers: int) -> list[tuple[int, int, int]]:
+    rng = Random(0)
+    return [
+        (team, hole, rng.randint(3, 8))
+        for team in range(num_teams)
+        for _ in range(num_golfers)
+        for hole in range(1, NUM_HOLES + 1)
+    ]
+
+
+def score_per_team(
+    hole_scores: list[tuple[int, int, int]], num_teams: int, num_balls: int
+) -> list[int]:
+    team_scores = []
+    for team in range(num_teams):
+        team_rounds = [h for h in hole_scores if h[0] == team]
+        score = 0
+        for hole in sorted({h[1] for h in team_rounds}):
+            scores = [s for _, number, s in team_rounds if number == hole]
+            score += sum(sorted(scores)[:num_balls])
+        team_scores.append(score)
+    return sorted(team_scores)
+
+
+def score_matrix(
+    hole_scores: list[tuple[int, int, int]], num_teams: int, num_balls: int
+) -> list[int]:
+    team_idx, hole_numbers, scores = np.array(hole_scores).T
+    holes, hole_idx = np.unique(hole_numbers, return_inverse=True)
+    team_hole_scores = compute_best_ball_scores(
+        build_score_matrix(team_idx, hole_idx, scores, num_teams, len(holes)),
+        num_balls=num_balls,
+    )
+    team_scores = team_hole_scores.sum(axis=1)
+    order, _ = rank_scores(
+        team_scores, tie_breaks=get_count_back_keys(team_hole_scores)
+    )
+    return team_scores[order].astype(int).tolist()
+
+
+def time_scoring(score, hole_scores, num_teams: int, num_balls: int, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = score(hole_scores, num_teams, num_balls)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--teams", type=int, default=36)
+    parser.add_argument("--golfers", type=int, default=4)
+    parser.add_argument("--balls", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    hole_scores = build_hole_scores(num_teams=args.teams, num_golfers=args.golfers)
+    print(
+        f"Tournament: {args.teams} teams, {args.golfers} golfers per team,"
+        f" {len(hole_scores)} hole scores, best {args.balls} balls"
+    )
+    per_team_time, per_team_scores = time_scoring(
+        score_per_team, hole_scores, args.teams, args.balls, args.repeat
+    )
+    matrix_time, matrix_scores = time_scoring(
+        score_matrix, hole_scores, args.teams, args.balls, args.repeat
+    )
+    print(f"Identical scores: {per_team_scores == matrix_scores}")
+    print(f"Per-team rescans: {per_team_time * 1000:.1f} ms")
+    print(f"Score matrix:     {matrix_time * 1000:.1f} ms")
+    print(f"Speedup: {per_team_time / matrix_time:.1f}x")
@@ -1,11 +1,23 @@
+import json
 from datetime import datetime, timedelta
 from random import random
 
 import pytest
-from sqlmodel import Session
+from sqlmodel import Session, func, select
 
 from app.database import handicaps as db_handicap
-from app.models.handicap import HandicapIndex
+from app.models.course import Course
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.handicap import GolferHandicapState, HandicapIndex
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.round import Round, RoundType, ScoringType
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.tee import Tee, TeeGender
+from app.models.track import Track
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.handicap_index_state import HandicapIndexState
+from tests.utilities import assert_max_queries
 
 
 def generate_random_number(min_value: float = -5, max_value: float = 36):
@@ -44,3 +56,171 @@ def test_get_handicap_history_for_golfer(session: Session, num_rounds: int):
     for hcp in handicaps:
         assert hcp.date_posted in [hcp_db.date_posted for hcp_db in handicaps_db]
         assert hcp.handicap_index in [hcp_db.handicap_index for hcp_db in handicaps_db]
+
+
+def add_rounds(
+    session: Session, golfer: Golfer, hole: Hole, scores: list[tuple[datetime, int]]
+):
+    """Adds individual rounds for golfer, with the given adjusted gross scores."""
+    for date_played, adjusted_gross_score in scores:
+        round_db = Round(
+            tee_id=hole.tee_id,
+            type=RoundType.FLIGHT,
+            scoring_type=ScoringType.INDIVIDUAL,
+            date_played=date_played,
+            date_updated=date_played,
+        )
+        session.add(round_db)
+        session.commit()
+        session.add(
+            RoundGolferLink(
+                round_id=round_db.id, golfer_id=golfer.id, playing_handicap=10
+            )
+        )
+        session.add(
+            HoleResult(
+                round_id=round_db.id,
+                hole_id=hole.id,
+                handicap_strokes=0,
+                gross_score=adjusted_gross_score,
+                adjusted_gross_score=adjusted_gross_score,
+                net_score=adjusted_gross_score,
+            )
+        )
+    session.commit()
+
+
+def test_update_handicap_states(session: Session):
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=track)
+    golfer = Golfer(name="Test Golfer", affiliation=GolferAffiliation.APL_EMPLOYEE)
+    session.add_all([course, track, tee, golfer])
+    session.commit()
+    hole = Hole(tee_id=tee.id, number=1, par=36, stroke_index=1)
+    session.add(hole)
+    session.commit()
+
+    scores = [
+        (datetime(2023, 5, 2, 17) + timedelta(weeks=week), 40 + (3 * week) % 11)
+        for week in range(24)
+    ]
+    add_rounds(session, golfer, hole, scores[:16])
+    assert db_handicap.get_handicap_state(session, golfer.id) is None
+
+    db_handicap.update_handicap_states(session)
+    assert db_handicap.get_handicap_state(session, golfer.id).num_scores == 16
+
+    # Only rounds played since last update are posted
+    add_rounds(session, golfer, hole, scores[16:])
+    with assert_max_queries(6):
+        (state_db,) = db_handicap.update_handicap_states(
+            session, golfer_ids=[golfer.id]
+        )
+    assert db_handicap.update_handicap_states(session) == []
+
+    ahs = APLHandicapSystem()
+    state = HandicapIndexState()
+    for date_played, adjusted_gross_score in scores:
+        state.post_score(
+            date_played=date_played,
+            score_differential=ahs.compute_score_differential(
+                rating=tee.rating, slope=tee.slope, score=adjusted_gross_score
+            ),
+            handicap_system=ahs,
+        )
+    handicap_state = db_handicap.get_handicap_state(session, golfer.id)
+    assert handicap_state.round_id == state_db.round_id
+    assert handicap_state.date_played == scores[-1][0]
+    assert handicap_state.num_scores == len(scores)
+    assert handicap_state.handicap_index == state.handicap_index
+    assert handicap_state.low_handicap_index == state.low_handicap_index
+    assert handicap_state.score_differentials == state.score_differentials
+
+    # Rebuilding state from all rounds gives the same result
+    db_handicap.update_handicap_states(session, rebuild=True)
+    assert session.get(GolferHandicapState, golfer.id).state == json.loads(state.json())
+
+
+def test_rebuild_handicap_states(session: Session):
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=track)
+    golfer = Golfer(name="Test Golfer", affiliation=GolferAffiliation.APL_EMPLOYEE)
+    session.add_all([course, track, tee, golfer])
+    session.commit()
+    hole = Hole(tee_id=tee.id, number=1, par=36, stroke_index=1)
+    session.add(hole)
+    session.commit()
+
+    scores = [
+        (datetime(2023, 5, 2, 17) + timedelta(weeks=week), 40 + (3 * week) % 11)
+        for week in range(14)
+    ]
+    add_rounds(session, golfer, hole, scores[:5] + scores[6:12])
+    db_handicap.update_handicap_states(session)
+    add_rounds(session, golfer, hole, scores[12:])  # not yet posted
+
+    # States posted before the changed date are not rebuilt
+    assert (
+        db_handicap.rebuild_handicap_states(
+            session, golfer_ids=[golfer.id], min_date=scores[11][0] + timedelta(days=1)
+        )
+        == []
+    )
+
+    # Late-entered round is included in rebuilt state, as if posted in order,
+    # without posting newer rounds
+    add_rounds(session, golfer, hole, scores[5:6])
+    (state_db,) = db_handicap.rebuild_handicap_states_for_rounds(
+        session, round_ids=[session.exec(select(func.max(Round.id))).one()]
+    )
+    assert state_db.date_played == scores[11][0]
+
+    ahs = APLHandicapSystem()
+    state = HandicapIndexState()
+    for date_played, adjusted_gross_score in scores[:12]:
+        state.post_score(
+            date_played=date_played,
+            score_differential=ahs.compute_score_differential(
+                rating=tee.rating, slope=tee.slope, score=adjusted_gross_score
+            ),
+            handicap_system=ahs,
+        )
+    assert session.get(GolferHandicapState, golfer.id).state == json.loads(state.json())
+
+
+@pytest.mark.parametrize("year", [2022, 2023, 2024, 2025])
+def test_get_scoring_record_rounds_for_golfer_year(session: Session, year: int):
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=track)
+    golfer = Golfer(name="Test Golfer", affiliation=GolferAffiliation.APL_EMPLOYEE)
+    session.add_all([course, track, tee, golfer])
+    session.commit()
+    hole = Hole(tee_id=tee.id, number=1, par=36, stroke_index=1)
+    session.add(hole)
+    session.commit()
+    add_rounds(
+        session,
+        golfer,
+        hole,
+        [
+            (datetime(2022, 5, 3, 17) + timedelta(weeks=week), 40 + (3 * week) % 11)
+            for week in list(range(6)) + list(range(52, 70)) + list(range(104, 108))
+        ],
+    )
+
+    # Rounds for a year match the full scoring record, filtered by year
+    scoring_record = db_handicap.get_scoring_record_rounds_for_golfer(
+        session, golfer_id=golfer.id
+    )
+    expected = [srr for srr in scoring_record if srr.date_played.year == year]
+    if len(expected) < 10:
+        expected = [srr for srr in scoring_record if srr.date_played.year <= year][-10:]
+    assert (
+        db_handicap.get_scoring_record_rounds_for_golfer(
+            session, golfer_id=golfer.id, year=year
+        )
+        == expected
+    )
@@ -0,0 +1,112 @@
+import hashlib
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session
+
+from app.database import snapshots as db_snapshots
+from app.models.flight import Flight
+from app.models.flight_team_link import FlightTeamLink
+from app.models.season import Season
+from app.models.substitute import Substitute
+from app.models.team_golfer_link import TeamGolferLink, TeamRole
+from app.models.tournament_team_link import TournamentTeamLink
+
+
+@pytest.fixture()
+def session_with_flights(session: Session):
+    session.add(Season(year=2024, is_active=True))
+    for id, year, locked in [(1, 2024, False), (2, 2024, True), (3, 2023, False)]:
+        session.add(
+            Flight(
+                id=id,
+                name=f"Test Flight {id}",
+                year=year,
+                secretary="Test Secretary",
+                signup_start_date=datetime(year, 3, 1),
+                signup_stop_date=datetime(year, 3, 15),
+                start_date=datetime(year, 4, 1),
+                weeks=18,
+                locked=locked,
+            )
+        )
+    session.commit()
+    yield session
+
+
+@pytest.mark.parametrize(
+    "flight_id, is_frozen", [(1, False), (2, True), (3, True), (99, False)]
+)
+def test_is_flight_frozen(session_with_flights, flight_id, is_frozen):
+    assert (
+        db_snapshots.is_flight_frozen(session_with_flights, flight_id=flight_id)
+        == is_frozen
+    )
+
+
+def test_put_snapshot(session: Session):
+    content = db_snapshots.render_content({"teams": [{"name": "Test Team"}]})
+    assert content == b'{"teams":[{"name":"Test Team"}]}'
+
+    snapshot_db = db_snapshots.put_snapshot(
+        session, key="/flights/standings/1", scope="flight:1", content=content
+    )
+    assert snapshot_db.digest == hashlib.sha256(content).hexdigest()
+    assert db_snapshots.get_snapshot(session, "/flights/standings/1") == snapshot_db
+
+    # Overwrites existing snapshot content
+    snapshot_db = db_snapshots.put_snapshot(
+        session, key="/flights/standings/1", scope="flight:1", content=b"[]"
+    )
+    assert snapshot_db.content == b"[]"
+    assert snapshot_db.digest == hashlib.sha256(b"[]").hexdigest()
+
+
+def test_delete_snapshots(session: Session):
+    for key, scope in [
+        ("/flights/standings/1", "flight:1"),
+        ("/flights/statistics/1", "flight:1"),
+        ("/flights/standings/2", "flight:2"),
+    ]:
+        db_snapshots.put_snapshot(session, key=key, scope=scope, content=b"{}")
+
+    db_snapshots.delete_snapshots(session, scope="flight:1")
+    session.expire_all()
+    assert db_snapshots.get_snapshot(session, "/flights/standings/1") is None
+    assert db_snapshots.get_snapshot(session, "/flights/statistics/1") is None
+    assert db_snapshots.get_snapshot(session, "/flights/standings/2") is not None
+
+
+def test_get_golfer_scopes(session: Session):
+    session.add(FlightTeamLink(flight_id=1, team_id=1))
+    session.add(TournamentTeamLink(tournament_id=2, team_id=2))
+    session.add(
+        TeamGolferLink(team_id=1, golfer_id=1, division_id=1, role=TeamRole.CAPTAIN)
+    )
+    session.add(
+        TeamGolferLink(team_id=2, golfer_id=1, division_id=1, role=TeamRole.PLAYER)
+    )
+    session.add(Substitute(golfer_id=2, flight_id=3, division_id=1))
+    session.commit()
+
+    assert db_snapshots.get_golfer_scopes(session, golfer_ids=[1]) == {
+        "flight:1",
+        "tournament:2",
+    }
+    assert db_snapshots.get_golfer_scopes(session, golfer_ids=[2]) == {"flight:3"}
+    assert db_snapshots.get_golfer_scopes(session, golfer_ids=[3]) == set()
+
+
+def test_delete_scopes(session: Session):
+    for key, scope in [
+        ("/flights/standings/1", "flight:1"),
+        ("/tournaments/standings/1", "tournament:1"),
+        ("/flights/standings/2", "flight:2"),
+    ]:
+        db_snapshots.put_snapshot(session, key=key, scope=scope, content=b"{}")
+
+    db_snapshots.delete_scopes(session, scopes={"flight:1", "tournament:1"})
+    session.expire_all()
+    assert db_snapshots.get_snapshot(session, "/flights/standings/1") is None
+    assert db_snapshots.get_snapshot(session, "/tournaments/standings/1") is None
+    assert db_snapshots.get_snapshot(session, "/flights/standings/2") is not None
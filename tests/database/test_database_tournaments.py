@@ -0,0 +1,258 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, select
+
+from app.database import snapshots as db_snapshots
+from app.database import tournaments as db_tournaments
+from app.models.course import Course
+from app.models.division import Division
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.round import Round, RoundType, ScoringType
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.team import Team
+from app.models.team_golfer_link import TeamGolferLink, TeamRole
+from app.models.tee import Tee, TeeGender
+from app.models.tournament import Tournament
+from app.models.tournament_round_link import TournamentRoundLink
+from app.models.track import Track
+from tests.utilities import assert_max_queries
+
+# Gross scores on each hole by team and golfer (third team has no rounds)
+GROSS_SCORES = [
+    [[4, 5, 3, 6], [5, 4, 4, 3]],  # best ball: 4 4 3 3 = 14
+    [[4, 4, 4, 4], [5, 5, 5, 5]],  # best ball: 16
+    None,
+]
+
+
+def add_round(
+    session: Session, tournament: Tournament, golfer_id: int, gross_scores: list[int]
+) -> int:
+    """Adds a tournament round with one handicap stroke on the first hole."""
+    holes = session.exec(select(Hole).order_by(Hole.number)).all()
+    round_db = Round(
+        tee_id=holes[0].tee_id,
+        type=RoundType.TOURNAMENT,
+        scoring_type=ScoringType.INDIVIDUAL,
+        date_played=tournament.date,
+        date_updated=tournament.date,
+    )
+    session.add(round_db)
+    session.commit()
+    session.add_all(
+        [
+            TournamentRoundLink(tournament_id=tournament.id, round_id=round_db.id),
+            RoundGolferLink(
+                round_id=round_db.id, golfer_id=golfer_id, playing_handicap=1
+            ),
+            *(
+                HoleResult(
+                    round_id=round_db.id,
+                    hole_id=hole.id,
+                    handicap_strokes=int(hole.number == 1),
+                    gross_score=gross_score,
+                    adjusted_gross_score=gross_score,
+                    net_score=gross_score - int(hole.number == 1),
+                )
+                for hole, gross_score in zip(holes, gross_scores)
+            ),
+        ]
+    )
+    session.commit()
+    return round_db.id
+
+
+@pytest.fixture
+def tournament(session: Session) -> Tournament:
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=track)
+    session.add_all([course, track, tee])
+    session.commit()
+    holes = [
+        Hole(tee_id=tee.id, number=number, par=4, stroke_index=number)
+        for number in range(1, 5)
+    ]
+    division = Division(
+        name="Middle",
+        gender=TeeGender.MENS,
+        primary_tee_id=tee.id,
+        secondary_tee_id=tee.id,
+    )
+    teams = [Team(name=f"Test Team {idx}") for idx in range(len(GROSS_SCORES))]
+    tournament = Tournament(
+        name="Test Tournament",
+        year=2024,
+        date=datetime(2024, 6, 8, 8),
+        signup_start_date=datetime(2024, 4, 1),
+        signup_stop_date=datetime(2024, 6, 1),
+        course_id=course.id,
+        secretary="Test Secretary",
+        bestball=1,
+        individual=True,
+        divisions=[division],
+        teams=teams,
+    )
+    session.add_all([*holes, division, *teams, tournament])
+    session.commit()
+
+    for team_idx, team in enumerate(teams):
+        for golfer_idx in range(2):
+            golfer = Golfer(
+                name=f"Test Golfer {team_idx}-{golfer_idx}",
+                affiliation=GolferAffiliation.APL_EMPLOYEE,
+            )
+            session.add(golfer)
+            session.commit()
+            session.add(
+                TeamGolferLink(
+                    team_id=team.id,
+                    golfer_id=golfer.id,
+                    division_id=division.id,
+                    role=TeamRole.PLAYER,
+                )
+            )
+            if GROSS_SCORES[team_idx] is None:
+                continue
+            add_round(
+                session, tournament, golfer.id, GROSS_SCORES[team_idx][golfer_idx]
+            )
+    session.commit()
+    return tournament
+
+
+def test_get_standings(session: Session, tournament: Tournament):
+    standings = db_tournaments.get_standings(
+        session=session, tournament_id=tournament.id
+    )
+
+    assert [
+        (t.team_name, t.gross_score, t.net_score, t.position) for t in standings.teams
+    ] == [
+        ("Test Team 0", 14, 13, "1"),
+        ("Test Team 1", 16, 15, "2"),
+        ("Test Team 2", 0, 0, ""),
+    ]
+    assert [
+        (g.golfer_name, g.net_score, g.golfer_playing_handicap, g.position)
+        for g in standings.golfers
+    ] == [
+        ("Test Golfer 0-1", 15, 1, "T1"),
+        ("Test Golfer 1-0", 15, 1, "T1"),
+        ("Test Golfer 0-0", 17, 1, "3"),
+        ("Test Golfer 1-1", 19, 1, "4"),
+    ]
+
+
+def test_get_standings_count_back(session: Session, tournament: Tournament):
+    standings = db_tournaments.get_standings(
+        session=session, tournament_id=tournament.id, count_back=True
+    )
+    assert [(g.golfer_name, g.position) for g in standings.golfers[:2]] == [
+        ("Test Golfer 0-1", "1"),  # back three holes: 11
+        ("Test Golfer 1-0", "2"),  # back three holes: 12
+    ]
+
+
+def test_leaderboard_standings(session: Session, tournament: Tournament):
+    db_tournaments.leaderboard_cache.clear()
+    tournament_id = tournament.id
+    standings = db_tournaments.get_leaderboard_standings(
+        session=session, tournament_id=tournament_id
+    )
+    assert (
+        standings.model_dump()
+        == db_tournaments.get_standings(
+            session=session, tournament_id=tournament_id
+        ).model_dump()
+    )
+
+    # Refreshes do not reload rounds
+    with assert_max_queries(0):
+        assert (
+            db_tournaments.get_leaderboard_standings(
+                session=session, tournament_id=tournament_id
+            )
+            is standings
+        )
+
+    # Posted rounds are applied to the leaderboard
+    team_id = standings.teams[-1].team_id
+    golfer_id = session.exec(
+        select(TeamGolferLink.golfer_id).where(TeamGolferLink.team_id == team_id)
+    ).first()
+    version = db_tournaments.get_standings_version(tournament_id)
+    round_id = add_round(session, tournament, golfer_id, [3, 4, 3, 3])
+    db_tournaments.apply_leaderboard_rounds(
+        session=session,
+        tournament_id=tournament_id,
+        round_ids=[round_id],
+        version=version,
+    )
+    with assert_max_queries(0):
+        standings = db_tournaments.get_leaderboard_standings(
+            session=session, tournament_id=tournament_id
+        )
+    assert [(t.team_name, t.net_score, t.position) for t in standings.teams] == [
+        ("Test Team 2", 12, "1"),
+        ("Test Team 0", 13, "2"),
+        ("Test Team 1", 15, "3"),
+    ]
+    assert db_tournaments.verify_leaderboard(
+        session=session, tournament_id=tournament_id
+    )
+
+
+def test_leaderboard_standings_rebuilt(session: Session, tournament: Tournament):
+    db_tournaments.leaderboard_cache.clear()
+    tournament_id = tournament.id
+    db_tournaments.get_leaderboard_standings(
+        session=session, tournament_id=tournament_id
+    )
+
+    # Leaderboard is kept if other tournaments' data is changed
+    db_snapshots.delete_snapshots(
+        session=session, scope=db_snapshots.get_tournament_scope(tournament_id + 1)
+    )
+    with assert_max_queries(0):
+        db_tournaments.get_leaderboard_standings(
+            session=session, tournament_id=tournament_id
+        )
+
+    # Leaderboard is rebuilt if rounds were changed without applying them
+    hole_result = session.exec(select(HoleResult).order_by(HoleResult.id)).first()
+    hole_result.net_score += 3
+    session.add(hole_result)
+    db_snapshots.delete_scopes(
+        session=session,
+        scopes=db_snapshots.get_round_scopes(
+            session=session, round_ids=[hole_result.round_id]
+        ),
+    )
+    golfer_id = session.exec(
+        select(RoundGolferLink.golfer_id).where(
+            RoundGolferLink.round_id == hole_result.round_id
+        )
+    ).one()
+    version = db_tournaments.get_standings_version(tournament_id)
+    round_id = add_round(session, tournament, golfer_id, [5, 5, 5, 5])
+    db_tournaments.apply_leaderboard_rounds(
+        session=session,
+        tournament_id=tournament_id,
+        round_ids=[round_id],
+        version=version,
+    )
+    assert db_tournaments.leaderboard_cache.get(tournament_id) is None
+    standings = db_tournaments.get_leaderboard_standings(
+        session=session, tournament_id=tournament_id
+    )
+    assert [(g.golfer_name, g.net_score) for g in standings.golfers[-2:]] == [
+        ("Test Golfer 1-1", 19),
+        ("Test Golfer 0-0", 39),
+    ]
+    assert db_tournaments.verify_leaderboard(
+        session=session, tournament_id=tournament_id
+    )
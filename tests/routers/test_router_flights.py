@@ -1,7 +1,8 @@
+import asyncio
 from datetime import datetime
 
 import pytest
-from fastapi import status
+from fastapi import Request, status
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
@@ -10,7 +11,11 @@ from app.models.division import Division
 from app.models.flight import Flight
 from app.models.flight_division_link import FlightDivisionLink
 from app.models.flight_team_link import FlightTeamLink
+from app.models.snapshot import ResponseSnapshot
 from app.models.team import Team
+from app.routers.utilities import get_flight_stream, live_event_response
+from app.utilities.live_events import live_events
+from tests.utilities import assert_max_queries
 
 
 @pytest.mark.parametrize(
@@ -322,6 +327,123 @@ def test_read_flight(session: Session, client_unauthorized: TestClient):
     assert len(data["teams"]) == 1
 
 
+def test_read_flights_query_budget(session: Session, client_unauthorized: TestClient):
+    for idx in range(3):
+        session.add(
+            Flight(
+                name=f"Test Flight {idx}",
+                year=2021,
+                secretary="Test Secretary",
+                signup_start_date=datetime(2021, 3, 1),
+                signup_stop_date=datetime(2021, 3, 15),
+                start_date=datetime(2021, 4, 1),
+                weeks=18,
+            )
+        )
+    session.commit()
+
+    # Flight ids, then flight, course and teams queries per flight
+    with assert_max_queries(1 + 3 * 3):
+        response = client_unauthorized.get("/flights/", params={"year": 2021})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 3
+
+
+def test_read_flight_conditional(session: Session, client_unauthorized: TestClient):
+    flight = Flight(
+        name="Test Flight 1",
+        year=2021,
+        secretary="Test Secretary",
+        signup_start_date=datetime(2021, 3, 1),
+        signup_stop_date=datetime(2021, 3, 15),
+        start_date=datetime(2021, 4, 1),
+        weeks=18,
+    )
+    session.add(flight)
+    session.commit()
+    session.refresh(flight)
+
+    response = client_unauthorized.get(f"/flights/{flight.id}")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+
+    response = client_unauthorized.get(
+        f"/flights/{flight.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    response = client_unauthorized.get(
+        f"/flights/{flight.id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Committed changes to flight data invalidate the cached copy
+    flight.name = "Test Flight 1 Updated"
+    session.add(flight)
+    session.commit()
+
+    response = client_unauthorized.get(
+        f"/flights/{flight.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["name"] == "Test Flight 1 Updated"
+
+
+def test_read_flight_standings_snapshot(session: Session, client_admin: TestClient):
+    flight = Flight(
+        name="Test Flight 1",
+        year=2021,
+        secretary="Test Secretary",
+        signup_start_date=datetime(2021, 3, 1),
+        signup_stop_date=datetime(2021, 3, 15),
+        start_date=datetime(2021, 4, 1),
+        weeks=18,
+        locked=True,
+    )
+    session.add(flight)
+    session.commit()
+    session.refresh(flight)
+
+    response = client_admin.get(f"/flights/standings/{flight.id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert "max-age" in response.headers["Cache-Control"]
+    assert response.json() == {"flight_id": flight.id, "teams": []}
+    assert session.get(ResponseSnapshot, f"/flights/standings/{flight.id}")
+
+    response = client_admin.get(
+        f"/flights/standings/{flight.id}",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Unlocking the flight invalidates its snapshots
+    response = client_admin.put(
+        f"/flights/{flight.id}",
+        json={
+            "id": flight.id,
+            "name": flight.name,
+            "year": flight.year,
+            "secretary": flight.secretary,
+            "signup_start_date": str(flight.signup_start_date),
+            "signup_stop_date": str(flight.signup_stop_date),
+            "start_date": str(flight.start_date),
+            "weeks": flight.weeks,
+            "locked": False,
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    session.expire_all()
+    assert session.get(ResponseSnapshot, f"/flights/standings/{flight.id}") is None
+
+    response = client_admin.get(f"/flights/standings/{flight.id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert "max-age" not in response.headers["Cache-Control"]
+
+
 def test_delete_flight(session: Session, client_admin: TestClient):
     flight = Flight(
         name="Test Flight 1",
@@ -429,3 +551,47 @@ def test_update_flight_divisions_sync(client_admin: TestClient, session: Session
     assert "Div B Updated" in division_names
     assert "Div C" in division_names
     assert len(links) == 2
+
+
+def test_get_live_results_not_found(client_unauthorized: TestClient):
+    response = client_unauthorized.get("/flights/live/999")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def read_live_event(stream: str, last_event_id: str | None = None) -> bytes:
+    """Reads first event streamed to a client of a live stream."""
+    headers = [(b"last-event-id", last_event_id.encode())] if last_event_id else []
+
+    async def run():
+        request = Request({"type": "http", "method": "GET", "headers": headers})
+        response = live_event_response(
+            request=request, stream=stream, event="standings", build=lambda: [1]
+        )
+        assert response.media_type == "text/event-stream"
+        chunk = await anext(response.body_iterator)
+        await response.body_iterator.aclose()
+        return chunk
+
+    return asyncio.run(run())
+
+
+def test_live_event_response():
+    stream = get_flight_stream(999)
+
+    # New clients are sent current data
+    event_id = live_events.get_last_event_id(stream)
+    assert read_live_event(stream) == (
+        f"id: {event_id}\nevent: standings\ndata: [1]\n\n".encode()
+    )
+
+    # Reconnecting clients are sent events missed since their last event
+    events = [live_events.publish(stream, "match", b"%d" % idx) for idx in range(2)]
+    assert read_live_event(stream, last_event_id=events[0].id) == events[1].encode()
+
+    # Unless missed events are not available
+    live_events.discard_history(stream)
+    event_id = live_events.get_last_event_id(stream)
+    assert read_live_event(stream, last_event_id=events[1].id) == (
+        f"id: {event_id}\nevent: standings\ndata: [1]\n\n".encode()
+    )
+    assert live_events.num_subscribers(stream) == 0
@@ -1,9 +1,24 @@
+from datetime import datetime
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
 
+from app.database.corrections import compute_match_score
+from app.models.course import Course
+from app.models.flight import Flight
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
 from app.models.match import Match
+from app.models.match_round_link import MatchRoundLink
+from app.models.round import Round
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.team import Team
+from app.models.tee import Tee, TeeGender
+from app.models.track import Track
+from tests.utilities import assert_max_queries
 
 
 @pytest.mark.parametrize(
@@ -175,3 +190,171 @@ def test_delete_match_unauthorized(session: Session, client_unauthorized: TestCl
 
     response = client_unauthorized.delete(f"/matches/{match.id}")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def add_match_data(session: Session) -> Match:
+    """Adds a match between two teams of two golfers, on a nine-hole tee."""
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=36.0, slope=120, track=track)
+    other_tee = Tee(
+        name="White", gender=TeeGender.MENS, rating=35.0, slope=115, track=track
+    )
+    session.add_all([course, track, tee, other_tee])
+    session.add_all(
+        Hole(number=number, par=4, stroke_index=number, tee=hole_tee)
+        for hole_tee in (tee, other_tee)
+        for number in range(1, 10)
+    )
+    flight = Flight(
+        name="Test Flight",
+        year=2024,
+        course=course,
+        secretary="Test Secretary",
+        signup_start_date=datetime(2024, 3, 1),
+        signup_stop_date=datetime(2024, 4, 1),
+        start_date=datetime(2024, 5, 1),
+        weeks=18,
+    )
+    teams = [Team(name="Test Team 1"), Team(name="Test Team 2")]
+    session.add_all([flight, *teams])
+    session.add_all(
+        Golfer(name=f"Test Golfer {idx}", affiliation=GolferAffiliation.APL_EMPLOYEE)
+        for idx in range(1, 5)
+    )
+    session.commit()
+
+    match = Match(
+        flight_id=flight.id,
+        week=1,
+        home_team_id=teams[0].id,
+        away_team_id=teams[1].id,
+    )
+    session.add(match)
+    session.commit()
+    return match
+
+
+def get_match_input(session: Session, match: Match) -> dict:
+    tee = session.exec(select(Tee).where(Tee.name == "Blue")).one()
+    golfers = session.exec(select(Golfer).order_by(Golfer.id)).all()
+    return {
+        "match_id": match.id,
+        "flight_id": match.flight_id,
+        "week": match.week,
+        "date_played": "2024-05-07T17:00:00",
+        "home_score": 7.5,
+        "away_score": 3.5,
+        "rounds": [
+            {
+                "team_id": match.home_team_id if idx < 2 else match.away_team_id,
+                "golfer_ids": [golfer.id],
+                "golfer_playing_handicap": 2 * idx,
+                "course_id": tee.track.course_id,
+                "track_id": tee.track_id,
+                "tee_id": tee.id,
+                "holes": [
+                    {"hole_id": hole.id, "gross_score": 4 + (hole.number % 3)}
+                    for hole in tee.holes
+                ],
+            }
+            for idx, golfer in enumerate(golfers)
+        ],
+    }
+
+
+def test_post_match_rounds(session: Session, client_admin: TestClient):
+    match = add_match_data(session)
+    match_input = get_match_input(session, match)
+
+    # Single transaction: query count does not grow with number of rounds or holes
+    with assert_max_queries(20):
+        response = client_admin.post("/matches/rounds", json=match_input)
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["match_id"] == match.id
+    assert data["home_score"] == 7.5
+    assert data["away_score"] == 3.5
+    assert len(data["rounds"]) == 4
+
+    rounds_db = session.exec(select(Round)).all()
+    assert len(rounds_db) == 4
+    assert len(session.exec(select(MatchRoundLink)).all()) == 4
+    round_golfer_links_db = session.exec(select(RoundGolferLink)).all()
+    assert sorted(link.playing_handicap for link in round_golfer_links_db) == [
+        0,
+        2,
+        4,
+        6,
+    ]
+
+    hole_results_db = session.exec(select(HoleResult)).all()
+    assert len(hole_results_db) == 4 * 9
+    for hole_result_db in hole_results_db:
+        assert hole_result_db.net_score == (
+            hole_result_db.gross_score - hole_result_db.handicap_strokes
+        )
+
+
+def test_post_match_rounds_error_rolls_back(session: Session, client_admin: TestClient):
+    match = add_match_data(session)
+    match_input = get_match_input(session, match)
+    other_tee = session.exec(select(Tee).where(Tee.name == "White")).one()
+    match_input["rounds"][-1]["holes"][-1]["hole_id"] = other_tee.holes[-1].id
+
+    response = client_admin.post("/matches/rounds", json=match_input)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert "not found for tee" in response.json()["detail"]
+
+    assert session.exec(select(Round)).all() == []
+    assert session.exec(select(HoleResult)).all() == []
+    session.refresh(match)
+    assert match.home_score is None
+
+
+@pytest.mark.parametrize("is_score_computed", [True, False])
+def test_correct_match_round(
+    session: Session, client_admin: TestClient, is_score_computed: bool
+):
+    match = add_match_data(session)
+    response = client_admin.post(
+        "/matches/rounds", json=get_match_input(session, match)
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    score_prior = compute_match_score(session, match_id=match.id)
+    if is_score_computed:
+        match.home_score, match.away_score = score_prior
+    else:  # entered score differs from computed score, e.g. a forfeit
+        match.home_score, match.away_score = (11.0, 0.0)
+    session.add(match)
+    session.commit()
+
+    away_round_golfer_link = session.exec(
+        select(RoundGolferLink).where(RoundGolferLink.playing_handicap == 6)
+    ).one()
+    response = client_admin.patch(
+        f"/rounds/{away_round_golfer_link.round_id}/correction",
+        json={"playing_handicap": 0},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    score = compute_match_score(session, match_id=match.id)
+    assert score[1] < score_prior[1]
+    session.refresh(match)
+    if is_score_computed:
+        assert (match.home_score, match.away_score) == score
+        assert response.json()["matches"] == [
+            {
+                "match_id": match.id,
+                "home_score_prior": score_prior[0],
+                "home_score": score[0],
+                "away_score_prior": score_prior[1],
+                "away_score": score[1],
+            }
+        ]
+    else:
+        assert (match.home_score, match.away_score) == (11.0, 0.0)
+        assert response.json()["matches"] == []
+    assert response.json()["snapshot_scopes"] == [f"flight:{match.flight_id}"]
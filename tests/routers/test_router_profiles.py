@@ -0,0 +1,105 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import dependencies
+from app.models.user import User
+from app.utilities.profiling import PROFILE_ID_HEADER, RequestProfiler
+
+AUTH_HEADERS = {"Authorization": "Bearer test-token"}
+
+
+@pytest.fixture(name="profiler")
+def profiler_fixture(monkeypatch):
+    profiler = RequestProfiler(min_interval=0, max_reports=2)
+    monkeypatch.setattr(dependencies, "request_profiler", profiler)
+    monkeypatch.setattr("app.routers.profiles.request_profiler", profiler)
+    return profiler
+
+
+def use_token_user(monkeypatch, user: User):
+    async def get_current_user(*, session, token):
+        return user
+
+    monkeypatch.setattr(dependencies, "get_current_user", get_current_user)
+
+
+def test_profile_request(
+    monkeypatch, profiler: RequestProfiler, client_admin: TestClient
+):
+    use_token_user(monkeypatch, User(username="admin", is_admin=True, disabled=False))
+
+    response = client_admin.get("/flights/", headers=AUTH_HEADERS)
+    assert response.status_code == status.HTTP_200_OK
+    assert PROFILE_ID_HEADER not in response.headers
+
+    response = client_admin.get(
+        "/flights/", params={"profile": "1"}, headers=AUTH_HEADERS
+    )
+    assert response.status_code == status.HTTP_200_OK
+    profile_id = response.headers[PROFILE_ID_HEADER]
+
+    response = client_admin.get("/profiles/")
+    assert response.status_code == status.HTTP_200_OK
+    assert [p["id"] for p in response.json()] == [profile_id]
+    assert "stats" not in response.json()[0]
+
+    response = client_admin.get(f"/profiles/{profile_id}")
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["username"] == "admin"
+    assert report["path"] == "/flights/"
+    assert report["sql_query_count"] >= 1
+    assert report["wall_time_ms"] >= report["sql_time_ms"]
+    assert "cumulative" in report["stats"]
+
+    # Only the most recent reports are kept
+    for _ in range(2):
+        client_admin.get("/flights/", headers={"X-Profile": "true", **AUTH_HEADERS})
+    assert len(profiler.get_reports()) == 2
+    response = client_admin.get(f"/profiles/{profile_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_profile_request_not_flagged(
+    monkeypatch, profiler: RequestProfiler, client_admin: TestClient
+):
+    async def get_current_user(*, session, token):
+        raise AssertionError("user resolved for request that is not flagged")
+
+    monkeypatch.setattr(dependencies, "get_current_user", get_current_user)
+    response = client_admin.get("/flights/", headers=AUTH_HEADERS)
+    assert response.status_code == status.HTTP_200_OK
+    assert PROFILE_ID_HEADER not in response.headers
+
+
+def test_profile_request_rate_limited(
+    monkeypatch, profiler: RequestProfiler, client_admin: TestClient
+):
+    use_token_user(monkeypatch, User(username="admin", is_admin=True, disabled=False))
+    profiler.min_interval = 60
+
+    headers = {"X-Profile": "1", **AUTH_HEADERS}
+    assert PROFILE_ID_HEADER in client_admin.get("/flights/", headers=headers).headers
+    response = client_admin.get("/flights/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert PROFILE_ID_HEADER not in response.headers
+
+
+def test_profile_request_unauthorized(
+    monkeypatch, profiler: RequestProfiler, client_unauthorized: TestClient
+):
+    response = client_unauthorized.get("/flights/", headers={"X-Profile": "1"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    use_token_user(monkeypatch, User(username="user", is_admin=False, disabled=False))
+    response = client_unauthorized.get(
+        "/flights/", headers={"X-Profile": "1", **AUTH_HEADERS}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert profiler.get_reports() == []
+
+
+def test_read_profiles_non_admin(client_non_admin: TestClient):
+    response = client_non_admin.get("/profiles/")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -6,9 +6,20 @@ from fastapi import status
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
+from app.database.handicaps import (
+    get_handicap_history_for_golfer,
+    get_handicap_state,
+    get_scoring_record_rounds_for_golfer,
+    update_handicap_states,
+)
+from app.database.snapshots import get_flight_scope
+from app.models.course import Course
+from app.models.flight import FlightFreeAgent, FlightFreeAgentCadence
 from app.models.golfer import Golfer, GolferAffiliation
+from app.models.handicap import HandicapIndex
 from app.models.hole import Hole
 from app.models.hole_result import (
+    HoleResult,
     HoleResultValidationRequest,
     HoleResultValidationResponse,
 )
@@ -22,7 +33,12 @@ from app.models.round import (
 )
 from app.models.round_golfer_link import RoundGolferLink
 from app.models.tee import Tee, TeeGender
+from app.models.tournament_round_link import TournamentRoundLink
+from app.models.track import Track
+from app.routers.utilities import get_tournament_stream
 from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.live_events import live_events
+from tests.utilities import assert_max_queries
 
 
 @pytest.fixture()
@@ -173,12 +189,17 @@ def test_submit_round(
         "round_type": RoundType.FLIGHT,
         "scoring_type": ScoringType.INDIVIDUAL,
     }
-    response = client_admin.post(f"/rounds/submit/", json=round_submit_data)
+    # Single transaction: query count does not grow with number of holes
+    # (including the lookups of snapshots outdated by the golfer's new handicap
+    # and of the golfer's handicap index state to rebuild)
+    with assert_max_queries(8):
+        response = client_admin.post(f"/rounds/submit/", json=round_submit_data)
 
     assert response.status_code == status.HTTP_200_OK
 
     # Check database updates
     round_response = RoundSubmissionResponse(**response.json())
+    assert round_response.golfer_id == 1
 
     round_db = session.get(Round, round_response.round_id)
     assert round_db.id == round_response.round_id
@@ -200,6 +221,7 @@ def test_submit_round(
             hole_result_db.gross_score
             == round_submit_data["holes"][hole_idx]["gross_score"]
         )
+        assert hole_result_db.id == round_response.holes[hole_idx].hole_result_id
 
     golfer_db = session.get(Golfer, round_response.golfer_id)
     assert golfer_db.id == 1
@@ -327,3 +349,354 @@ def test_submit_round_error(
 
     if expected_detail is not None:
         assert all([detail in response.json()["detail"] for detail in expected_detail])
+
+
+def add_import_data(session: Session, holes: list[dict]) -> None:
+    session.add_all(
+        Golfer(
+            id=idx,
+            name=f"Test Golfer {idx}",
+            affiliation=GolferAffiliation.APL_EMPLOYEE,
+        )
+        for idx in (1, 2)
+    )
+    session.add(Tee(id=1, name="Test", gender=TeeGender.MENS, rating=72.3, slope=123))
+    session.add_all(
+        Hole(
+            id=hole_idx + 1,
+            tee_id=1,
+            number=hole["number"],
+            par=hole["par"],
+            stroke_index=hole["stroke_index"],
+        )
+        for hole_idx, hole in enumerate(holes)
+    )
+    session.commit()
+
+
+def get_round_import_data(golfer_id: int, gross_scores: list[int]) -> dict:
+    return {
+        "golfer_id": golfer_id,
+        "tee_id": 1,
+        "date_played": date.today().isoformat(),
+        "course_handicap": 12,
+        "round_type": RoundType.FLIGHT,
+        "scoring_type": ScoringType.INDIVIDUAL,
+        "gross_scores": gross_scores,
+    }
+
+
+def test_import_rounds(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests importing a batch of rounds, skipping rounds that cannot be imported."""
+    add_import_data(session, round_validate_data_valid["holes"])
+
+    rounds_import_data = [
+        get_round_import_data(golfer_id=1, gross_scores=[5, 7, 11]),
+        get_round_import_data(golfer_id=99, gross_scores=[5, 7, 11]),
+        get_round_import_data(golfer_id=2, gross_scores=[5, 0, 11]),
+        get_round_import_data(golfer_id=2, gross_scores=[5, 7]),
+        get_round_import_data(golfer_id=2, gross_scores=[4, 3, 5]),
+    ]
+    with assert_max_queries(10):
+        response = client_admin.post("/rounds/import/", json=rounds_import_data)
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["num_rounds"] == 5
+    assert data["num_imported"] == 2
+    results = data["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert [result["is_imported"] for result in results] == [
+        True,
+        False,
+        False,
+        False,
+        True,
+    ]
+    assert "Golfer (id=99) not found" in results[1]["detail"]
+    assert "Invalid scoring on hole(s) #2" in results[2]["detail"]
+    assert "Expected 3 scores" in results[3]["detail"]
+
+    for result, gross_scores in ((results[0], [5, 7, 11]), (results[4], [4, 3, 5])):
+        round_db = session.get(Round, result["round_id"])
+        assert round_db.golfers[0].id == result["golfer_id"]
+        assert [
+            hole_result.gross_score
+            for hole_result in sorted(round_db.hole_results, key=lambda h: h.hole_id)
+        ] == gross_scores
+    assert len(session.exec(select(Round)).all()) == 2
+
+
+def test_import_rounds_dry_run(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests validating a batch of rounds without importing."""
+    add_import_data(session, round_validate_data_valid["holes"])
+
+    response = client_admin.post(
+        "/rounds/import/",
+        params={"dry_run": True},
+        json=[get_round_import_data(golfer_id=1, gross_scores=[5, 7, 11])],
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["num_imported"] == 0
+    assert data["results"][0]["detail"] is None
+    assert session.exec(select(Round)).all() == []
+
+
+def test_import_rounds_csv(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests importing a batch of rounds from a CSV file."""
+    add_import_data(session, round_validate_data_valid["holes"])
+
+    today = date.today().isoformat()
+    content = (
+        "golfer_id,tee_id,date_played,course_handicap,round_type,scoring_type,hole_1,hole_2,hole_3\n"
+        f"1,1,{today},12,FLIGHT,INDIVIDUAL,5,7,11\n"
+        f"2,1,{today},12,FLIGHT,INDIVIDUAL,5,x,11\n"
+        f"2,1,{today},12,FLIGHT,INDIVIDUAL,4,3,5\n"
+        f"1,1,{today},12,FLIGHT,INDIVIDUAL,5,7,11,9\n"
+    )
+    response = client_admin.post(
+        "/rounds/import/csv/", files={"file": ("rounds.csv", content, "text/csv")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["num_rounds"] == 4
+    assert data["num_imported"] == 2
+    assert [result["is_imported"] for result in data["results"]] == [
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert "gross_scores" in data["results"][1]["detail"]
+    assert "more field(s) than the header" in data["results"][3]["detail"]
+    assert len(session.exec(select(Round)).all()) == 2
+
+
+def test_import_rounds_unauthorized(client_unauthorized: TestClient):
+    """Tests error from unauthorized user attempting to import rounds."""
+    response = client_unauthorized.post(
+        "/rounds/import/",
+        json=[get_round_import_data(golfer_id=1, gross_scores=[5, 7, 11])],
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def add_correction_data(session: Session, client_admin: TestClient, holes: list[dict]):
+    """Adds three rounds for golfer 1, with posted handicap indexes."""
+    add_import_data(session, holes)
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = session.get(Tee, 1)
+    tee.track = track
+    session.add_all([course, track, tee])
+    session.commit()
+
+    rounds_import_data = [
+        get_round_import_data(golfer_id=1, gross_scores=[9, 7, 11])
+        | {"date_played": date_played}
+        for date_played in ("2024-05-07", "2024-05-14", "2024-05-21")
+    ]
+    response = client_admin.post("/rounds/import/", json=rounds_import_data)
+    assert response.json()["num_imported"] == 3
+    round_ids = [result["round_id"] for result in response.json()["results"]]
+
+    golfer_db = session.get(Golfer, 1)
+    scoring_record = get_scoring_record_rounds_for_golfer(session, golfer_id=1)
+    session.add_all(
+        HandicapIndex(
+            golfer_id=1,
+            round_id=srr.round_id,
+            date_posted=srr.date_played,
+            handicap_index=srr.handicap_index,
+        )
+        for srr in scoring_record
+    )
+    golfer_db.handicap_index = scoring_record[-1].handicap_index
+    session.add(golfer_db)
+    session.commit()
+    return round_ids
+
+
+def test_correct_round(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests correcting a playing handicap, recomputing dependent records."""
+    round_ids = add_correction_data(
+        session, client_admin, round_validate_data_valid["holes"]
+    )
+    handicap_indexes_prior = [
+        hi.handicap_index for hi in get_handicap_history_for_golfer(session, 1)
+    ]
+    session.add(
+        FlightFreeAgent(
+            golfer_id=1,
+            flight_id=7,
+            division_id=1,
+            cadence=FlightFreeAgentCadence.WEEKLY,
+        )
+    )
+    session.commit()
+
+    response = client_admin.patch(
+        f"/rounds/{round_ids[0]}/correction", json={"playing_handicap": 0}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["is_applied"]
+    assert data["playing_handicap_prior"] == 12
+    assert data["playing_handicap"] == 0
+    assert [h["number"] for h in data["hole_results"]] == [1, 2, 3]
+    assert [h["net_score"] for h in data["hole_results"]] == [9, 7, 11]
+
+    # Handicap indexes from corrected round onwards match recomputed record
+    scoring_record = get_scoring_record_rounds_for_golfer(session, golfer_id=1)
+    handicap_indexes = [
+        hi.handicap_index for hi in get_handicap_history_for_golfer(session, 1)
+    ]
+    assert handicap_indexes == [srr.handicap_index for srr in scoring_record]
+    assert handicap_indexes != handicap_indexes_prior
+    assert len(data["handicap_indexes"]) == sum(
+        new != prior for new, prior in zip(handicap_indexes, handicap_indexes_prior)
+    )
+    assert session.get(Golfer, 1).handicap_index == handicap_indexes[-1]
+    assert data["golfers"] == [
+        {
+            "golfer_id": 1,
+            "handicap_index_prior": handicap_indexes_prior[-1],
+            "handicap_index": handicap_indexes[-1],
+        }
+    ]
+
+    # Snapshots of competitions the corrected golfer plays in are outdated
+    assert data["snapshot_scopes"] == [get_flight_scope(7)]
+
+
+def test_correct_round_dry_run(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests reporting changes from a round correction without applying them."""
+    round_ids = add_correction_data(
+        session, client_admin, round_validate_data_valid["holes"]
+    )
+    handicap_indexes_prior = [
+        hi.handicap_index for hi in get_handicap_history_for_golfer(session, 1)
+    ]
+
+    response = client_admin.patch(
+        f"/rounds/{round_ids[0]}/correction",
+        params={"dry_run": True},
+        json={"playing_handicap": 0},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert not data["is_applied"]
+    assert len(data["hole_results"]) == 3
+    assert len(data["handicap_indexes"]) > 0
+    assert session.get(RoundGolferLink, (round_ids[0], 1)).playing_handicap == 12
+    assert [
+        hi.handicap_index for hi in get_handicap_history_for_golfer(session, 1)
+    ] == handicap_indexes_prior
+
+
+def test_delete_round_rebuilds_handicap_state(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests that a deleted round is removed from the golfer's handicap state."""
+    round_ids = add_correction_data(
+        session, client_admin, round_validate_data_valid["holes"]
+    )
+    update_handicap_states(session, golfer_ids=[1])
+    assert get_handicap_state(session, 1).num_scores == 3
+
+    # Related hole results are not deleted with the round
+    for hole_result_id in session.exec(
+        select(HoleResult.id).where(HoleResult.round_id == round_ids[0])
+    ).all():
+        client_admin.delete(f"/rounds/hole_results/{hole_result_id}")
+    response = client_admin.delete(f"/rounds/{round_ids[0]}")
+    assert response.status_code == status.HTTP_200_OK
+    handicap_state = get_handicap_state(session, 1)
+    assert handicap_state.num_scores == 2
+    assert handicap_state.round_id == round_ids[-1]
+
+
+def test_correct_round_live_results(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests that live results of the corrected round's tournament are updated."""
+    round_ids = add_correction_data(
+        session, client_admin, round_validate_data_valid["holes"]
+    )
+    session.add(TournamentRoundLink(tournament_id=1, round_id=round_ids[0]))
+    session.commit()
+    stream = get_tournament_stream(1)
+    event = live_events.publish(stream, "standings", b"[]")
+
+    response = client_admin.patch(
+        f"/rounds/{round_ids[0]}/correction", json={"playing_handicap": 0}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    # Without subscribers, clients reconnecting later are sent current standings
+    assert live_events.get_events_since(stream, event.id) is None
+
+
+def test_correct_round_golfer(
+    session: Session, client_admin: TestClient, round_validate_data_valid: dict
+):
+    """Tests reassigning a round to another golfer, moving its handicap index."""
+    round_ids = add_correction_data(
+        session, client_admin, round_validate_data_valid["holes"]
+    )
+
+    response = client_admin.patch(
+        "/rounds/golfer/", params={"round_id": round_ids[-1], "golfer_id": 2}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["golfers"][0]["id"] == 2
+
+    assert [hi.round_id for hi in get_handicap_history_for_golfer(session, 1)] == (
+        round_ids[:-1]
+    )
+    handicap_indexes = get_handicap_history_for_golfer(session, 2)
+    assert [hi.round_id for hi in handicap_indexes] == round_ids[-1:]
+    assert handicap_indexes[0].handicap_index == (
+        get_scoring_record_rounds_for_golfer(session, golfer_id=2)[-1].handicap_index
+    )
+    assert session.get(Golfer, 1).handicap_index == (
+        get_handicap_history_for_golfer(session, 1)[-1].handicap_index
+    )
+
+
+@pytest.mark.parametrize(
+    "round_id, correction, expected_status",
+    [
+        (99, {"playing_handicap": 0}, status.HTTP_404_NOT_FOUND),
+        (1, {"golfer_id": 99}, status.HTTP_404_NOT_FOUND),
+        (1, {}, status.HTTP_422_UNPROCESSABLE_CONTENT),
+    ],
+)
+def test_correct_round_error(
+    session: Session,
+    client_admin: TestClient,
+    round_validate_data_valid: dict,
+    round_id: int,
+    correction: dict,
+    expected_status: int,
+):
+    """Tests errors from invalid round corrections."""
+    add_correction_data(session, client_admin, round_validate_data_valid["holes"])
+
+    response = client_admin.patch(f"/rounds/{round_id}/correction", json=correction)
+    assert response.status_code == expected_status
@@ -2,7 +2,7 @@ import pytest
 from fastapi import status
 from sqlmodel import Session
 
-from app.models.season import Season
+from app.models.season import GolferSeasonStatistics, Season
 
 
 @pytest.fixture()
@@ -118,3 +118,35 @@ def test_delete_season_active(session_with_seasons, client_admin):
 def test_delete_season_not_found(session_with_seasons, client_admin):
     response = client_admin.delete("/seasons/1900")
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_get_season_statistics(session_with_seasons, client_unauthorized):
+    session_with_seasons.add_all(
+        GolferSeasonStatistics(
+            year=year,
+            golfer_id=golfer_id,
+            golfer_name=golfer_name,
+            starting_handicap_index=12.0,
+            current_handicap_index=11.4,
+            rounds_played=8,
+            avg_gross_to_par=9.125,
+            avg_gross_differential=12.3,
+            avg_net_to_par=-1.5,
+            avg_net_differential=0.8,
+        )
+        for year, golfer_id, golfer_name in (
+            (2024, 1, "Golfer B"),
+            (2024, 2, "Golfer A"),
+            (2023, 1, "Golfer B"),
+        )
+    )
+    session_with_seasons.commit()
+
+    response = client_unauthorized.get("/seasons/2024/statistics")
+    assert response.status_code == status.HTTP_200_OK
+    assert [s["golfer_name"] for s in response.json()] == ["Golfer A", "Golfer B"]
+    assert response.json()[0]["avg_gross_to_par"] == 9.125
+
+    response = client_unauthorized.get("/seasons/1900/statistics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
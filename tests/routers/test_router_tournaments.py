@@ -1,8 +1,13 @@
+from datetime import datetime
+
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
+from app.database import snapshots as db_snapshots
+from app.database import tournaments as db_tournaments
 from app.models.division import Division
+from app.models.tournament import Tournament
 from app.models.tournament_division_link import TournamentDivisionLink
 
 
@@ -72,3 +77,43 @@ def test_update_tournament_divisions_sync(client_admin: TestClient, session: Ses
     assert "Div B Updated" in division_names
     assert "Div C" in division_names
     assert len(links) == 2
+
+
+def test_get_tournament_handicaps(client_unauthorized: TestClient, session: Session):
+    response = client_unauthorized.get(
+        "/tournaments/handicaps/", params={"tournament_ids": [1, 2]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+    response = client_unauthorized.get("/tournaments/handicaps/")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_get_standings_count_back(client_unauthorized: TestClient, session: Session):
+    tournament = Tournament(
+        name="Test Tournament",
+        year=2024,
+        date=datetime(2024, 6, 8, 8),
+        signup_start_date=datetime(2024, 4, 1),
+        signup_stop_date=datetime(2024, 6, 1),
+        course_id=1,
+        secretary="Sec",
+        individual=True,
+        locked=True,
+    )
+    session.add(tournament)
+    session.commit()
+
+    response = client_unauthorized.get(
+        f"/tournaments/standings/{tournament.id}", params={"count_back": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == db_tournaments.get_standings(
+        session=session, tournament_id=tournament.id, count_back=True
+    ).model_dump(mode="json")
+    # Count-back standings are not stored as the locked tournament's snapshot
+    assert (
+        db_snapshots.get_snapshot(session, f"/tournaments/standings/{tournament.id}")
+        is None
+    )
@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlmodel import Session
+
+from app import dependencies
+from app.dependencies import get_current_user, user_cache
+from app.models.user import User
+from tests.utilities import assert_max_queries
+
+SECRET_KEY = "test-secret"
+ALGORITHM = "HS256"
+
+
+@pytest.fixture(name="token_settings", autouse=True)
+def token_settings_fixture(monkeypatch):
+    settings = SimpleNamespace(
+        apl_golf_league_api_access_token_secret_key=SECRET_KEY,
+        apl_golf_league_api_access_token_algorithm=ALGORITHM,
+    )
+    monkeypatch.setattr(dependencies, "get_settings", lambda: settings)
+    user_cache.clear()
+    yield settings
+    user_cache.clear()
+
+
+def create_user(session: Session, username: str) -> User:
+    user = User(username=username, disabled=False, is_admin=False, edit_flights=False)
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+def test_get_current_user_cached(session: Session):
+    user = create_user(session, "cached_user")
+    token = jwt.encode({"sub": user.username}, SECRET_KEY, algorithm=ALGORITHM)
+
+    with assert_max_queries(1):
+        first = asyncio.run(get_current_user(session=session, token=token))
+    with assert_max_queries(0):
+        second = asyncio.run(get_current_user(session=session, token=token))
+    assert first.username == second.username == "cached_user"
+    assert first is not second
+
+
+def test_update_user_invalidates_cache(session: Session, client_admin: TestClient):
+    user = create_user(session, "edited_user")
+    token = jwt.encode({"sub": user.username}, SECRET_KEY, algorithm=ALGORITHM)
+    asyncio.run(get_current_user(session=session, token=token))
+    assert user_cache.get(user.username) is not None
+
+    response = client_admin.patch(
+        f"/users/{user.id}", json={"disabled": True, "edit_flights": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["disabled"] is True
+    assert response.json()["edit_flights"] is True
+    assert user_cache.get(user.username) is None
+
+    current_user = asyncio.run(get_current_user(session=session, token=token))
+    assert current_user.disabled
+    assert current_user.edit_flights
+
+
+def test_update_user_non_admin(session: Session, client_non_admin: TestClient):
+    user = create_user(session, "other_user")
+    response = client_non_admin.patch(f"/users/{user.id}", json={"is_admin": True})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_update_user_not_found(client_admin: TestClient):
+    response = client_admin.patch("/users/999", json={"disabled": True})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,191 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from sqlmodel import Session, select
+
+from app.models.course import Course
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.handicap import HandicapIndex
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.round import Round, RoundType, ScoringType
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.season import GolferSeasonStatistics, Season
+from app.models.tee import Tee, TeeGender
+from app.models.track import Track
+from app.tasks.compile_season_stats import compile_season_statistics
+from app.tasks.handicaps import get_round_summaries
+from tests.utilities import assert_max_queries
+
+
+@pytest.fixture
+def golfers(session: Session) -> list[Golfer]:
+    """
+    Adds a season with rounds for four golfers:
+    - regular season, playoff and tournament rounds, with handicap index before season
+    - regular season rounds, with handicap index posted in season before first round
+    - a regular season round, without handicap index
+    - a tournament round only
+    """
+    session.add(
+        Season(
+            year=2024,
+            is_active=True,
+            start_date=date(2024, 4, 21),
+            playoffs_start_date=date(2024, 9, 1),
+        )
+    )
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=track)
+    golfers = [
+        Golfer(
+            name=f"Test Golfer {idx}",
+            affiliation=GolferAffiliation.APL_EMPLOYEE,
+            handicap_index=9.5 + idx,
+        )
+        for idx in range(4)
+    ]
+    session.add_all([course, track, tee, *golfers])
+    session.commit()
+    holes = [
+        Hole(tee_id=tee.id, number=number, par=4, stroke_index=2 * number - 1)
+        for number in range(1, 10)
+    ]
+    session.add_all(holes)
+    session.add_all(
+        [
+            HandicapIndex(
+                golfer_id=golfers[0].id,
+                date_posted=datetime(2024, 4, 1),
+                handicap_index=11.2,
+            ),
+            HandicapIndex(
+                golfer_id=golfers[0].id,
+                date_posted=datetime(2024, 5, 1),
+                handicap_index=10.0,
+            ),
+            HandicapIndex(
+                golfer_id=golfers[1].id,
+                date_posted=datetime(2024, 5, 10),
+                handicap_index=14.3,
+            ),
+        ]
+    )
+    session.commit()
+
+    rounds = [
+        (golfers[0], RoundType.FLIGHT, datetime(2024, 5, 7, 17), 10),
+        (golfers[0], RoundType.FLIGHT, datetime(2024, 5, 14, 17), 10),
+        (golfers[0], RoundType.FLIGHT, datetime(2024, 5, 21, 17), 9),
+        (golfers[0], RoundType.FLIGHT, datetime(2024, 9, 3, 17), 9),
+        (golfers[0], RoundType.TOURNAMENT, datetime(2024, 6, 8, 9), 9),
+        (golfers[1], RoundType.FLIGHT, datetime(2024, 5, 14, 17), 14),
+        (golfers[1], RoundType.FLIGHT, datetime(2024, 5, 28, 17), 15),
+        (golfers[2], RoundType.FLIGHT, datetime(2024, 6, 4, 17), 6),
+        (golfers[3], RoundType.TOURNAMENT, datetime(2024, 6, 8, 9), 12),
+    ]
+    for round_idx, (golfer, round_type, date_played, playing_handicap) in enumerate(
+        rounds
+    ):
+        round_db = Round(
+            tee_id=tee.id,
+            type=round_type,
+            scoring_type=ScoringType.INDIVIDUAL,
+            date_played=date_played,
+            date_updated=date_played,
+        )
+        session.add(round_db)
+        session.commit()
+        session.add(
+            RoundGolferLink(
+                round_id=round_db.id,
+                golfer_id=golfer.id,
+                playing_handicap=playing_handicap,
+            )
+        )
+        session.add_all(
+            HoleResult(
+                round_id=round_db.id,
+                hole_id=hole.id,
+                handicap_strokes=1,
+                gross_score=4 + (hole.number + round_idx) % 4,
+                adjusted_gross_score=min(4 + (hole.number + round_idx) % 4, 6),
+                net_score=3 + (hole.number + round_idx) % 4,
+            )
+            for hole in holes
+        )
+    session.commit()
+    return golfers
+
+
+def test_compile_season_statistics(session: Session, golfers: list[Golfer]):
+    with assert_max_queries(7):
+        statistics = compile_season_statistics(session=session)
+
+    assert [(s.golfer_id, s.rounds_played) for s in statistics] == [
+        (golfers[0].id, 3),
+        (golfers[1].id, 2),
+        (golfers[2].id, 1),
+    ]
+    assert [s.starting_handicap_index for s in statistics[:2]] == [11.2, 14.3]
+    assert statistics[2].starting_handicap_index == round(
+        (6 - (35.5 - 36)) / (125 / 113), 1
+    )
+    assert [s.current_handicap_index for s in statistics] == [9.5, 10.5, 11.5]
+
+    # Averages match round summaries of regular season flight rounds
+    for golfer_statistics in statistics:
+        round_ids = session.exec(
+            select(Round.id)
+            .join(RoundGolferLink)
+            .where(RoundGolferLink.golfer_id == golfer_statistics.golfer_id)
+            .where(Round.type == RoundType.FLIGHT)
+            .where(Round.date_played < datetime(2024, 9, 1))
+        ).all()
+        rounds = get_round_summaries(session, round_ids=list(round_ids))
+        assert golfer_statistics.avg_gross_to_par == round(
+            np.mean([r.gross_score - r.tee_par for r in rounds]), 3
+        )
+        assert golfer_statistics.avg_gross_differential == round(
+            np.mean([r.score_differential for r in rounds]), 3
+        )
+        assert golfer_statistics.avg_net_to_par == round(
+            np.mean([r.net_score - r.tee_par for r in rounds]), 3
+        )
+        assert golfer_statistics.avg_net_differential == round(
+            np.mean([r.score_differential - r.golfer_playing_handicap for r in rounds]),
+            3,
+        )
+
+    # Recompiling replaces stored statistics
+    compile_season_statistics(session=session, year=2024)
+    assert len(session.exec(select(GolferSeasonStatistics)).all()) == 3
+
+
+def test_compile_season_statistics_dry_run(session: Session, golfers: list[Golfer]):
+    statistics = compile_season_statistics(session=session, year=2024, dry_run=True)
+    assert len(statistics) == 3
+    assert session.exec(select(GolferSeasonStatistics)).all() == []
+
+
+def test_compile_season_statistics_no_rounds(session: Session):
+    assert compile_season_statistics(session=session, year=2024) == []
+
+
+def test_compile_season_statistics_default_dates(
+    session: Session, golfers: list[Golfer]
+):
+    """Tests that playoff rounds are excluded for seasons without dates."""
+    statistics = compile_season_statistics(session=session, year=2024, dry_run=True)
+    season_db = session.get(Season, 2024)
+    season_db.start_date = None
+    season_db.playoffs_start_date = None
+    session.add(season_db)
+    session.commit()
+
+    assert [
+        s.model_dump(exclude={"date_updated"})
+        for s in compile_season_statistics(session=session, year=2024, dry_run=True)
+    ] == [s.model_dump(exclude={"date_updated"}) for s in statistics]
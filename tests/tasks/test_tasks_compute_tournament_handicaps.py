@@ -0,0 +1,187 @@
+import pytest
+from sqlmodel import Session
+
+from app.models.course import Course
+from app.models.division import Division
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.hole import Hole
+from app.models.team import Team
+from app.models.team_golfer_link import TeamGolferLink, TeamRole
+from app.models.tee import Tee, TeeGender
+from app.models.tournament import Tournament
+from app.models.track import Track
+from app.tasks.compute_tournament_handicaps import (
+    compute_team_handicap_scramble,
+    compute_tournament_handicaps,
+    get_tournament_handicaps,
+    organize_team_handicaps_scramble,
+)
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from tests.utilities import assert_max_queries
+
+
+@pytest.fixture
+def tournaments(session: Session) -> list[Tournament]:
+    """
+    Adds two tournaments on a course with front and back tees:
+    - scramble, with divisions playing both tees or front tee only, and teams
+      of four (including a golfer without handicap index) and three golfers
+    - shamble, with a team of two golfers
+    """
+    course = Course(name="Test Course", year=2024)
+    front = Track(name="Front", course=course)
+    back = Track(name="Back", course=course)
+    tees = [
+        Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=front),
+        Tee(name="Blue", gender=TeeGender.MENS, rating=36.1, slope=128, track=back),
+    ]
+    session.add_all([course, front, back, *tees])
+    session.commit()
+    session.add_all(
+        Hole(tee_id=tee.id, number=number, par=4, stroke_index=2 * number - 1)
+        for tee in tees
+        for number in range(1, 10)
+    )
+    divisions = [
+        Division(
+            name="Middle",
+            gender=TeeGender.MENS,
+            primary_tee_id=tees[0].id,
+            secondary_tee_id=tees[1].id,
+        ),
+        Division(name="Front", gender=TeeGender.MENS, primary_tee_id=tees[0].id),
+    ]
+    golfers = [
+        Golfer(
+            name=f"Test Golfer {idx}",
+            affiliation=GolferAffiliation.APL_EMPLOYEE,
+            handicap_index=None if idx == 2 else 4.3 + 2.6 * idx,
+        )
+        for idx in range(9)
+    ]
+    teams = [Team(name=f"Test Team {idx}") for idx in range(3)]
+    tournaments = [
+        Tournament(
+            name="Test Scramble",
+            year=2024,
+            course_id=course.id,
+            scramble=True,
+            divisions=divisions,
+            teams=teams[:2],
+        ),
+        Tournament(
+            name="Test Shamble",
+            year=2024,
+            course_id=course.id,
+            shamble=True,
+            divisions=divisions[:1],
+            teams=teams[2:],
+        ),
+    ]
+    session.add_all([*divisions, *golfers, *teams, *tournaments])
+    session.commit()
+
+    roster = [(0, 0), (0, 1), (0, 2), (0, 3), (1, 4), (1, 5), (1, 6), (2, 7), (2, 8)]
+    session.add_all(
+        TeamGolferLink(
+            team_id=teams[team_idx].id,
+            golfer_id=golfers[golfer_idx].id,
+            division_id=divisions[golfer_idx % 2 if team_idx < 2 else 0].id,
+            role=TeamRole.PLAYER,
+        )
+        for team_idx, golfer_idx in roster
+    )
+    session.commit()
+    return tournaments
+
+
+def test_organize_team_handicaps_scramble():
+    assert organize_team_handicaps_scramble([12, 4, 20, 8]) == (4, 8, 12, 20)
+    assert organize_team_handicaps_scramble([12, 4, 20]) == (4, 12, 12, 20)
+    assert organize_team_handicaps_scramble([12, 4]) == (4, 4, 12, 12)
+    with pytest.raises(ValueError):
+        organize_team_handicaps_scramble([12])
+
+
+def test_compute_tournament_handicaps(session: Session, tournaments: list[Tournament]):
+    tournament_ids = [t.id for t in tournaments]
+    with assert_max_queries(4):
+        handicaps = compute_tournament_handicaps(
+            session=session, tournament_ids=tournament_ids
+        )
+
+    assert [h.tournament_id for h in handicaps] == tournament_ids
+    assert [h.handicap_allowance for h in handicaps] == [1.0, 0.7]
+    assert [[team.team_name for team in h.teams] for h in handicaps] == [
+        ["Test Team 0", "Test Team 1"],
+        ["Test Team 2"],
+    ]
+
+    # Course handicaps match those computed per golfer and tee
+    ahs = APLHandicapSystem()
+    for tournament_handicaps in handicaps:
+        for team in tournament_handicaps.teams:
+            for golfer in team.golfers:
+                golfer_db = session.get(Golfer, golfer.golfer_id)
+                division_db = session.get(Division, golfer.division_id)
+                course_handicaps = [
+                    (
+                        0.0
+                        if golfer_db.handicap_index is None
+                        else ahs.compute_course_handicap(
+                            par=tee.par,
+                            rating=tee.rating,
+                            slope=tee.slope,
+                            handicap_index=golfer_db.handicap_index,
+                        )
+                    )
+                    for tee in [
+                        session.get(Tee, tee_id)
+                        for tee_id in (
+                            division_db.primary_tee_id,
+                            division_db.secondary_tee_id,
+                        )
+                        if tee_id is not None
+                    ]
+                ]
+                assert golfer.primary_course_handicap == round(course_handicaps[0], 2)
+                if division_db.secondary_tee_id is None:
+                    assert golfer.secondary_course_handicap is None
+                else:
+                    assert golfer.secondary_course_handicap == round(
+                        course_handicaps[1], 2
+                    )
+                assert golfer.course_handicap == round(
+                    tournament_handicaps.handicap_allowance * sum(course_handicaps)
+                )
+
+    # Team handicaps for scramble only
+    for team in handicaps[0].teams:
+        assert team.team_handicap == compute_team_handicap_scramble(
+            *organize_team_handicaps_scramble(
+                [golfer.course_handicap for golfer in team.golfers]
+            )
+        )
+    assert handicaps[1].teams[0].team_handicap is None
+
+
+def test_get_tournament_handicaps_cached(
+    session: Session, tournaments: list[Tournament]
+):
+    tournament_ids = [t.id for t in tournaments]
+    handicaps = get_tournament_handicaps(session=session, tournament_ids=tournament_ids)
+    with assert_max_queries(0):
+        assert (
+            get_tournament_handicaps(
+                session=session, tournament_ids=tournament_ids[::-1]
+            )
+            == handicaps
+        )
+
+    # Recomputed after golfer handicap index changes
+    golfer_db = session.get(Golfer, handicaps[1].teams[0].golfers[0].golfer_id)
+    golfer_db.handicap_index = 30.2
+    session.add(golfer_db)
+    session.commit()
+    handicaps = get_tournament_handicaps(session=session, tournament_ids=tournament_ids)
+    assert handicaps[1].teams[0].golfers[0].handicap_index == 30.2
@@ -0,0 +1,243 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from app.database import snapshots as db_snapshots
+from app.database.handicaps import get_scoring_record_rounds_for_golfer
+from app.models.course import Course
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.handicap import HandicapIndex
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.qualifying_score import QualifyingScore, QualifyingScoreType
+from app.models.round import Round, RoundType, ScoringType
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.substitute import Substitute
+from app.models.tee import Tee, TeeGender
+from app.models.track import Track
+from app.tasks.handicap_replay import load_replay_data, replay_golfer, replay_handicaps
+from app.tasks.handicaps import (
+    get_handicap_index_data,
+    get_handicap_min_date,
+    get_handicap_update_dates,
+)
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from tests.utilities import assert_max_queries
+
+DATE_REPLAYED = date(2024, 9, 1)
+
+
+@pytest.fixture
+def golfer_ids(session: Session) -> list[int]:
+    """
+    Adds weekly rounds for one golfer, and qualifying scores and a round for
+    another, with posted and current handicap indexes matching the scoring records.
+    """
+    ahs = APLHandicapSystem()
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=track)
+    golfers = [
+        Golfer(name=f"Test Golfer {idx}", affiliation=GolferAffiliation.APL_EMPLOYEE)
+        for idx in (1, 2)
+    ]
+    session.add_all([course, track, tee, *golfers])
+    session.commit()
+    holes = [
+        Hole(tee_id=tee.id, number=number, par=4, stroke_index=2 * number - 1)
+        for number in range(1, 10)
+    ]
+    session.add_all(holes)
+    session.add_all(
+        QualifyingScore(
+            golfer_id=golfers[1].id,
+            year=2024,
+            type=QualifyingScoreType.QUALIFYING_ROUND,
+            score_differential=score_differential,
+            date_updated=datetime(2024, 4, 1),
+            date_played=datetime(2024, 4, day),
+        )
+        for day, score_differential in ((1, 8.2), (8, 6.5))
+    )
+    session.commit()
+
+    rounds = [
+        (golfers[0], datetime(2023, 5, 2, 17) + timedelta(weeks=week), 10 - week % 4)
+        for week in range(14)
+    ] + [
+        (golfers[0], datetime(2024, 5, 7, 17) + timedelta(weeks=week), 8 + week % 5)
+        for week in range(6)
+    ]
+    rounds.append((golfers[1], datetime(2024, 5, 14, 17), 6))
+    for round_idx, (golfer, date_played, playing_handicap) in enumerate(rounds):
+        round_db = Round(
+            tee_id=tee.id,
+            type=RoundType.FLIGHT,
+            scoring_type=ScoringType.INDIVIDUAL,
+            date_played=date_played,
+            date_updated=date_played,
+        )
+        session.add(round_db)
+        session.commit()
+        session.add(
+            RoundGolferLink(
+                round_id=round_db.id,
+                golfer_id=golfer.id,
+                playing_handicap=playing_handicap,
+            )
+        )
+        for hole in holes:
+            gross_score = 4 + (hole.number + round_idx) % 4
+            handicap_strokes = ahs.compute_hole_handicap_strokes(
+                hole.stroke_index, playing_handicap
+            )
+            session.add(
+                HoleResult(
+                    round_id=round_db.id,
+                    hole_id=hole.id,
+                    handicap_strokes=handicap_strokes,
+                    gross_score=gross_score,
+                    adjusted_gross_score=ahs.compute_hole_adjusted_gross_score(
+                        hole.par, hole.stroke_index, gross_score, playing_handicap
+                    ),
+                    net_score=gross_score - handicap_strokes,
+                )
+            )
+    session.commit()
+
+    for golfer in golfers:
+        session.add_all(
+            HandicapIndex(
+                golfer_id=golfer.id,
+                round_id=srr.round_id,
+                date_posted=srr.date_played,
+                handicap_index=srr.handicap_index,
+            )
+            for srr in get_scoring_record_rounds_for_golfer(session, golfer.id)
+            if srr.round_id is not None
+        )
+        golfer.handicap_index = get_weekly_handicap_index(
+            session, golfer.id, DATE_REPLAYED
+        )
+        session.add(golfer)
+    session.commit()
+    return [golfer.id for golfer in golfers]
+
+
+def get_weekly_handicap_index(
+    session: Session, golfer_id: int, date_updated: date
+) -> float | None:
+    _, max_date = get_handicap_update_dates(date_updated)
+    return get_handicap_index_data(
+        session=session,
+        golfer_id=golfer_id,
+        min_date=get_handicap_min_date(date_updated),
+        max_date=max_date,
+        limit=10,
+    ).active_handicap_index
+
+
+def test_replay_handicaps_matches_stored(session: Session, golfer_ids: list[int]):
+    with assert_max_queries(5):
+        report = replay_handicaps(session=session, today=DATE_REPLAYED, max_workers=1)
+
+    assert report.num_golfers == 2
+    assert report.num_rounds == 21
+    assert report.golfers == []
+    assert not report.is_applied
+
+
+@pytest.mark.parametrize(
+    "date_updated",
+    [date(2023, 5, 7), date(2023, 6, 4), date(2023, 8, 6), date(2024, 5, 19)],
+)
+def test_replay_golfer_weekly_handicap_index(
+    session: Session, golfer_ids: list[int], date_updated: date
+):
+    """Tests weekly handicap indexes match those from the weekly handicap update."""
+    for golfer in load_replay_data(session=session):
+        golfer.handicap_index = -99.0  # always report
+        diff = replay_golfer(golfer=golfer, today=date_updated)
+        assert diff.handicap_index == get_weekly_handicap_index(
+            session, golfer.golfer_id, date_updated
+        )
+
+
+def test_replay_handicaps_write_back(session: Session, golfer_ids: list[int]):
+    handicap_index_db = session.exec(
+        select(HandicapIndex)
+        .where(HandicapIndex.golfer_id == golfer_ids[0])
+        .order_by(HandicapIndex.date_posted)
+    ).all()[-3]
+    handicap_index_expected = handicap_index_db.handicap_index
+    handicap_index_db.handicap_index += 1.0
+    golfer_db = session.get(Golfer, golfer_ids[1])
+    golfer_handicap_index_expected = golfer_db.handicap_index
+    golfer_db.handicap_index = None
+    session.add_all([handicap_index_db, golfer_db])
+    session.add(Substitute(golfer_id=golfer_ids[1], flight_id=1, division_id=1))
+    session.commit()
+    db_snapshots.put_snapshot(
+        session, key="/flights/standings/1", scope="flight:1", content=b"{}"
+    )
+
+    report = replay_handicaps(
+        session=session,
+        today=DATE_REPLAYED,
+        recompute_hole_results=False,
+        write_back=True,
+        max_workers=2,
+    )
+
+    assert report.is_applied
+    assert [diff.golfer_id for diff in report.golfers] == golfer_ids
+    assert [
+        (hi.handicap_index_id, hi.handicap_index)
+        for hi in report.golfers[0].handicap_indexes
+    ] == [(handicap_index_db.id, handicap_index_expected)]
+    assert report.golfers[1].handicap_index_prior is None
+    assert report.golfers[1].handicap_index == golfer_handicap_index_expected
+    assert report.golfers[1].weekly_handicap_indexes[-1].handicap_index == (
+        golfer_handicap_index_expected
+    )
+
+    session.refresh(handicap_index_db)
+    session.refresh(golfer_db)
+    assert handicap_index_db.handicap_index == handicap_index_expected
+    assert golfer_db.handicap_index == golfer_handicap_index_expected
+    assert db_snapshots.get_snapshot(session, "/flights/standings/1") is None
+    assert replay_handicaps(session=session, today=DATE_REPLAYED).golfers == []
+
+
+def test_replay_handicaps_write_back_recomputed(
+    session: Session, golfer_ids: list[int]
+):
+    """Tests refusing to write back indexes replayed from recomputed hole results."""
+    with pytest.raises(ValueError):
+        replay_handicaps(session=session, today=DATE_REPLAYED, write_back=True)
+
+
+def test_replay_handicaps_recompute_hole_results(
+    session: Session, golfer_ids: list[int]
+):
+    """Tests replay from gross scores, when stored hole results are out of date."""
+    round_id = session.exec(
+        select(RoundGolferLink.round_id).where(
+            RoundGolferLink.golfer_id == golfer_ids[1]
+        )
+    ).one()
+    for hole_result_db in session.exec(
+        select(HoleResult).where(HoleResult.round_id == round_id)
+    ):
+        hole_result_db.adjusted_gross_score = hole_result_db.gross_score - 2
+        session.add(hole_result_db)
+    session.commit()
+
+    assert (
+        replay_handicaps(
+            session=session, today=DATE_REPLAYED, recompute_hole_results=False
+        ).golfers
+        != []
+    )
+    assert replay_handicaps(session=session, today=DATE_REPLAYED).golfers == []
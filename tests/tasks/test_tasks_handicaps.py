@@ -0,0 +1,274 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from sqlmodel import Session, select
+
+from app.database import snapshots as db_snapshots
+from app.database.handicaps import get_scoring_record_rounds_for_golfer
+from app.models.course import Course
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.handicap import PlayingConditionsCorrection
+from app.models.hole import Hole
+from app.models.hole_result import HoleResult
+from app.models.round import Round, RoundType, ScoringType
+from app.models.round_golfer_link import RoundGolferLink
+from app.models.tee import Tee, TeeGender
+from app.models.tournament_round_link import TournamentRoundLink
+from app.models.track import Track
+from app.tasks.handicaps import (
+    HOLE_RESULT_COLUMNS,
+    compute_hole_result_corrections,
+    get_round_summaries,
+    recalculate_hole_results,
+    update_playing_conditions_corrections,
+)
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.apl_legacy_handicap_system import APLLegacyHandicapSystem
+from tests.utilities import assert_max_queries
+
+
+def add_round(
+    session: Session,
+    tee: Tee,
+    golfer: Golfer,
+    date_played: datetime,
+    playing_handicap: int,
+    gross_scores: list[int],
+    is_correct: bool,
+) -> Round:
+    """Adds a round, with hole results computed without handicap strokes if incorrect."""
+    ahs = APLHandicapSystem() if date_played.year >= 2022 else APLLegacyHandicapSystem()
+    round_db = Round(
+        tee_id=tee.id,
+        type=RoundType.FLIGHT,
+        scoring_type=ScoringType.INDIVIDUAL,
+        date_played=date_played,
+        date_updated=date_played,
+    )
+    session.add(round_db)
+    session.commit()
+    session.add(
+        RoundGolferLink(
+            round_id=round_db.id,
+            golfer_id=golfer.id,
+            playing_handicap=playing_handicap,
+        )
+    )
+    hole_handicap = playing_handicap if is_correct else 0
+    for hole, gross_score in zip(tee.holes, gross_scores):
+        handicap_strokes = ahs.compute_hole_handicap_strokes(
+            hole.stroke_index, hole_handicap
+        )
+        session.add(
+            HoleResult(
+                round_id=round_db.id,
+                hole_id=hole.id,
+                handicap_strokes=handicap_strokes,
+                gross_score=gross_score,
+                adjusted_gross_score=ahs.compute_hole_adjusted_gross_score(
+                    hole.par, hole.stroke_index, gross_score, hole_handicap
+                ),
+                net_score=gross_score - handicap_strokes,
+            )
+        )
+    session.commit()
+    return round_db
+
+
+@pytest.fixture
+def round_ids(session: Session) -> dict[int, list[int]]:
+    """Adds a correct and an incorrect round for each of 2021 and 2023."""
+    tee = Tee(name="Test", gender=TeeGender.MENS, rating=36.0, slope=120)
+    golfer = Golfer(name="Test Golfer", affiliation=GolferAffiliation.APL_EMPLOYEE)
+    session.add_all([tee, golfer])
+    session.commit()
+    session.add_all(
+        Hole(tee_id=tee.id, number=number, par=4, stroke_index=2 * number - 1)
+        for number in range(1, 10)
+    )
+    session.commit()
+
+    gross_scores = [4, 5, 9, 4, 6, 3, 5, 10, 4]
+    return {
+        year: [
+            add_round(
+                session,
+                tee,
+                golfer,
+                datetime(year, 6, 1),
+                playing_handicap=12,
+                gross_scores=gross_scores,
+                is_correct=is_correct,
+            ).id
+            for is_correct in (True, False)
+        ]
+        for year in (2021, 2023)
+    }
+
+
+def get_hole_results(session: Session, round_id: int) -> list[tuple[int, int, int]]:
+    return [
+        (h.handicap_strokes, h.adjusted_gross_score, h.net_score)
+        for h in session.exec(
+            select(HoleResult)
+            .where(HoleResult.round_id == round_id)
+            .order_by(HoleResult.hole_id)
+        )
+    ]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_recalculate_hole_results(
+    session: Session, round_ids: dict[int, list[int]], max_workers: int
+):
+    session.add(TournamentRoundLink(tournament_id=1, round_id=round_ids[2023][1]))
+    session.commit()
+    db_snapshots.put_snapshot(
+        session, key="/tournaments/standings/1", scope="tournament:1", content=b"{}"
+    )
+
+    with assert_max_queries(8):
+        reports = recalculate_hole_results(
+            session=session, years=[2023, 2021], max_workers=max_workers
+        )
+
+    assert [report.year for report in reports] == [2021, 2023]
+    for report in reports:
+        correct_round_id, incorrect_round_id = round_ids[report.year]
+        assert report.num_rounds == 2
+        assert report.num_hole_results == 18
+        assert report.num_rounds_corrected == 1
+        assert len(report.hole_results) > 0
+        assert {h.round_id for h in report.hole_results} == {incorrect_round_id}
+        assert get_hole_results(session, incorrect_round_id) == get_hole_results(
+            session, correct_round_id
+        )
+        assert session.get(Round, incorrect_round_id).date_updated.year > report.year
+    assert db_snapshots.get_snapshot(session, "/tournaments/standings/1") is None
+
+    assert all(
+        report.hole_results == []
+        for report in recalculate_hole_results(session=session, years=[2021, 2023])
+    )
+
+
+def test_recalculate_hole_results_dry_run(
+    session: Session, round_ids: dict[int, list[int]]
+):
+    correct_round_id, incorrect_round_id = round_ids[2023]
+    hole_results_prior = get_hole_results(session, incorrect_round_id)
+
+    reports = recalculate_hole_results(session=session, year=2023, dry_run=True)
+
+    assert len(reports) == 1
+    assert reports[0].num_rounds_corrected == 1
+    assert get_hole_results(session, incorrect_round_id) == hole_results_prior
+
+
+@pytest.mark.parametrize("year", [2021, 2023])
+def test_compute_hole_result_corrections(year: int):
+    """Tests recalculation matches handicap system, hole by hole."""
+    ahs = APLHandicapSystem() if year >= 2022 else APLLegacyHandicapSystem()
+    rng = np.random.default_rng(seed=year)
+    num_holes = 500
+    hole_results = np.zeros((num_holes, len(HOLE_RESULT_COLUMNS)), dtype=np.int64)
+    hole_results[:, 0] = np.arange(num_holes)
+    hole_results[:, 1] = np.arange(num_holes) // 9
+    hole_results[:, 2] = np.arange(num_holes) % 9 + 1
+    hole_results[:, 3] = rng.integers(3, 6, num_holes)
+    hole_results[:, 4] = rng.integers(1, 19, num_holes)
+    hole_results[:, 5] = rng.integers(-2, 25, num_holes)
+    hole_results[:, 6] = rng.integers(2, 12, num_holes)
+
+    corrections = compute_hole_result_corrections(year, hole_results)
+
+    for hole_result in hole_results.tolist():
+        (_, _, _, par, stroke_index, playing_handicap, gross_score) = hole_result[:7]
+        handicap_strokes = ahs.compute_hole_handicap_strokes(
+            stroke_index, playing_handicap
+        )
+        expected = (
+            handicap_strokes,
+            ahs.compute_hole_adjusted_gross_score(
+                par, stroke_index, gross_score, playing_handicap
+            ),
+            gross_score - handicap_strokes,
+        )
+        correction = corrections[corrections[:, 0] == hole_result[0]]
+        if expected == (0, 0, 0):
+            assert len(correction) == 0
+        else:
+            assert tuple(correction[0, [4, 6, 8]].tolist()) == expected
+
+
+def test_update_playing_conditions_corrections(session: Session):
+    """Tests corrections for a course-day with high scores, and one with too few."""
+    course = Course(name="Test Course", year=2024)
+    track = Track(name="Front", course=course)
+    tee = Tee(name="Blue", gender=TeeGender.MENS, rating=35.5, slope=125, track=track)
+    golfers = [
+        Golfer(name=f"Test Golfer {idx}", affiliation=GolferAffiliation.APL_EMPLOYEE)
+        for idx in range(8)
+    ]
+    session.add_all([course, track, tee, *golfers])
+    session.commit()
+    session.add_all(
+        Hole(tee_id=tee.id, number=number, par=4, stroke_index=2 * number - 1)
+        for number in range(1, 10)
+    )
+    session.commit()
+
+    # Scores 3 or 4 strokes over net par (median 3.5), expected 1.5 over
+    round_ids = [
+        add_round(
+            session,
+            tee,
+            golfer,
+            datetime(2024, 6, 4, 17),
+            playing_handicap=10,
+            gross_scores=[5, 5, 5, 5, 6, 6, 6, 6] + [6 if idx % 2 else 5],
+            is_correct=True,
+        ).id
+        for idx, golfer in enumerate(golfers)
+    ]
+    for golfer in golfers[:4]:
+        add_round(
+            session,
+            tee,
+            golfer,
+            datetime(2024, 6, 11, 17),
+            playing_handicap=10,
+            gross_scores=[6] * 9,
+            is_correct=True,
+        )
+
+    # Including the lookups of handicap index states with changed corrections
+    with assert_max_queries(5):
+        corrections = update_playing_conditions_corrections(
+            session=session, min_date=date(2024, 6, 1), max_date=date(2024, 7, 1)
+        )
+    assert [
+        (c.course_id, c.date_played, c.num_scores, c.playing_conditions_correction)
+        for c in corrections
+    ] == [
+        (course.id, date(2024, 6, 4), 8, 2.0),
+        (course.id, date(2024, 6, 11), 4, 0.0),
+    ]
+    assert len(session.exec(select(PlayingConditionsCorrection)).all()) == 2
+
+    # Corrections are applied to score differentials for handicapping
+    ahs = APLHandicapSystem()
+    (round_summary,) = get_round_summaries(session, round_ids=round_ids[:1])
+    assert round_summary.playing_conditions_correction == 2.0
+    assert round_summary.score_differential == ahs.compute_score_differential(
+        tee.rating, tee.slope, round_summary.adjusted_gross_score, 2.0
+    )
+    scoring_record = get_scoring_record_rounds_for_golfer(session, golfers[0].id)
+    assert [srr.playing_conditions_correction for srr in scoring_record] == [2.0, 0.0]
+
+    # Recomputing replaces stored corrections
+    update_playing_conditions_corrections(
+        session=session, min_date=date(2024, 6, 1), max_date=date(2024, 7, 1)
+    )
+    assert len(session.exec(select(PlayingConditionsCorrection)).all()) == 2
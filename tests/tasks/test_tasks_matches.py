@@ -0,0 +1,106 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models.flight import Flight
+from app.models.match import Match
+from app.models.team import Team
+from app.tasks.matches import (
+    MATCHUP_MATRICES,
+    get_schedule_from_matchup_matrix,
+    initialize_matches_for_flight,
+)
+
+
+def add_flight(session: Session, num_teams: int, weeks: int = 18) -> Flight:
+    flight = Flight(
+        name="Test Flight",
+        year=2024,
+        secretary="Test Secretary",
+        signup_start_date=datetime(2024, 3, 1),
+        signup_stop_date=datetime(2024, 4, 1),
+        start_date=datetime(2024, 4, 21),
+        weeks=weeks,
+        teams=[Team(name=f"Test Team {idx}") for idx in range(num_teams)],
+    )
+    session.add(flight)
+    session.commit()
+    return flight
+
+
+def test_get_schedule_from_matchup_matrix():
+    schedule = get_schedule_from_matchup_matrix(MATCHUP_MATRICES[(18, 5)])
+    assert schedule[0] == [(0, 3), (1, 2)]
+    assert schedule[5] == [(0, 3), (1, 2), (4, 3)]  # extra: 5 vs 4
+
+
+def test_initialize_matches_for_flight_generated(session: Session):
+    flight = add_flight(session, num_teams=12)
+    team_ids = [team.id for team in flight.teams]
+    initialize_matches_for_flight(
+        session=session,
+        flight_id=flight.id,
+        bye_weeks_by_team={team_ids[3]: 5},
+        off_weeks=[7, 12],
+    )
+
+    matches = session.exec(select(Match).where(Match.flight_id == flight.id)).all()
+    assert {match.week for match in matches} == set(range(1, 19)) - {7, 12}
+    assert not any(
+        team_ids[3] in (match.home_team_id, match.away_team_id)
+        for match in matches
+        if match.week == 5
+    )
+
+    # Existing matches are kept, not duplicated
+    initialize_matches_for_flight(
+        session=session,
+        flight_id=flight.id,
+        bye_weeks_by_team={team_ids[3]: 5},
+        off_weeks=[7, 12],
+        force=True,
+    )
+    assert len(session.exec(select(Match)).all()) == len(matches)
+
+
+def test_initialize_matches_for_flight_bye_week_fallback(session: Session):
+    flight = add_flight(session, num_teams=5)
+    team_ids = [team.id for team in flight.teams]
+
+    # Pre-defined matchups are used if bye week requests can be met
+    initialize_matches_for_flight(
+        session=session, flight_id=flight.id, bye_weeks_by_team={team_ids[0]: 1}
+    )
+    matches = session.exec(select(Match).where(Match.flight_id == flight.id)).all()
+    assert len(matches) == 40  # includes extra matches
+    assert not any(
+        team_ids[0] in (match.home_team_id, match.away_team_id)
+        for match in matches
+        if match.week == 1
+    )
+
+    # Schedule is generated if pre-defined matchups have no byes on requested week
+    flight = add_flight(session, num_teams=6)
+    team_ids = [team.id for team in flight.teams]
+    initialize_matches_for_flight(
+        session=session, flight_id=flight.id, bye_weeks_by_team={team_ids[2]: 1}
+    )
+    matches = session.exec(select(Match).where(Match.flight_id == flight.id)).all()
+    assert {match.week for match in matches} == set(range(1, 19))
+    assert not any(
+        team_ids[2] in (match.home_team_id, match.away_team_id)
+        for match in matches
+        if match.week == 1
+    )
+
+
+def test_initialize_matches_for_flight_existing(session: Session):
+    flight = add_flight(session, num_teams=6)
+    initialize_matches_for_flight(session=session, flight_id=flight.id, dry_run=True)
+    assert session.exec(select(Match)).all() == []
+
+    initialize_matches_for_flight(session=session, flight_id=flight.id)
+    assert len(session.exec(select(Match)).all()) == 16 * 3
+    with pytest.raises(ValueError):
+        initialize_matches_for_flight(session=session, flight_id=flight.id)
@@ -1,9 +1,24 @@
 import json
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+from app.utilities.query_counter import QueryStats, capture_queries
+
 
 def load_fixture(fixture_path: str):
     """Loads data from JSON file in the 'fixtures' directory at the given subpath."""
     file_path = Path(__file__).parent / "fixtures" / fixture_path
     with file_path.open() as f:
         return json.load(f)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """Asserts that at most the given number of SQL statements run within the block."""
+    with capture_queries() as stats:
+        yield stats
+    assert stats.count <= max_queries, (
+        f"Expected at most {max_queries} queries, executed {stats.count}:\n"
+        + "\n".join(f"{count}x {shape}" for shape, count in stats.shapes.most_common())
+    )
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utilities.coalescing import DEFAULT_COALESCED_ROUTES, RequestCoalescer
+
+
+def test_identical_computations_share_execution():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        time.sleep(0.1)
+        return {"standings": [1, 2, 3]}
+
+    async def run_requests():
+        return await asyncio.gather(
+            *[coalescer.run(("GET", "/flights/standings/1"), compute) for _ in range(5)]
+        )
+
+    results = asyncio.run(run_requests())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert coalescer.num_in_flight == 0
+
+
+def test_different_computations_run_separately():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    def compute(flight_id: int):
+        calls.append(flight_id)
+        time.sleep(0.05)
+        return flight_id
+
+    async def run_requests():
+        return await asyncio.gather(
+            coalescer.run(1, lambda: compute(1)),
+            coalescer.run(2, lambda: compute(2)),
+            coalescer.run(1, lambda: compute(1)),
+        )
+
+    assert asyncio.run(run_requests()) == [1, 2, 1]
+    assert sorted(calls) == [1, 2]
+
+
+def test_exception_propagates_to_all_waiters():
+    coalescer = RequestCoalescer()
+
+    def compute():
+        time.sleep(0.05)
+        raise ValueError("Flight not found")
+
+    async def run_requests():
+        return await asyncio.gather(
+            *[coalescer.run("key", compute) for _ in range(3)],
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run_requests())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert coalescer.num_in_flight == 0
+
+
+def test_completed_computations_are_not_cached():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert asyncio.run(coalescer.run("key", compute)) == 1
+    assert asyncio.run(coalescer.run("key", compute)) == 2
+
+
+@pytest.mark.parametrize(
+    "routes, route, is_enabled",
+    [
+        (DEFAULT_COALESCED_ROUTES, "/flights/standings/{flight_id}", True),
+        (DEFAULT_COALESCED_ROUTES, "/flights/{flight_id}", False),
+        ([], "/flights/standings/{flight_id}", False),
+        (
+            ["/tournaments/statistics/{tournament_id}"],
+            "/tournaments/statistics/{tournament_id}",
+            True,
+        ),
+    ],
+)
+def test_is_enabled(routes, route, is_enabled):
+    coalescer = RequestCoalescer()
+    coalescer.configure(routes)
+    assert coalescer.is_enabled(route) == is_enabled
@@ -0,0 +1,74 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from loguru import logger
+from sqlalchemy import text
+from sqlmodel import Session, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.utilities.custom_logger import AccessLogMiddleware, AccessLogOptions
+from app.utilities.query_counter import QueryCounterMiddleware
+
+
+@pytest.fixture(name="records")
+def records_fixture():
+    records = []
+    handler_id = logger.add(
+        lambda message: records.append(message.record),
+        level=0,
+        filter="app.utilities.custom_logger",
+    )
+    yield records
+    logger.remove(handler_id)
+
+
+def make_client(options: AccessLogOptions) -> TestClient:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware, options=options)
+    app.add_middleware(QueryCounterMiddleware)
+
+    @app.get("/golfers/{golfer_id}")
+    async def read_golfer(golfer_id: int):
+        with Session(engine) as session:
+            session.exec(text("SELECT 1"))
+        return {"golfer_id": golfer_id}
+
+    return TestClient(app)
+
+
+def test_access_log_line(records: list):
+    client = make_client(AccessLogOptions(debug_sample_rate=0))
+    response = client.get("/golfers/3", headers={"X-Request-ID": "abc123"})
+    assert response.status_code == 200
+
+    access_records = [r for r in records if r["extra"].get("latency_ms") is not None]
+    assert len(access_records) == 1
+    record = access_records[0]
+    assert record["level"].name == "INFO"
+    assert record["message"].startswith("GET /golfers/3 200")
+    assert record["extra"]["request_id"] == "abc123"
+    assert record["extra"]["route"] == "/golfers/{golfer_id}"
+    assert record["extra"]["status"] == 200
+    assert record["extra"]["db_query_count"] == 1
+    assert not [r for r in records if r["level"].name == "DEBUG"]
+
+
+def test_access_log_debug_detail(records: list):
+    client = make_client(AccessLogOptions(headers=("User-Agent",), debug_sample_rate=1))
+    client.get(
+        "/golfers/3", headers={"User-Agent": "test-agent", "Authorization": "secret"}
+    )
+
+    debug_records = [r for r in records if r["level"].name == "DEBUG"]
+    assert len(debug_records) == 1
+    assert "'golfer_id': '3'" in debug_records[0]["message"]
+    assert "test-agent" in debug_records[0]["message"]
+    assert "secret" not in debug_records[0]["message"]
+
+
+def test_access_log_options_exclude_credentials():
+    options = AccessLogOptions(headers=("Authorization", "Cookie", "Referer"))
+    assert options.headers == ("referer",)
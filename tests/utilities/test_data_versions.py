@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, insert
+from sqlmodel.pool import StaticPool
+
+from app.models.golfer import Golfer, GolferAffiliation
+from app.models.season import Season
+from app.utilities.data_versions import DataVersions, data_versions, touch
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_etag_changes_with_version():
+    versions = DataVersions()
+    etag = versions.get_etag(["golfer", "team"])
+    assert etag.startswith('W/"')
+    assert versions.get_etag(["team", "golfer"]) == etag
+
+    versions.bump(["team"])
+    assert versions.get_version("team") == 1
+    assert versions.get_version("golfer") == 0
+    assert versions.get_etag(["golfer", "team"]) != etag
+    assert versions.get_etag(["golfer", "team"], "extra") != versions.get_etag(
+        ["golfer", "team"]
+    )
+
+
+def test_last_modified():
+    versions = DataVersions()
+    started = versions.get_last_modified(["golfer"])
+    assert isinstance(started, datetime)
+    versions.bump(["golfer"])
+    assert versions.get_last_modified(["golfer"]) >= started
+    assert versions.get_last_modified(["team"]) == started
+
+
+def test_commit_bumps_written_tables(session: Session):
+    golfer_version = data_versions.get_version("golfer")
+    season_version = data_versions.get_version("season")
+
+    session.add(Golfer(name="Test Golfer", affiliation=GolferAffiliation.APL_EMPLOYEE))
+    session.commit()
+    assert data_versions.get_version("golfer") == golfer_version + 1
+    assert data_versions.get_version("season") == season_version
+
+    session.exec(insert(Season).values(year=2024, is_active=False))
+    session.commit()
+    assert data_versions.get_version("season") == season_version + 1
+
+
+def test_rollback_does_not_bump_tables(session: Session):
+    golfer_version = data_versions.get_version("golfer")
+    session.add(Golfer(name="Test Golfer", affiliation=GolferAffiliation.APL_EMPLOYEE))
+    session.flush()
+    session.rollback()
+    session.commit()
+    assert data_versions.get_version("golfer") == golfer_version
+
+
+def test_commit_bumps_touched_names(session: Session):
+    version = data_versions.get_version("tournament:1")
+    other_version = data_versions.get_version("tournament:2")
+    session.begin()
+    touch(session, ["tournament:1"])
+    session.rollback()
+    session.commit()
+    assert data_versions.get_version("tournament:1") == version
+
+    touch(session, ["tournament:1"])
+    session.commit()
+    assert data_versions.get_version("tournament:1") == version + 1
+    assert data_versions.get_version("tournament:2") == other_version
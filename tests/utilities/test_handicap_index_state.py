@@ -0,0 +1,124 @@
+import json
+from datetime import datetime, timedelta
+from random import Random
+
+import pytest
+
+from app.utilities.apl_handicap_system import APLHandicapSystem
+from app.utilities.handicap_index_state import HandicapIndexState
+from app.utilities.world_handicap_system import WorldHandicapSystem
+
+
+def compute_handicap_indexes(
+    scores: list[tuple[datetime, float]], handicap_system: WorldHandicapSystem
+) -> list[float]:
+    """Computes handicap index after each score, rescanning the scoring history."""
+    size = handicap_system.scoring_record_size
+    reductions: list[float] = []
+    handicap_indexes: list[float] = []
+    for idx, (date_played, score_differential) in enumerate(scores):
+        low_handicap_index = None
+        if idx >= size:
+            period_start = date_played.date() - timedelta(
+                days=handicap_system.low_handicap_index_period
+            )
+            final_indexes = {
+                scores[prior_idx][0].date(): handicap_indexes[prior_idx]
+                for prior_idx in range(idx)
+            }  # last handicap index each day
+            low_indexes = [
+                handicap_index
+                for day, handicap_index in final_indexes.items()
+                if period_start <= day < date_played.date()
+            ]
+            low_handicap_index = min(low_indexes) if low_indexes else None
+        reductions.append(
+            handicap_system.compute_exceptional_score_reduction(
+                score_differential=score_differential,
+                handicap_index=handicap_indexes[-1] if handicap_indexes else None,
+            )
+        )
+        record = [
+            round(scores[record_idx][1] - sum(reductions[record_idx:]), 1)
+            for record_idx in range(max(idx + 1 - size, 0), idx + 1)
+        ]
+        handicap_indexes.append(
+            min(
+                handicap_system.compute_capped_handicap_index(
+                    handicap_index=float(
+                        handicap_system.compute_handicap_index(record=record)
+                    ),
+                    low_handicap_index=low_handicap_index,
+                ),
+                handicap_system.maximum_handicap_index,
+            )
+        )
+    return handicap_indexes
+
+
+def generate_scores(seed: int, num_scores: int) -> list[tuple[datetime, float]]:
+    """Generates weekly scores (some on the same day) with an upward trend."""
+    rng = Random(seed)
+    date_played = datetime(2022, 4, 5, 17)
+    scores = []
+    for idx in range(num_scores):
+        if rng.random() > 0.1:
+            date_played += timedelta(days=rng.choice([7, 7, 7, 14, 120]))
+        scores.append((date_played, round(rng.uniform(-2.0, 24.0) + idx * 0.15, 1)))
+    return scores
+
+
+@pytest.mark.parametrize(
+    "handicap_system", [WorldHandicapSystem(), APLHandicapSystem()]
+)
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_post_score(handicap_system: WorldHandicapSystem, seed: int):
+    scores = generate_scores(seed=seed, num_scores=80)
+    state = HandicapIndexState()
+    handicap_indexes = [
+        state.post_score(
+            date_played=date_played,
+            score_differential=score_differential,
+            handicap_system=handicap_system,
+        )
+        for date_played, score_differential in scores
+    ]
+    assert handicap_indexes == compute_handicap_indexes(scores, handicap_system)
+    assert state.num_scores == len(scores)
+    assert len(state.scores) == handicap_system.scoring_record_size
+
+
+def test_post_score_exceptional():
+    whs = WorldHandicapSystem()
+    state = HandicapIndexState()
+    for week in range(3):
+        state.post_score(datetime(2024, 5, 7) + timedelta(weeks=week), 20.0, whs)
+    assert state.handicap_index == 18.0
+
+    state.post_score(datetime(2024, 5, 28), 8.0, whs)  # 10.0 below handicap index
+    assert state.reduction_total == 2.0
+    assert state.score_differentials == [18.0, 18.0, 18.0, 6.0]
+    assert state.handicap_index == 5.0
+
+
+def test_post_score_out_of_order():
+    whs = WorldHandicapSystem()
+    state = HandicapIndexState()
+    state.post_score(datetime(2024, 5, 14), 12.0, whs)
+    with pytest.raises(ValueError):
+        state.post_score(datetime(2024, 5, 7), 12.0, whs)
+
+
+def test_state_json_round_trip():
+    whs = WorldHandicapSystem()
+    scores = generate_scores(seed=4, num_scores=40)
+    state = HandicapIndexState()
+    for date_played, score_differential in scores[:30]:
+        state.post_score(date_played, score_differential, whs)
+
+    state_loaded = HandicapIndexState.model_validate(json.loads(state.json()))
+    assert state_loaded.score_differentials == state.score_differentials
+    for date_played, score_differential in scores[30:]:
+        assert state_loaded.post_score(
+            date_played, score_differential, whs
+        ) == state.post_score(date_played, score_differential, whs)
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.utilities.live_events import HEARTBEAT, LiveEvent, LiveEventBroker
+
+
+def test_publish_to_subscribers():
+    broker = LiveEventBroker(heartbeat_interval=10)
+
+    async def run():
+        initial = LiveEvent(id="0", event="standings", data=b"[]")
+        chunks = broker.subscribe("flights/1", initial=[initial])
+        assert broker.num_subscribers("flights/1") == 1
+        broker.publish("flights/1", "standings", b"[1]")
+        broker.publish("flights/2", "standings", b"[2]")  # other stream
+        received = [await anext(chunks), await anext(chunks)]
+        await chunks.aclose()
+        return received
+
+    received = asyncio.run(run())
+    event_id = broker.get_last_event_id("flights/1")
+    assert received == [
+        b"id: 0\nevent: standings\ndata: []\n\n",
+        f"id: {event_id}\nevent: standings\ndata: [1]\n\n".encode(),
+    ]
+    assert broker.num_subscribers("flights/1") == 0
+
+
+def test_get_events_since():
+    broker = LiveEventBroker(history_size=3)
+    last_event_id = broker.get_last_event_id("flights/1")
+    assert broker.get_events_since("flights/1", last_event_id) == []
+    events = [broker.publish("flights/1", "match", b"%d" % idx) for idx in range(5)]
+
+    assert broker.get_events_since("flights/1", events[1].id) == events[2:]
+    assert broker.get_events_since("flights/1", events[-1].id) == []
+    assert broker.get_events_since("flights/1", events[0].id) is None  # too old
+    assert broker.get_events_since("flights/1", "restarted-1") is None
+    assert broker.get_events_since("flights/2", events[1].id) is None
+
+    broker.discard_history("flights/1")
+    assert broker.get_events_since("flights/1", events[-1].id) is None
+    last_event_id = broker.get_last_event_id("flights/1")
+    assert broker.get_events_since("flights/1", last_event_id) == []
+
+
+def test_slow_subscriber_disconnected():
+    broker = LiveEventBroker(queue_size=2, heartbeat_interval=10)
+
+    async def run():
+        chunks = broker.subscribe("tournaments/1")
+        for idx in range(3):
+            broker.publish("tournaments/1", "rounds", b"%d" % idx)
+        await asyncio.sleep(0)  # deliver events
+        return [chunk async for chunk in chunks]
+
+    assert asyncio.run(run()) == []
+    assert broker.num_subscribers("tournaments/1") == 0
+
+
+def test_heartbeat():
+    broker = LiveEventBroker(heartbeat_interval=0.01)
+
+    async def run():
+        chunks = broker.subscribe("tournaments/1")
+        chunk = await anext(chunks)
+        await chunks.aclose()
+        return chunk
+
+    assert asyncio.run(run()) == HEARTBEAT
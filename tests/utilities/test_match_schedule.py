@@ -0,0 +1,79 @@
+import pytest
+
+from app.utilities.match_schedule import (
+    generate_schedule,
+    get_round_robin_rounds,
+    score_schedule,
+)
+
+
+@pytest.mark.parametrize("num_teams", range(2, 15))
+def test_get_round_robin_rounds(num_teams: int):
+    rounds = get_round_robin_rounds(num_teams)
+    assert len(rounds) == num_teams - 1 + num_teams % 2
+    for matches in rounds:
+        teams = [team for match in matches for team in match]
+        assert len(teams) == len(set(teams)) == num_teams - num_teams % 2
+    pairs = [frozenset(match) for matches in rounds for match in matches]
+    assert len(set(pairs)) == len(pairs) == num_teams * (num_teams - 1) // 2
+
+
+@pytest.mark.parametrize("num_teams", range(3, 15))
+def test_generate_schedule(num_teams: int):
+    schedule = generate_schedule(num_teams=num_teams, num_weeks=18)
+    assert len(schedule) == 18
+
+    matches = [0] * num_teams
+    home_matches = [0] * num_teams
+    meetings: dict[frozenset[int], int] = {}
+    for week_matches in schedule:
+        teams = [team for match in week_matches for team in match]
+        assert all(teams.count(team) <= 2 for team in teams)
+        assert len(teams) >= num_teams - 1  # at most one team sits out
+        for home, away in week_matches:
+            matches[home] += 1
+            matches[away] += 1
+            home_matches[home] += 1
+            pair = frozenset((home, away))
+            meetings[pair] = meetings.get(pair, 0) + 1
+
+    assert max(matches) - min(matches) <= 1
+    assert len(meetings) == num_teams * (num_teams - 1) // 2
+    assert max(meetings.values()) - min(meetings.values()) <= 1
+    assert all(abs(2 * home - total) <= 1 for home, total in zip(home_matches, matches))
+    assert score_schedule(schedule, num_teams) < 200
+
+
+@pytest.mark.parametrize("num_teams", [5, 8, 12])
+def test_generate_schedule_bye_and_off_weeks(num_teams: int):
+    bye_weeks = {team: 1 + (3 * team) % 18 for team in range(num_teams)}
+    bye_weeks = {team: week for team, week in bye_weeks.items() if week not in (7, 12)}
+    schedule = generate_schedule(
+        num_teams=num_teams, num_weeks=18, bye_weeks=bye_weeks, off_weeks=[7, 12]
+    )
+    assert schedule[6] == schedule[11] == []
+    for team, week in bye_weeks.items():
+        assert all(team not in match for match in schedule[week - 1])
+    assert score_schedule(schedule, num_teams, bye_weeks) < 1000
+
+
+def test_generate_schedule_deterministic():
+    assert generate_schedule(num_teams=9, num_weeks=12, seed=3) == generate_schedule(
+        num_teams=9, num_weeks=12, seed=3
+    )
+
+
+def test_generate_schedule_invalid():
+    with pytest.raises(ValueError):
+        generate_schedule(num_teams=1, num_weeks=18)
+    with pytest.raises(ValueError):
+        generate_schedule(num_teams=6, num_weeks=18, bye_weeks={6: 1})
+    with pytest.raises(ValueError):
+        generate_schedule(num_teams=6, num_weeks=18, bye_weeks={0: 19})
+
+
+def test_score_schedule():
+    # Two teams playing every week: balanced, but every week is a rematch
+    schedule = [[(0, 1)], [(1, 0)], [], [(0, 1)]]
+    assert score_schedule(schedule, 2) == 2 * 20.0
+    assert score_schedule(schedule, 2, bye_weeks={0: 2}) == 1000.0 + 2 * 20.0
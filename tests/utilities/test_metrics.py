@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import QueuePool
+from sqlmodel import create_engine
+
+from app.api import app
+from app.utilities import metrics
+from app.utilities.metrics import MetricsRegistry, PhaseTimer, time_task
+
+
+def test_registry_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter", labels=("name",))
+    histogram = registry.histogram(
+        "test_seconds", "Test histogram", labels=("name",), buckets=(0.1, 1)
+    )
+    counter.inc(name='a "quoted" name')
+    counter.inc(2, name='a "quoted" name')
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value, name="b")
+
+    lines = registry.render().decode().splitlines()
+    assert "# TYPE test_total counter" in lines
+    assert 'test_total{name="a \\"quoted\\" name"} 3' in lines
+    assert "# TYPE test_seconds histogram" in lines
+    assert 'test_seconds_bucket{name="b",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{name="b",le="1"} 3' in lines
+    assert 'test_seconds_bucket{name="b",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{name="b"} 5.65' in lines
+    assert 'test_seconds_count{name="b"} 4' in lines
+
+
+def test_request_metrics():
+    client = TestClient(app)
+    labels = {"method": "GET", "route": "/heartbeat/"}
+    count = metrics.http_request_duration_seconds.get_count(**labels)
+
+    assert client.get("/heartbeat/").status_code == 200
+    assert metrics.http_request_duration_seconds.get_count(**labels) == count + 1
+    assert metrics.http_requests_total.get(**labels, status="200") >= 1
+    assert metrics.http_requests_in_flight.get() == 0
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="GET",route="/heartbeat/",status="200"}'
+        in response.text
+    )
+
+
+def test_time_task():
+    with time_task("test_task"):
+        pass
+    with pytest.raises(ValueError):
+        with time_task("test_task"):
+            raise ValueError()
+    assert metrics.task_runs_total.get(task="test_task", outcome="success") == 1
+    assert metrics.task_runs_total.get(task="test_task", outcome="failure") == 1
+    assert metrics.task_run_duration_seconds.get_count(task="test_task") == 2
+
+
+def test_phase_timer():
+    timer = PhaseTimer("test_phase_task")
+    for _ in range(3):
+        with timer.phase("compute"):
+            pass
+    timer.observe()
+    assert list(timer.durations) == ["compute"]
+    assert (
+        metrics.task_phase_duration_seconds.get_count(
+            task="test_phase_task", phase="compute"
+        )
+        == 1
+    )
+
+
+def test_pool_metrics():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=3)
+    metrics.register_pool_metrics(engine.pool)
+    with engine.connect():
+        assert metrics.registry.gauge("db_pool_checked_out", "").get() == 1
+    assert metrics.registry.gauge("db_pool_size", "").get() == 3
@@ -0,0 +1,195 @@
+import socketserver
+import threading
+from email import message_from_bytes
+
+import pytest
+
+from app.utilities.notifications import (
+    EmailOutbox,
+    EmailSchema,
+    OutboxMessage,
+    SMTPConfig,
+    connect_smtp,
+    render_email,
+)
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal local SMTP server recording received messages.
+
+    Rejects the first `num_failures` messages with a transient error.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, num_failures: int = 0):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.num_failures = num_failures
+        self.messages = []
+        self.num_connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        with self.server.lock:
+            self.server.num_connections += 1
+        self.reply("220 localhost stand-in")
+        while line := self.rfile.readline():
+            command = line.decode().strip().split(" ")[0].upper()
+            if command == "EHLO":
+                self.reply("250 localhost")
+            elif command in ("MAIL", "RCPT", "RSET", "NOOP", "HELO"):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (line := self.rfile.readline()) != b".\r\n":
+                    data += line
+                with self.server.lock:
+                    if self.server.num_failures > 0:
+                        self.server.num_failures -= 1
+                        self.reply("451 Try again later")
+                        continue
+                    self.server.messages.append(message_from_bytes(data))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_outbox(server: SMTPStandIn, **options) -> EmailOutbox:
+    config = SMTPConfig(
+        server="127.0.0.1",
+        port=server.port,
+        from_address="league@example.com",
+        from_name="APL Golf League",
+        starttls=False,
+        timeout=5,
+    )
+    return EmailOutbox(config=config, **options)
+
+
+def test_render_email():
+    email = EmailSchema(
+        subject="Handicap Update Report",
+        to_addresses=["handicapper@example.com"],
+        body={
+            "update_date": "2024-06-03T00:00:00",
+            "updates": [
+                {
+                    "golfer_name": "Test Golfer",
+                    "golfer_id": 1,
+                    "index_prior": 10.2,
+                    "index_new": 9.8,
+                    "reasons": "<new rounds>",
+                }
+            ],
+        },
+    )
+    html = render_email(email, "handicap_update_report.html")
+    assert "2024-06-03T00:00:00" in html
+    assert "Test Golfer (id=1)" in html
+    assert "&lt;new rounds&gt;" in html
+
+
+def test_outbox_reuses_connection(smtp_server: SMTPStandIn):
+    outbox = make_outbox(smtp_server)
+    for idx in range(3):
+        outbox.enqueue(
+            OutboxMessage(
+                subject=f"Message {idx}",
+                recipients=["golfer@example.com"],
+                html=f"<p>{idx}</p>",
+            )
+        )
+    assert outbox.wait_until_idle(timeout=5)
+    outbox.close(timeout=5)
+
+    assert [message["Subject"] for message in smtp_server.messages] == [
+        "Message 0",
+        "Message 1",
+        "Message 2",
+    ]
+    assert smtp_server.messages[0]["From"] == "APL Golf League <league@example.com>"
+    assert smtp_server.messages[0]["To"] == "golfer@example.com"
+    assert smtp_server.num_connections == 1
+    assert len(outbox) == 0
+
+
+def test_outbox_retries_with_backoff(smtp_server: SMTPStandIn):
+    smtp_server.num_failures = 2
+    outbox = make_outbox(smtp_server, backoff=0.01)
+    message = OutboxMessage(
+        subject="Retried", recipients=["golfer@example.com"], html="<p></p>"
+    )
+    outbox.enqueue(message)
+    assert outbox.wait_until_idle(timeout=5)
+    outbox.close(timeout=5)
+
+    assert message.attempts == 3
+    assert [message["Subject"] for message in smtp_server.messages] == ["Retried"]
+
+
+def test_outbox_drops_message_after_max_attempts(smtp_server: SMTPStandIn):
+    smtp_server.num_failures = 5
+    outbox = make_outbox(smtp_server, backoff=0.01, max_attempts=2)
+    message = OutboxMessage(
+        subject="Dropped", recipients=["golfer@example.com"], html="<p></p>"
+    )
+    outbox.enqueue(message)
+    assert outbox.wait_until_idle(timeout=5)
+    outbox.close(timeout=5)
+
+    assert message.attempts == 2
+    assert smtp_server.messages == []
+
+
+def test_outbox_enqueue_does_not_block_on_unavailable_server():
+    def connect_unavailable(config: SMTPConfig):
+        raise ConnectionRefusedError("Mail server unavailable")
+
+    outbox = EmailOutbox(
+        config=SMTPConfig(server="127.0.0.1", port=1, from_address="a@example.com"),
+        backoff=60,
+        connect=connect_unavailable,
+    )
+    outbox.enqueue(OutboxMessage(subject="Queued", recipients=[], html=""))
+    assert not outbox.wait_until_idle(timeout=0.1)
+    assert len(outbox) == 1
+    outbox.close(timeout=5)  # final attempt on close, then dropped
+    assert len(outbox) == 0
+
+
+def test_connect_smtp(smtp_server: SMTPStandIn):
+    connection = connect_smtp(
+        SMTPConfig(
+            server="127.0.0.1",
+            port=smtp_server.port,
+            from_address="league@example.com",
+            starttls=False,
+        )
+    )
+    assert connection.noop()[0] == 250
+    connection.quit()
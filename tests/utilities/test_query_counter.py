@@ -0,0 +1,84 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.utilities.query_counter import (
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    QueryCounterMiddleware,
+    QueryCounterOptions,
+    capture_queries,
+    get_statement_shape,
+    track_queries,
+)
+
+
+def make_engine():
+    return create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+
+def test_statement_shape_ignores_parameters():
+    assert get_statement_shape(
+        "SELECT * FROM golfer\n WHERE golfer.id IN (1, 2, 3) AND name = 'A'"
+    ) == get_statement_shape(
+        "SELECT * FROM golfer WHERE golfer.id IN (4) AND name = 'B'"
+    )
+    assert get_statement_shape("SELECT * FROM golfer WHERE id = ?") != (
+        get_statement_shape("SELECT * FROM team WHERE id = ?")
+    )
+
+
+def test_track_queries_counts_statements():
+    engine = make_engine()
+    with Session(engine) as session:
+        with track_queries() as stats:
+            for value in range(12):
+                session.exec(text(f"SELECT {value}"))
+            session.exec(text("SELECT 'other' AS name"))
+        session.exec(text("SELECT 1"))  # not tracked
+    assert stats.count == 13
+    assert stats.duration > 0
+    assert stats.get_repeated_statements(threshold=10) == {"SELECT ?": 12}
+    assert stats.get_repeated_statements(threshold=13) == {}
+
+
+def test_capture_queries_from_other_threads():
+    engine = make_engine()
+    app = FastAPI()
+
+    @app.get("/")
+    def read():
+        with Session(engine) as session:
+            session.exec(text("SELECT 1"))
+        return {}
+
+    with capture_queries() as stats:
+        TestClient(app).get("/")
+    assert stats.count == 1
+
+
+def test_middleware_debug_headers():
+    engine = make_engine()
+    options = QueryCounterOptions(debug_headers=False)
+    app = FastAPI()
+    app.add_middleware(QueryCounterMiddleware, options=options)
+
+    @app.get("/")
+    async def read():
+        with Session(engine) as session:
+            session.exec(text("SELECT 1"))
+            session.exec(text("SELECT 2"))
+        return {}
+
+    client = TestClient(app)
+    response = client.get("/")
+    assert QUERY_COUNT_HEADER not in response.headers
+
+    options.configure(debug_headers=True)
+    response = client.get("/")
+    assert response.headers[QUERY_COUNT_HEADER] == "2"
+    assert float(response.headers[QUERY_TIME_HEADER]) >= 0
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, Response
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.models.base import APLGLBaseModel
+from app.models.round import RoundType
+from app.utilities import responses
+from app.utilities.responses import FastJSONRoute, render_json
+
+
+class HoleData(APLGLBaseModel):
+    number: int
+    gross_score: int | None = None
+
+
+class RoundData(APLGLBaseModel):
+    round_id: int
+    round_type: RoundType
+    date_played: datetime
+    golfer_name: str
+    tee_rating: float
+    holes: list[HoleData] = []
+
+
+class RoundDataWithExtra(RoundData):
+    extra: str = "not in response model"
+
+
+def make_rounds() -> list[RoundData]:
+    return [
+        RoundData(
+            round_id=round_id,
+            round_type=RoundType.FLIGHT,
+            date_played=datetime(2024, 5, 1, 17, 30, 15, 250),
+            golfer_name="Golfer Ünïcode",
+            tee_rating=35.6,
+            holes=[
+                HoleData(number=n, gross_score=None if n == 9 else 4)
+                for n in range(1, 10)
+            ],
+        )
+        for round_id in range(1, 4)
+    ]
+
+
+async def set_etag(response: Response):
+    response.headers["ETag"] = '"test-etag"'
+
+
+def make_client(route_class) -> TestClient:
+    router = APIRouter(route_class=route_class)
+
+    @router.get(
+        "/rounds", response_model=list[RoundData], dependencies=[Depends(set_etag)]
+    )
+    async def read_rounds():
+        return make_rounds()
+
+    @router.get("/rounds/{round_id}", response_model=RoundData)
+    async def read_round(*, round_id: int):
+        return RoundDataWithExtra(**make_rounds()[round_id - 1].dict())
+
+    @router.get("/raw")
+    async def read_raw():
+        return {"round_type": RoundType.FLIGHT, "rounds": make_rounds()}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/rounds", "/rounds/2", "/raw"])
+def test_fast_json_matches_standard_response(path: str):
+    standard = make_client(APIRoute).get(path)
+    fast = make_client(FastJSONRoute).get(path)
+    assert standard.status_code == fast.status_code == 200
+    assert fast.content == standard.content
+    assert fast.headers["content-type"] == standard.headers["content-type"]
+
+
+def test_fast_json_keeps_dependency_headers():
+    response = make_client(FastJSONRoute).get("/rounds")
+    assert response.headers["ETag"] == '"test-etag"'
+    assert response.json()[0]["round_type"] == RoundType.FLIGHT.label
+    assert response.json()[0]["date_played"] == "2024-05-01T17:30:15.000250"
+
+
+def test_fast_json_disabled(monkeypatch):
+    monkeypatch.setattr(responses, "fast_json_enabled", False)
+    standard = make_client(APIRoute).get("/rounds")
+    fast = make_client(FastJSONRoute).get("/rounds")
+    assert fast.content == standard.content
+
+
+def test_render_json_untrusted_subclass_not_used_directly():
+    # Rendering a subclass includes its extra fields, so routes must fall back
+    content = RoundDataWithExtra(**make_rounds()[0].dict())
+    assert b"not in response model" in render_json(content)
+    response = make_client(FastJSONRoute).get("/rounds/1")
+    assert "extra" not in response.json()
+
+
+def test_fast_json_used_for_trusted_content_only(monkeypatch):
+    rendered = []
+    monkeypatch.setattr(
+        responses.FastJSONResponse,
+        "render",
+        lambda self, content: rendered.append(content) or render_json(content),
+    )
+    client = make_client(FastJSONRoute)
+    client.get("/rounds")
+    client.get("/raw")
+    assert len(rendered) == 1
+    client.get("/rounds/1")
+    assert len(rendered) == 1
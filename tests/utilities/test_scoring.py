@@ -94,6 +94,38 @@ def test_validate_round(
     assert round_response.is_valid == all(hole_is_valid)
 
 
+def test_validate_rounds():
+    """Batch validation matches validating each round."""
+    holes = [
+        {"number": 1, "par": 4, "stroke_index": 1},
+        {"number": 2, "par": 3, "stroke_index": 9},
+        {"number": 3, "par": 5, "stroke_index": 5},
+    ]
+    round_requests = [
+        RoundValidationRequest(
+            course_handicap=course_handicap,
+            date_played=date_played,
+            holes=[
+                {**hole, "gross_score": gross_score}
+                for hole, gross_score in zip(holes, gross_scores)
+            ],
+        )
+        for course_handicap, date_played, gross_scores in [
+            (12, date(2024, 6, 3), [5, 7, 11]),
+            (12, date(2024, 6, 3), [6, 0, 12]),
+            (4, date(2024, 6, 3), [4, 3, 5]),
+            (-2, date(2024, 6, 3), [4, 3, 12]),
+        ]
+    ]
+
+    round_responses = scoring.validate_rounds(round_requests)
+
+    assert len(round_responses) == len(round_requests)
+    for round_request, round_response in zip(round_requests, round_responses):
+        assert round_response == scoring.validate_round(round_request)
+    assert [r.is_valid for r in round_responses] == [True, False, True, False]
+
+
 def test_validate_match():
     match_request = MatchValidationRequest(
         **load_fixture("valid_match/match_request.json")
@@ -0,0 +1,50 @@
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlmodel import create_engine
+from sqlmodel.pool import StaticPool
+
+from app.utilities.startup import StartupTimer, find_alembic_config, is_schema_current
+
+
+def make_engine():
+    return create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+
+def set_revision(engine, revision: str):
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32))")
+        )
+        connection.execute(text("DELETE FROM alembic_version"))
+        connection.execute(
+            text("INSERT INTO alembic_version VALUES (:revision)"),
+            {"revision": revision},
+        )
+
+
+def test_is_schema_current():
+    config_path = find_alembic_config()
+    assert config_path is not None
+    (head,) = ScriptDirectory.from_config(Config(config_path)).get_heads()
+
+    engine = make_engine()
+    assert not is_schema_current(engine)  # not migrated
+
+    set_revision(engine, "499f7f88cfe5")
+    assert not is_schema_current(engine)  # outdated
+
+    set_revision(engine, head)
+    assert is_schema_current(engine)
+
+
+def test_startup_timer():
+    timer = StartupTimer()
+    with timer.phase("first"):
+        pass
+    with timer.phase("second"):
+        pass
+    timer.report()
+    assert list(timer.durations) == ["first", "second"]
@@ -0,0 +1,168 @@
+from datetime import datetime
+from random import Random
+
+from app.models.hole_result import HoleResultData
+from app.models.round import RoundResults, RoundType
+from app.models.tee import TeeGender
+from app.models.tournament import TournamentTeam
+from app.utilities.tournament_leaderboard import TournamentLeaderboard
+
+TEAMS = [
+    TournamentTeam(tournament_id=1, team_id=team_id, name=f"Team {team_id}")
+    for team_id in (30, 10, 20)
+]
+
+
+def make_round(
+    round_id: int, team_id: int, golfer_id: int, gross_scores: list[int]
+) -> RoundResults:
+    """Round results with one handicap stroke on the first hole."""
+    net_scores = [score - int(idx == 0) for idx, score in enumerate(gross_scores)]
+    return RoundResults(
+        round_id=round_id,
+        team_id=team_id,
+        round_type=RoundType.TOURNAMENT,
+        date_played=datetime(2024, 6, 8),
+        date_updated=datetime(2024, 6, 8),
+        golfer_id=golfer_id,
+        golfer_name=f"Golfer {golfer_id}",
+        golfer_playing_handicap=1,
+        course_id=1,
+        course_name="Course",
+        track_id=1,
+        track_name="Front",
+        tee_id=1,
+        tee_name="Blue",
+        tee_gender=TeeGender.MENS,
+        tee_par=4 * len(gross_scores),
+        tee_rating=35.5,
+        tee_slope=125,
+        tee_color="Blue",
+        gross_score=sum(gross_scores),
+        net_score=sum(net_scores),
+        holes=[
+            HoleResultData(
+                hole_result_id=round_id * 100 + idx,
+                round_id=round_id,
+                hole_id=idx,
+                number=idx + 1,
+                par=4,
+                gross_score=gross_score,
+                net_score=net_score,
+            )
+            for idx, (gross_score, net_score) in enumerate(
+                zip(gross_scores, net_scores)
+            )
+        ],
+    )
+
+
+def test_apply_round():
+    leaderboard = TournamentLeaderboard(
+        tournament_id=1, teams=TEAMS, num_balls=1, individual=True
+    )
+    assert [(t.team_id, t.position) for t in leaderboard.get_standings().teams] == [
+        (30, ""),
+        (10, ""),
+        (20, ""),
+    ]
+    assert leaderboard.get_standings().golfers == []
+
+    leaderboard.apply_round(make_round(1, 10, 1, [4, 5, 3, 6]))
+    leaderboard.apply_round(make_round(2, 10, 2, [5, 4, 4, 3]))  # best ball: 14
+    leaderboard.apply_round(make_round(3, 20, 3, [4, 4, 4, 3]))  # best ball: 15
+    standings = leaderboard.get_standings()
+    assert [
+        (t.team_id, t.gross_score, t.net_score, t.position) for t in standings.teams
+    ] == [(10, 14, 13, "1"), (20, 15, 14, "2"), (30, 0, 0, "")]
+    assert [(g.golfer_id, g.net_score, g.position) for g in standings.golfers] == [
+        (3, 14, "1"),
+        (2, 15, "2"),
+        (1, 17, "3"),
+    ]
+
+    # Standings are cached until the next round is applied
+    assert leaderboard.get_standings() is standings
+
+    # Only the team of the posted round is rescored
+    leaderboard.apply_round(make_round(4, 20, 4, [3, 3, 4, 3]))  # best ball: 13
+    standings = leaderboard.get_standings()
+    assert [
+        (t.team_id, t.gross_score, t.net_score, t.position) for t in standings.teams
+    ] == [(20, 13, 12, "1"), (10, 14, 13, "2"), (30, 0, 0, "")]
+    assert [(g.golfer_id, g.position) for g in standings.golfers] == [
+        (4, "1"),
+        (3, "2"),
+        (2, "3"),
+        (1, "4"),
+    ]
+
+    # Re-applying a round replaces it, tied teams are listed in team order
+    leaderboard.apply_round(make_round(4, 20, 4, [4, 4, 3, 3]))  # best ball: 14
+    standings = leaderboard.get_standings()
+    assert leaderboard.num_rounds == 4
+    assert [(t.team_id, t.net_score, t.position) for t in standings.teams] == [
+        (10, 13, "T1"),
+        (20, 13, "T1"),
+        (30, 0, ""),
+    ]
+    assert [(g.golfer_id, g.net_score) for g in standings.golfers] == [
+        (4, 13),
+        (3, 14),
+        (2, 15),
+        (1, 17),
+    ]
+
+
+def test_apply_round_order():
+    rng = Random(0)
+    rounds = [
+        make_round(
+            round_id=len(TEAMS) * golfer_idx + team_idx,
+            team_id=team.team_id,
+            golfer_id=len(TEAMS) * golfer_idx + team_idx,
+            gross_scores=[rng.randint(3, 6) for _ in range(9)],
+        )
+        for team_idx, team in enumerate(TEAMS)
+        for golfer_idx in range(3)
+    ]
+    expected = TournamentLeaderboard(
+        tournament_id=1, teams=TEAMS, num_balls=2, individual=True
+    )
+    for round_results in rounds:
+        expected.apply_round(round_results)
+
+    # Rounds posted in any order, including corrected rounds, give same standings
+    leaderboard = TournamentLeaderboard(
+        tournament_id=1, teams=TEAMS, num_balls=2, individual=True
+    )
+    for round_results in rng.sample(rounds, len(rounds)):
+        leaderboard.apply_round(
+            make_round(
+                round_id=round_results.round_id,
+                team_id=round_results.team_id,
+                golfer_id=round_results.golfer_id,
+                gross_scores=[rng.randint(3, 6) for _ in range(9)],
+            )
+        )
+        leaderboard.get_standings()
+    for round_results in rng.sample(rounds, len(rounds)):
+        leaderboard.apply_round(round_results)
+    assert (
+        leaderboard.get_standings().model_dump()
+        == expected.get_standings().model_dump()
+    )
+
+
+def test_apply_round_individual_only():
+    leaderboard = TournamentLeaderboard(
+        tournament_id=1, teams=TEAMS, num_balls=0, individual=True
+    )
+    leaderboard.apply_round(make_round(1, 10, 1, [4, 4, 4, 4]))
+    leaderboard.apply_round(make_round(2, 10, 1, [5, 4, 4, 4]))  # second round
+    standings = leaderboard.get_standings()
+    assert standings.teams == []
+    assert [
+        (g.golfer_id, g.gross_score, g.net_score, g.golfer_playing_handicap)
+        for g in standings.golfers
+    ] == [(1, 33, 31, 2)]
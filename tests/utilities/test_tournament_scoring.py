@@ -0,0 +1,96 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+from app.utilities.tournament_scoring import (
+    build_score_matrix,
+    compute_best_ball_scores,
+    get_count_back_keys,
+    rank_scores,
+)
+
+
+def compute_best_ball_naive(
+    hole_scores: list[tuple[int, int, int]], team: int, num_balls: int
+) -> int:
+    """Best-ball score for a team, scanning hole scores for each hole."""
+    score = 0
+    for hole in sorted({h for t, h, _ in hole_scores if t == team}):
+        scores = sorted(s for t, h, s in hole_scores if t == team and h == hole)
+        score += sum(scores[:num_balls])
+    return score
+
+
+@pytest.mark.parametrize("num_balls", [1, 2, 3, 5])
+def test_compute_best_ball_scores(num_balls: int):
+    rng = Random(num_balls)
+    num_teams, num_holes = 30, 18
+    hole_scores = [
+        (team, hole, rng.randint(2, 9))
+        for team in range(num_teams)
+        for _ in range(rng.randint(1, 4))  # golfers
+        for hole in range(num_holes)
+        if rng.random() > 0.05  # some holes not played
+    ]
+    rng.shuffle(hole_scores)
+    team_idx, hole_idx, scores = np.array(hole_scores).T
+
+    matrix = build_score_matrix(
+        group_idx=team_idx,
+        hole_idx=hole_idx,
+        scores=scores,
+        num_groups=num_teams,
+        num_holes=num_holes,
+    )
+    assert matrix.shape[0] == num_teams and matrix.shape[2] == num_holes
+    assert np.nansum(matrix) == scores.sum()
+
+    team_scores = compute_best_ball_scores(matrix, num_balls=num_balls).sum(axis=1)
+    assert team_scores.tolist() == [
+        compute_best_ball_naive(hole_scores, team, num_balls)
+        for team in range(num_teams)
+    ]
+
+
+def test_compute_best_ball_scores_empty():
+    matrix = build_score_matrix(
+        group_idx=np.array([], dtype=int),
+        hole_idx=np.array([], dtype=int),
+        scores=np.array([]),
+        num_groups=2,
+        num_holes=0,
+    )
+    assert compute_best_ball_scores(matrix, num_balls=2).shape == (2, 0)
+
+
+def test_rank_scores():
+    order, positions = rank_scores(np.array([72, 68, 70, 68, 75, 70, 70]))
+    assert order == [1, 3, 2, 5, 6, 0, 4]
+    assert positions == ["T1", "T1", "T3", "T3", "T3", "6", "7"]
+
+    assert rank_scores(np.array([])) == ([], [])
+
+
+def test_rank_scores_count_back():
+    hole_scores = np.array(
+        [
+            [4] * 9 + [4, 4, 4, 4, 4, 4, 4, 4, 4],  # 72, back nine 36, last hole 4
+            [4] * 8 + [2] + [5, 5, 4, 4, 4, 4, 4, 4, 4],  # 72, back nine 38
+            [4] * 7 + [5, 5] + [3, 3, 4, 4, 4, 4, 4, 4, 4],  # 72, back nine 34
+            [4] * 9 + [4, 4, 4, 4, 4, 4, 3, 4, 5],  # 72, back nine 36, last hole 5
+            [4] * 9 + [4, 4, 4, 4, 4, 4, 4, 4, 3],  # 71
+        ]
+    )
+    keys = get_count_back_keys(hole_scores)
+    assert keys[0].tolist() == [36, 24, 12, 4]
+
+    order, positions = rank_scores(hole_scores.sum(axis=1), tie_breaks=keys)
+    assert order == [4, 2, 0, 3, 1]
+    assert positions == ["1", "2", "3", "4", "5"]
+
+    # Ties remain if count-back is also tied
+    order, positions = rank_scores(
+        np.array([70, 70]), tie_breaks=get_count_back_keys(hole_scores[[0, 0]])
+    )
+    assert positions == ["T1", "T1"]
@@ -0,0 +1,40 @@
+import time
+
+from app.utilities.ttl_cache import TTLCache
+
+
+def test_get_set_invalidate():
+    cache = TTLCache(maxsize=4, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    cache.invalidate("a")
+    assert cache.get("a", "missing") == "missing"
+
+
+def test_entries_expire():
+    cache = TTLCache(maxsize=4, ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_disabled_with_zero_ttl():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.configure(ttl=0)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from app.utilities.world_handicap_system import WorldHandicapSystem
@@ -324,3 +325,70 @@ def test_compoute_handicap_index(records, handicap_index):
 def test_maximum_handicap_index():
     whs = WorldHandicapSystem()
     assert whs.maximum_handicap_index == 54.0
+
+
+@pytest.mark.parametrize(
+    "handicap_index, low_handicap_index, capped_handicap_index",
+    [
+        (12.0, None, 12.0),
+        (10.0, 12.0, 10.0),
+        (15.0, 12.0, 15.0),
+        (17.0, 12.0, 16.0),
+        (20.0, 12.0, 17.0),
+        (25.0, 12.0, 17.0),
+    ],
+)
+def test_compute_capped_handicap_index(
+    handicap_index, low_handicap_index, capped_handicap_index
+):
+    whs = WorldHandicapSystem()
+    assert (
+        whs.compute_capped_handicap_index(
+            handicap_index=handicap_index, low_handicap_index=low_handicap_index
+        )
+        == capped_handicap_index
+    )
+
+
+@pytest.mark.parametrize(
+    "score_differential, handicap_index, reduction",
+    [
+        (5.0, None, 0.0),
+        (5.0, 11.9, 0.0),
+        (5.0, 12.0, 1.0),
+        (5.0, 14.9, 1.0),
+        (5.0, 15.0, 2.0),
+        (20.0, 12.0, 0.0),
+    ],
+)
+def test_compute_exceptional_score_reduction(
+    score_differential, handicap_index, reduction
+):
+    whs = WorldHandicapSystem()
+    assert (
+        whs.compute_exceptional_score_reduction(
+            score_differential=score_differential, handicap_index=handicap_index
+        )
+        == reduction
+    )
+
+
+@pytest.mark.parametrize(
+    "net_scores_over_par, playing_conditions_correction",
+    [
+        ([9.0] * 7, 0.0),
+        ([3.0] * 8, 0.0),
+        ([1.0] * 8, -1.0),
+        ([-4.0] * 8, -1.0),
+        ([5.0, 5.0, 6.0, 4.0, 9.0, 2.0, 5.0, 7.0], 2.0),
+        ([12.0] * 10, 3.0),
+    ],
+)
+def test_compute_playing_conditions_correction(
+    net_scores_over_par, playing_conditions_correction
+):
+    whs = WorldHandicapSystem()
+    assert (
+        whs.compute_playing_conditions_correction(np.array(net_scores_over_par))
+        == playing_conditions_correction
+    )